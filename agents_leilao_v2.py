@@ -6,7 +6,6 @@ Pipeline completo com 6 agentes especializados
 import os
 from typing import Dict, List, Optional
 from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
 import logging
 
 # Importa tools customizadas
@@ -18,6 +17,7 @@ from tools.score_tools import (
     classificar_recomendacao
 )
 from tools.output_tools import generate_csv_report, generate_pdf_report, generate_summary_csv
+from tools.llm_tools import criar_llm_langchain
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,18 +26,11 @@ logger = logging.getLogger(__name__)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
 
-llm = ChatOpenAI(
-    model=LLM_MODEL,
-    temperature=0.2,
-    api_key=OPENAI_API_KEY
-)
+# Mesmo limite de requisicoes/min, retry e URL base do gateway (tools/llm_tools.py)
+llm = criar_llm_langchain(LLM_MODEL, temperatura=0.2)
 
 # LLM economico para tarefas simples
-llm_fast = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0.1,
-    api_key=OPENAI_API_KEY
-)
+llm_fast = criar_llm_langchain("gpt-4o-mini", temperatura=0.1)
 
 
 # ==================== AGENTES ====================
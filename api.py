@@ -21,6 +21,8 @@ load_dotenv()
 
 # Import do pipeline
 from main_pipeline import PipelineLeilao
+from tools.store_tools import ler_tabela, listar_execucoes, TABELA_ANALISES
+from tools.ranking_tools import reclassificar_top5
 
 # Configuracao
 logging.basicConfig(level=logging.INFO)
@@ -37,6 +39,48 @@ pipeline_status = {
 }
 
 
+def _carregar_analises(colunas=None, filtros=None):
+    """
+    Le as analises da ultima execucao.
+
+    Usa o store Parquet (projecao de colunas + filtros na leitura);
+    se o store estiver vazio ou indisponivel, le o ultimo CSV de analise.
+
+    Args:
+        colunas: Colunas a ler (None = todas, exceto analise_json)
+        filtros: Lista de (coluna, operador, valor) no formato do pyarrow
+
+    Returns:
+        Tupla (DataFrame, origem, data_atualizacao) ou None se nao ha dados
+    """
+    import pandas as pd
+
+    execucoes = listar_execucoes(TABELA_ANALISES)
+    if execucoes:
+        if colunas is None:
+            from tools.output_tools import CSV_COLUMNS
+            colunas = CSV_COLUMNS + ["uf", "fonte", "execucao_id"]
+        df = ler_tabela(TABELA_ANALISES, colunas=colunas, filtros=filtros, execucao=execucoes[-1])
+        data = datetime.strptime(execucoes[-1], "%Y%m%d_%H%M%S").isoformat()
+        return df, f"store:{TABELA_ANALISES}/{execucoes[-1]}", data
+
+    # Fallback: ultimo CSV gerado pelo pipeline
+    output_dir = Path(os.getenv("OUTPUT_DIR", "./output"))
+    csv_files = list(output_dir.glob("analise_leilao_*.csv"))
+    if not csv_files:
+        return None
+
+    latest_csv = max(csv_files, key=lambda x: x.stat().st_mtime)
+    df = pd.read_csv(latest_csv, sep=';', dtype={"id_imovel": str}, usecols=colunas)
+    for coluna, operador, valor in filtros or []:
+        if operador == "=":
+            df = df[df[coluna] == valor]
+        elif operador == ">=":
+            df = df[df[coluna] >= valor]
+    data = datetime.fromtimestamp(latest_csv.stat().st_mtime).isoformat()
+    return df, str(latest_csv), data
+
+
 # ==================== ENDPOINTS ====================
 
 @app.route('/health', methods=['GET'])
@@ -116,30 +160,20 @@ def get_results():
     recomendacao = request.args.get('recomendacao', None)
     min_score = request.args.get('min_score', 0, type=float)
 
-    # Le ultimo CSV de resultados
-    output_dir = Path(os.getenv("OUTPUT_DIR", "./output"))
-
-    # Busca arquivo mais recente
-    csv_files = list(output_dir.glob("analise_leilao_*.csv"))
-
-    if not csv_files:
-        return jsonify({
-            "status": "empty",
-            "message": "Nenhum resultado encontrado"
-        })
-
-    latest_csv = max(csv_files, key=lambda x: x.stat().st_mtime)
+    filtros = []
+    if recomendacao:
+        filtros.append(("recomendacao", "=", recomendacao))
+    if min_score > 0:
+        filtros.append(("score_geral", ">=", min_score))
 
     try:
-        import pandas as pd
-        df = pd.read_csv(latest_csv, sep=';')
-
-        # Aplica filtros
-        if recomendacao:
-            df = df[df['recomendacao'] == recomendacao]
-
-        if min_score > 0:
-            df = df[df['score_geral'] >= min_score]
+        carregado = _carregar_analises(filtros=filtros)
+        if carregado is None:
+            return jsonify({
+                "status": "empty",
+                "message": "Nenhum resultado encontrado"
+            })
+        df, origem, _ = carregado
 
         # Ordena por score
         df = df.sort_values('score_geral', ascending=False)
@@ -150,7 +184,7 @@ def get_results():
         return jsonify({
             "status": "success",
             "total": len(df),
-            "arquivo": str(latest_csv),
+            "arquivo": origem,
             "resultados": df.to_dict('records')
         })
 
@@ -161,22 +195,57 @@ def get_results():
         }), 500
 
 
-@app.route('/imovel/<imovel_id>', methods=['GET'])
-def get_imovel(imovel_id: str):
-    """Retorna detalhes de um imovel especifico"""
-    output_dir = Path(os.getenv("OUTPUT_DIR", "./output"))
-    csv_files = list(output_dir.glob("analise_leilao_*.csv"))
-
-    if not csv_files:
-        return jsonify({"error": "Nenhum dado encontrado"}), 404
+@app.route('/rerank', methods=['POST'])
+def rerank():
+    """
+    Refaz o Top 5 da ultima execucao com novos parametros, sem reanalisar.
 
-    latest_csv = max(csv_files, key=lambda x: x.stat().st_mtime)
+    Body (todos opcionais):
+    {
+        "quantidade": 5,
+        "score_minimo": 65,
+        "risco_maximo": ["BAIXO"],
+        "recomendacoes": ["COMPRAR", "ANALISAR_MELHOR"],
+        "valor_penhoras_max": 50000,
+        "pesos_score": {"financeiro": 0.40, "liquidez": 0.05},
+        "pesos_oportunidade": {"roi": 0.30, "desconto": 0.05},
+        "execucao": "20260105_080000",
+        "pdf": true
+    }
+    """
+    body = request.get_json(silent=True) or {}
+    config = {
+        chave: body[chave]
+        for chave in ("score_minimo", "risco_maximo", "recomendacoes", "valor_penhoras_max", "pesos_oportunidade")
+        if body.get(chave) is not None
+    }
 
     try:
-        import pandas as pd
-        df = pd.read_csv(latest_csv, sep=';')
+        resultado = reclassificar_top5(
+            quantidade=int(body.get("quantidade", 5)),
+            config=config,
+            pesos_score=body.get("pesos_score"),
+            execucao=body.get("execucao", "ultima"),
+            gerar_pdf=bool(body.get("pdf", True))
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+    if resultado.get("status") != "success":
+        return jsonify(resultado), 404
+    return jsonify(resultado)
+
 
-        imovel = df[df['id_imovel'] == imovel_id]
+@app.route('/imovel/<imovel_id>', methods=['GET'])
+def get_imovel(imovel_id: str):
+    """Retorna detalhes de um imovel especifico"""
+    try:
+        carregado = _carregar_analises(filtros=[("id_imovel", "=", imovel_id)])
+        if carregado is None:
+            return jsonify({"error": "Nenhum dado encontrado"}), 404
+        imovel = carregado[0]
 
         if imovel.empty:
             return jsonify({"error": "Imovel nao encontrado"}), 404
@@ -193,20 +262,19 @@ def get_imovel(imovel_id: str):
 @app.route('/stats', methods=['GET'])
 def get_stats():
     """Retorna estatisticas gerais"""
-    output_dir = Path(os.getenv("OUTPUT_DIR", "./output"))
-    csv_files = list(output_dir.glob("analise_leilao_*.csv"))
-
-    if not csv_files:
-        return jsonify({
-            "total_analises": 0,
-            "total_arquivos": 0
-        })
-
-    latest_csv = max(csv_files, key=lambda x: x.stat().st_mtime)
+    colunas = [
+        "recomendacao", "cidade", "valor_minimo_leilao", "desconto_percentual",
+        "cenario_roi_percentual", "score_geral"
+    ]
 
     try:
-        import pandas as pd
-        df = pd.read_csv(latest_csv, sep=';')
+        carregado = _carregar_analises(colunas=colunas)
+        if carregado is None:
+            return jsonify({
+                "total_analises": 0,
+                "total_arquivos": 0
+            })
+        df, origem, data_atualizacao = carregado
 
         stats = {
             "total_imoveis": len(df),
@@ -216,8 +284,8 @@ def get_stats():
             "desconto_medio": df['desconto_percentual'].mean(),
             "roi_medio": df['cenario_roi_percentual'].mean(),
             "score_medio": df['score_geral'].mean(),
-            "ultimo_arquivo": str(latest_csv),
-            "data_atualizacao": datetime.fromtimestamp(latest_csv.stat().st_mtime).isoformat()
+            "ultimo_arquivo": origem,
+            "data_atualizacao": data_atualizacao
         }
 
         return jsonify(stats)
@@ -0,0 +1,108 @@
+"""
+Benchmark do extrator de matricula: regex legado x extrator por atos
+Gera matriculas sinteticas longas (N atos) e mede o tempo de cada extrator;
+o extrator por atos deve crescer linearmente com o tamanho do texto
+
+Uso:
+    python benchmark_matricula.py              # 50 a 1600 atos
+    python benchmark_matricula.py 100 200 400  # tamanhos especificos
+"""
+
+import re
+import sys
+import time
+import random
+
+from tools.matricula_tools import extrair_matricula
+
+ATOS = [
+    "R.{n}/45.678 - COMPRA E VENDA. Por escritura lavrada em 10/03/2015, o imóvel foi adquirido "
+    "por FULANO DE TAL, CPF 123.456.789-00, pelo valor de R$ 180.000,00. ",
+    "AV.{n}/45.678 - ALTERAÇÃO DE ESTADO CIVIL. Averba-se o casamento do proprietário, "
+    "conforme certidão apresentada, sem alteração do regime de bens. ",
+    "R.{n}/45.678 - ALIENAÇÃO FIDUCIÁRIA. O imóvel foi alienado fiduciariamente à CAIXA ECONÔMICA "
+    "FEDERAL em garantia da dívida de R$ 150.000,00, pagável em 360 meses. ",
+    "AV.{n}/45.678 - PENHORA. Processo 1002345-67.2019.8.26.0100, exequente CONDOMÍNIO EDIFÍCIO "
+    "SOL, valor da dívida de R$ 23.456,78, depositário o executado. ",
+    "AV.{n}/45.678 - CANCELAMENTO. Fica cancelada a penhora objeto do AV.{m}, por mandado judicial. ",
+    "AV.{n}/45.678 - CONSOLIDAÇÃO DA PROPRIEDADE em favor da CAIXA ECONÔMICA FEDERAL, "
+    "não houve purgação da mora, valor de R$ 160.000,00 para fins fiscais. ",
+]
+
+# Atos sem valores: as buscas ".*?R\$" do extrator legado varrem ate o fim do texto
+# a partir de cada ocorrencia (pior caso quadratico)
+ATOS_SEM_VALOR = [
+    "AV.{n}/45.678 - PENHORA: averba-se a penhora determinada nos autos da execução fiscal, "
+    "sem indicação do valor do débito, conforme ofício do juízo. ",
+    "AV.{n}/45.678 - CANCELAMENTO. Fica cancelada a penhora objeto do AV.{m}, por mandado judicial. ",
+    "AV.{n}/45.678 - CONDOMÍNIO: notificação da ação de cobrança movida pelo condomínio. ",
+]
+
+CABECALHO = (
+    "OFICIAL DE REGISTRO DE IMÓVEIS - COMARCA DE SANTOS\n"
+    "MATRÍCULA Nº 45.678 - Apartamento nº 12 do Edifício Sol, área privativa de 45,50 m2, "
+    "área total de 80,20 m2, fração ideal de 0,0125. "
+)
+
+
+def gerar_matricula(n_atos: int, semente: int = 42, sem_valores: bool = False) -> str:
+    """
+    Matricula sintetica com n_atos atos numerados e quebras de linha de PDF.
+    Com sem_valores, a segunda metade dos atos nao tem nenhum "R$".
+    """
+    aleatorio = random.Random(semente)
+    partes = [CABECALHO]
+    for n in range(1, n_atos + 1):
+        modelos = ATOS_SEM_VALOR if sem_valores and n > n_atos // 2 else ATOS
+        modelo = aleatorio.choice(modelos)
+        partes.append(modelo.format(n=n, m=max(1, n - 1)))
+    texto = "".join(partes)
+    # Simula linhas de ~90 caracteres do texto extraido do PDF
+    return "\n".join(texto[i:i + 90] for i in range(0, len(texto), 90))
+
+
+def extrair_legado(texto: str) -> int:
+    """Padroes do extrator anterior (buscas independentes com .*? e DOTALL)"""
+    flags = re.IGNORECASE | re.DOTALL
+    encontrados = 0
+    texto_upper = texto.upper()
+    re.sub(r"\s+", " ", texto)
+    encontrados += len(re.findall(r"PENHORA[:\s].*?(?:valor|d[íi]vida)[:\s]*(?:de\s+)?R\$\s*([\d\.,]+)", texto, flags))
+    encontrados += len(re.findall(r"PENHORA.*?R\$\s*([\d\.]+[,]\d{2})", texto, flags))
+    if "ALIENA" in texto_upper:
+        encontrados += bool(re.search(r"ALIENA[ÇC][ÃA]O\s+FIDUCI[ÁA]RIA.*?d[íi]vida.*?R\$\s*([\d\.,]+)", texto, flags))
+    if "CONSOLIDA" in texto_upper:
+        encontrados += bool(re.search(r"CONSOLIDA[ÇC][ÃA]O.*?PROPRIEDADE.*?R\$\s*([\d\.,]+)", texto, flags))
+    if "CONDOM" in texto_upper:
+        encontrados += bool(re.search(r"CONDOM[ÍI]NIO.*?R\$\s*([\d\.,]+)", texto, flags))
+    encontrados += len(re.findall(r"\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}", texto))
+    return encontrados
+
+
+def medir(funcao, texto: str, repeticoes: int = 3) -> float:
+    """Melhor tempo (ms) entre as repeticoes"""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(texto)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000
+
+
+def main(tamanhos: list) -> None:
+    for corpus, sem_valores in (("tipico", False), ("sem valores no fim", True)):
+        print(f"\nCorpus: {corpus}")
+        print(f"{'Atos':>6} {'KB':>8} {'Legado(ms)':>11} {'Atos(ms)':>9} {'us/KB':>7} {'Penhoras':>9}")
+        print("-" * 56)
+        for n_atos in tamanhos:
+            texto = gerar_matricula(n_atos, sem_valores=sem_valores)
+            kb = len(texto.encode("utf-8")) / 1024
+            legado = medir(extrair_legado, texto)
+            novo = medir(extrair_matricula, texto)
+            penhoras = len(extrair_matricula(texto)["penhoras"])
+            print(f"{n_atos:>6} {kb:>8.1f} {legado:>11.1f} {novo:>9.2f} {novo * 1000 / kb:>7.1f} {penhoras:>9}")
+    print("\nus/KB constante = tempo linear no tamanho do texto")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [50, 100, 200, 400, 800, 1600])
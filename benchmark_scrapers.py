@@ -0,0 +1,50 @@
+"""
+Benchmark dos web scrapers: modo normal x modo leve
+Mede bytes transferidos e tempo de coleta da listagem por fonte
+
+Uso:
+    python benchmark_scrapers.py                 # todas as fontes
+    python benchmark_scrapers.py zuk superbid    # fontes especificas
+"""
+
+import asyncio
+import sys
+import logging
+
+from scrapers import SCRAPERS_DISPONIVEIS
+
+logging.basicConfig(level=logging.WARNING)
+
+
+async def medir(scraper_class, modo_leve: bool, max_imoveis: int = 20) -> dict:
+    """Executa a coleta de listagem de uma fonte e retorna as metricas"""
+    scraper = scraper_class(headless=True, modo_leve=modo_leve, medir_bytes=True)
+    try:
+        imoveis = await scraper.executar(coletar_detalhes=False, max_imoveis=max_imoveis)
+        return {**scraper.metricas, "imoveis": len(imoveis), "erro": ""}
+    except Exception as e:
+        return {**scraper.metricas, "imoveis": 0, "erro": str(e)[:40]}
+
+
+async def main(filtro: list) -> None:
+    classes = [
+        c for c in SCRAPERS_DISPONIVEIS
+        if not filtro or any(f in c.FONTE_NOME for f in filtro)
+    ]
+
+    print(f"\n{'Fonte':<16} {'Modo':<7} {'KB':>9} {'Req':>5} {'Bloq':>5} {'Tempo(s)':>9} {'Imoveis':>8}")
+    print("-" * 64)
+
+    for scraper_class in classes:
+        for modo_leve in (False, True):
+            m = await medir(scraper_class, modo_leve)
+            print(
+                f"{scraper_class.FONTE_NOME:<16} {'leve' if modo_leve else 'normal':<7} "
+                f"{m['bytes_recebidos'] / 1024:>9.0f} {m['requisicoes']:>5} "
+                f"{m['requisicoes_bloqueadas']:>5} {m['duracao_s']:>9.1f} {m['imoveis']:>8}"
+                + (f"  ERRO: {m['erro']}" if m['erro'] else "")
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
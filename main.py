@@ -9,8 +9,8 @@ from typing import Dict, Any
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
 from supabase import create_client, Client
+from tools.llm_tools import criar_llm_langchain
 import logging
 
 # Configuração de logging
@@ -58,7 +58,7 @@ def get_llm():
     if llm is None:
         if not OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY não configurada")
-        llm = ChatOpenAI(model="gpt-4o", temperature=0.2, api_key=OPENAI_API_KEY)
+        llm = criar_llm_langchain("gpt-4o", temperatura=0.2)
     return llm
 
 # Segurança e controle
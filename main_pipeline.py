@@ -7,7 +7,7 @@ import os
 import sys
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from pathlib import Path
 
@@ -30,24 +30,33 @@ logger = logging.getLogger(__name__)
 
 # Imports das tools
 from tools.data_tools import (
-    download_csv_caixa, parse_csv_imoveis, filter_imoveis,
+    filter_imoveis,
+    coletar_caixa_estados, UFS_BRASIL,
     executar_coleta_multifonte_sync
 )
 from tools.calc_tools import calc_custos_totais
+from tools.cenario_tools import simular_cenarios
 from tools.score_tools import (
     calc_score_edital, calc_score_matricula, calc_score_localizacao,
     calc_score_financeiro, calc_score_liquidez, calc_score_oportunidade,
-    classificar_recomendacao
+    classificar_recomendacao, SUBSCORES_LOCALIZACAO, LIMITE_DEBITOS_ALTO
 )
 from tools.output_tools import (
     generate_csv_report, generate_pdf_report, generate_summary_csv,
     gerar_csv_top5, gerar_pdf_top5_consolidado
 )
-from tools.top5_selector import selecionar_top5, gerar_resumo_selecao
+from tools.top5_selector import selecionar_top5, gerar_resumo_selecao, PerfisTopK
 from tools.market_tools import buscar_preco_mercado_web, calcular_liquidez_mercado
 from tools.document_tools import (
     analisar_documento_imovel, calcular_custos_documentacao, gerar_relatorio_matricula,
-    analisar_edital_completo, extrair_edital_pagina
+    analisar_edital_completo, extrair_edital_pagina, prefetch_matriculas
+)
+from tools.edital_tools import buscar_editais
+from tools.parallel_tools import executar_em_paralelo, ANALISE_WORKERS, ANALISE_TIMEOUT_IMOVEL
+from tools.store_tools import (
+    nova_execucao_id, salvar_listagens, salvar_analises, salvar_top5,
+    ler_tabela, carregar_analises, calcular_delta, execucao_anterior, chave_imovel,
+    chaves_unicas, ErroStore, TABELA_LISTAGENS
 )
 
 # Imports Supabase
@@ -58,6 +67,15 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 APIFY_TOKEN = os.getenv("APIFY_TOKEN")
+USAR_SCRAPERS = os.getenv("USAR_SCRAPERS", "false").lower() == "true"
+
+# Reanalisa apenas imoveis novos ou com preco alterado desde a ultima execucao
+MODO_INCREMENTAL = os.getenv("PIPELINE_INCREMENTAL", "true").lower() == "true"
+# Idade maxima (dias desde a analise original) de uma analise reaproveitada (0 = sem limite)
+REUSO_MAX_DIAS = int(os.getenv("PIPELINE_REUSO_MAX_DIAS", "7"))
+
+# Estados da lista da Caixa (ex: "SP", "SP,RJ,MG" ou "TODOS")
+CAIXA_ESTADOS = [uf.strip().upper() for uf in os.getenv("CAIXA_ESTADOS", "SP").split(",") if uf.strip()]
 
 # Cidades alvo
 CIDADES_CAPITAL = ["SAO PAULO"]
@@ -67,6 +85,10 @@ CIDADES_LITORAL = [
 ]
 CIDADES_ALVO = CIDADES_CAPITAL + CIDADES_LITORAL
 
+# Rankings mantidos durante a analise: "top5" (relatorios) + perfis extras em JSON,
+# ex: PERFIS_TOP='{"risco_baixo": {"quantidade": 10, "config": {"risco_maximo": ["BAIXO"]}}}'
+PERFIS_TOP = {"top5": {"quantidade": 5}, **json.loads(os.getenv("PERFIS_TOP", "{}"))}
+
 # Criterios de filtragem
 FILTROS = {
     "preco_max": 150000,
@@ -76,15 +98,39 @@ FILTROS = {
 }
 
 
+def uf_imovel(imovel: Dict) -> str:
+    """UF do imovel (fontes sem UF sao de SP, como no normalizar_imovel dos scrapers)"""
+    return str(imovel.get("uf") or "SP").strip().upper() or "SP"
+
+
 class PipelineLeilao:
     """Pipeline completo de analise de leiloes"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout_imovel: Optional[float] = None,
+        incremental: Optional[bool] = None
+    ):
+        """
+        Args:
+            max_workers: Imoveis analisados em paralelo (default: ANALISE_WORKERS)
+            timeout_imovel: Timeout em segundos por imovel (default: ANALISE_TIMEOUT_IMOVEL)
+            incremental: Reaproveita analises de imoveis inalterados (default: MODO_INCREMENTAL)
+        """
+        self.incremental = MODO_INCREMENTAL if incremental is None else incremental
+        self.max_workers = max_workers or ANALISE_WORKERS
+        self.timeout_imovel = timeout_imovel if timeout_imovel is not None else ANALISE_TIMEOUT_IMOVEL
         self.supabase: Optional[Client] = None
         self.imoveis_coletados: List[Dict] = []
         self.imoveis_analisados: List[Dict] = []
+        self.editais: Dict[str, Dict] = {}
+        self.matriculas: Dict[str, Optional[str]] = {}
+        self.rankings: Optional[PerfisTopK] = None
+        self.execucao_id = nova_execucao_id()
         self.stats = {
             "inicio": datetime.now().isoformat(),
+            "execucao_id": self.execucao_id,
             "fonte_caixa": 0,
             "fonte_zuk": 0,
             "fonte_superbid": 0,
@@ -94,7 +140,9 @@ class PipelineLeilao:
             "total_scrapers": 0,
             "total_filtrado": 0,
             "total_analisado": 0,
-            "recomendados": 0
+            "recomendados": 0,
+            "caixa_csv_alterado": None,
+            "delta": None
         }
 
         # Inicializa Supabase (com timeout para evitar travamento em DNS)
@@ -121,37 +169,45 @@ class PipelineLeilao:
         logger.info("=" * 50)
 
         try:
-            # Download do CSV
-            result = download_csv_caixa("SP", force=False)
-
-            if result.get("status") in ["cached", "updated", "no_changes"]:
-                filepath = result.get("filepath")
-                logger.info(f"CSV obtido: {filepath}")
-
-                # Parse
-                imoveis = parse_csv_imoveis(filepath)
-                logger.info(f"Total parseado: {len(imoveis)}")
-
-                # Filtra
-                filtrado = filter_imoveis(
-                    imoveis,
-                    preco_max=FILTROS["preco_max"],
-                    tipo=FILTROS["tipo"],
-                    praca=FILTROS["praca"],
-                    cidades=CIDADES_ALVO
-                )
+            estados = UFS_BRASIL if CAIXA_ESTADOS == ["TODOS"] else CAIXA_ESTADOS
+
+            # Download paralelo + parse com filtros aplicados durante a leitura.
+            # Cidades alvo sao de SP: os demais estados filtram so preco/tipo/praca
+            result = coletar_caixa_estados(
+                estados,
+                cidades={"SP": CIDADES_ALVO},
+                preco_max=FILTROS["preco_max"],
+                tipo=FILTROS["tipo"]
+            )
+            imoveis = result["imoveis"]
+            self.stats["caixa_csv_alterado"] = any(
+                d.get("changed", False) for d in result["downloads"].values()
+            )
 
-                imoveis_filtrados = filtrado.get("imoveis", [])
-                self.stats["fonte_caixa"] = len(imoveis_filtrados)
+            if result["erros"]:
+                logger.warning(f"Estados sem lista da Caixa: {result['erros']}")
+            if not len(imoveis) and len(result["erros"]) == len(estados):
+                logger.error(f"Erro no download: {result['downloads']}")
+                return []
 
-                logger.info(f"Filtrados Caixa: {len(imoveis_filtrados)}")
-                logger.info(f"Stats: {filtrado.get('stats')}")
+            logger.info(f"Total parseado (cidades/preco/tipo): {len(imoveis)}")
 
-                return imoveis_filtrados
+            # Filtra
+            filtrado = filter_imoveis(
+                imoveis,
+                preco_max=FILTROS["preco_max"],
+                tipo=FILTROS["tipo"],
+                praca=FILTROS["praca"],
+                cidades=cidades or []
+            )
 
-            else:
-                logger.error(f"Erro no download: {result}")
-                return []
+            imoveis_filtrados = filtrado.get("imoveis", [])
+            self.stats["fonte_caixa"] = len(imoveis_filtrados)
+
+            logger.info(f"Filtrados Caixa: {len(imoveis_filtrados)}")
+            logger.info(f"Stats: {filtrado.get('stats')}")
+
+            return imoveis_filtrados
 
         except Exception as e:
             logger.error(f"Erro na coleta Caixa: {e}")
@@ -218,9 +274,9 @@ class PipelineLeilao:
         Mantido para compatibilidade.
         """
         # Usa o novo sistema multi-fonte
-        # NOTA: Scrapers desabilitados por limitacao de memoria do servidor
-        # Para reativar, mude para usar_scrapers=True (requer 2GB+ RAM)
-        return self.coletar_multifonte(usar_scrapers=False)
+        # NOTA: Os scrapers compartilham um unico Chromium (OrquestradorScrapers),
+        # com um contexto por fonte. Desligados por padrao: habilite com USAR_SCRAPERS=true
+        return self.coletar_multifonte(usar_scrapers=USAR_SCRAPERS)
 
     def consolidar_imoveis(self, caixa: List[Dict], zuk: List[Dict]) -> List[Dict]:
         """Consolida e remove duplicatas"""
@@ -271,8 +327,10 @@ class PipelineLeilao:
             dividas_matricula = 0
 
             if imovel_id:
-                # Tenta baixar e analisar matricula
-                doc_result = analisar_documento_imovel(imovel_id, "SP")
+                # Analisa a matricula (ja baixada na pre-busca de analisar_todos, se houve)
+                doc_result = analisar_documento_imovel(
+                    imovel_id, uf_imovel(imovel), baixar=str(imovel_id) not in self.matriculas
+                )
 
                 if doc_result.get("matricula_disponivel") and doc_result.get("analise"):
                     doc_analise = doc_result["analise"]
@@ -294,7 +352,8 @@ class PipelineLeilao:
             limite_condominio_caixa = 10  # default 10%
 
             if imovel_id:
-                edital_dados = extrair_edital_pagina(imovel_id)
+                # Pagina ja baixada no lote de analisar_todos (ou busca individual)
+                edital_dados = self.editais.get(str(imovel_id)) or extrair_edital_pagina(imovel_id)
                 if edital_dados and not edital_dados.get('erro'):
                     edital_riscos = []
                     if edital_dados.get('gravames_matricula'):
@@ -327,30 +386,25 @@ class PipelineLeilao:
             )
 
             # Analise de matricula (com dados reais se disponivel)
+            # (as mesmas listas vao para a analise gravada, para poder repontuar depois)
             if doc_analise:
-                gravames = doc_analise.get("gravames", [])
-                penhoras = doc_analise.get("penhoras", [])
-
-                matricula = calc_score_matricula(
-                    gravames_extintos=["Alienacao Fiduciaria CEF"] if doc_analise.get("consolidacao_propriedade") else [],
-                    gravames_transferidos=[g.get("tipo", "Gravame") for g in gravames],
-                    valor_gravames=penhoras_total
-                )
+                gravames_extintos = ["Alienacao Fiduciaria CEF"] if doc_analise.get("consolidacao_propriedade") else []
+                gravames_transferidos = [g.get("tipo", "Gravame") for g in doc_analise.get("gravames", [])]
             else:
-                matricula = calc_score_matricula(
-                    gravames_extintos=["Hipoteca CEF"],
-                    gravames_transferidos=[],
-                    valor_gravames=0
-                )
+                gravames_extintos = ["Hipoteca CEF"]
+                gravames_transferidos = []
+
+            matricula = calc_score_matricula(
+                gravames_extintos=gravames_extintos,
+                gravames_transferidos=gravames_transferidos,
+                valor_gravames=penhoras_total
+            )
 
             # Analise de localizacao
             localizacao = calc_score_localizacao(
                 bairro=bairro,
                 cidade=cidade,
-                infraestrutura=70,
-                seguranca=70,
-                valorizacao=75,
-                transporte=80
+                **SUBSCORES_LOCALIZACAO
             )
 
             # PESQUISA DE MERCADO REAL - Busca precos na web
@@ -422,7 +476,7 @@ class PipelineLeilao:
             recomendacao = classificar_recomendacao(
                 score_geral=score_geral["score_geral"],
                 ocupado=ocupado,
-                debitos_alto=total_debitos > 15000,
+                debitos_alto=total_debitos > LIMITE_DEBITOS_ALTO,
                 roi_minimo=50
             )
 
@@ -451,8 +505,8 @@ class PipelineLeilao:
                 "analise_matricula": {
                     "matricula_disponivel": doc_analise is not None,
                     "numero_matricula": doc_analise.get("matricula_numero") if doc_analise else None,
-                    "gravames_extintos": ["Alienacao Fiduciaria CEF"] if doc_analise and doc_analise.get("consolidacao_propriedade") else ["Hipoteca CEF"],
-                    "gravames_transferidos": [g.get("tipo") for g in doc_analise.get("gravames", [])] if doc_analise else [],
+                    "gravames_extintos": gravames_extintos,
+                    "gravames_transferidos": gravames_transferidos,
                     "penhoras": doc_analise.get("penhoras", []) if doc_analise else [],
                     "dividas_identificadas": doc_analise.get("dividas_identificadas", []) if doc_analise else [],
                     "valor_gravames": penhoras_total,
@@ -505,24 +559,150 @@ class PipelineLeilao:
             logger.error(f"Erro ao analisar imovel: {e}")
             return {**imovel, "error": str(e)}
 
+    def analises_reaproveitaveis(self) -> Dict[str, Dict]:
+        """
+        Compara a listagem atual com a da ultima execucao (por id_imovel)
+        e recupera as analises dos imoveis inalterados. Analises com
+        data_analise (data da analise original) mais antiga que
+        REUSO_MAX_DIAS sao refeitas.
+
+        Returns:
+            Dict id_imovel -> analise da execucao anterior
+        """
+        anterior = execucao_anterior(self.execucao_id)
+        if not anterior:
+            logger.info("Modo incremental: sem execucao anterior, analisando tudo")
+            return {}
+
+        try:
+            listagem = ler_tabela(TABELA_LISTAGENS, colunas=["id_imovel", "preco"], execucao=anterior)
+        except ErroStore as e:
+            logger.warning(f"Modo incremental: listagem de {anterior} ilegivel ({e}), analisando tudo")
+            return {}
+        if listagem.empty:
+            logger.warning(f"Modo incremental: listagem de {anterior} vazia no store, analisando tudo")
+            return {}
+
+        delta = calcular_delta(self.imoveis_coletados, listagem)
+        if delta["sem_id"]:
+            logger.warning(f"Modo incremental: {len(delta['sem_id'])} imoveis sem id_imovel unico serao analisados")
+
+        ids = [chave_imovel(i.get("id_imovel")) for i in delta["inalterados"]]
+        try:
+            analises = carregar_analises(filtros=[("id_imovel", "in", ids)], execucao=anterior) if ids else []
+        except ErroStore as e:
+            logger.warning(f"Modo incremental: analises de {anterior} ilegiveis ({e}), analisando tudo")
+            return {}
+        if ids and not analises:
+            logger.warning(f"Modo incremental: nenhuma analise de {anterior} recuperada, analisando tudo")
+
+        # Uma analise por id (repetidas no store nao sao reaproveitadas)
+        unicos = chaves_unicas([a.get("id_imovel") for a in analises])
+        reaproveitaveis = {
+            chave_imovel(a.get("id_imovel")): a for a in analises if chave_imovel(a.get("id_imovel")) in unicos
+        }
+
+        # Analises antigas (ou sem data) sao refeitas mesmo com o imovel inalterado
+        expiradas = []
+        if REUSO_MAX_DIAS > 0:
+            limite = (datetime.now() - timedelta(days=REUSO_MAX_DIAS)).strftime("%Y-%m-%d")
+            expiradas = [
+                chave for chave, analise in reaproveitaveis.items()
+                if str(analise.get("data_analise") or "")[:10] < limite
+            ]
+            for chave in expiradas:
+                del reaproveitaveis[chave]
+
+        self.stats["delta"] = {
+            "execucao_anterior": anterior,
+            "novos": len(delta["novos"]),
+            "alterados": len(delta["alterados"]),
+            "inalterados": len(delta["inalterados"]),
+            "sem_id": len(delta["sem_id"]),
+            "removidos": len(delta["removidos"]),
+            "expirados": len(expiradas),
+            "reaproveitados": len(reaproveitaveis)
+        }
+        logger.info(f"Delta vs {anterior}: {self.stats['delta']}")
+
+        return reaproveitaveis
+
     def analisar_todos(self):
-        """Analisa todos os imoveis coletados"""
+        """Analisa os imoveis coletados (no modo incremental, so novos/alterados)"""
         logger.info("=" * 50)
         logger.info("ETAPA 4: Analise de imoveis")
         logger.info("=" * 50)
 
         self.imoveis_analisados = []
-
-        for i, imovel in enumerate(self.imoveis_coletados, 1):
-            logger.info(f"[{i}/{len(self.imoveis_coletados)}]")
-            analise = self.analisar_imovel(imovel)
-
+        reaproveitadas = self.analises_reaproveitaveis() if self.incremental else {}
+        posicoes_pendentes = [
+            posicao for posicao, i in enumerate(self.imoveis_coletados)
+            if chave_imovel(i.get("id_imovel")) not in reaproveitadas
+        ]
+        pendentes = [self.imoveis_coletados[posicao] for posicao in posicoes_pendentes]
+        total = len(pendentes)
+        concluidos = [0]
+
+        # Top N de cada perfil atualizado a cada analise concluida (posicao na listagem desempata)
+        self.rankings = PerfisTopK(PERFIS_TOP)
+        for posicao, imovel in enumerate(self.imoveis_coletados):
+            analise = reaproveitadas.get(chave_imovel(imovel.get("id_imovel")))
+            if analise and "error" not in analise:
+                self.rankings.adicionar(analise, posicao)
+
+        logger.info(f"Analisando {total} imoveis com {self.max_workers} workers "
+                    f"(timeout {self.timeout_imovel:.0f}s por imovel)")
+
+        def _progresso(indice: int, analise: Dict):
+            concluidos[0] += 1
+            status = "ERRO" if "error" in analise else analise.get("recomendacao", "N/A")
+            logger.info(f"[{concluidos[0]}/{total}] {pendentes[indice].get('id_imovel', '')} - {status}")
+            if "error" not in analise:
+                self.rankings.adicionar(analise, posicoes_pendentes[indice])
+
+        # Documentos dos pendentes em lote (downloads em paralelo, sessao compartilhada):
+        # a analise nao espera pela rede
+        ids_pendentes = [i.get("id_imovel") for i in pendentes]
+        self.editais = buscar_editais(ids_pendentes)
+        # A URL da matricula depende da UF: uma pre-busca por estado
+        ids_por_uf: Dict[str, List[str]] = {}
+        for imovel in pendentes:
+            ids_por_uf.setdefault(uf_imovel(imovel), []).append(imovel.get("id_imovel"))
+        self.matriculas = {}
+        for uf, ids in ids_por_uf.items():
+            self.matriculas.update(prefetch_matriculas(ids, uf))
+
+        # Resultados voltam na mesma ordem de pendentes
+        resultados = executar_em_paralelo(
+            pendentes,
+            self.analisar_imovel,
+            max_workers=self.max_workers,
+            timeout_item=self.timeout_imovel,
+            ao_concluir=_progresso
+        )
+        # Data da analise original: segue com a analise quando reaproveitada (REUSO_MAX_DIAS)
+        hoje = datetime.now().strftime("%Y-%m-%d")
+        for analise in resultados:
+            analise.setdefault("data_analise", hoje)
+        novas = iter(resultados)
+
+        # Mantem a ordem de imoveis_coletados
+        analises = [
+            reaproveitadas.get(chave_imovel(imovel.get("id_imovel"))) or next(novas)
+            for imovel in self.imoveis_coletados
+        ]
+
+        for analise in analises:
             if "error" not in analise:
                 self.imoveis_analisados.append(analise)
 
                 if analise.get("recomendacao") == "COMPRAR":
                     self.stats["recomendados"] += 1
 
+        # Monte Carlo das premissas de venda (todos os imoveis numa passada vetorizada)
+        for analise, cenarios in zip(self.imoveis_analisados, simular_cenarios(self.imoveis_analisados)):
+            analise["cenarios"] = cenarios
+
         self.stats["total_analisado"] = len(self.imoveis_analisados)
         logger.info(f"Total analisado: {len(self.imoveis_analisados)}")
         logger.info(f"Recomendados (COMPRAR): {self.stats['recomendados']}")
@@ -554,8 +734,15 @@ class PipelineLeilao:
         logger.info("-" * 50)
         logger.info("Gerando relatorios TOP 5...")
 
-        # Seleciona os top 5 melhores oportunidades
-        top5 = selecionar_top5(self.imoveis_analisados, quantidade=5)
+        # Seleciona os top 5 melhores oportunidades (ja mantidos durante a analise)
+        if self.rankings:
+            top5 = self.rankings["top5"].resultado()
+            self.stats["perfis_top"] = {
+                nome: [i.get("id_imovel") for i in ordenados]
+                for nome, ordenados in self.rankings.ordenados().items() if nome != "top5"
+            }
+        else:
+            top5 = selecionar_top5(self.imoveis_analisados, quantidade=5)
         logger.info(f"Top 5 selecionados: {len(top5)} imoveis")
 
         # Gera resumo estatistico
@@ -584,6 +771,12 @@ class PipelineLeilao:
             logger.info(f"  ROI medio: {stats_top5.get('roi_percentual', {}).get('media', 0):.1f}%")
             logger.info(f"  Margem media: {stats_top5.get('margem_seguranca_pct', {}).get('media', 0):.1f}%")
 
+        # Store Parquet (consultado pela API no lugar dos CSVs)
+        store_result = {
+            "analises": salvar_analises(self.imoveis_analisados, self.execucao_id),
+            "top5": salvar_top5(top5, self.execucao_id)
+        }
+
         return {
             "csv": csv_result,
             "summary": summary_result,
@@ -593,7 +786,8 @@ class PipelineLeilao:
                 "pdf": pdf_top5_result,
                 "resumo": resumo_top5,
                 "analises_completas": top5  # Lista completa dos 5 imoveis com todos os dados
-            }
+            },
+            "store": store_result
         }
 
     def salvar_supabase(self):
@@ -612,7 +806,7 @@ class PipelineLeilao:
                 # Prepara dados para inserir
                 data = {
                     "id_imovel": imovel.get("id_imovel"),
-                    "uf": "SP",
+                    "uf": uf_imovel(imovel),
                     "cidade": imovel.get("cidade"),
                     "bairro": imovel.get("bairro"),
                     "endereco": imovel.get("endereco"),
@@ -654,6 +848,7 @@ class PipelineLeilao:
 
             # 3. Consolida
             self.consolidar_imoveis(imoveis_caixa, imoveis_zuk)
+            salvar_listagens(self.imoveis_coletados, self.execucao_id)
 
             # 4. Analisa
             self.analisar_todos()
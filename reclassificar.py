@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Reclassificacao do Top 5 a partir das analises gravadas (sem reanalisar)
+Ex: python reclassificar.py --score-minimo 65 --risco-maximo BAIXO --pesos-score financeiro=0.4,liquidez=0.05
+"""
+
+import sys
+import json
+import logging
+from pathlib import Path
+
+# Adiciona path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from tools.ranking_tools import reclassificar_top5
+
+logging.basicConfig(level=logging.INFO)
+
+
+def _lista(valor: str) -> list:
+    return [v.strip().upper() for v in valor.split(",") if v.strip()]
+
+
+def _pesos(valor: str) -> dict:
+    """"financeiro=0.4,liquidez=0.05" -> {"financeiro": 0.4, "liquidez": 0.05}"""
+    pesos = {}
+    for par in valor.split(","):
+        nome, _, peso = par.partition("=")
+        pesos[nome.strip()] = float(peso)
+    return pesos
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Reclassifica o Top 5 da ultima execucao sem reanalisar')
+    parser.add_argument('--quantidade', type=int, default=5, help='Imoveis no ranking')
+    parser.add_argument('--score-minimo', type=float, help='Score geral minimo (padrao 55)')
+    parser.add_argument('--risco-maximo', type=_lista, help='Niveis de risco aceitos (ex: BAIXO,MEDIO)')
+    parser.add_argument('--recomendacoes', type=_lista, help='Recomendacoes aceitas (ex: COMPRAR)')
+    parser.add_argument('--valor-penhoras-max', type=float, help='Valor maximo de penhoras/gravames')
+    parser.add_argument('--pesos-score', type=_pesos, help='Pesos do score geral (ex: financeiro=0.4)')
+    parser.add_argument('--pesos-oportunidade', type=_pesos, help='Pesos do ranking (ex: roi=0.3,desconto=0.05)')
+    parser.add_argument('--execucao', default='ultima', help='execucao_id (padrao: ultima)')
+    parser.add_argument('--sem-pdf', action='store_true', help='Gera so o CSV')
+
+    args = parser.parse_args()
+
+    config = {
+        chave: valor for chave, valor in {
+            "score_minimo": args.score_minimo,
+            "risco_maximo": args.risco_maximo,
+            "recomendacoes": args.recomendacoes,
+            "valor_penhoras_max": args.valor_penhoras_max,
+            "pesos_oportunidade": args.pesos_oportunidade,
+        }.items() if valor is not None
+    }
+
+    try:
+        resultado = reclassificar_top5(
+            quantidade=args.quantidade,
+            config=config,
+            pesos_score=args.pesos_score,
+            execucao=args.execucao,
+            gerar_pdf=not args.sem_pdf
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(json.dumps({k: v for k, v in resultado.items() if k != "resumo"}, indent=2, ensure_ascii=False, default=str))
+    sys.exit(0 if resultado.get("status") == "success" else 1)
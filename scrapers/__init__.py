@@ -9,6 +9,7 @@ from .superbid_scraper import SuperbidScraper
 from .megaleiloes_scraper import MegaLeiloesScraper
 from .frazao_scraper import FrazaoScraper
 from .biasi_scraper import BiasiScraper
+from .orquestrador import OrquestradorScrapers
 
 __all__ = [
     'BaseLeilaoScraper',
@@ -16,7 +17,8 @@ __all__ = [
     'SuperbidScraper',
     'MegaLeiloesScraper',
     'FrazaoScraper',
-    'BiasiScraper'
+    'BiasiScraper',
+    'OrquestradorScrapers'
 ]
 
 # Lista de todos os scrapers disponiveis
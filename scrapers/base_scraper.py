@@ -4,16 +4,77 @@ Implementa logica comum usando Playwright para web scraping
 """
 
 from abc import ABC, abstractmethod
-from playwright.async_api import async_playwright, Browser, Page
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+import os
 import asyncio
 import random
 import re
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
+from urllib.parse import urlparse
 from datetime import datetime
 
+from .rate_limiter import LimitadoresHost
+
 logger = logging.getLogger(__name__)
 
+# Modo leve: bloqueia recursos pesados e troca esperas fixas por esperas por seletor
+MODO_LEVE = os.getenv("SCRAPER_MODO_LEVE", "false").lower() == "true"
+
+# Listagem pelo JSON das APIs (API_LISTAGEM/CAMPOS_API): nenhuma fonte declara os
+# endpoints ainda; so devem ser declarados apos confirmados no trafego real. O DOM e o padrao
+LISTAGEM_API = os.getenv("SCRAPER_LISTAGEM_API", "false").lower() == "true"
+
+# Fracao minima de itens validos para aceitar uma lista do JSON como listagem de imoveis
+MIN_ITENS_API_VALIDOS = 0.5
+
+# Tipos de recurso descartados no modo leve
+RECURSOS_BLOQUEADOS = {"image", "media", "font"}
+
+# Dominios de analytics/ads de terceiros descartados no modo leve
+HOSTS_BLOQUEADOS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "tiktok.com",
+    "criteo.com",
+    "rdstation.com.br",
+    "hubspot.com",
+)
+
+
+# Campos padrao lidos de cada card (chaves de SELETORES)
+CAMPOS_CARD_PADRAO = (
+    "link_imovel", "preco", "endereco", "area", "quartos", "desconto",
+    "avaliacao", "imagem", "data_leilao", "praca", "status",
+)
+
+# Extrai todos os campos de todos os cards em uma unica ida ao browser
+JS_EXTRAIR_CARDS = """
+(cards, campos) => cards.map(card => {
+    const dados = {};
+    for (const [nome, [seletor, atributo]] of Object.entries(campos)) {
+        const el = card.querySelector(seletor);
+        if (!el) {
+            dados[nome] = null;
+        } else if (atributo === "src") {
+            dados[nome] = el.getAttribute("src") || el.getAttribute("data-src");
+        } else if (atributo) {
+            dados[nome] = el.getAttribute(atributo);
+        } else {
+            dados[nome] = el.innerText;
+        }
+    }
+    return dados;
+})
+"""
+
 
 class BaseLeilaoScraper(ABC):
     """
@@ -24,6 +85,18 @@ class BaseLeilaoScraper(ABC):
     # Constantes a serem sobrescritas pelas subclasses
     FONTE_NOME: str = "base"
     BASE_URL: str = ""
+    SELETORES: Dict[str, str] = {}
+
+    # Listagem via API (XHR/fetch JSON). Vazio = apenas DOM.
+    # API_LISTAGEM: trechos de URL das respostas JSON da listagem
+    # CAMPOS_API: campo do normalizar_imovel -> caminhos candidatos no item JSON ("a.b.c")
+    API_LISTAGEM: Tuple[str, ...] = ()
+    CAMPOS_API: Dict[str, Tuple[str, ...]] = {}
+    PREFIXO_ID: str = ""
+
+    # Extracao de cards pelo DOM: nome -> (seletor, atributo ou None para o texto).
+    # Vazio = montado a partir de SELETORES (ver campos_card)
+    CAMPOS_CARD: Dict[str, Tuple[str, Optional[str]]] = {}
 
     # Filtros padrao para leiloes extrajudiciais
     FILTROS_PADRAO = {
@@ -38,9 +111,14 @@ class BaseLeilaoScraper(ABC):
     # Configuracoes do browser
     BROWSER_CONFIG = {
         "headless": True,
-        "slow_mo": 100,  # ms entre acoes
+        "slow_mo": 0,  # ms entre acoes (politeness agora via rate limiter por host)
     }
 
+    # Coleta de detalhes: paginas paralelas por fonte e limite por host
+    DETALHES_PAGINAS = 3           # abas simultaneas por fonte
+    REQUISICOES_POR_SEGUNDO = 2.0  # taxa sustentada por host
+    RAJADA_HOST = 3                # rajada maxima por host
+
     # User agents para rotacao
     USER_AGENTS = [
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -49,40 +127,104 @@ class BaseLeilaoScraper(ABC):
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
     ]
 
-    def __init__(self, headless: bool = True, timeout: int = 30000):
+    def __init__(
+        self,
+        headless: bool = True,
+        timeout: int = 30000,
+        modo_leve: Optional[bool] = None,
+        listagem_api: Optional[bool] = None,
+        medir_bytes: bool = False
+    ):
         """
         Inicializa o scraper.
 
         Args:
             headless: Se True, executa browser sem interface grafica
             timeout: Timeout padrao para operacoes em ms
+            modo_leve: Bloqueia imagens/midia/fontes/analytics e usa esperas por
+                       seletor em vez de delays fixos (default: SCRAPER_MODO_LEVE)
+            listagem_api: Le a listagem do JSON das APIs da fonte, com o DOM como
+                          fallback (default: SCRAPER_LISTAGEM_API)
+            medir_bytes: Conta requisicoes e bytes recebidos em self.metricas
+                         (um listener por requisicao; usado pelo benchmark)
         """
         self.headless = headless
         self.timeout = timeout
+        self.modo_leve = MODO_LEVE if modo_leve is None else modo_leve
+        self.listagem_api = LISTAGEM_API if listagem_api is None else listagem_api
+        self.medir_bytes = medir_bytes
         self.playwright = None
         self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self.imoveis_coletados: List[Dict] = []
         self.erros: List[Dict] = []
 
-    async def iniciar(self) -> None:
-        """Inicia o browser Playwright"""
-        try:
-            self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch(
-                headless=self.headless,
-                slow_mo=self.BROWSER_CONFIG["slow_mo"]
-            )
+        # Browser compartilhado (OrquestradorScrapers), orcamento global de paginas
+        # e rate limit por host da execucao
+        self._browser_proprio = True
+        self.orcamento_paginas: Optional[asyncio.Semaphore] = None
+        self.limitadores: Optional[LimitadoresHost] = None
+
+        # Respostas JSON de listagem capturadas durante a navegacao
+        self._respostas_api: List[Tuple[str, Any]] = []
+        self._leituras_api: List[asyncio.Task] = []
+
+        # Trafego da coleta (comparacao entre modo normal e modo leve);
+        # requisicoes e bytes_recebidos so sao contados com medir_bytes
+        self.metricas = {
+            "modo_leve": self.modo_leve,
+            "requisicoes": 0,
+            "requisicoes_bloqueadas": 0,
+            "bytes_recebidos": 0,
+            "duracao_s": 0.0,
+        }
 
-            # Cria contexto com user agent aleatorio
-            context = await self.browser.new_context(
+    async def iniciar(
+        self,
+        browser: Optional[Browser] = None,
+        orcamento_paginas: Optional[asyncio.Semaphore] = None,
+        limitadores: Optional[LimitadoresHost] = None
+    ) -> None:
+        """
+        Inicia o browser Playwright.
+
+        Args:
+            browser: Browser ja iniciado para compartilhar (cria contexto isolado nele).
+                     Se None, lanca um Chromium proprio.
+            orcamento_paginas: Semaforo global limitando paginas abertas entre fontes
+            limitadores: Rate limit por host compartilhado entre fontes
+                         (se None, um proprio desta execucao)
+        """
+        try:
+            if browser is not None:
+                self.browser = browser
+                self._browser_proprio = False
+            else:
+                self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.launch(
+                    headless=self.headless,
+                    slow_mo=self.BROWSER_CONFIG["slow_mo"]
+                )
+                self._browser_proprio = True
+
+            self.orcamento_paginas = orcamento_paginas
+            self.limitadores = limitadores or LimitadoresHost()
+
+            # Cria contexto com user agent aleatorio (isolado por fonte)
+            self.context = await self.browser.new_context(
                 user_agent=random.choice(self.USER_AGENTS),
                 viewport={"width": 1920, "height": 1080},
                 locale="pt-BR"
             )
+            if self.medir_bytes:
+                self.context.on("requestfinished", self._contabilizar_requisicao)
+            if self.modo_leve:
+                await self.context.route("**/*", self._filtrar_requisicao)
 
-            self.page = await context.new_page()
-            self.page.set_default_timeout(self.timeout)
+            self.page = await self.nova_pagina()
+            if self.API_LISTAGEM and self.listagem_api:
+                self.registrar_interceptor_api(self.page)
 
             logger.info(f"[{self.FONTE_NOME}] Browser iniciado com sucesso")
 
@@ -90,15 +232,336 @@ class BaseLeilaoScraper(ABC):
             logger.error(f"[{self.FONTE_NOME}] Erro ao iniciar browser: {e}")
             raise
 
+    async def _filtrar_requisicao(self, route) -> None:
+        """Handler de rota do modo leve: aborta recursos pesados e trackers"""
+        request = route.request
+        host = urlparse(request.url).netloc.lower()
+
+        if request.resource_type in RECURSOS_BLOQUEADOS or any(
+            host == h or host.endswith("." + h) for h in HOSTS_BLOQUEADOS
+        ):
+            self.metricas["requisicoes_bloqueadas"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _contabilizar_requisicao(self, request) -> None:
+        """Soma os bytes recebidos (headers + corpo) de cada requisicao concluida"""
+        self.metricas["requisicoes"] += 1
+        try:
+            tamanhos = await request.sizes()
+            self.metricas["bytes_recebidos"] += (
+                max(0, tamanhos.get("responseHeadersSize", 0))
+                + max(0, tamanhos.get("responseBodySize", 0))
+            )
+        except Exception:
+            # Pagina/contexto fechado antes da leitura dos tamanhos
+            pass
+
+    # ------------------------------------------------------------------
+    # Extracao de cards pelo DOM (uma unica chamada por pagina)
+    # ------------------------------------------------------------------
+
+    def campos_card(self) -> Dict[str, Tuple[str, Optional[str]]]:
+        """Campos lidos de cada card: CAMPOS_CARD ou os SELETORES padrao da fonte"""
+        if self.CAMPOS_CARD:
+            return self.CAMPOS_CARD
+
+        atributos = {"link_imovel": "href", "imagem": "src"}
+        return {
+            nome: (self.SELETORES[nome], atributos.get(nome))
+            for nome in CAMPOS_CARD_PADRAO
+            if nome in self.SELETORES
+        }
+
+    async def extrair_cards(self, page: Optional[Page] = None) -> List[Dict[str, Optional[str]]]:
+        """
+        Le todos os cards da pagina em um unico page.evaluate.
+
+        Para cada card retorna {campo: texto ou atributo}, com None quando o
+        seletor do campo nao existe no card. O atributo "src" cai para
+        "data-src" (imagens lazy-loaded).
+
+        Args:
+            page: Pagina a usar (default: self.page)
+
+        Returns:
+            Lista de dicts simples, um por card, na ordem do DOM
+        """
+        page = page or self.page
+        try:
+            return await page.eval_on_selector_all(
+                self.SELETORES["card_imovel"],
+                JS_EXTRAIR_CARDS,
+                self.campos_card()
+            )
+        except Exception as e:
+            logger.warning(f"[{self.FONTE_NOME}] Erro ao extrair cards: {e}")
+            return []
+
+    def converter_card(self, bruto: Dict[str, Optional[str]], dados: Dict) -> Dict:
+        """
+        Converte os campos comuns de um card bruto (textos) para o formato da listagem.
+        Link/ID e campos especificos ficam a cargo de cada fonte.
+
+        Args:
+            bruto: Card retornado por extrair_cards
+            dados: Dicionario de destino (atualizado in-place)
+
+        Returns:
+            O proprio dados
+        """
+        if bruto.get('preco') is not None:
+            dados['preco'] = self.extrair_preco(bruto['preco'])
+
+        if bruto.get('endereco') is not None:
+            dados['endereco'] = bruto['endereco'].strip()
+            self._extrair_localizacao(bruto['endereco'], dados)
+
+        if bruto.get('area') is not None:
+            dados['area_privativa'] = self.extrair_area(bruto['area'])
+
+        if bruto.get('quartos') is not None:
+            dados['quartos'] = self.extrair_numero(bruto['quartos'])
+
+        if bruto.get('desconto') is not None:
+            dados['desconto'] = self.extrair_numero(bruto['desconto'])
+
+        if bruto.get('avaliacao') is not None:
+            dados['valor_avaliacao'] = self.extrair_preco(bruto['avaliacao'])
+
+        if bruto.get('imagem'):
+            dados['imagens'] = [bruto['imagem']]
+
+        if bruto.get('data_leilao') is not None:
+            dados['data_leilao'] = bruto['data_leilao'].strip()
+
+        if bruto.get('praca') is not None:
+            praca = bruto['praca'].lower()
+            if '2' in praca or 'segunda' in praca or 'second' in praca:
+                dados['praca'] = '2a Praca'
+            else:
+                dados['praca'] = '1a Praca'
+
+        return dados
+
+    def _extrair_localizacao(self, endereco: str, dados: Dict) -> None:
+        """Extrai bairro/cidade/uf do endereco (implementado por cada fonte)"""
+        pass
+
+    # ------------------------------------------------------------------
+    # Listagem via API (JSON capturado das respostas XHR/fetch)
+    # ------------------------------------------------------------------
+
+    def registrar_interceptor_api(self, page: Page) -> None:
+        """
+        Registra na pagina um listener que captura as respostas JSON da listagem
+        (URLs contendo algum trecho de API_LISTAGEM). As respostas sao lidas em
+        background e consumidas por consumir_respostas_api().
+        """
+        def _ao_responder(response) -> None:
+            if response.request.resource_type not in ("xhr", "fetch"):
+                return
+            if not any(trecho in response.url for trecho in self.API_LISTAGEM):
+                return
+            self._leituras_api.append(asyncio.ensure_future(self._ler_resposta_api(response)))
+
+        page.on("response", _ao_responder)
+
+    async def _ler_resposta_api(self, response) -> None:
+        """Le o corpo JSON de uma resposta da listagem"""
+        try:
+            if "json" not in (response.headers.get("content-type") or ""):
+                return
+            self._respostas_api.append((response.url, await response.json()))
+        except Exception as e:
+            logger.debug(f"[{self.FONTE_NOME}] Resposta de API ignorada ({response.url}): {e}")
+
+    @staticmethod
+    def _valor_por_caminho(item: Any, caminho: str) -> Any:
+        """Le um valor aninhado pelo caminho "a.b.c" (indices numericos em listas)"""
+        valor = item
+        for chave in caminho.split("."):
+            if isinstance(valor, dict):
+                valor = valor.get(chave)
+            elif isinstance(valor, list) and chave.isdigit() and int(chave) < len(valor):
+                valor = valor[int(chave)]
+            else:
+                return None
+        return valor
+
+    def extrair_itens_api(self, payload: Any, profundidade: int = 4) -> List[Dict]:
+        """
+        Localiza a lista de imoveis dentro do JSON da listagem.
+        Retorna a primeira lista de objetos encontrada (busca em largura).
+        """
+        niveis = [payload]
+        for _ in range(profundidade):
+            proximos = []
+            for no in niveis:
+                if isinstance(no, list) and no and all(isinstance(x, dict) for x in no):
+                    return no
+                if isinstance(no, dict):
+                    proximos.extend(v for v in no.values() if isinstance(v, (dict, list)))
+            niveis = proximos
+        return []
+
+    def mapear_item_api(self, item: Dict, url_resposta: str) -> Dict:
+        """
+        Converte um item JSON da API para o formato de dados_raw do normalizar_imovel,
+        usando CAMPOS_API. Subclasses podem sobrescrever para ajustes especificos.
+
+        Args:
+            item: Objeto JSON de um imovel
+            url_resposta: URL da resposta de origem
+
+        Returns:
+            Dicionario no formato da listagem (vazio se o item nao tem link)
+        """
+        dados: Dict[str, Any] = {}
+        for campo, caminhos in self.CAMPOS_API.items():
+            for caminho in caminhos:
+                valor = self._valor_por_caminho(item, caminho)
+                if valor in (None, "", [], {}):
+                    continue
+                # Objetos aninhados so sao aceitos na lista de imagens
+                if campo != 'imagens' and isinstance(valor, (dict, list)):
+                    continue
+                dados[campo] = valor
+                break
+
+        link = str(self.montar_link_api(dados, url_resposta) or '')
+        if not link:
+            return {}
+        dados['link'] = link if link.startswith('http') else f"{self.BASE_URL}/{link.lstrip('/')}"
+
+        if 'id_imovel' in dados:
+            dados['id_imovel'] = f"{self.PREFIXO_ID}{dados['id_imovel']}"
+        for campo in ('endereco', 'bairro', 'cidade', 'uf', 'data_leilao', 'praca'):
+            if campo in dados:
+                dados[campo] = str(dados[campo]).strip()
+
+        for campo in ('preco', 'valor_avaliacao'):
+            if isinstance(dados.get(campo), str):
+                dados[campo] = self.extrair_preco(dados[campo])
+        for campo in ('area_privativa', 'area_total'):
+            if isinstance(dados.get(campo), str):
+                dados[campo] = self.extrair_area(dados[campo])
+        for campo in ('quartos', 'vagas'):
+            if isinstance(dados.get(campo), str):
+                dados[campo] = self.extrair_numero(dados[campo])
+        if isinstance(dados.get('desconto'), str):
+            dados['desconto'] = self.extrair_numero(dados['desconto'])
+        if 'imagens' in dados:
+            imagens = dados['imagens'] if isinstance(dados['imagens'], list) else [dados['imagens']]
+            dados['imagens'] = [
+                img if isinstance(img, str) else str(img.get('url') or img.get('src') or '')
+                for img in imagens if isinstance(img, (str, dict))
+            ]
+
+        dados.setdefault('tipo_imovel', 'Apartamento')
+        dados.setdefault('modalidade', 'Venda Online')
+        return dados
+
+    def montar_link_api(self, dados: Dict, url_resposta: str) -> str:
+        """Link da pagina de detalhes do item (subclasses montam a partir do id se necessario)"""
+        return dados.get('link', '')
+
+    def item_api_valido(self, dados: Dict) -> bool:
+        """Item mapeado com o minimo de um imovel da listagem: link, preco e endereco"""
+        return bool(
+            dados
+            and dados.get('link')
+            and isinstance(dados.get('preco'), (int, float)) and dados['preco'] > 0
+            and (dados.get('endereco') or dados.get('bairro'))
+        )
+
+    async def consumir_respostas_api(self) -> List[Dict]:
+        """
+        Aguarda as leituras pendentes e converte o JSON capturado desde a
+        ultima chamada em imoveis da listagem (sem duplicatas por link).
+
+        Returns:
+            Lista de imoveis no formato da listagem (vazia = usar DOM)
+        """
+        if self._leituras_api:
+            pendentes, self._leituras_api = self._leituras_api, []
+            await asyncio.gather(*pendentes, return_exceptions=True)
+
+        respostas, self._respostas_api = self._respostas_api, []
+        imoveis: List[Dict] = []
+        vistos = set()
+
+        for url_resposta, payload in respostas:
+            itens = self.extrair_itens_api(payload)
+            validos = []
+            for item in itens:
+                try:
+                    dados = self.mapear_item_api(item, url_resposta)
+                except Exception as e:
+                    logger.debug(f"[{self.FONTE_NOME}] Item de API ignorado: {e}")
+                    continue
+                if self.item_api_valido(dados):
+                    validos.append(dados)
+
+            # A primeira lista de objetos do JSON pode nao ser a de imoveis (filtros, banners...)
+            if len(validos) < len(itens) * MIN_ITENS_API_VALIDOS:
+                logger.info(
+                    f"[{self.FONTE_NOME}] JSON de {url_resposta} ignorado: "
+                    f"{len(validos)}/{len(itens)} itens com link, preco e endereco"
+                )
+                continue
+            for dados in validos:
+                if dados['link'] not in vistos:
+                    vistos.add(dados['link'])
+                    imoveis.append(dados)
+
+        if imoveis:
+            logger.info(f"[{self.FONTE_NOME}] {len(imoveis)} imoveis extraidos do JSON da API")
+        return imoveis
+
+    async def nova_pagina(self) -> Page:
+        """
+        Abre uma pagina no contexto da fonte, respeitando o orcamento global.
+        Toda pagina aberta aqui deve ser liberada com fechar_pagina().
+        """
+        if self.orcamento_paginas is not None:
+            await self.orcamento_paginas.acquire()
+        try:
+            page = await self.context.new_page()
+            page.set_default_timeout(self.timeout)
+            return page
+        except Exception:
+            if self.orcamento_paginas is not None:
+                self.orcamento_paginas.release()
+            raise
+
+    async def fechar_pagina(self, page: Page) -> None:
+        """Fecha uma pagina aberta com nova_pagina() e devolve o orcamento"""
+        try:
+            await page.close()
+        finally:
+            if self.orcamento_paginas is not None:
+                self.orcamento_paginas.release()
+
     async def finalizar(self) -> None:
         """Fecha o browser e libera recursos"""
         try:
             if self.page:
-                await self.page.close()
-            if self.browser:
-                await self.browser.close()
-            if self.playwright:
-                await self.playwright.stop()
+                await self.fechar_pagina(self.page)
+                self.page = None
+            if self.context:
+                await self.context.close()
+                self.context = None
+
+            # Browser compartilhado e fechado pelo orquestrador
+            if self._browser_proprio:
+                if self.browser:
+                    await self.browser.close()
+                if self.playwright:
+                    await self.playwright.stop()
+            self.browser = None
+            self.playwright = None
 
             logger.info(f"[{self.FONTE_NOME}] Browser finalizado")
 
@@ -122,6 +585,104 @@ class BaseLeilaoScraper(ABC):
             await self.page.evaluate("window.scrollBy(0, window.innerHeight)")
             await asyncio.sleep(delay_entre / 1000)
 
+    async def scroll_ate_estabilizar(
+        self,
+        seletor: Optional[str] = None,
+        max_scrolls: int = 30,
+        espera_ms: int = 1500,
+        page: Optional[Page] = None
+    ) -> int:
+        """
+        Faz scroll ate o numero de cards parar de crescer.
+        Em vez de um delay fixo por scroll, espera no maximo espera_ms
+        por novos cards e encerra quando um scroll nao traz nada novo.
+
+        Args:
+            seletor: Seletor dos cards (default: SELETORES["card_imovel"])
+            max_scrolls: Limite de scrolls
+            espera_ms: Espera maxima por novos cards apos cada scroll
+            page: Pagina a usar (default: self.page)
+
+        Returns:
+            Numero final de cards na pagina
+        """
+        page = page or self.page
+        seletor = seletor or self.SELETORES.get("card_imovel", "")
+        contar = "s => document.querySelectorAll(s).length"
+
+        total = await page.evaluate(contar, seletor)
+        for _ in range(max_scrolls):
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            try:
+                await page.wait_for_function(
+                    "([s, n]) => document.querySelectorAll(s).length > n",
+                    arg=[seletor, total],
+                    timeout=espera_ms
+                )
+            except Exception:
+                break
+            total = await page.evaluate(contar, seletor)
+
+        return total
+
+    async def carregar_cards(
+        self,
+        vezes: int = 5,
+        delay_entre: int = 1000,
+        seletor: Optional[str] = None
+    ) -> None:
+        """
+        Carrega conteudo lazy-loaded da listagem.
+        Modo leve: scroll ate estabilizar. Modo normal: scroll_pagina com delay fixo.
+
+        Args:
+            vezes: Numero de scrolls (modo normal)
+            delay_entre: Delay entre scrolls em ms (modo normal)
+            seletor: Seletor dos cards (modo leve)
+        """
+        if self.modo_leve:
+            total = await self.scroll_ate_estabilizar(seletor)
+            logger.debug(f"[{self.FONTE_NOME}] {total} cards apos scroll")
+        else:
+            await self.scroll_pagina(vezes=vezes, delay_entre=delay_entre)
+
+    async def navegar(
+        self,
+        url: str,
+        seletor: Optional[str] = None,
+        espera_ms: Optional[Tuple[int, int]] = None,
+        page: Optional[Page] = None
+    ) -> None:
+        """
+        Navega para uma URL e espera o conteudo relevante.
+
+        Modo leve: domcontentloaded + espera pelo seletor (ou pelo evento load,
+        barato sem imagens/fontes, quando nao ha seletor).
+        Modo normal: networkidle + delay aleatorio opcional.
+
+        Args:
+            url: URL de destino
+            seletor: Seletor que indica pagina pronta
+            espera_ms: (min, max) do delay apos carregar no modo normal
+            page: Pagina a usar (default: self.page)
+        """
+        page = page or self.page
+
+        if not self.modo_leve:
+            await page.goto(url, wait_until="networkidle")
+            if espera_ms:
+                await self.delay_aleatorio(*espera_ms)
+            return
+
+        await page.goto(url, wait_until="domcontentloaded")
+        try:
+            if seletor:
+                await page.wait_for_selector(seletor, timeout=self.timeout)
+            else:
+                await page.wait_for_load_state("load", timeout=self.timeout)
+        except Exception:
+            logger.warning(f"[{self.FONTE_NOME}] Timeout aguardando {seletor or 'load'} em {url}")
+
     async def esperar_elemento(self, seletor: str, timeout: int = None) -> bool:
         """
         Espera um elemento aparecer na pagina
@@ -293,26 +854,37 @@ class BaseLeilaoScraper(ABC):
         pass
 
     @abstractmethod
-    async def coletar_detalhes(self, url: str) -> Dict:
+    async def coletar_detalhes(self, url: str, page: Optional[Page] = None) -> Dict:
         """
         Coleta detalhes de um imovel especifico.
         Deve ser implementado por cada subclasse.
 
         Args:
             url: URL da pagina de detalhes do imovel
+            page: Pagina a usar (default: self.page). Permite coleta em paralelo.
 
         Returns:
             Dicionario com dados completos do imovel
         """
         pass
 
-    async def executar(self, coletar_detalhes: bool = True, max_imoveis: int = 50) -> List[Dict]:
+    async def executar(
+        self,
+        coletar_detalhes: bool = True,
+        max_imoveis: int = 50,
+        browser: Optional[Browser] = None,
+        orcamento_paginas: Optional[asyncio.Semaphore] = None,
+        limitadores: Optional[LimitadoresHost] = None
+    ) -> List[Dict]:
         """
         Executa o processo completo de scraping.
 
         Args:
             coletar_detalhes: Se True, coleta detalhes de cada imovel
             max_imoveis: Limite maximo de imoveis a coletar
+            browser: Browser compartilhado (ver OrquestradorScrapers)
+            orcamento_paginas: Semaforo global de paginas abertas
+            limitadores: Rate limit por host compartilhado (ver OrquestradorScrapers)
 
         Returns:
             Lista de imoveis normalizados
@@ -321,7 +893,7 @@ class BaseLeilaoScraper(ABC):
         logger.info(f"[{self.FONTE_NOME}] Iniciando coleta...")
 
         try:
-            await self.iniciar()
+            await self.iniciar(browser=browser, orcamento_paginas=orcamento_paginas, limitadores=limitadores)
 
             # Etapa 1: Coletar listagem
             listagem = await self.coletar_listagem()
@@ -331,25 +903,8 @@ class BaseLeilaoScraper(ABC):
             listagem = listagem[:max_imoveis]
 
             # Etapa 2: Coletar detalhes (opcional)
-            imoveis = []
             if coletar_detalhes and listagem:
-                for i, item in enumerate(listagem):
-                    try:
-                        url = item.get('link', '')
-                        if url:
-                            await self.delay_aleatorio(1000, 3000)
-                            detalhes = await self.coletar_detalhes(url)
-                            # Mescla dados da listagem com detalhes
-                            dados_completos = {**item, **detalhes}
-                            imovel_normalizado = self.normalizar_imovel(dados_completos)
-                            imoveis.append(imovel_normalizado)
-
-                            if (i + 1) % 10 == 0:
-                                logger.info(f"[{self.FONTE_NOME}] Progresso: {i + 1}/{len(listagem)}")
-
-                    except Exception as e:
-                        logger.warning(f"[{self.FONTE_NOME}] Erro ao coletar detalhes: {e}")
-                        self.erros.append({"url": item.get('link'), "erro": str(e)})
+                imoveis = await self._coletar_detalhes_em_pool(listagem)
             else:
                 # Usa apenas dados da listagem
                 imoveis = [self.normalizar_imovel(item) for item in listagem]
@@ -364,6 +919,12 @@ class BaseLeilaoScraper(ABC):
             )
 
             self.imoveis_coletados = imoveis_filtrados
+            if self.medir_bytes:
+                logger.info(
+                    f"[{self.FONTE_NOME}] Trafego: {self.metricas['bytes_recebidos'] / 1024:.0f} KB "
+                    f"em {self.metricas['requisicoes']} requisicoes "
+                    f"({self.metricas['requisicoes_bloqueadas']} bloqueadas)"
+                )
             return imoveis_filtrados
 
         except Exception as e:
@@ -371,13 +932,75 @@ class BaseLeilaoScraper(ABC):
             raise
 
         finally:
+            self.metricas["duracao_s"] = round((datetime.now() - inicio).total_seconds(), 1)
             await self.finalizar()
 
+    async def _coletar_detalhes_em_pool(self, listagem: List[Dict]) -> List[Dict]:
+        """
+        Coleta detalhes usando um pool de DETALHES_PAGINAS abas da fonte.
+        O espacamento entre requisicoes e controlado por um token bucket por host.
+
+        Args:
+            listagem: Itens da listagem (com 'link')
+
+        Returns:
+            Imoveis normalizados, na ordem da listagem
+        """
+        fila: asyncio.Queue = asyncio.Queue()
+        for i, item in enumerate(listagem):
+            if item.get('link'):
+                fila.put_nowait((i, item))
+
+        resultados: Dict[int, Dict] = {}
+        total = fila.qsize()
+        num_paginas = max(1, min(self.DETALHES_PAGINAS, total))
+
+        async def worker(page: Page) -> None:
+            while True:
+                try:
+                    i, item = fila.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                url = item['link']
+                try:
+                    await self.limitadores.obter(url, self.REQUISICOES_POR_SEGUNDO, self.RAJADA_HOST).aguardar()
+                    detalhes = await self.coletar_detalhes(url, page=page)
+                    # Mescla dados da listagem com detalhes
+                    resultados[i] = self.normalizar_imovel({**item, **detalhes})
+
+                    if len(resultados) % 10 == 0:
+                        logger.info(f"[{self.FONTE_NOME}] Progresso: {len(resultados)}/{total}")
+
+                except Exception as e:
+                    logger.warning(f"[{self.FONTE_NOME}] Erro ao coletar detalhes: {e}")
+                    self.erros.append({"url": url, "erro": str(e)})
+
+        # A pagina principal e reutilizada; as extras respeitam o orcamento global
+        paginas = [self.page]
+        try:
+            for _ in range(num_paginas - 1):
+                # Nao espera por orcamento ocupado por outras fontes
+                if self.orcamento_paginas is not None and self.orcamento_paginas.locked():
+                    break
+                paginas.append(await self.nova_pagina())
+        except Exception as e:
+            logger.warning(f"[{self.FONTE_NOME}] Pool de detalhes reduzido a {len(paginas)} paginas: {e}")
+
+        try:
+            await asyncio.gather(*[worker(page) for page in paginas])
+        finally:
+            for page in paginas[1:]:
+                await self.fechar_pagina(page)
+
+        return [resultados[i] for i in sorted(resultados)]
+
     def get_estatisticas(self) -> Dict:
         """Retorna estatisticas da coleta"""
         return {
             "fonte": self.FONTE_NOME,
             "total_coletados": len(self.imoveis_coletados),
             "total_erros": len(self.erros),
-            "erros": self.erros[:5]  # Primeiros 5 erros
+            "erros": self.erros[:5],  # Primeiros 5 erros
+            "metricas": dict(self.metricas)
         }
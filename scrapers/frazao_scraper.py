@@ -5,7 +5,8 @@ Leiloes extrajudiciais de imoveis - Multiplos bancos (Itau, Santander, Inter)
 
 import re
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+from playwright.async_api import Page
 from .base_scraper import BaseLeilaoScraper
 
 logger = logging.getLogger(__name__)
@@ -87,11 +88,10 @@ class FrazaoScraper(BaseLeilaoScraper):
         imoveis = []
 
         try:
-            await self.page.goto(url, wait_until="networkidle")
-            await self.delay_aleatorio(2000, 3500)
+            await self.navegar(url, self.SELETORES["card_imovel"], espera_ms=(2000, 3500))
 
             # Scroll para carregar conteudo
-            await self.scroll_pagina(vezes=5, delay_entre=1000)
+            await self.carregar_cards(vezes=5, delay_entre=1000)
 
             # Coleta primeira pagina
             imoveis_pagina = await self._extrair_pagina(banco)
@@ -106,7 +106,7 @@ class FrazaoScraper(BaseLeilaoScraper):
 
                     await next_btn.click()
                     await self.delay_aleatorio(2000, 4000)
-                    await self.scroll_pagina(vezes=3)
+                    await self.carregar_cards(vezes=3)
 
                     imoveis_pagina = await self._extrair_pagina(banco)
                     if not imoveis_pagina:
@@ -134,100 +134,38 @@ class FrazaoScraper(BaseLeilaoScraper):
             logger.warning(f"[{self.FONTE_NOME}] Timeout aguardando .card")
 
         # Busca todos os cards
-        cards = await self.page.query_selector_all(".card")
+        cards = await self.extrair_cards()
         logger.info(f"[{self.FONTE_NOME}] {len(cards)} cards encontrados")
 
-        for card in cards:
+        for bruto in cards:
             try:
-                imovel = await self._extrair_card(card, banco)
-                if imovel and imovel.get('link'):
+                imovel = self._montar_card(bruto, banco)
+                if imovel.get('link'):
                     imoveis.append(imovel)
             except Exception as e:
                 logger.warning(f"[{self.FONTE_NOME}] Erro ao extrair card: {e}")
 
         return imoveis
 
-    async def _extrair_card(self, card, banco: str) -> Dict:
-        """Extrai dados de um card de imovel"""
+    def _montar_card(self, bruto: Dict, banco: str) -> Dict:
+        """Monta os dados de um imovel a partir do card lido por extrair_cards"""
         dados = {'banco': banco}
 
-        try:
-            # Link do imovel - busca link com /lote/ no href
-            link_elem = await card.query_selector("a[href*='/lote/']")
-            if link_elem:
-                href = await link_elem.get_attribute("href")
-                if href:
-                    dados['link'] = href if href.startswith('http') else f"{self.BASE_URL}{href}"
-                    # ID do imovel - extrai numero do lote
-                    match = re.search(r'/lote/(\d+)', href)
-                    if match:
-                        dados['id_imovel'] = f"FRAZAO-{banco[:3].upper()}-{match.group(1)}"
-
-            # Preco
-            preco_elem = await card.query_selector(self.SELETORES["preco"])
-            if preco_elem:
-                preco_texto = await preco_elem.inner_text()
-                dados['preco'] = self.extrair_preco(preco_texto)
-
-            # Endereco
-            endereco_elem = await card.query_selector(self.SELETORES["endereco"])
-            if endereco_elem:
-                endereco = await endereco_elem.inner_text()
-                dados['endereco'] = endereco.strip()
-                self._extrair_localizacao(endereco, dados)
-
-            # Area
-            area_elem = await card.query_selector(self.SELETORES["area"])
-            if area_elem:
-                area_texto = await area_elem.inner_text()
-                dados['area_privativa'] = self.extrair_area(area_texto)
-
-            # Quartos
-            quartos_elem = await card.query_selector(self.SELETORES["quartos"])
-            if quartos_elem:
-                quartos_texto = await quartos_elem.inner_text()
-                dados['quartos'] = self.extrair_numero(quartos_texto)
-
-            # Desconto
-            desconto_elem = await card.query_selector(self.SELETORES["desconto"])
-            if desconto_elem:
-                desconto_texto = await desconto_elem.inner_text()
-                dados['desconto'] = self.extrair_numero(desconto_texto)
-
-            # Valor de avaliacao
-            avaliacao_elem = await card.query_selector(self.SELETORES["avaliacao"])
-            if avaliacao_elem:
-                avaliacao_texto = await avaliacao_elem.inner_text()
-                dados['valor_avaliacao'] = self.extrair_preco(avaliacao_texto)
+        # Link do imovel - link com /lote/ no href
+        href = bruto.get('link_imovel')
+        if href:
+            dados['link'] = href if href.startswith('http') else f"{self.BASE_URL}{href}"
+            # ID do imovel - extrai numero do lote
+            match = re.search(r'/lote/(\d+)', href)
+            if match:
+                dados['id_imovel'] = f"FRAZAO-{banco[:3].upper()}-{match.group(1)}"
 
-            # Imagem
-            img_elem = await card.query_selector(self.SELETORES["imagem"])
-            if img_elem:
-                src = await img_elem.get_attribute("src") or await img_elem.get_attribute("data-src")
-                if src:
-                    dados['imagens'] = [src]
+        # Preco, endereco, area, quartos, desconto, avaliacao, imagem, data, praca
+        self.converter_card(bruto, dados)
 
-            # Data do leilao
-            data_elem = await card.query_selector(self.SELETORES["data_leilao"])
-            if data_elem:
-                data_texto = await data_elem.inner_text()
-                dados['data_leilao'] = data_texto.strip()
-
-            # Praca
-            praca_elem = await card.query_selector(self.SELETORES["praca"])
-            if praca_elem:
-                praca_texto = await praca_elem.inner_text()
-                if '2' in praca_texto or 'segunda' in praca_texto.lower():
-                    dados['praca'] = '2a Praca'
-                else:
-                    dados['praca'] = '1a Praca'
-
-            # Define tipo
-            dados['tipo_imovel'] = 'Apartamento'
-            dados['modalidade'] = 'Venda Online'
-
-        except Exception as e:
-            logger.warning(f"[{self.FONTE_NOME}] Erro ao extrair dados do card: {e}")
+        # Define tipo
+        dados['tipo_imovel'] = 'Apartamento'
+        dados['modalidade'] = 'Venda Online'
 
         return dados
 
@@ -250,42 +188,43 @@ class FrazaoScraper(BaseLeilaoScraper):
 
         dados['uf'] = 'SP'
 
-    async def coletar_detalhes(self, url: str) -> Dict:
+    async def coletar_detalhes(self, url: str, page: Optional[Page] = None) -> Dict:
         """
         Coleta detalhes completos de um imovel do Frazao.
 
         Args:
             url: URL da pagina de detalhes
+            page: Pagina a usar (default: self.page; o pool de detalhes passa a sua)
 
         Returns:
             Dicionario com dados detalhados
         """
+        page = page or self.page
         dados = {'link': url}
 
         try:
-            await self.page.goto(url, wait_until="networkidle")
-            await self.delay_aleatorio(1500, 3000)
+            await self.navegar(url, page=page)
 
             # Preco atual
-            preco_elem = await self.page.query_selector(".preco-atual, .valor-lance, .lance-minimo")
+            preco_elem = await page.query_selector(".preco-atual, .valor-lance, .lance-minimo")
             if preco_elem:
                 preco_texto = await preco_elem.inner_text()
                 dados['preco'] = self.extrair_preco(preco_texto)
 
             # Valor de avaliacao
-            avaliacao_elem = await self.page.query_selector(".valor-avaliacao, .avaliado, .valor-mercado")
+            avaliacao_elem = await page.query_selector(".valor-avaliacao, .avaliado, .valor-mercado")
             if avaliacao_elem:
                 avaliacao_texto = await avaliacao_elem.inner_text()
                 dados['valor_avaliacao'] = self.extrair_preco(avaliacao_texto)
 
             # Endereco completo
-            endereco_elem = await self.page.query_selector(".endereco-completo, h1, .titulo-imovel")
+            endereco_elem = await page.query_selector(".endereco-completo, h1, .titulo-imovel")
             if endereco_elem:
                 dados['endereco'] = (await endereco_elem.inner_text()).strip()
                 self._extrair_localizacao(dados['endereco'], dados)
 
             # Caracteristicas
-            caracteristicas = await self.page.query_selector_all(".caracteristica, .info, .detalhe, li")
+            caracteristicas = await page.query_selector_all(".caracteristica, .info, .detalhe, li")
             for carac in caracteristicas:
                 texto = (await carac.inner_text()).lower()
                 if 'm²' in texto or 'metro' in texto or 'area' in texto:
@@ -296,18 +235,18 @@ class FrazaoScraper(BaseLeilaoScraper):
                     dados['vagas'] = self.extrair_numero(texto)
 
             # Data do leilao
-            data_elem = await self.page.query_selector(".data-leilao, .encerramento, .prazo")
+            data_elem = await page.query_selector(".data-leilao, .encerramento, .prazo")
             if data_elem:
                 dados['data_leilao'] = (await data_elem.inner_text()).strip()
 
             # Descricao
-            descricao_elem = await self.page.query_selector(".descricao, .description, .detalhes")
+            descricao_elem = await page.query_selector(".descricao, .description, .detalhes")
             if descricao_elem:
                 dados['descricao'] = (await descricao_elem.inner_text()).strip()[:500]
 
             # Imagens
             imagens = []
-            img_elems = await self.page.query_selector_all(".galeria img, .fotos img, .slider img")
+            img_elems = await page.query_selector_all(".galeria img, .fotos img, .slider img")
             for img in img_elems[:10]:
                 src = await img.get_attribute("src") or await img.get_attribute("data-src")
                 if src and src.startswith('http'):
@@ -316,7 +255,7 @@ class FrazaoScraper(BaseLeilaoScraper):
                 dados['imagens'] = imagens
 
             # Praca
-            praca_elem = await self.page.query_selector(".praca, .etapa, .rodada")
+            praca_elem = await page.query_selector(".praca, .etapa, .rodada")
             if praca_elem:
                 praca_texto = (await praca_elem.inner_text()).lower()
                 if '2' in praca_texto or 'segunda' in praca_texto:
@@ -325,13 +264,13 @@ class FrazaoScraper(BaseLeilaoScraper):
                     dados['praca'] = '1a Praca'
 
             # Modalidade
-            modalidade_elem = await self.page.query_selector(".modalidade, .tipo-venda")
+            modalidade_elem = await page.query_selector(".modalidade, .tipo-venda")
             if modalidade_elem:
                 dados['modalidade'] = (await modalidade_elem.inner_text()).strip()
 
             # Banco (se nao foi setado antes)
             if 'banco' not in dados:
-                banco_elem = await self.page.query_selector(".banco, .instituicao")
+                banco_elem = await page.query_selector(".banco, .instituicao")
                 if banco_elem:
                     dados['banco'] = (await banco_elem.inner_text()).strip()
 
@@ -5,7 +5,8 @@ Leiloes extrajudiciais de imoveis
 
 import re
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+from playwright.async_api import Page
 from .base_scraper import BaseLeilaoScraper
 
 logger = logging.getLogger(__name__)
@@ -46,6 +47,20 @@ class MegaLeiloesScraper(BaseLeilaoScraper):
         "total_resultados": ".results-count, .total"
     }
 
+    # Campos lidos de cada card (estrutura propria: titulo + localidade, lote, banco)
+    CAMPOS_CARD = {
+        "link_imovel": ("a[href*='/imoveis/']", "href"),
+        "preco": (".card-price", None),
+        "titulo": (".card-title", None),
+        "localidade": (".card-locality", None),
+        "numero": (".card-number", None),
+        "imagem": (".card-image img", "src"),
+        "data_leilao": (".card-first-instance-date, .card-second-instance-date", None),
+        "praca": (".card-instance-title", None),
+        "valor_instancia": (".card-instance-value", None),
+        "banco": (".card-bank img", "alt"),
+    }
+
     async def coletar_listagem(self) -> List[Dict]:
         """
         Coleta lista de imoveis da pagina de listagem do Mega Leiloes.
@@ -63,11 +78,10 @@ class MegaLeiloesScraper(BaseLeilaoScraper):
 
         try:
             logger.info(f"[{self.FONTE_NOME}] Acessando {url_completa}")
-            await self.page.goto(url_completa, wait_until="networkidle")
-            await self.delay_aleatorio(2000, 4000)
+            await self.navegar(url_completa, self.SELETORES["card_imovel"], espera_ms=(2000, 4000))
 
             # Scroll para carregar conteudo
-            await self.scroll_pagina(vezes=5, delay_entre=1000)
+            await self.carregar_cards(vezes=5, delay_entre=1000)
 
             # Coleta primeira pagina
             imoveis_pagina = await self._extrair_pagina()
@@ -82,13 +96,13 @@ class MegaLeiloesScraper(BaseLeilaoScraper):
                     if not next_btn:
                         # Tenta URL direta com parametro de pagina
                         url_pagina = f"{url_completa}&pagina={pagina}"
-                        await self.page.goto(url_pagina, wait_until="networkidle")
+                        await self.navegar(url_pagina, self.SELETORES["card_imovel"])
 
                     else:
                         await next_btn.click()
 
                     await self.delay_aleatorio(2000, 4000)
-                    await self.scroll_pagina(vezes=3)
+                    await self.carregar_cards(vezes=3)
 
                     imoveis_pagina = await self._extrair_pagina()
                     if not imoveis_pagina:
@@ -117,113 +131,71 @@ class MegaLeiloesScraper(BaseLeilaoScraper):
             logger.warning(f"[{self.FONTE_NOME}] Timeout aguardando .card")
 
         # Busca todos os cards na pagina
-        cards = await self.page.query_selector_all(".card")
+        cards = await self.extrair_cards()
         logger.info(f"[{self.FONTE_NOME}] {len(cards)} cards encontrados na pagina")
 
-        for card in cards:
+        for bruto in cards:
             try:
-                imovel = await self._extrair_card(card)
-                if imovel and imovel.get('link'):
+                imovel = self._montar_card(bruto)
+                if imovel.get('link'):
                     imoveis.append(imovel)
             except Exception as e:
                 logger.warning(f"[{self.FONTE_NOME}] Erro ao extrair card: {e}")
 
         return imoveis
 
-    async def _extrair_card(self, card) -> Dict:
-        """Extrai dados de um card de imovel"""
+    def _montar_card(self, bruto: Dict) -> Dict:
+        """Monta os dados de um imovel a partir do card lido por extrair_cards"""
         dados = {}
 
-        try:
-            # Link do imovel - busca link com /imoveis/ no href
-            link_elem = await card.query_selector("a[href*='/imoveis/']")
-            if link_elem:
-                href = await link_elem.get_attribute("href")
-                if href:
-                    dados['link'] = href
-                    # ID do imovel - extrai codigo X123456 do final da URL
-                    match = re.search(r'-x(\d+)', href, re.IGNORECASE)
-                    if match:
-                        dados['id_imovel'] = f"MEGA-{match.group(1)}"
-                    else:
-                        # Tenta extrair qualquer numero
-                        match = re.search(r'/(\d+)', href)
-                        if match:
-                            dados['id_imovel'] = f"MEGA-{match.group(1)}"
-
-            # Se nao encontrou link valido, pula este card
-            if not dados.get('link'):
-                return dados
-
-            # Preco - .card-price
-            preco_elem = await card.query_selector(".card-price")
-            if preco_elem:
-                preco_texto = await preco_elem.inner_text()
-                dados['preco'] = self.extrair_preco(preco_texto)
-
-            # Titulo/Endereco - .card-title
-            titulo_elem = await card.query_selector(".card-title")
-            if titulo_elem:
-                titulo = await titulo_elem.inner_text()
-                dados['endereco'] = titulo.strip()
-
-            # Localidade - .card-locality
-            local_elem = await card.query_selector(".card-locality")
-            if local_elem:
-                local = await local_elem.inner_text()
-                dados['endereco'] = f"{dados.get('endereco', '')} - {local.strip()}"
-                self._extrair_localizacao(local, dados)
-
-            # Numero do lote - .card-number
-            numero_elem = await card.query_selector(".card-number")
-            if numero_elem:
-                numero = await numero_elem.inner_text()
-                if not dados.get('id_imovel'):
-                    dados['id_imovel'] = f"MEGA-{numero.strip()}"
-
-            # Imagem - .card-image img
-            img_elem = await card.query_selector(".card-image img")
-            if img_elem:
-                src = await img_elem.get_attribute("src") or await img_elem.get_attribute("data-src")
-                if src:
-                    dados['imagens'] = [src]
-
-            # Data do leilao - datas das pracas
-            data_elem = await card.query_selector(".card-first-instance-date, .card-second-instance-date")
-            if data_elem:
-                data_texto = await data_elem.inner_text()
-                dados['data_leilao'] = data_texto.strip()
-
-            # Praca - .card-instance-title
-            praca_elem = await card.query_selector(".card-instance-title")
-            if praca_elem:
-                praca_texto = await praca_elem.inner_text()
-                if '2' in praca_texto or 'segunda' in praca_texto.lower():
-                    dados['praca'] = '2a Praca'
-                else:
-                    dados['praca'] = '1a Praca'
-
-            # Valor da instancia (praca) - .card-instance-value
-            valor_elem = await card.query_selector(".card-instance-value")
-            if valor_elem:
-                valor_texto = await valor_elem.inner_text()
-                valor = self.extrair_preco(valor_texto)
-                if valor and not dados.get('preco'):
-                    dados['preco'] = valor
-
-            # Banco - .card-bank img (alt text)
-            banco_elem = await card.query_selector(".card-bank img")
-            if banco_elem:
-                banco_alt = await banco_elem.get_attribute("alt")
-                if banco_alt:
-                    dados['banco'] = banco_alt.strip()
-
-            # Define tipo
-            dados['tipo_imovel'] = 'Apartamento'
-            dados['modalidade'] = 'Venda Online'
-
-        except Exception as e:
-            logger.warning(f"[{self.FONTE_NOME}] Erro ao extrair dados do card: {e}")
+        # Link do imovel - link com /imoveis/ no href
+        href = bruto.get('link_imovel')
+        if href:
+            dados['link'] = href
+            # ID do imovel - extrai codigo X123456 do final da URL
+            match = re.search(r'-x(\d+)', href, re.IGNORECASE)
+            if match:
+                dados['id_imovel'] = f"MEGA-{match.group(1)}"
+            else:
+                # Tenta extrair qualquer numero
+                match = re.search(r'/(\d+)', href)
+                if match:
+                    dados['id_imovel'] = f"MEGA-{match.group(1)}"
+
+        # Se nao encontrou link valido, pula este card
+        if not dados.get('link'):
+            return dados
+
+        # Preco, imagem, data e praca
+        self.converter_card(bruto, dados)
+
+        # Titulo/Endereco - .card-title
+        if bruto.get('titulo') is not None:
+            dados['endereco'] = bruto['titulo'].strip()
+
+        # Localidade - .card-locality
+        local = bruto.get('localidade')
+        if local is not None:
+            dados['endereco'] = f"{dados.get('endereco', '')} - {local.strip()}"
+            self._extrair_localizacao(local, dados)
+
+        # Numero do lote - .card-number
+        if bruto.get('numero') is not None and not dados.get('id_imovel'):
+            dados['id_imovel'] = f"MEGA-{bruto['numero'].strip()}"
+
+        # Valor da instancia (praca) - .card-instance-value
+        if bruto.get('valor_instancia') is not None:
+            valor = self.extrair_preco(bruto['valor_instancia'])
+            if valor and not dados.get('preco'):
+                dados['preco'] = valor
+
+        # Banco - .card-bank img (alt text)
+        if bruto.get('banco'):
+            dados['banco'] = bruto['banco'].strip()
+
+        # Define tipo
+        dados['tipo_imovel'] = 'Apartamento'
+        dados['modalidade'] = 'Venda Online'
 
         return dados
 
@@ -246,42 +218,43 @@ class MegaLeiloesScraper(BaseLeilaoScraper):
 
         dados['uf'] = 'SP'
 
-    async def coletar_detalhes(self, url: str) -> Dict:
+    async def coletar_detalhes(self, url: str, page: Optional[Page] = None) -> Dict:
         """
         Coleta detalhes completos de um imovel do Mega Leiloes.
 
         Args:
             url: URL da pagina de detalhes
+            page: Pagina a usar (default: self.page; o pool de detalhes passa a sua)
 
         Returns:
             Dicionario com dados detalhados
         """
+        page = page or self.page
         dados = {'link': url}
 
         try:
-            await self.page.goto(url, wait_until="networkidle")
-            await self.delay_aleatorio(1500, 3000)
+            await self.navegar(url, page=page)
 
             # Preco atual
-            preco_elem = await self.page.query_selector(".preco-atual, .valor-lance, h2.valor")
+            preco_elem = await page.query_selector(".preco-atual, .valor-lance, h2.valor")
             if preco_elem:
                 preco_texto = await preco_elem.inner_text()
                 dados['preco'] = self.extrair_preco(preco_texto)
 
             # Valor de avaliacao
-            avaliacao_elem = await self.page.query_selector(".valor-avaliacao, .avaliado")
+            avaliacao_elem = await page.query_selector(".valor-avaliacao, .avaliado")
             if avaliacao_elem:
                 avaliacao_texto = await avaliacao_elem.inner_text()
                 dados['valor_avaliacao'] = self.extrair_preco(avaliacao_texto)
 
             # Endereco completo
-            endereco_elem = await self.page.query_selector(".endereco-completo, h1.titulo, .localizacao")
+            endereco_elem = await page.query_selector(".endereco-completo, h1.titulo, .localizacao")
             if endereco_elem:
                 dados['endereco'] = (await endereco_elem.inner_text()).strip()
                 self._extrair_localizacao(dados['endereco'], dados)
 
             # Caracteristicas
-            caracteristicas = await self.page.query_selector_all(".caracteristica, .info-item, .detalhe")
+            caracteristicas = await page.query_selector_all(".caracteristica, .info-item, .detalhe")
             for carac in caracteristicas:
                 texto = (await carac.inner_text()).lower()
                 if 'm²' in texto or 'metro' in texto or 'area' in texto:
@@ -292,18 +265,18 @@ class MegaLeiloesScraper(BaseLeilaoScraper):
                     dados['vagas'] = self.extrair_numero(texto)
 
             # Data do leilao
-            data_elem = await self.page.query_selector(".data-leilao, .encerramento")
+            data_elem = await page.query_selector(".data-leilao, .encerramento")
             if data_elem:
                 dados['data_leilao'] = (await data_elem.inner_text()).strip()
 
             # Descricao
-            descricao_elem = await self.page.query_selector(".descricao, .description, .sobre")
+            descricao_elem = await page.query_selector(".descricao, .description, .sobre")
             if descricao_elem:
                 dados['descricao'] = (await descricao_elem.inner_text()).strip()[:500]
 
             # Imagens
             imagens = []
-            img_elems = await self.page.query_selector_all(".galeria img, .fotos img, .carousel img")
+            img_elems = await page.query_selector_all(".galeria img, .fotos img, .carousel img")
             for img in img_elems[:10]:
                 src = await img.get_attribute("src") or await img.get_attribute("data-src")
                 if src and src.startswith('http'):
@@ -312,7 +285,7 @@ class MegaLeiloesScraper(BaseLeilaoScraper):
                 dados['imagens'] = imagens
 
             # Praca
-            praca_elem = await self.page.query_selector(".praca, .etapa")
+            praca_elem = await page.query_selector(".praca, .etapa")
             if praca_elem:
                 praca_texto = (await praca_elem.inner_text()).lower()
                 if '2' in praca_texto or 'segunda' in praca_texto:
@@ -321,7 +294,7 @@ class MegaLeiloesScraper(BaseLeilaoScraper):
                     dados['praca'] = '1a Praca'
 
             # Modalidade
-            modalidade_elem = await self.page.query_selector(".modalidade, .tipo-venda")
+            modalidade_elem = await page.query_selector(".modalidade, .tipo-venda")
             if modalidade_elem:
                 dados['modalidade'] = (await modalidade_elem.inner_text()).strip()
 
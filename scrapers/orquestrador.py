@@ -0,0 +1,140 @@
+"""
+Orquestrador de scrapers de leilao
+Executa todas as fontes em paralelo com um unico Playwright/Chromium compartilhado
+"""
+
+import os
+import asyncio
+import logging
+from typing import List, Dict
+from datetime import datetime
+
+from playwright.async_api import async_playwright
+
+from .base_scraper import BaseLeilaoScraper
+from .rate_limiter import LimitadoresHost
+
+logger = logging.getLogger(__name__)
+
+# Maximo de paginas abertas simultaneamente somando todas as fontes
+MAX_PAGINAS_GLOBAL = int(os.getenv("SCRAPER_MAX_PAGINAS", "8"))
+
+# Flags do Chromium para reduzir consumo de memoria em container
+CHROMIUM_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--no-first-run",
+]
+
+
+class OrquestradorScrapers:
+    """
+    Executa varios scrapers concorrentemente sobre um unico browser.
+
+    - Um unico processo Playwright e um unico Chromium para todas as fontes
+    - Cada fonte recebe um BrowserContext isolado (cookies, cache, user agent)
+    - Um semaforo global limita o total de paginas abertas entre as fontes
+    - Rate limit por host compartilhado entre as fontes, novo a cada execucao
+
+    O tempo total tende ao da fonte mais lenta, e nao a soma das fontes.
+    """
+
+    def __init__(
+        self,
+        scrapers: List[BaseLeilaoScraper],
+        max_paginas: int = MAX_PAGINAS_GLOBAL,
+        headless: bool = True
+    ):
+        """
+        Args:
+            scrapers: Instancias de scrapers a executar
+            max_paginas: Limite global de paginas abertas
+            headless: Se True, executa browser sem interface grafica
+        """
+        self.scrapers = scrapers
+        self.max_paginas = max(max_paginas, len(scrapers))
+        self.headless = headless
+
+    async def _executar_fonte(
+        self,
+        scraper: BaseLeilaoScraper,
+        browser,
+        orcamento: asyncio.Semaphore,
+        limitadores: LimitadoresHost,
+        coletar_detalhes: bool,
+        max_por_fonte: int
+    ) -> Dict:
+        """Executa uma fonte isolando falhas das demais"""
+        inicio = datetime.now()
+        try:
+            imoveis = await scraper.executar(
+                coletar_detalhes=coletar_detalhes,
+                max_imoveis=max_por_fonte,
+                browser=browser,
+                orcamento_paginas=orcamento,
+                limitadores=limitadores
+            )
+            return {
+                "status": "sucesso",
+                "imoveis": imoveis,
+                "duracao_s": round((datetime.now() - inicio).total_seconds(), 1),
+                "metricas": dict(scraper.metricas)
+            }
+        except Exception as e:
+            logger.error(f"[ORQUESTRADOR] Erro em {scraper.FONTE_NOME}: {e}")
+            return {
+                "status": "erro",
+                "imoveis": [],
+                "erro": str(e),
+                "duracao_s": round((datetime.now() - inicio).total_seconds(), 1),
+                "metricas": dict(scraper.metricas)
+            }
+
+    async def executar(
+        self,
+        coletar_detalhes: bool = False,
+        max_por_fonte: int = 50
+    ) -> Dict[str, Dict]:
+        """
+        Executa todas as fontes concorrentemente.
+
+        Args:
+            coletar_detalhes: Se deve coletar detalhes de cada imovel
+            max_por_fonte: Maximo de imoveis por fonte
+
+        Returns:
+            Dict FONTE_NOME -> {status, imoveis, duracao_s, metricas, erro?}
+
+        Raises:
+            Exception se o Playwright/Chromium nao puder ser iniciado
+        """
+        inicio = datetime.now()
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(
+                headless=self.headless,
+                args=CHROMIUM_ARGS
+            )
+            logger.info(
+                f"[ORQUESTRADOR] Chromium iniciado - {len(self.scrapers)} fontes, "
+                f"ate {self.max_paginas} paginas simultaneas"
+            )
+
+            try:
+                orcamento = asyncio.Semaphore(self.max_paginas)
+                limitadores = LimitadoresHost()
+                resultados = await asyncio.gather(*[
+                    self._executar_fonte(s, browser, orcamento, limitadores, coletar_detalhes, max_por_fonte)
+                    for s in self.scrapers
+                ])
+            finally:
+                await browser.close()
+
+        duracao = (datetime.now() - inicio).total_seconds()
+        logger.info(f"[ORQUESTRADOR] Coleta concluida em {duracao:.1f}s")
+
+        return {
+            scraper.FONTE_NOME: resultado
+            for scraper, resultado in zip(self.scrapers, resultados)
+        }
@@ -0,0 +1,72 @@
+"""
+Rate limiter por host (token bucket) para os scrapers
+Substitui os delays fixos por um limite de requisicoes por segundo em cada site
+"""
+
+import asyncio
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """
+    Token bucket assincrono.
+
+    Acumula ate `capacidade` tokens, repostos a `taxa` tokens por segundo.
+    Cada requisicao consome um token; sem tokens, aguarda a reposicao.
+    """
+
+    def __init__(self, taxa: float, capacidade: int = 1):
+        """
+        Args:
+            taxa: Tokens repostos por segundo (requisicoes/s sustentadas)
+            capacidade: Tamanho maximo da rajada
+        """
+        self.taxa = taxa
+        self.capacidade = max(1, capacidade)
+        self.tokens = float(self.capacidade)
+        self.ultimo = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _repor(self) -> None:
+        agora = time.monotonic()
+        self.tokens = min(self.capacidade, self.tokens + (agora - self.ultimo) * self.taxa)
+        self.ultimo = agora
+
+    async def aguardar(self) -> None:
+        """Aguarda ate haver um token disponivel e o consome"""
+        async with self._lock:
+            self._repor()
+            if self.tokens < 1:
+                espera = (1 - self.tokens) / self.taxa
+                await asyncio.sleep(espera)
+                self._repor()
+            self.tokens -= 1
+
+
+class LimitadoresHost:
+    """
+    Token buckets por host de uma execucao de coleta.
+
+    Criado por execucao (OrquestradorScrapers.executar ou um scraper isolado)
+    e compartilhado entre as paginas e fontes dessa execucao. Os buckets e seus
+    locks vivem no event loop da execucao e sao descartados com ela.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def obter(self, url: str, taxa: float, capacidade: int) -> TokenBucket:
+        """
+        Retorna o token bucket do host da URL (criando se necessario).
+
+        Args:
+            url: URL a ser acessada
+            taxa: Requisicoes por segundo permitidas no host
+            capacidade: Rajada maxima no host
+        """
+        host = urlparse(url).netloc.lower()
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(taxa, capacidade)
+        return self._buckets[host]
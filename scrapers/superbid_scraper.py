@@ -5,7 +5,8 @@ Leiloes extrajudiciais de imoveis
 
 import re
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+from playwright.async_api import Page
 from .base_scraper import BaseLeilaoScraper
 
 logger = logging.getLogger(__name__)
@@ -81,11 +82,10 @@ class SuperbidScraper(BaseLeilaoScraper):
 
         try:
             logger.info(f"[{self.FONTE_NOME}] Acessando {url_completa}")
-            await self.page.goto(url_completa, wait_until="networkidle")
-            await self.delay_aleatorio(2000, 4000)
+            await self.navegar(url_completa, self.SELETORES["card_imovel"], espera_ms=(2000, 4000))
 
             # Scroll para carregar conteudo lazy-loaded
-            await self.scroll_pagina(vezes=8, delay_entre=1200)
+            await self.carregar_cards(vezes=8, delay_entre=1200)
 
             # Coleta primeira pagina
             imoveis_pagina = await self._extrair_pagina(base_url)
@@ -99,12 +99,12 @@ class SuperbidScraper(BaseLeilaoScraper):
                     if not next_btn:
                         # Tenta URL direta
                         url_pagina = f"{url_completa}&page={pagina}"
-                        await self.page.goto(url_pagina, wait_until="networkidle")
+                        await self.navegar(url_pagina, self.SELETORES["card_imovel"])
                     else:
                         await next_btn.click()
 
                     await self.delay_aleatorio(2000, 4000)
-                    await self.scroll_pagina(vezes=5)
+                    await self.carregar_cards(vezes=5)
 
                     imoveis_pagina = await self._extrair_pagina(base_url)
                     if not imoveis_pagina:
@@ -127,110 +127,46 @@ class SuperbidScraper(BaseLeilaoScraper):
         imoveis = []
 
         await self.esperar_elemento(self.SELETORES["card_imovel"])
-        cards = await self.page.query_selector_all(self.SELETORES["card_imovel"])
 
-        for card in cards:
+        for bruto in await self.extrair_cards():
             try:
-                imovel = await self._extrair_card(card, base_url)
-                if imovel and imovel.get('link'):
+                imovel = self._montar_card(bruto, base_url)
+                if imovel.get('link'):
                     imoveis.append(imovel)
             except Exception as e:
                 logger.warning(f"[{self.FONTE_NOME}] Erro ao extrair card: {e}")
 
         return imoveis
 
-    async def _extrair_card(self, card, base_url: str) -> Dict:
-        """Extrai dados de um card de imovel"""
+    def _montar_card(self, bruto: Dict, base_url: str) -> Dict:
+        """Monta os dados de um imovel a partir do card lido por extrair_cards"""
         dados = {}
 
-        try:
-            # Link do imovel
-            link_elem = await card.query_selector(self.SELETORES["link_imovel"])
-            if link_elem:
-                href = await link_elem.get_attribute("href")
-                if href:
-                    dados['link'] = href if href.startswith('http') else f"{base_url}{href}"
-                    # ID do imovel
-                    match = re.search(r'/lote/(\d+)|/auction/(\d+)|/(\d+)', href)
-                    if match:
-                        id_match = match.group(1) or match.group(2) or match.group(3)
-                        prefixo = "SOLD" if "sold" in base_url else "SBID"
-                        dados['id_imovel'] = f"{prefixo}-{id_match}"
-
-            # Preco
-            preco_elem = await card.query_selector(self.SELETORES["preco"])
-            if preco_elem:
-                preco_texto = await preco_elem.inner_text()
-                dados['preco'] = self.extrair_preco(preco_texto)
-
-            # Endereco
-            endereco_elem = await card.query_selector(self.SELETORES["endereco"])
-            if endereco_elem:
-                endereco = await endereco_elem.inner_text()
-                dados['endereco'] = endereco.strip()
-                self._extrair_localizacao(endereco, dados)
-
-            # Area
-            area_elem = await card.query_selector(self.SELETORES["area"])
-            if area_elem:
-                area_texto = await area_elem.inner_text()
-                dados['area_privativa'] = self.extrair_area(area_texto)
-
-            # Quartos
-            quartos_elem = await card.query_selector(self.SELETORES["quartos"])
-            if quartos_elem:
-                quartos_texto = await quartos_elem.inner_text()
-                dados['quartos'] = self.extrair_numero(quartos_texto)
-
-            # Desconto
-            desconto_elem = await card.query_selector(self.SELETORES["desconto"])
-            if desconto_elem:
-                desconto_texto = await desconto_elem.inner_text()
-                dados['desconto'] = self.extrair_numero(desconto_texto)
-
-            # Valor de avaliacao
-            avaliacao_elem = await card.query_selector(self.SELETORES["avaliacao"])
-            if avaliacao_elem:
-                avaliacao_texto = await avaliacao_elem.inner_text()
-                dados['valor_avaliacao'] = self.extrair_preco(avaliacao_texto)
-
-            # Imagem
-            img_elem = await card.query_selector(self.SELETORES["imagem"])
-            if img_elem:
-                src = await img_elem.get_attribute("src") or await img_elem.get_attribute("data-src")
-                if src:
-                    dados['imagens'] = [src]
-
-            # Data do leilao
-            data_elem = await card.query_selector(self.SELETORES["data_leilao"])
-            if data_elem:
-                data_texto = await data_elem.inner_text()
-                dados['data_leilao'] = data_texto.strip()
-
-            # Praca
-            praca_elem = await card.query_selector(self.SELETORES["praca"])
-            if praca_elem:
-                praca_texto = await praca_elem.inner_text()
-                if '2' in praca_texto or 'second' in praca_texto.lower():
-                    dados['praca'] = '2a Praca'
-                else:
-                    dados['praca'] = '1a Praca'
-
-            # Status
-            status_elem = await card.query_selector(self.SELETORES["status"])
-            if status_elem:
-                status_texto = (await status_elem.inner_text()).lower()
-                if 'venda direta' in status_texto or 'direct' in status_texto:
-                    dados['modalidade'] = 'Venda Direta'
-                elif 'online' in status_texto:
-                    dados['modalidade'] = 'Venda Online'
-
-            # Define tipo
-            dados['tipo_imovel'] = 'Apartamento'
-            dados['modalidade'] = dados.get('modalidade', 'Venda Online')
-
-        except Exception as e:
-            logger.warning(f"[{self.FONTE_NOME}] Erro ao extrair dados do card: {e}")
+        # Link do imovel
+        href = bruto.get('link_imovel')
+        if href:
+            dados['link'] = href if href.startswith('http') else f"{base_url}{href}"
+            # ID do imovel
+            match = re.search(r'/lote/(\d+)|/auction/(\d+)|/(\d+)', href)
+            if match:
+                id_match = match.group(1) or match.group(2) or match.group(3)
+                prefixo = "SOLD" if "sold" in base_url else "SBID"
+                dados['id_imovel'] = f"{prefixo}-{id_match}"
+
+        # Preco, endereco, area, quartos, desconto, avaliacao, imagem, data, praca
+        self.converter_card(bruto, dados)
+
+        # Status
+        if bruto.get('status') is not None:
+            status_texto = bruto['status'].lower()
+            if 'venda direta' in status_texto or 'direct' in status_texto:
+                dados['modalidade'] = 'Venda Direta'
+            elif 'online' in status_texto:
+                dados['modalidade'] = 'Venda Online'
+
+        # Define tipo
+        dados['tipo_imovel'] = 'Apartamento'
+        dados['modalidade'] = dados.get('modalidade', 'Venda Online')
 
         return dados
 
@@ -256,42 +192,43 @@ class SuperbidScraper(BaseLeilaoScraper):
 
         dados['uf'] = 'SP'
 
-    async def coletar_detalhes(self, url: str) -> Dict:
+    async def coletar_detalhes(self, url: str, page: Optional[Page] = None) -> Dict:
         """
         Coleta detalhes completos de um imovel do Superbid.
 
         Args:
             url: URL da pagina de detalhes
+            page: Pagina a usar (default: self.page; o pool de detalhes passa a sua)
 
         Returns:
             Dicionario com dados detalhados
         """
+        page = page or self.page
         dados = {'link': url}
 
         try:
-            await self.page.goto(url, wait_until="networkidle")
-            await self.delay_aleatorio(1500, 3000)
+            await self.navegar(url, page=page)
 
             # Preco atual
-            preco_elem = await self.page.query_selector(".current-price, .preco-atual, .lance-atual, h2.valor")
+            preco_elem = await page.query_selector(".current-price, .preco-atual, .lance-atual, h2.valor")
             if preco_elem:
                 preco_texto = await preco_elem.inner_text()
                 dados['preco'] = self.extrair_preco(preco_texto)
 
             # Valor de avaliacao
-            avaliacao_elem = await self.page.query_selector(".market-value, .avaliacao, .valor-mercado")
+            avaliacao_elem = await page.query_selector(".market-value, .avaliacao, .valor-mercado")
             if avaliacao_elem:
                 avaliacao_texto = await avaliacao_elem.inner_text()
                 dados['valor_avaliacao'] = self.extrair_preco(avaliacao_texto)
 
             # Endereco completo
-            endereco_elem = await self.page.query_selector(".full-address, .endereco, h1.title, .titulo")
+            endereco_elem = await page.query_selector(".full-address, .endereco, h1.title, .titulo")
             if endereco_elem:
                 dados['endereco'] = (await endereco_elem.inner_text()).strip()
                 self._extrair_localizacao(dados['endereco'], dados)
 
             # Caracteristicas (formato lista ou tabela)
-            caracteristicas = await self.page.query_selector_all(".spec-item, .feature, .caracteristica, tr")
+            caracteristicas = await page.query_selector_all(".spec-item, .feature, .caracteristica, tr")
             for carac in caracteristicas:
                 texto = (await carac.inner_text()).lower()
                 if 'm²' in texto or 'metro' in texto or 'area' in texto:
@@ -302,18 +239,18 @@ class SuperbidScraper(BaseLeilaoScraper):
                     dados['vagas'] = self.extrair_numero(texto)
 
             # Data do leilao
-            data_elem = await self.page.query_selector(".end-time, .encerramento, .data-fim")
+            data_elem = await page.query_selector(".end-time, .encerramento, .data-fim")
             if data_elem:
                 dados['data_leilao'] = (await data_elem.inner_text()).strip()
 
             # Descricao
-            descricao_elem = await self.page.query_selector(".description, .descricao, .about")
+            descricao_elem = await page.query_selector(".description, .descricao, .about")
             if descricao_elem:
                 dados['descricao'] = (await descricao_elem.inner_text()).strip()[:500]
 
             # Imagens
             imagens = []
-            img_elems = await self.page.query_selector_all(".gallery img, .photos img, .carousel img, .slider img")
+            img_elems = await page.query_selector_all(".gallery img, .photos img, .carousel img, .slider img")
             for img in img_elems[:10]:
                 src = await img.get_attribute("src") or await img.get_attribute("data-src")
                 if src and src.startswith('http'):
@@ -322,7 +259,7 @@ class SuperbidScraper(BaseLeilaoScraper):
                 dados['imagens'] = imagens
 
             # Praca/Etapa
-            praca_elem = await self.page.query_selector(".auction-round, .praca, .etapa")
+            praca_elem = await page.query_selector(".auction-round, .praca, .etapa")
             if praca_elem:
                 praca_texto = (await praca_elem.inner_text()).lower()
                 if '2' in praca_texto or 'second' in praca_texto:
@@ -331,7 +268,7 @@ class SuperbidScraper(BaseLeilaoScraper):
                     dados['praca'] = '1a Praca'
 
             # Modalidade
-            modalidade_elem = await self.page.query_selector(".sale-type, .modalidade, .tipo-venda")
+            modalidade_elem = await page.query_selector(".sale-type, .modalidade, .tipo-venda")
             if modalidade_elem:
                 modalidade_texto = (await modalidade_elem.inner_text()).lower()
                 if 'direta' in modalidade_texto or 'direct' in modalidade_texto:
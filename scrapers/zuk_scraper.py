@@ -5,7 +5,8 @@ Leiloes extrajudiciais de imoveis
 
 import re
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+from playwright.async_api import Page
 from .base_scraper import BaseLeilaoScraper
 
 logger = logging.getLogger(__name__)
@@ -49,27 +50,17 @@ class ZukScraper(BaseLeilaoScraper):
 
         try:
             logger.info(f"[{self.FONTE_NOME}] Acessando {url_completa}")
-            await self.page.goto(url_completa, wait_until="networkidle")
-            await self.delay_aleatorio(2000, 4000)
+            await self.navegar(url_completa, self.SELETORES["card_imovel"], espera_ms=(2000, 4000))
 
             # Scroll para carregar todos os imoveis (lazy loading)
             logger.info(f"[{self.FONTE_NOME}] Fazendo scroll para carregar conteudo...")
-            await self.scroll_pagina(vezes=10, delay_entre=1500)
+            await self.carregar_cards(vezes=10, delay_entre=1500)
 
             # Espera cards carregarem
             await self.esperar_elemento(self.SELETORES["card_imovel"])
 
             # Extrai todos os cards de imoveis
-            cards = await self.page.query_selector_all(self.SELETORES["card_imovel"])
-            logger.info(f"[{self.FONTE_NOME}] {len(cards)} cards encontrados")
-
-            for card in cards:
-                try:
-                    imovel = await self._extrair_card(card)
-                    if imovel and imovel.get('link'):
-                        imoveis.append(imovel)
-                except Exception as e:
-                    logger.warning(f"[{self.FONTE_NOME}] Erro ao extrair card: {e}")
+            imoveis = await self._extrair_cards_dom()
 
             # Tenta paginacao se disponivel
             imoveis_paginacao = await self._coletar_paginacao()
@@ -80,79 +71,41 @@ class ZukScraper(BaseLeilaoScraper):
 
         return imoveis
 
-    async def _extrair_card(self, card) -> Dict:
-        """Extrai dados de um card de imovel"""
-        dados = {}
-
-        try:
-            # Link do imovel
-            link_elem = await card.query_selector(self.SELETORES["link_imovel"])
-            if link_elem:
-                href = await link_elem.get_attribute("href")
-                if href:
-                    dados['link'] = href if href.startswith('http') else f"{self.BASE_URL}{href}"
-                    # ID do imovel extraido da URL
-                    match = re.search(r'/imovel/(\d+)|/leilao/(\d+)', href)
-                    if match:
-                        dados['id_imovel'] = f"ZUK-{match.group(1) or match.group(2)}"
-
-            # Preco
-            preco_elem = await card.query_selector(self.SELETORES["preco"])
-            if preco_elem:
-                preco_texto = await preco_elem.inner_text()
-                dados['preco'] = self.extrair_preco(preco_texto)
+    async def _extrair_cards_dom(self) -> List[Dict]:
+        """Extrai os imoveis dos cards renderizados na pagina atual"""
+        imoveis = []
+        cards = await self.extrair_cards()
+        logger.info(f"[{self.FONTE_NOME}] {len(cards)} cards encontrados")
 
-            # Endereco
-            endereco_elem = await card.query_selector(self.SELETORES["endereco"])
-            if endereco_elem:
-                endereco = await endereco_elem.inner_text()
-                dados['endereco'] = endereco.strip()
-                # Tenta extrair bairro e cidade
-                self._extrair_localizacao(endereco, dados)
-
-            # Area
-            area_elem = await card.query_selector(self.SELETORES["area"])
-            if area_elem:
-                area_texto = await area_elem.inner_text()
-                dados['area_privativa'] = self.extrair_area(area_texto)
-
-            # Quartos
-            quartos_elem = await card.query_selector(self.SELETORES["quartos"])
-            if quartos_elem:
-                quartos_texto = await quartos_elem.inner_text()
-                dados['quartos'] = self.extrair_numero(quartos_texto)
-
-            # Desconto
-            desconto_elem = await card.query_selector(self.SELETORES["desconto"])
-            if desconto_elem:
-                desconto_texto = await desconto_elem.inner_text()
-                dados['desconto'] = self.extrair_numero(desconto_texto)
+        for bruto in cards:
+            try:
+                imovel = self._montar_card(bruto)
+                if imovel.get('link'):
+                    imoveis.append(imovel)
+            except Exception as e:
+                logger.warning(f"[{self.FONTE_NOME}] Erro ao extrair card: {e}")
 
-            # Valor de avaliacao
-            avaliacao_elem = await card.query_selector(self.SELETORES["avaliacao"])
-            if avaliacao_elem:
-                avaliacao_texto = await avaliacao_elem.inner_text()
-                dados['valor_avaliacao'] = self.extrair_preco(avaliacao_texto)
+        return imoveis
 
-            # Imagem
-            img_elem = await card.query_selector(self.SELETORES["imagem"])
-            if img_elem:
-                src = await img_elem.get_attribute("src") or await img_elem.get_attribute("data-src")
-                if src:
-                    dados['imagens'] = [src]
+    def _montar_card(self, bruto: Dict) -> Dict:
+        """Monta os dados de um imovel a partir do card lido por extrair_cards"""
+        dados = {}
 
-            # Data do leilao
-            data_elem = await card.query_selector(self.SELETORES["data_leilao"])
-            if data_elem:
-                data_texto = await data_elem.inner_text()
-                dados['data_leilao'] = data_texto.strip()
+        # Link do imovel
+        href = bruto.get('link_imovel')
+        if href:
+            dados['link'] = href if href.startswith('http') else f"{self.BASE_URL}{href}"
+            # ID do imovel extraido da URL
+            match = re.search(r'/imovel/(\d+)|/leilao/(\d+)', href)
+            if match:
+                dados['id_imovel'] = f"ZUK-{match.group(1) or match.group(2)}"
 
-            # Define tipo como Apartamento (filtro ja aplicado na URL)
-            dados['tipo_imovel'] = 'Apartamento'
-            dados['modalidade'] = 'Venda Online'
+        # Preco, endereco, area, quartos, desconto, avaliacao, imagem, data
+        self.converter_card(bruto, dados)
 
-        except Exception as e:
-            logger.warning(f"[{self.FONTE_NOME}] Erro ao extrair dados do card: {e}")
+        # Define tipo como Apartamento (filtro ja aplicado na URL)
+        dados['tipo_imovel'] = 'Apartamento'
+        dados['modalidade'] = 'Venda Online'
 
         return dados
 
@@ -188,15 +141,12 @@ class ZukScraper(BaseLeilaoScraper):
 
                 await next_btn.click()
                 await self.delay_aleatorio(2000, 4000)
-                await self.scroll_pagina(vezes=5)
+                await self.carregar_cards(vezes=5)
 
-                cards = await self.page.query_selector_all(self.SELETORES["card_imovel"])
-                for card in cards:
-                    imovel = await self._extrair_card(card)
-                    if imovel and imovel.get('link'):
-                        imoveis_extras.append(imovel)
+                imoveis_pagina = await self._extrair_cards_dom()
+                imoveis_extras.extend(imoveis_pagina)
 
-                logger.info(f"[{self.FONTE_NOME}] Pagina {pagina}: {len(cards)} imoveis")
+                logger.info(f"[{self.FONTE_NOME}] Pagina {pagina}: {len(imoveis_pagina)} imoveis")
 
             except Exception as e:
                 logger.debug(f"[{self.FONTE_NOME}] Fim da paginacao: {e}")
@@ -204,42 +154,43 @@ class ZukScraper(BaseLeilaoScraper):
 
         return imoveis_extras
 
-    async def coletar_detalhes(self, url: str) -> Dict:
+    async def coletar_detalhes(self, url: str, page: Optional[Page] = None) -> Dict:
         """
         Coleta detalhes completos de um imovel do Zuk.
 
         Args:
             url: URL da pagina de detalhes
+            page: Pagina a usar (default: self.page; o pool de detalhes passa a sua)
 
         Returns:
             Dicionario com dados detalhados
         """
+        page = page or self.page
         dados = {'link': url}
 
         try:
-            await self.page.goto(url, wait_until="networkidle")
-            await self.delay_aleatorio(1500, 3000)
+            await self.navegar(url, page=page)
 
             # Preco atual
-            preco_elem = await self.page.query_selector(".preco-atual, .current-price, h2.preco")
+            preco_elem = await page.query_selector(".preco-atual, .current-price, h2.preco")
             if preco_elem:
                 preco_texto = await preco_elem.inner_text()
                 dados['preco'] = self.extrair_preco(preco_texto)
 
             # Valor de avaliacao
-            avaliacao_elem = await self.page.query_selector(".valor-avaliacao, .evaluation-price")
+            avaliacao_elem = await page.query_selector(".valor-avaliacao, .evaluation-price")
             if avaliacao_elem:
                 avaliacao_texto = await avaliacao_elem.inner_text()
                 dados['valor_avaliacao'] = self.extrair_preco(avaliacao_texto)
 
             # Endereco completo
-            endereco_elem = await self.page.query_selector(".endereco-completo, .full-address, h1")
+            endereco_elem = await page.query_selector(".endereco-completo, .full-address, h1")
             if endereco_elem:
                 dados['endereco'] = (await endereco_elem.inner_text()).strip()
                 self._extrair_localizacao(dados['endereco'], dados)
 
             # Caracteristicas (area, quartos, vagas)
-            caracteristicas = await self.page.query_selector_all(".caracteristica, .feature, .info-item")
+            caracteristicas = await page.query_selector_all(".caracteristica, .feature, .info-item")
             for carac in caracteristicas:
                 texto = (await carac.inner_text()).lower()
                 if 'm²' in texto or 'metro' in texto:
@@ -250,18 +201,18 @@ class ZukScraper(BaseLeilaoScraper):
                     dados['vagas'] = self.extrair_numero(texto)
 
             # Data do leilao
-            data_elem = await self.page.query_selector(".data-leilao, .auction-date")
+            data_elem = await page.query_selector(".data-leilao, .auction-date")
             if data_elem:
                 dados['data_leilao'] = (await data_elem.inner_text()).strip()
 
             # Descricao
-            descricao_elem = await self.page.query_selector(".descricao, .description")
+            descricao_elem = await page.query_selector(".descricao, .description")
             if descricao_elem:
                 dados['descricao'] = (await descricao_elem.inner_text()).strip()[:500]
 
             # Imagens (ate 10)
             imagens = []
-            img_elems = await self.page.query_selector_all(".galeria img, .gallery img, .carousel img")
+            img_elems = await page.query_selector_all(".galeria img, .gallery img, .carousel img")
             for img in img_elems[:10]:
                 src = await img.get_attribute("src") or await img.get_attribute("data-src")
                 if src and src.startswith('http'):
@@ -270,7 +221,7 @@ class ZukScraper(BaseLeilaoScraper):
                 dados['imagens'] = imagens
 
             # Tipo de leilao / praca
-            tipo_elem = await self.page.query_selector(".tipo-leilao, .auction-type")
+            tipo_elem = await page.query_selector(".tipo-leilao, .auction-type")
             if tipo_elem:
                 tipo_texto = (await tipo_elem.inner_text()).lower()
                 if '2' in tipo_texto or 'segunda' in tipo_texto:
@@ -279,7 +230,7 @@ class ZukScraper(BaseLeilaoScraper):
                     dados['praca'] = '1a Praca'
 
             # Modalidade
-            modalidade_elem = await self.page.query_selector(".modalidade, .sale-type")
+            modalidade_elem = await page.query_selector(".modalidade, .sale-type")
             if modalidade_elem:
                 dados['modalidade'] = (await modalidade_elem.inner_text()).strip()
 
@@ -0,0 +1,70 @@
+"""
+Teste do cache persistente de analises de matricula (tools/cache_tools.py)
+TTL, remocao por tamanho (LRU) e reaproveitamento sem chamar a OpenAI
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools import cache_tools, document_tools
+from tools.cache_tools import CacheDisco
+
+
+def test_ttl_e_limite_de_tamanho():
+    """Entradas expiradas somem; acima do limite sai a menos acessada"""
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = Path(tmp) / "cache.sqlite3"
+
+        cache = CacheDisco(caminho, ttl_s=0.2, max_bytes=0)
+        cache.gravar("a", {"x": 1})
+        assert cache.obter("a") == {"x": 1}
+        time.sleep(0.3)
+        assert cache.obter("a") is None
+
+        cache = CacheDisco(caminho, ttl_s=0, max_bytes=50)
+        cache.gravar("b", {"v": "b" * 15})
+        time.sleep(0.01)
+        cache.gravar("c", {"v": "c" * 15})
+        time.sleep(0.01)
+        cache.obter("b")  # b passa a ser a mais recente
+        cache.gravar("d", {"v": "d" * 15})
+
+        # Outra instancia (como outro processo) ve o mesmo arquivo
+        outro = CacheDisco(caminho, ttl_s=0, max_bytes=50)
+        assert outro.obter("c") is None
+        assert outro.obter("b") == {"v": "b" * 15}
+        assert outro.obter("d") == {"v": "d" * 15}
+
+
+def test_matricula_inalterada_nao_vai_para_openai():
+    """Mesmo PDF (mesmo SHA-256) e mesma versao de prompt -> resposta do cache"""
+    original = (cache_tools.CACHE_DB, document_tools.OPENAI_API_KEY, document_tools.renderizar_paginas)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_tools.CACHE_DB = Path(tmp) / "cache.sqlite3"
+        document_tools.OPENAI_API_KEY = "sk-teste"
+        document_tools.renderizar_paginas = lambda *a, **k: (_ for _ in ()).throw(AssertionError("chamou a OpenAI"))
+        try:
+            pdf = Path(tmp) / "matricula_1.pdf"
+            pdf.write_bytes(b"%PDF-1.4 matricula de teste")
+
+            chave = document_tools.chave_cache_matricula(str(pdf))
+            assert document_tools.VERSAO_ANALISE_MATRICULA in chave
+            cache_tools.get_cache().gravar(chave, {"classificacao_risco": "BAIXO"})
+
+            # Copia com outro nome: mesma chave
+            copia = Path(tmp) / "matricula_2.pdf"
+            copia.write_bytes(pdf.read_bytes())
+            assert document_tools.analisar_matricula_com_gpt4(str(copia)) == {"classificacao_risco": "BAIXO"}
+        finally:
+            cache_tools.CACHE_DB, document_tools.OPENAI_API_KEY, document_tools.renderizar_paginas = original
+
+
+if __name__ == "__main__":
+    test_ttl_e_limite_de_tamanho()
+    test_matricula_inalterada_nao_vai_para_openai()
+    print("[OK] Cache de matriculas")
@@ -0,0 +1,133 @@
+"""
+Teste da ingestao multi-estado da Caixa (tools/data_tools.py)
+Usa um servidor HTTP local no lugar do site da Caixa
+"""
+
+import sys
+import json
+import tempfile
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools import data_tools
+import main_pipeline
+
+CABECALHO = (
+    " Lista de Imóveis da Caixa;;Data de geração:;12/12/2025;;;;;;;\n"
+    " N° do imóvel;UF;Cidade;Bairro;Endereço;Preço;Valor de avaliação;Desconto;"
+    "Descrição;Modalidade de venda;Link de acesso\n\n"
+)
+
+
+def _csv(uf: str) -> bytes:
+    """CSV no formato da Caixa com 3 apartamentos do estado"""
+    prefixo = sum(map(ord, uf))
+    linhas = [
+        f" {prefixo}{i} ;{uf} ;CIDADE {uf} ;CENTRO ;RUA A, {i} ;{90 + i}.000,00;200.000,00;50.00;"
+        f"Apartamento, 0.00 de área total, {40 + i}.50 de área privativa,  2 qto(s), 1 vaga(s) de garagem.;"
+        f"Venda Online;https://venda-imoveis.caixa.gov.br/sistema/detalhe-imovel.asp?hdnimovel={prefixo}{i}"
+        for i in range(1, 4)
+    ]
+    return (CABECALHO + "\n".join(linhas) + "\n").encode("latin-1")
+
+
+class _StubCaixa(BaseHTTPRequestHandler):
+    requisicoes = []
+
+    def do_GET(self):
+        uf = parse_qs(urlparse(self.path).query)["uf"][0]
+        etag = f'"{uf}-v1"'
+        _StubCaixa.requisicoes.append((uf, self.headers.get("If-None-Match")))
+
+        if uf == "XX":
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        corpo = _csv(uf)
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_ingestao_multiestado_condicional():
+    """Downloads paralelos, merge num unico DataFrame e 304 no segundo download"""
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _StubCaixa)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    original = (data_tools.DATA_DIR, data_tools.CACHE_FILE, data_tools.CAIXA_DOWNLOAD_URL)
+    with tempfile.TemporaryDirectory() as tmp:
+        data_tools.DATA_DIR = Path(tmp)
+        data_tools.CACHE_FILE = Path(tmp) / "cache_metadata.json"
+        data_tools.CAIXA_DOWNLOAD_URL = f"http://127.0.0.1:{servidor.server_port}/download"
+        try:
+            resultado = data_tools.coletar_caixa_estados(["SP", "RJ", "MG", "XX"], force=True)
+            imoveis = resultado["imoveis"]
+
+            assert len(imoveis) == 9
+            assert sorted(imoveis["uf"].unique()) == ["MG", "RJ", "SP"]
+            assert imoveis["quartos"].tolist() == [2] * 9
+            assert [e["uf"] for e in resultado["erros"]] == ["XX"]
+
+            metadata = json.loads(data_tools.CACHE_FILE.read_text())
+            assert {"Lista_imoveis_SP", "Lista_imoveis_RJ", "Lista_imoveis_MG"} <= set(metadata)
+            assert metadata["Lista_imoveis_SP"]["etag"] == '"SP-v1"'
+            assert metadata["Lista_imoveis_SP"]["total_imoveis"] == 3
+
+            # Cidades por UF: o filtro vale so para SP, os demais estados passam inteiros
+            filtrado = data_tools.coletar_caixa_estados(["SP", "RJ"], cidades={"SP": ["SANTOS"]})["imoveis"]
+            assert filtrado["uf"].tolist() == ["RJ"] * 3
+
+            # Segundo download (sem force, mas fora do cache): requisicao condicional
+            for chave in metadata:
+                metadata[chave]["last_update"] = "2000-01-01T00:00:00"
+            data_tools.CACHE_FILE.write_text(json.dumps(metadata))
+
+            _StubCaixa.requisicoes.clear()
+            resultado = data_tools.download_csv_caixa("SP")
+            assert resultado["status"] == "no_changes"
+            assert _StubCaixa.requisicoes == [("SP", '"SP-v1"')]
+            assert not list(Path(tmp).glob("*.tmp"))
+        finally:
+            data_tools.DATA_DIR, data_tools.CACHE_FILE, data_tools.CAIXA_DOWNLOAD_URL = original
+            servidor.shutdown()
+
+
+def test_matriculas_pela_uf_do_imovel():
+    """Pre-busca de matriculas agrupada por UF (a URL da matricula depende do estado)"""
+    chamadas = []
+    original = (main_pipeline.prefetch_matriculas, main_pipeline.buscar_editais)
+    main_pipeline.prefetch_matriculas = lambda ids, uf: chamadas.append((uf, list(ids))) or {}
+    main_pipeline.buscar_editais = lambda ids: {}
+    try:
+        pipeline = main_pipeline.PipelineLeilao(max_workers=2, timeout_imovel=0, incremental=False)
+        pipeline.supabase = None
+        pipeline.imoveis_coletados = [
+            {"id_imovel": "1", "uf": "SP"}, {"id_imovel": "2", "uf": "rj "},
+            {"id_imovel": "3"}, {"id_imovel": "4", "uf": "MG"}, {"id_imovel": "5", "uf": "RJ"},
+        ]
+        pipeline.analisar_imovel = lambda imovel: dict(imovel)
+        pipeline.analisar_todos()
+        assert sorted(chamadas) == [("MG", ["4"]), ("RJ", ["2", "5"]), ("SP", ["1", "3"])]
+    finally:
+        main_pipeline.prefetch_matriculas, main_pipeline.buscar_editais = original
+
+
+if __name__ == "__main__":
+    test_ingestao_multiestado_condicional()
+    test_matriculas_pela_uf_do_imovel()
+    print("[OK] Ingestao multi-estado da Caixa")
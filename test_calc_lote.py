@@ -0,0 +1,84 @@
+"""
+Teste do calculo de custos em lote (tools/calc_tools.py)
+calc_custos_lote deve reproduzir calc_custos_totais linha a linha
+"""
+
+import sys
+import random
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools.calc_tools import calc_custos_lote, calc_custos_totais
+
+
+def _arredondar(valor) -> float:
+    """round() do Python (np.float64 usaria o arredondamento do NumPy)"""
+    return round(float(valor), 2)
+
+
+CIDADES = ["SAO PAULO", "santos ", "Guaruja", "CAMPINAS", "PRAIA GRANDE"]
+
+
+def _imoveis(n: int, semente: int = 7) -> pd.DataFrame:
+    aleatorio = random.Random(semente)
+    return pd.DataFrame([{
+        "valor_arrematacao": round(aleatorio.uniform(10000, 900000), aleatorio.choice([0, 2])),
+        "cidade": aleatorio.choice(CIDADES),
+        "ocupado": aleatorio.random() < 0.5,
+        "debitos_edital": round(aleatorio.uniform(0, 30000), 2),
+        "area_m2": round(aleatorio.uniform(20, 200), 1),
+        "preco_venda_estimado": aleatorio.choice([0, round(aleatorio.uniform(10000, 1500000), 2)]),
+        "condominio_mensal": round(aleatorio.uniform(0, 1500), 2),
+        "iptu_mensal": round(aleatorio.uniform(0, 400), 2),
+        "meses_manutencao": aleatorio.choice([0, 3, 6, 12]),
+    } for _ in range(n)])
+
+
+def test_lote_equivale_ao_calculo_por_imovel():
+    imoveis = _imoveis(400)
+    lote = calc_custos_lote(imoveis, comissao_leiloeiro_pct=2.5)
+
+    for i, linha in enumerate(imoveis.to_dict("records")):
+        escalar = calc_custos_totais(**linha, comissao_leiloeiro_pct=2.5)
+        assert escalar["custos_aquisicao"]["itbi"] == lote["itbi"][i]
+        assert escalar["total_custos_aquisicao"] == _arredondar(lote["total_custos_aquisicao"][i])
+        assert escalar["investimento_total_com_manutencao"] == _arredondar(lote["investimento_total_com_manutencao"][i])
+        if linha["preco_venda_estimado"] > 0:
+            venda = escalar["resultado_venda"]
+            assert venda["lucro_liquido"] == _arredondar(lote["lucro_liquido"][i])
+            assert venda["roi_total_percentual"] == _arredondar(lote["roi_total_percentual"][i])
+            assert venda["diferenca_vs_cdi"] == _arredondar(lote["diferenca_vs_cdi"][i])
+        else:
+            assert escalar["resultado_venda"] == {} and np.isnan(lote["lucro_liquido"][i])
+
+
+def test_valores_de_referencia():
+    # Valores da implementacao anterior (por imovel, sem NumPy)
+    custos = calc_custos_totais(
+        valor_arrematacao=120000, cidade="SAO PAULO", ocupado=True, debitos_edital=17000,
+        gravames_matricula=8000, area_m2=65, custo_reforma_m2=300, preco_venda_estimado=525000,
+        condominio_mensal=650, iptu_mensal=180, meses_manutencao=6
+    )
+    assert custos["investimento_total_com_manutencao"] == 198780.0
+    assert custos["resultado_venda"]["lucro_liquido"] == 250512.0
+    assert custos["resultado_venda"]["roi_total_percentual"] == 126.02
+
+    # Empate de arredondamento: 629291.25 * 2% = 12585.825 -> round() do Python da 12585.83
+    assert calc_custos_totais(629291.25, "SANTOS")["custos_aquisicao"]["itbi"] == 12585.83
+
+    # Cenario como array: mesmo imovel em 4 prazos de venda
+    prazos = calc_custos_lote({"valor_arrematacao": [120000], "cidade": ["SAO PAULO"]},
+                              preco_venda_estimado=525000, meses_manutencao=np.array([3, 6, 9, 12]))
+    assert len(prazos["roi_total_percentual"]) == 4
+    assert np.all(np.diff(prazos["comparativo_cdi"]) > 0)
+
+
+if __name__ == "__main__":
+    test_lote_equivale_ao_calculo_por_imovel()
+    test_valores_de_referencia()
+    print("[OK] Custos em lote")
@@ -0,0 +1,62 @@
+"""
+Teste da simulacao Monte Carlo de cenarios (tools/cenario_tools.py)
+Premissas sorteadas rodadas em lote sobre calc_custos_lote
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools.cenario_tools import simular_cenarios
+
+
+def _analise(preco: float, preco_m2: float, tempo_venda_dias: int = 90) -> dict:
+    return {
+        "preco": preco,
+        "cidade": "SANTOS",
+        "area_privativa": 60,
+        "analise_edital": {"ocupacao": "ocupado", "total_debitos": 15000},
+        "pesquisa_mercado": {
+            "preco_m2": preco_m2, "preco_m2_min": preco_m2 * 0.85, "preco_m2_max": preco_m2 * 1.15,
+            "condominio_mensal": 600, "iptu_mensal": 150, "tempo_venda_dias": tempo_venda_dias,
+        },
+    }
+
+
+def test_percentis_e_probabilidade_de_prejuizo():
+    barato = _analise(150000, 8000)                     # mercado ~480k: lucro em quase todo cenario
+    caro = _analise(420000, 8000, tempo_venda_dias=150)  # arremate perto do valor de mercado
+    sem_mercado = {"preco": 100000, "pesquisa_mercado": {}}
+
+    resultados = simular_cenarios([barato, sem_mercado, caro], trials=5000, semente=1)
+    a, nenhum, b = resultados
+
+    assert nenhum is None
+    assert a["trials"] == 5000
+    p = a["roi_percentis"]
+    assert p["p5"] < p["p25"] < p["p50"] < p["p75"] < p["p95"]
+    assert a["prob_prejuizo"] == 0.0
+    assert b["prob_prejuizo"] > 0.5 and b["roi_percentis"]["p50"] < a["roi_percentis"]["p5"]
+    assert b["meses_ate_venda_medio"] > a["meses_ate_venda_medio"]
+    # Preco de venda domina a incerteza do ROI
+    assert a["sensibilidade"]["preco_m2"] > abs(a["sensibilidade"]["custo_reforma_m2"])
+
+    # Semente fixa: mesmo resultado
+    assert simular_cenarios([barato, sem_mercado, caro], trials=5000, semente=1) == resultados
+
+
+def test_lote_de_candidatos_em_segundos():
+    analises = [_analise(100000 + 1000 * i, 6000 + 10 * i) for i in range(200)]
+    inicio = time.perf_counter()
+    resultados = simular_cenarios(analises, trials=10000, semente=2)
+    assert all(r["trials"] == 10000 for r in resultados)
+    assert time.perf_counter() - inicio < 10
+
+
+if __name__ == "__main__":
+    test_percentis_e_probabilidade_de_prejuizo()
+    test_lote_de_candidatos_em_segundos()
+    print("[OK] Simulacao de cenarios")
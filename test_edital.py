@@ -0,0 +1,99 @@
+"""
+Teste da busca em lote de editais (tools/edital_tools.py)
+Usa um servidor HTTP local no lugar do site da Caixa
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools import edital_tools
+
+PAGINA = """<html><head><title>Detalhe do imóvel</title></head><body>
+<h5> EDIFICIO SOL - APTO {id} </h5>
+<p>Valor de avaliação: R$ 250.000,00</p>
+<p>Valor mínimo de venda: R$ 150.000,00 (desconto de 40%)</p>
+<p>Tipo de imóvel: Apartamento</p><p>Quartos: 2</p>
+<p>Matrícula(s): 45678</p><p>Comarca: SANTOS-SP</p><p>Ofício: 1</p>
+<p>Área total = 80,20m2</p><p>Área privativa = 45,50m2</p>
+<p>Formas de pagamento: Recursos próprios, financiamento, FGTS.</p>
+<p>Condomínio: Sob responsabilidade do comprador. A Caixa paga até o limite de 10% do valor.</p>
+<p>Tributos: Sob responsabilidade do comprador.</p>
+<p>Imóvel ocupado.</p>
+</body></html>"""
+
+
+class _StubCaixa(BaseHTTPRequestHandler):
+    requisicoes = []
+
+    def do_GET(self):
+        imovel_id = parse_qs(urlparse(self.path).query)["hdnimovel"][0]
+        _StubCaixa.requisicoes.append(imovel_id)
+        if imovel_id == "404":
+            self.send_response(404)
+            self.end_headers()
+            return
+        corpo = PAGINA.format(id=imovel_id).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_busca_em_lote_e_reprocessamento_sem_rede():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _StubCaixa)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    original = (edital_tools.EDITAL_URL, edital_tools.EDITAL_HTML_DIR, edital_tools.INDICE_EDITAIS)
+    with tempfile.TemporaryDirectory() as tmp:
+        edital_tools.EDITAL_URL = f"http://127.0.0.1:{servidor.server_port}/detalhe-imovel.asp?hdnimovel={{imovel_id}}"
+        edital_tools.EDITAL_HTML_DIR = Path(tmp)
+        edital_tools.INDICE_EDITAIS = Path(tmp) / "indice.json"
+        try:
+            editais = edital_tools.buscar_editais(["1", "2", "3", "404", "1"], max_workers=3)
+            assert sorted(_StubCaixa.requisicoes) == ["1", "2", "3", "404"]
+            assert editais["404"] == {"erro": "Status 404"}
+
+            dados = editais["2"]
+            assert dados["titulo"] == "EDIFICIO SOL - APTO 2"
+            assert dados["valor_avaliacao"] == 250000.0
+            assert dados["valor_minimo"] == 150000.0
+            assert dados["desconto_percentual"] == 40.0
+            assert dados["matricula"] == "45678"
+            assert dados["area_privativa"] == 45.5
+            assert dados["limite_condominio_caixa_percentual"] == 10
+            assert dados["aceita_fgts"] and dados["ocupado"]
+
+            # lxml e html.parser produzem o mesmo resultado
+            html = PAGINA.format(id="2")
+            lxml_disponivel = edital_tools.LXML_DISPONIVEL
+            edital_tools.LXML_DISPONIVEL = False
+            try:
+                assert edital_tools.parsear_pagina_edital(html, "2") == {
+                    k: v for k, v in dados.items() if k != "html_sha256"
+                }
+            finally:
+                edital_tools.LXML_DISPONIVEL = lxml_disponivel
+
+            # Sem servidor: o HTML guardado por hash e interpretado de novo
+            servidor.shutdown()
+            reprocessados = edital_tools.reprocessar_editais()
+            assert sorted(reprocessados) == ["1", "2", "3"]
+            assert reprocessados["2"] == dados
+        finally:
+            servidor.server_close()
+            edital_tools.EDITAL_URL, edital_tools.EDITAL_HTML_DIR, edital_tools.INDICE_EDITAIS = original
+
+
+if __name__ == "__main__":
+    test_busca_em_lote_e_reprocessamento_sem_rede()
+    print("[OK] Busca de editais")
@@ -0,0 +1,173 @@
+"""
+Teste do modo incremental do pipeline (tools/store_tools.py + main_pipeline.py)
+Somente imoveis novos ou com preco alterado passam por analisar_imovel
+"""
+
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools import store_tools
+from main_pipeline import PipelineLeilao
+
+
+def _imovel(id_imovel: str, preco: float) -> dict:
+    return {"id_imovel": id_imovel, "uf": "SP", "cidade": "SANTOS", "preco": preco}
+
+
+def _executar(execucao_id: str, imoveis: list) -> tuple:
+    """Executa coleta -> analise -> store com analisar_imovel simulado"""
+    analisados = []
+
+    pipeline = PipelineLeilao(max_workers=2, timeout_imovel=0, incremental=True)
+    pipeline.supabase = None
+    pipeline.execucao_id = execucao_id
+    pipeline.imoveis_coletados = imoveis
+
+    def analisar(imovel):
+        analisados.append(imovel["id_imovel"])
+        return {**imovel, "recomendacao": "ANALISAR_MELHOR", "execucao": execucao_id}
+
+    pipeline.analisar_imovel = analisar
+    store_tools.salvar_listagens(imoveis, execucao_id)
+    pipeline.analisar_todos()
+    store_tools.salvar_analises(pipeline.imoveis_analisados, execucao_id)
+    return pipeline, sorted(analisados, key=str)
+
+
+def test_delta_reaproveita_inalterados():
+    """Novos e com preco alterado sao analisados; inalterados vem da execucao anterior"""
+    original = store_tools.STORE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        store_tools.STORE_DIR = Path(tmp)
+        try:
+            _, analisados = _executar("20261013_080000", [_imovel(str(i), 100000 + i) for i in range(5)])
+            assert analisados == ["0", "1", "2", "3", "4"]
+
+            # 0 removido, 1 com preco alterado, 2-4 inalterados, 5 novo
+            atuais = [_imovel("1", 90000)] + [_imovel(str(i), 100000 + i) for i in (2, 3, 4)] + [_imovel("5", 80000)]
+            pipeline, analisados = _executar("20261016_080000", atuais)
+
+            assert analisados == ["1", "5"]
+            assert pipeline.stats["delta"] == {
+                "execucao_anterior": "20261013_080000",
+                "novos": 1, "alterados": 1, "inalterados": 3, "sem_id": 0, "removidos": 1,
+                "expirados": 0, "reaproveitados": 3
+            }
+            # Ordem da coleta preservada; inalterados trazem a analise anterior
+            assert [a["id_imovel"] for a in pipeline.imoveis_analisados] == ["1", "2", "3", "4", "5"]
+            assert [a["execucao"] for a in pipeline.imoveis_analisados] == [
+                "20261016_080000", "20261013_080000", "20261013_080000", "20261013_080000", "20261016_080000"
+            ]
+        finally:
+            store_tools.STORE_DIR = original
+
+
+def test_ids_vazios_ou_repetidos_nao_reaproveitam_analise():
+    """Imoveis sem id_imovel unico sempre sao analisados (nunca herdam a analise de outro)"""
+    original = store_tools.STORE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        store_tools.STORE_DIR = Path(tmp)
+        try:
+            anteriores = [_imovel("", 1000), _imovel(None, 1000), _imovel("7", 2000), _imovel("7", 2000), _imovel("8", 3000)]
+            _executar("20261013_080000", anteriores)
+
+            atuais = [_imovel("", 1000), _imovel(None, 1000), _imovel("7", 2000), _imovel("8", 3000), _imovel("8", 3000)]
+            pipeline, analisados = _executar("20261016_080000", atuais)
+
+            assert len(analisados) == 5
+            assert pipeline.stats["delta"]["sem_id"] == 4
+            assert pipeline.stats["delta"]["reaproveitados"] == 0
+            assert all(a["execucao"] == "20261016_080000" for a in pipeline.imoveis_analisados)
+        finally:
+            store_tools.STORE_DIR = original
+
+
+def test_analise_antiga_e_refeita():
+    """Inalterado cuja analise original passou de REUSO_MAX_DIAS volta a ser analisado"""
+    original = store_tools.STORE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        store_tools.STORE_DIR = Path(tmp)
+        try:
+            # data_analise do imovel vai para a analise simulada; sem data = hoje
+            antigo = {**_imovel("1", 1000), "data_analise": "2026-01-01"}
+            _executar("20261013_080000", [antigo, _imovel("2", 2000)])
+
+            pipeline, analisados = _executar("20261016_080000", [_imovel("1", 1000), _imovel("2", 2000)])
+            assert analisados == ["1"]
+            assert pipeline.stats["delta"]["expirados"] == 1
+            assert pipeline.stats["delta"]["reaproveitados"] == 1
+
+            # A reaproveitada mantem a data da analise original
+            reaproveitada = pipeline.imoveis_analisados[1]
+            assert reaproveitada["execucao"] == "20261013_080000"
+            assert reaproveitada["data_analise"] == datetime.now().strftime("%Y-%m-%d")
+        finally:
+            store_tools.STORE_DIR = original
+
+
+def test_store_tipos_mudam_entre_execucoes():
+    """Coluna int numa execucao e float/texto na seguinte continua legivel"""
+    original = store_tools.STORE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        store_tools.STORE_DIR = Path(tmp)
+        try:
+            # Arquivo gravado sem schema explicito (debitos int64, observacao nula)
+            pq.write_to_dataset(
+                pa.table({
+                    "id_imovel": ["1"], "debitos": [0], "observacao": pa.nulls(1),
+                    "execucao_id": ["20261013_080000"], "data_execucao": ["2026-10-13"], "uf": ["SP"]
+                }),
+                root_path=str(Path(tmp) / "analises"),
+                partition_cols=store_tools.PARTICOES,
+                basename_template="20261013_080000-{i}.parquet"
+            )
+            store_tools.salvar_tabela("analises", [{"id_imovel": "2", "debitos": 0, "observacao": None}], "20261014_080000")
+            store_tools.salvar_tabela(
+                "analises", [{"id_imovel": "3", "debitos": 1234.5, "observacao": "ocupado"}], "20261016_080000"
+            )
+
+            df = store_tools.ler_tabela("analises", execucao=None).sort_values("id_imovel")
+            assert df["debitos"].tolist() == [0.0, 0.0, 1234.5]
+            assert df["observacao"].tolist()[2] == "ocupado"
+
+            ultima = store_tools.ler_tabela("analises", filtros=[("debitos", ">", 1000)])
+            assert ultima["id_imovel"].tolist() == ["3"]
+            assert store_tools.ler_tabela("analises", execucao="20261013_080000")["debitos"].tolist() == [0]
+        finally:
+            store_tools.STORE_DIR = original
+
+
+def test_store_erro_de_leitura_nao_vira_tabela_vazia():
+    """Arquivo corrompido levanta ErroStore em vez de devolver DataFrame vazio"""
+    original = store_tools.STORE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        store_tools.STORE_DIR = Path(tmp)
+        try:
+            store_tools.salvar_tabela("analises", [{"id_imovel": "1"}], "20261016_080000")
+            for arquivo in (Path(tmp) / "analises").rglob("*.parquet"):
+                arquivo.write_bytes(b"corrompido")
+            try:
+                store_tools.ler_tabela("analises")
+            except store_tools.ErroStore:
+                pass
+            else:
+                raise AssertionError("ErroStore esperado")
+        finally:
+            store_tools.STORE_DIR = original
+
+
+if __name__ == "__main__":
+    test_delta_reaproveita_inalterados()
+    test_ids_vazios_ou_repetidos_nao_reaproveitam_analise()
+    test_analise_antiga_e_refeita()
+    test_store_tipos_mudam_entre_execucoes()
+    test_store_erro_de_leitura_nao_vira_tabela_vazia()
+    print("[OK] Pipeline incremental")
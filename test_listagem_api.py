@@ -0,0 +1,79 @@
+"""
+Teste da listagem pelo JSON das APIs dos scrapers (scrapers/base_scraper.py)
+Itens sem link, preco ou endereco nao substituem o DOM; o modo API e opcional.
+Nenhuma fonte declara API_LISTAGEM ainda: o teste usa uma fonte propria
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from scrapers import ZukScraper
+
+URL_API = "https://www.portalzuk.com.br/api/busca?pagina=1"
+
+
+class _ScraperApi(ZukScraper):
+    """Fonte com endpoint e chaves de JSON declarados (so para o teste)"""
+    API_LISTAGEM = ("/api/busca",)
+    PREFIXO_ID = "ZUK-"
+    CAMPOS_API = {
+        "id_imovel": ("id",),
+        "link": ("url",),
+        "preco": ("valorLance",),
+        "endereco": ("endereco.logradouro",),
+        "bairro": ("endereco.bairro",),
+        "cidade": ("endereco.cidade",),
+        "uf": ("endereco.uf",),
+    }
+
+
+def _lote(i: int) -> dict:
+    return {
+        "id": i,
+        "url": f"/imovel/sp/sao-paulo/{i}",
+        "valorLance": f"R$ {100 + i}.000,00",
+        "endereco": {"logradouro": f"Rua A, {i}", "bairro": "MOEMA", "cidade": "SAO PAULO", "uf": "SP"},
+    }
+
+
+def _consumir(scraper: _ScraperApi, *payloads) -> list:
+    scraper._respostas_api = [(URL_API, payload) for payload in payloads]
+    return asyncio.run(scraper.consumir_respostas_api())
+
+
+def test_json_valido_vira_listagem():
+    scraper = _ScraperApi(listagem_api=True)
+    imoveis = _consumir(scraper, {"data": {"lotes": [_lote(1), _lote(2), _lote(2)]}})
+
+    assert [i["id_imovel"] for i in imoveis] == ["ZUK-1", "ZUK-2"]
+    assert imoveis[0]["link"] == "https://www.portalzuk.com.br/imovel/sp/sao-paulo/1"
+    assert imoveis[0]["preco"] == 101000
+
+
+def test_lista_errada_do_json_cai_no_dom():
+    """Primeira lista de objetos do JSON (filtros com slug) nao e aceita como listagem"""
+    scraper = _ScraperApi(listagem_api=True)
+    filtros = {"filtros": [{"slug": "apartamento", "nome": "Apartamento"}, {"slug": "casa", "nome": "Casa"}]}
+    assert _consumir(scraper, filtros) == []
+
+    # Maioria dos itens sem preco ou endereco: lista descartada inteira
+    incompletos = [_lote(1)] + [{"id": i, "url": f"/x/{i}"} for i in range(2, 5)]
+    assert _consumir(scraper, {"itens": incompletos}) == []
+
+
+def test_listagem_api_desligada_por_padrao():
+    assert _ScraperApi().listagem_api is False
+    assert _ScraperApi(listagem_api=True).listagem_api is True
+    # Fontes reais sem endpoints declarados: so o DOM
+    assert ZukScraper.API_LISTAGEM == () and ZukScraper.CAMPOS_API == {}
+
+
+if __name__ == "__main__":
+    test_json_valido_vira_listagem()
+    test_lista_errada_do_json_cai_no_dom()
+    test_listagem_api_desligada_por_padrao()
+    print("[OK] Listagem pela API")
@@ -0,0 +1,114 @@
+"""
+Teste do gateway de LLM (tools/llm_tools.py)
+Usa um servidor HTTP local no lugar da API da OpenAI
+"""
+
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools.llm_tools import GatewayLLM, LimitadorPorMinuto
+
+
+class _StubOpenAI(BaseHTTPRequestHandler):
+    requisicoes = []
+    falhas = {}  # prompt -> quantidade de 429 antes do sucesso
+
+    def do_POST(self):
+        corpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = corpo["messages"][0]["content"]
+        _StubOpenAI.requisicoes.append(prompt)
+
+        if _StubOpenAI.falhas.get(prompt, 0) > 0:
+            _StubOpenAI.falhas[prompt] -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "0.05")
+            self.end_headers()
+            return
+        if prompt == "invalido":
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        time.sleep(0.2)  # tempo para chamadas identicas se sobreporem
+        resposta = json.dumps({
+            "model": corpo["model"],
+            "choices": [{"message": {"content": f"ok: {prompt}"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5}
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(resposta)))
+        self.end_headers()
+        self.wfile.write(resposta)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_gateway_retry_coalescencia_metricas():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _StubOpenAI)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        gateway = GatewayLLM(
+            api_key="sk-teste",
+            base_url=f"http://127.0.0.1:{servidor.server_port}/v1",
+            backoff_base_s=0.01
+        )
+        mensagens = lambda prompt: [{"role": "user", "content": prompt}]
+
+        # 429 duas vezes (com Retry-After) e depois sucesso
+        _StubOpenAI.falhas["retry"] = 2
+        resposta = gateway.chat(mensagens("retry"))
+        assert resposta["conteudo"] == "ok: retry"
+        assert resposta["tentativas"] == 3
+        assert resposta["uso"] == {"prompt_tokens": 10, "completion_tokens": 5}
+
+        # Erro nao recuperavel: sem retry
+        resposta = gateway.chat(mensagens("invalido"))
+        assert resposta["status"] == 400 and resposta["tentativas"] == 1
+
+        # Quatro chamadas identicas simultaneas -> uma requisicao
+        _StubOpenAI.requisicoes.clear()
+        resultados = []
+        threads = [
+            threading.Thread(target=lambda: resultados.append(gateway.chat(mensagens("igual"))))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert _StubOpenAI.requisicoes == ["igual"]
+        assert [r["conteudo"] for r in resultados] == ["ok: igual"] * 4
+        assert sum(r["coalescida"] for r in resultados) == 3
+
+        metricas = gateway.metricas()
+        assert metricas["chamadas"] == 6
+        assert metricas["requisicoes"] == 5
+        assert metricas["retries"] == 2
+        assert metricas["coalescidas"] == 3
+        assert metricas["erros"] == 1
+        assert metricas["tokens_prompt"] == 20
+    finally:
+        servidor.shutdown()
+
+
+def test_limitador_por_minuto():
+    """Rajada ate a capacidade; depois espera a reposicao"""
+    limitador = LimitadorPorMinuto(600)  # 10 por segundo
+    for _ in range(600):
+        assert limitador.aguardar() == 0.0
+    assert 0.05 < limitador.aguardar() < 0.2
+
+
+if __name__ == "__main__":
+    test_gateway_retry_coalescencia_metricas()
+    test_limitador_por_minuto()
+    print("[OK] Gateway de LLM")
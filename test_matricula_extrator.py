@@ -0,0 +1,159 @@
+"""
+Teste do extrator de matricula por atos e do modelo da resposta do GPT-4o
+(tools/matricula_tools.py)
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools import cache_tools, document_tools
+from tools.matricula_tools import extrair_matricula, AnaliseMatricula, RespostaInvalida
+from tools.document_tools import analisar_matricula
+
+MATRICULA = """OFICIAL DE REGISTRO DE IMÓVEIS - COMARCA DE SANTOS
+MATRÍCULA Nº 45.678 - Apartamento 12 do Edifício Sol, situado na Av. 9 de Julho, 100,
+área privativa de 45,50 m2, área total de 80,20 m2.
+R.1/45.678 - COMPRA E VENDA. Adquirente FULANO DE TAL, pelo valor de R$ 180.000,00.
+R.2/45.678 - ALIENAÇÃO FIDUCIÁRIA em favor da CAIXA ECONÔMICA FEDERAL, em garantia
+da dívida de R$ 150.000,00.
+AV.3/45.678 - PENHORA. Processo 1002345-67.2019.8.26.0100, exequente CONDOMÍNIO
+EDIFÍCIO SOL, valor da dívida de R$ 23.456,78.
+AV.4/45.678 - PENHORA. Execução fiscal, valor de R$ 5.000,00.
+AV.5/45.678 - CANCELAMENTO. Fica cancelada a penhora objeto do AV.4, por mandado judicial.
+AV.6/45.678 - CONSOLIDAÇÃO DA PROPRIEDADE em favor da CAIXA ECONÔMICA FEDERAL,
+não houve purgação da mora, valor de R$ 160.000,00.
+"""
+
+
+def test_extrator_por_atos():
+    resultado = extrair_matricula(MATRICULA)
+
+    # "Av. 9 de Julho" no cabecalho nao e um ato
+    assert resultado['atos'] == ["R.1", "R.2", "AV.3", "AV.4", "AV.5", "AV.6"]
+    assert resultado['matricula_numero'] == "45678"
+    assert resultado['area_privativa_m2'] == 45.5
+    assert resultado['area_total_m2'] == 80.2
+
+    # Penhora do AV.4 foi cancelada pelo AV.5
+    assert resultado['atos_cancelados'] == ["AV.4"]
+    assert [(p['ato'], p['valor']) for p in resultado['penhoras']] == [("AV.3", 23456.78)]
+    assert {'tipo': 'Condomínio', 'valor': 23456.78,
+            'observacao': 'Dívida de condomínio averbada na matrícula'} in resultado['dividas_identificadas']
+
+    assert resultado['alienacao_fiduciaria']['valor_original'] == 150000.0
+    assert resultado['alienacao_fiduciaria']['credor'] == 'Caixa Econômica Federal'
+    assert resultado['consolidacao_propriedade']['valor'] == 160000.0
+    assert resultado['consolidacao_propriedade']['motivo'] == 'Não purgação da mora'
+    assert [g.get('numero') for g in resultado['gravames']] == ["1002345-67.2019.8.26.0100"]
+
+
+# Atos que so mencionam um cancelamento no corpo (nao abrem com CANCELAMENTO)
+MATRICULA_CANCELAMENTO_MENCIONADO = """OFICIAL DE REGISTRO DE IMOVEIS - COMARCA DE SAO PAULO
+MATRICULA N 98.765 - Apartamento 31, area privativa de 52,30 m2.
+R.5/98.765 - ALIENACAO FIDUCIARIA em favor da CAIXA ECONOMICA FEDERAL, em garantia da divida de R$ 180.000,00 em 120 parcelas.
+AV.9/98.765 - CONSOLIDACAO DA PROPRIEDADE em favor da CAIXA ECONOMICA FEDERAL pelo valor de R$ 210.000,00 por nao purgacao da mora, ficando cancelada a alienacao fiduciaria do R.5 desta matricula.
+R.10/98.765 - PENHORA, ficando cancelada a penhora anterior do R.3, por determinacao judicial, valor da divida R$ 50.000,00 em favor do exequente.
+"""
+
+
+def test_cancelamento_mencionado_nao_apaga_gravames():
+    """Mesmo resultado do extrator anterior (regex sobre o texto inteiro) para este texto"""
+    resultado = extrair_matricula(MATRICULA_CANCELAMENTO_MENCIONADO)
+
+    assert resultado['atos_cancelados'] == []
+    assert [(p['tipo'], p['valor']) for p in resultado['penhoras']] == [("PENHORA", 50000.0)]
+    assert resultado['dividas_identificadas'] == [{'tipo': 'Penhora', 'valor': 50000.0}]
+    assert resultado['alienacao_fiduciaria']['valor_original'] == 180000.0
+    assert resultado['alienacao_fiduciaria']['credor'] == 'Caixa Econômica Federal'
+    consolidacao = resultado['consolidacao_propriedade']
+    assert (consolidacao['consolidada'], consolidacao['valor'], consolidacao['motivo']) == (
+        True, 210000.0, 'Não purgação da mora'
+    )
+
+
+def test_score_de_risco_mantido():
+    analise = analisar_matricula(MATRICULA)
+    assert analise['score_risco'] > 0
+    assert analise['classificacao_risco'] in ("BAIXO", "MEDIO", "ALTO")
+    assert any("penhora" in r for r in analise['riscos'])
+
+
+RESPOSTA_GPT = {
+    "matricula_numero": "45678", "comarca": "Santos", "oficio": "1",
+    "area_privativa_m2": 45.5, "area_total_m2": None, "endereco": None,
+    "proprietarios_atuais": ["FULANO DE TAL"],
+    "penhoras": [{"tipo": "PENHORA", "valor": 23456.78, "credor": "Condominio",
+                  "processo": "1002345-67.2019.8.26.0100", "data": None}],
+    "alienacao_fiduciaria": {"existe": True, "credor": "CEF", "valor_original": 150000, "consolidada": True},
+    "gravames": [],
+    "dividas_condominio": {"existe": False, "valor": None, "credor": None},
+    "consolidacao_propriedade": {"consolidada": True, "para_quem": "CEF", "valor": 160000, "data": None},
+    "riscos_identificados": ["Penhora ativa"],
+    "score_risco": 40, "classificacao_risco": "MEDIO", "resumo": "ok",
+}
+
+
+class _GatewayFalso:
+    def __init__(self, respostas):
+        self.respostas = list(respostas)
+        self.chamadas = []
+
+    def chat(self, mensagens, **kwargs):
+        self.chamadas.append(kwargs)
+        return {"conteudo": self.respostas.pop(0)}
+
+
+def test_resposta_gpt_validada_pelo_schema():
+    schema = AnaliseMatricula.schema()
+    assert schema["additionalProperties"] is False
+    assert set(schema["required"]) == set(schema["properties"])
+
+    analise = AnaliseMatricula.de_json(json.dumps(RESPOSTA_GPT))
+    assert analise.alienacao_fiduciaria.valor_original == 150000.0
+    assert analise.para_dict()["penhoras"][0]["valor"] == 23456.78
+    pipeline = analise.para_pipeline()
+    assert pipeline["penhoras"][0]["processo"] == "1002345-67.2019.8.26.0100"
+    assert pipeline["consolidacao_propriedade"]["para_quem"] == "CEF"
+
+    for invalida in ('```json {}```', json.dumps({**RESPOSTA_GPT, "score_risco": "40"}),
+                     json.dumps({**RESPOSTA_GPT, "classificacao_risco": "ALTISSIMO"})):
+        try:
+            AnaliseMatricula.de_json(invalida)
+            assert False, invalida
+        except RespostaInvalida:
+            pass
+
+    # Resposta fora do schema: uma nova chamada, sem cair no regex
+    original = (cache_tools.CACHE_DB, document_tools.OPENAI_API_KEY,
+                document_tools.get_gateway, document_tools.renderizar_paginas)
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = Path(tmp) / "matricula.pdf"
+        pdf.write_bytes(b"%PDF-1.4 teste")
+        imagem = Path(tmp) / "p0.jpg"
+        imagem.write_bytes(b"\xff\xd8")
+        gateway = _GatewayFalso(["{", json.dumps(RESPOSTA_GPT)])
+        cache_tools.CACHE_DB = Path(tmp) / "cache.sqlite3"
+        document_tools.OPENAI_API_KEY = "sk-teste"
+        document_tools.get_gateway = lambda: gateway
+        document_tools.renderizar_paginas = lambda *a, **k: [str(imagem)]
+        try:
+            resultado = document_tools.analisar_matricula_com_gpt4(str(pdf))
+            assert resultado["classificacao_risco"] == "MEDIO"
+            assert len(gateway.chamadas) == 2
+            assert gateway.chamadas[0]["response_format"]["json_schema"]["strict"] is True
+        finally:
+            (cache_tools.CACHE_DB, document_tools.OPENAI_API_KEY,
+             document_tools.get_gateway, document_tools.renderizar_paginas) = original
+
+
+if __name__ == "__main__":
+    test_extrator_por_atos()
+    test_cancelamento_mencionado_nao_apaga_gravames()
+    test_score_de_risco_mantido()
+    test_resposta_gpt_validada_pelo_schema()
+    print("[OK] Extrator de matricula")
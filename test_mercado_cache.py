@@ -0,0 +1,119 @@
+"""
+Teste do cache de precos de mercado por bairro (tools/market_tools.py)
+Dois niveis (memoria + disco), escala por area e cache negativo de falhas;
+indice de bairros da base regional
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import requests
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools import cache_tools, market_tools
+
+
+def test_uma_consulta_por_bairro_e_cache_negativo():
+    chamadas = []
+
+    def _api_falsa(cidade, bairro, tipo):
+        chamadas.append(bairro)
+        if bairro == "FORA DO AR":
+            return {"sucesso": False, "erro": "Status 503", "indisponivel": True}
+        return {"sucesso": True, "preco_m2": 8000.0, "preco_m2_min": 7000.0,
+                "preco_m2_max": 9000.0, "amostras": 12, "imoveis_similares": []}
+
+    original = (cache_tools.CACHE_DB, market_tools._buscar_vivareal_api)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_tools.CACHE_DB = Path(tmp) / "cache.sqlite3"
+        market_tools._buscar_vivareal_api = _api_falsa
+        market_tools._cache_bairros.clear()
+        try:
+            a = market_tools.buscar_preco_mercado_web("SAO PAULO", "Moema", area_m2=50, quartos=2)
+            b = market_tools.buscar_preco_mercado_web("Sao Paulo ", "MOEMA", area_m2=50.5, quartos=3)
+            assert chamadas == ["Moema"]
+            assert a["fonte"] == b["fonte"] == "vivareal_api"
+            assert a["valor_estimado"] == 400000.0 and b["valor_estimado"] == 404000.0
+
+            # Novo processo (memoria vazia): estatistica vem do disco
+            market_tools._cache_bairros.clear()
+            market_tools.buscar_preco_mercado_web("SAO PAULO", "MOEMA", area_m2=70)
+            assert chamadas == ["Moema"]
+
+            # API fora do ar: nenhum outro bairro tenta enquanto o cache negativo vale
+            c = market_tools.buscar_preco_mercado_web("SAO PAULO", "FORA DO AR", area_m2=50)
+            d = market_tools.buscar_preco_mercado_web("SAO PAULO", "PENHA", area_m2=50)
+            assert chamadas == ["Moema", "FORA DO AR"]
+            assert c["fonte"] == "estimativa_mercado" and d["fonte"] == "base_regional"
+
+            # Expirado o cache negativo, volta a consultar
+            market_tools._cache_bairros.pop(market_tools.CHAVE_API_INDISPONIVEL)
+            cache_tools.get_cache().remover(market_tools.CHAVE_API_INDISPONIVEL)
+            market_tools.buscar_preco_mercado_web("SAO PAULO", "PENHA", area_m2=50)
+            assert chamadas == ["Moema", "FORA DO AR", "PENHA"]
+        finally:
+            cache_tools.CACHE_DB, market_tools._buscar_vivareal_api = original
+            market_tools._cache_bairros.clear()
+
+
+def test_erro_de_parse_nao_bloqueia_a_api():
+    """So falhas de conexao marcam a API como indisponivel; payload ruim falha so o bairro"""
+    class _Resposta:
+        status_code = 200
+
+        def json(self):
+            return {"search": {"result": {"listings": [
+                {"listing": {"pricingInfos": [{"price": "300000"}], "usableAreas": []}}
+            ]}}}
+
+    def _sem_conexao(*args, **kwargs):
+        raise requests.ConnectionError("sem rota")
+
+    original = requests.get
+    try:
+        requests.get = lambda *args, **kwargs: _Resposta()
+        resultado = market_tools._buscar_vivareal_api("SAO PAULO", "MOEMA", "Apartamento")
+        assert resultado["sucesso"] is False and not resultado.get("indisponivel")
+
+        requests.get = _sem_conexao
+        assert market_tools._buscar_vivareal_api("SAO PAULO", "MOEMA", "Apartamento")["indisponivel"] is True
+    finally:
+        requests.get = original
+
+
+def test_indice_de_bairros_por_cidade():
+    buscar = market_tools.INDICE_PRECOS.buscar
+
+    # Mesmo nome em cidades diferentes
+    assert buscar("Santos", "Boqueirão")[1]["m2"] == 8000
+    assert buscar("PRAIA GRANDE", "BOQUEIRAO")[1]["m2"] == 5200
+    assert buscar("SANTOS", "CENTRO") is None
+
+    # Acentos, sufixos, abreviacoes e erros de digitacao
+    assert buscar("São Paulo", "Vila Mariana II")[0] == "VILA MARIANA"
+    assert buscar("SAO PAULO", "Jd. São Luís")[0] == "JARDIM SAO LUIS"
+    assert buscar("SAO PAULO", "JARDIM SAO LUIZ")[0] == "JARDIM SAO LUIS"
+
+    # Substring de palavra nao conta ("SE" dentro de "JOSE")
+    assert buscar("SAO PAULO", "VILA JOSE") is None
+
+    # Bairros diferentes com prefixo/sufixo em comum nao sao aproximados
+    assert buscar("SAO PAULO", "JARDIM PAULISTA") is None
+    assert buscar("SAO PAULO", "VILA MARIA") is None
+    assert buscar("SAO PAULO", "JARDIM SAO PAULO") is None
+    assert buscar("SAO PAULO", "VILA GUILHERMINA") is None
+    assert buscar("SAO PAULO", "JARDIM ANGELICA") is None
+    assert buscar("SAO PAULO", "JARDIM SANTANA") is None
+
+    assert market_tools.calcular_liquidez_mercado("SANTOS", "REAL")["liquidez"] == "media"
+    assert market_tools.calcular_liquidez_mercado("PRAIA GRANDE", "Real")["liquidez"] == "baixa"
+
+
+if __name__ == "__main__":
+    test_uma_consulta_por_bairro_e_cache_negativo()
+    test_erro_de_parse_nao_bloqueia_a_api()
+    test_indice_de_bairros_por_cidade()
+    print("[OK] Cache de mercado")
@@ -0,0 +1,99 @@
+"""
+Teste do motor de analise paralela (tools/parallel_tools.py)
+Valida ordem deterministica, limites por etapa e timeout por imovel
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools.parallel_tools import executar_em_paralelo, limite_etapa, configurar_limites
+
+
+def test_ordem_deterministica():
+    """Resultados voltam na ordem de entrada mesmo concluindo fora de ordem"""
+    itens = [{"id_imovel": str(i), "espera": (5 - i) * 0.02} for i in range(6)]
+
+    def analisar(imovel):
+        time.sleep(imovel["espera"])
+        return {"id_imovel": imovel["id_imovel"]}
+
+    resultados = executar_em_paralelo(itens, analisar, max_workers=6, timeout_item=0)
+    assert [r["id_imovel"] for r in resultados] == [i["id_imovel"] for i in itens]
+
+
+def test_limite_etapa():
+    """Nunca mais que LIMITES_ETAPA[etapa] chamadas simultaneas"""
+    configurar_limites({"teste": 2})
+    ativos = [0]
+    pico = [0]
+    lock = threading.Lock()
+
+    def analisar(_):
+        with limite_etapa("teste"):
+            with lock:
+                ativos[0] += 1
+                pico[0] = max(pico[0], ativos[0])
+            time.sleep(0.05)
+            with lock:
+                ativos[0] -= 1
+        return {}
+
+    executar_em_paralelo(list(range(8)), analisar, max_workers=8, timeout_item=0)
+    assert pico[0] <= 2
+
+
+def test_timeout_por_imovel():
+    """Imovel lento recebe erro de timeout sem bloquear os demais"""
+    def analisar(espera):
+        time.sleep(espera)
+        return {"ok": True}
+
+    inicio = time.monotonic()
+    resultados = executar_em_paralelo([0.0, 5.0, 0.0], analisar, max_workers=3, timeout_item=0.5)
+    duracao = time.monotonic() - inicio
+
+    assert resultados[0] == {"ok": True}
+    assert resultados[1] == {"error": "timeout"}
+    assert resultados[2] == {"ok": True}
+    assert duracao < 4
+
+
+def test_espera_do_limite_nao_conta_no_timeout():
+    """Fila no semaforo da etapa nao consome o timeout do imovel"""
+    configurar_limites({"fila": 1})
+
+    def analisar(_):
+        with limite_etapa("fila"):
+            time.sleep(0.6)
+        return {"ok": True}
+
+    # O quarto imovel espera ~1.8s pelo semaforo, mas executa so 0.6s
+    resultados = executar_em_paralelo(list(range(4)), analisar, max_workers=4, timeout_item=1.2)
+    assert resultados == [{"ok": True}] * 4
+
+
+def test_erro_isolado():
+    """Excecao em um imovel nao derruba os outros"""
+    def analisar(x):
+        if x == 1:
+            raise ValueError("falha")
+        return {"x": x}
+
+    resultados = executar_em_paralelo([0, 1, 2], analisar, max_workers=2, timeout_item=0)
+    assert resultados[0] == {"x": 0}
+    assert "error" in resultados[1]
+    assert resultados[2] == {"x": 2}
+
+
+if __name__ == "__main__":
+    test_ordem_deterministica()
+    test_limite_etapa()
+    test_timeout_por_imovel()
+    test_espera_do_limite_nao_conta_no_timeout()
+    test_erro_isolado()
+    print("[OK] Todos os testes de paralelismo passaram")
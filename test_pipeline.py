@@ -282,7 +282,7 @@ def test_csv_download():
 
             # Tenta parsear
             imoveis = parse_csv_imoveis(str(csv_path))
-            if imoveis:
+            if len(imoveis):
                 print_success(f"Parse OK: {len(imoveis)} imoveis")
 
                 # Filtra
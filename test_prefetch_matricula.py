@@ -0,0 +1,79 @@
+"""
+Teste da pre-busca de matriculas (tools/document_tools.py)
+Download em streaming com .part + rename, retomada com Range e validacao do PDF
+Usa um servidor HTTP local no lugar do site da Caixa
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools import document_tools
+
+PDF = b"%PDF-1.4\n" + b"0" * 200_000 + b"\ntrailer\n%%EOF\n"
+
+
+class _StubCaixa(BaseHTTPRequestHandler):
+    ranges = []
+
+    def do_GET(self):
+        nome = self.path.rsplit("/", 1)[-1]
+        if nome == "404.pdf":
+            self.send_response(404)
+            self.end_headers()
+            return
+        corpo = PDF if nome != "html.pdf" else b"<html>manutencao</html>"
+
+        inicio = 0
+        if self.headers.get("Range"):
+            inicio = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            _StubCaixa.ranges.append(inicio)
+        self.send_response(206 if inicio else 200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(corpo) - inicio))
+        self.end_headers()
+        self.wfile.write(corpo[inicio:])
+
+    def log_message(self, *args):
+        pass
+
+
+def test_prefetch_retoma_e_valida():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _StubCaixa)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    original = (document_tools.DOCS_DIR, document_tools.MATRICULA_URL)
+    with tempfile.TemporaryDirectory() as tmp:
+        document_tools.DOCS_DIR = tmp
+        document_tools.MATRICULA_URL = f"http://127.0.0.1:{servidor.server_port}/{{estado}}/{{imovel_id}}.pdf"
+        try:
+            # Queda no meio do download anterior: .part com metade do arquivo
+            Path(tmp, "matricula_1.pdf.part").write_bytes(PDF[:100_000])
+            # Arquivo final truncado (gravado pela versao antiga) nao conta como baixado
+            Path(tmp, "matricula_2.pdf").write_bytes(PDF[:5_000])
+
+            matriculas = document_tools.prefetch_matriculas(["1", "2", "3", "404", "html"])
+
+            assert matriculas["404"] is None and matriculas["html"] is None
+            for imovel_id in ("1", "2", "3"):
+                assert Path(matriculas[imovel_id]).read_bytes() == PDF
+            assert _StubCaixa.ranges == [100_000]
+            assert not list(Path(tmp).glob("*.part"))
+
+            # Analise sem rede usa o arquivo da pre-busca
+            assert document_tools.pdf_valido(document_tools.caminho_matricula("3"))
+            servidor.shutdown()
+            resultado = document_tools.analisar_documento_imovel("404", baixar=False)
+            assert resultado["matricula_disponivel"] is False
+        finally:
+            servidor.server_close()
+            document_tools.DOCS_DIR, document_tools.MATRICULA_URL = original
+
+
+if __name__ == "__main__":
+    test_prefetch_retoma_e_valida()
+    print("[OK] Pre-busca de matriculas")
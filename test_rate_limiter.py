@@ -0,0 +1,91 @@
+"""
+Teste do rate limiter por host dos scrapers (scrapers/rate_limiter.py)
+Os buckets pertencem a cada execucao do orquestrador: execucoes seguidas
+(um asyncio.run por vez, como no agendador) nao compartilham buckets nem locks
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from scrapers import orquestrador
+from scrapers.rate_limiter import LimitadoresHost
+
+
+class _Browser:
+    async def close(self):
+        pass
+
+
+class _Playwright:
+    """async_playwright() falso: nao abre o Chromium"""
+
+    def __init__(self):
+        self.chromium = self
+
+    async def launch(self, **kwargs):
+        return _Browser()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class _Scraper:
+    FONTE_NOME = "FALSO"
+
+    def __init__(self, host: str):
+        self.host = host
+        self.metricas = {}
+        self.limitadores = []
+
+    async def executar(self, limitadores=None, **kwargs):
+        self.limitadores.append(limitadores)
+        bucket = limitadores.obter(f"https://{self.host}/imovel", taxa=1000, capacidade=1)
+        # Contencao no lock do bucket (o erro "bound to a different event loop" aparecia aqui)
+        await asyncio.gather(*(bucket.aguardar() for _ in range(5)))
+        return []
+
+
+def test_bucket_limita_requisicoes_por_host():
+    """Rajada imediata ate a capacidade; as demais esperam a reposicao (por host)"""
+    limitadores = LimitadoresHost()
+
+    async def _executar():
+        inicio = time.monotonic()
+        for _ in range(4):
+            await limitadores.obter("https://a.com.br/x", taxa=20, capacidade=2).aguardar()
+        await limitadores.obter("https://B.com.br/y", taxa=20, capacidade=2).aguardar()
+        return time.monotonic() - inicio
+
+    assert 0.08 <= asyncio.run(_executar()) < 1
+    assert limitadores.obter("https://a.com.br/z", 1, 1) is limitadores.obter("https://A.COM.BR/w", 1, 1)
+
+
+def test_buckets_por_execucao_do_orquestrador():
+    """Fontes da mesma execucao dividem os buckets; cada asyncio.run tem os seus"""
+    original = orquestrador.async_playwright
+    orquestrador.async_playwright = _Playwright
+    try:
+        scrapers = [_Scraper("a.com.br"), _Scraper("a.com.br")]
+        for _ in range(3):
+            resultado = asyncio.run(orquestrador.OrquestradorScrapers(scrapers).executar())
+            assert all(r["status"] == "sucesso" for r in resultado.values())
+
+        primeira, segunda = scrapers
+        assert [l is s for l, s in zip(primeira.limitadores, segunda.limitadores)] == [True] * 3
+        assert len({id(l) for l in primeira.limitadores}) == 3
+    finally:
+        orquestrador.async_playwright = original
+
+
+if __name__ == "__main__":
+    test_bucket_limita_requisicoes_por_host()
+    test_buckets_por_execucao_do_orquestrador()
+    print("[OK] Rate limiter por host")
@@ -0,0 +1,113 @@
+"""
+Teste da reclassificacao do Top 5 a partir do store (tools/ranking_tools.py)
+Novos filtros/pesos sobre as analises gravadas, sem reanalisar
+"""
+
+import sys
+import copy
+import time
+import tempfile
+from pathlib import Path
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools import ranking_tools, store_tools, output_tools
+from tools.score_tools import explicar_scores, PESOS_SCORE
+from tools.top5_selector import selecionar_top5
+from test_scores_lote import _analises
+
+
+def _gravadas(n: int) -> list:
+    """Analises como o pipeline grava: scores e recomendacao vindos das calc_score_*"""
+    analises = []
+    for i, analise in enumerate(_analises(n, semente=21)):
+        explicacao = explicar_scores(analise)
+        analise.update({
+            "id_imovel": f"{1000 + i}",
+            "endereco": f"Rua {i}, 100",
+            "preco": 100000 + 1000 * i,
+            "uf": "SP",
+            "scores": {
+                **{nome: explicacao[nome]["score"] for nome in ("edital", "matricula", "localizacao", "financeiro", "liquidez")},
+                "geral": explicacao["oportunidade"]["score_geral"],
+            },
+            "recomendacao": explicacao["recomendacao"]["recomendacao"],
+            "nivel_risco": explicacao["recomendacao"]["nivel_risco"],
+            "justificativa": explicacao["recomendacao"]["justificativa"],
+        })
+        analises.append(analise)
+    return analises
+
+
+def test_reclassifica_sem_reanalisar():
+    analises = _gravadas(300)
+    original = store_tools.STORE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        store_tools.STORE_DIR = Path(tmp) / "store"
+        ranking_tools._execucao_cache.clear()
+        try:
+            store_tools.salvar_analises(analises, "20261017_080000")
+            saida = Path(tmp) / "output"
+
+            # Mesmos parametros do pipeline: mesmo Top 5 de selecionar_top5
+            padrao = ranking_tools.reclassificar_top5(output_dir=saida)
+            esperado = selecionar_top5(copy.deepcopy(analises))
+            assert padrao["top_ids"] == [i["id_imovel"] for i in esperado]
+            assert Path(padrao["csv"]["filepath"]).exists() and Path(padrao["pdf"]["filepath"]).exists()
+
+            # Filtros mais restritivos
+            config = {"score_minimo": 65, "risco_maximo": ["BAIXO"], "pesos_oportunidade": {"roi": 0.35, "desconto": 0.0}}
+            inicio = time.perf_counter()
+            restrito = ranking_tools.reclassificar_top5(quantidade=8, config=config, output_dir=saida)
+            assert time.perf_counter() - inicio < 1
+            assert restrito["top_ids"] == [i["id_imovel"] for i in selecionar_top5(copy.deepcopy(analises), 8, config)]
+            assert all(i["nivel_risco"] == "BAIXO" for i in restrito["top"])
+
+            # Pesos do score geral: scores recalculados, justificativa so dos selecionados
+            pesos = {"financeiro": 0.6, "localizacao": 0.1, "liquidez": 0.0}
+            repontuado = ranking_tools.reclassificar_top5(pesos_score=pesos, gerar_pdf=False, output_dir=saida)
+            completos = {**PESOS_SCORE, **pesos}
+            por_id = {a["id_imovel"]: a for a in analises}
+            for item in repontuado["top"]:
+                explicacao = explicar_scores(por_id[item["id_imovel"]], completos)
+                assert item["score_geral"] == explicacao["oportunidade"]["score_geral"]
+                assert item["recomendacao"] == explicacao["recomendacao"]["recomendacao"]
+            assert repontuado["top_ids"] != padrao["top_ids"]
+            assert repontuado["pdf"] is None
+
+            # Nada gravado no store foi alterado pela reclassificacao
+            assert [a["scores"] for a in store_tools.carregar_analises()] == [a["scores"] for a in analises]
+        finally:
+            store_tools.STORE_DIR = original
+            ranking_tools._execucao_cache.clear()
+
+
+def test_endpoint_rerank():
+    import api
+
+    original = (store_tools.STORE_DIR, output_tools.OUTPUT_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        store_tools.STORE_DIR = Path(tmp) / "store"
+        output_tools.OUTPUT_DIR = Path(tmp) / "output"
+        ranking_tools._execucao_cache.clear()
+        try:
+            cliente = api.app.test_client()
+            assert cliente.post("/rerank", json={}).status_code == 404
+
+            store_tools.salvar_analises(_gravadas(40), "20261017_080000")
+            resposta = cliente.post("/rerank", json={"quantidade": 3, "score_minimo": 60, "pdf": False})
+            assert resposta.status_code == 200
+            assert len(resposta.get_json()["top_ids"]) <= 3
+            assert [p.name for p in (Path(tmp) / "output").iterdir()] == ["top5_reclassificado_20261017_080000.csv"]
+
+            assert cliente.post("/rerank", json={"pesos_score": {"vista_mar": 1}}).status_code == 400
+        finally:
+            store_tools.STORE_DIR, output_tools.OUTPUT_DIR = original
+            ranking_tools._execucao_cache.clear()
+
+
+if __name__ == "__main__":
+    test_reclassifica_sem_reanalisar()
+    test_endpoint_rerank()
+    print("[OK] Reclassificacao do Top 5")
@@ -0,0 +1,72 @@
+"""
+Teste do score em lote (tools/score_tools.py)
+calc_scores_lote deve reproduzir as funcoes calc_score_* imovel a imovel
+"""
+
+import sys
+import random
+from pathlib import Path
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools.score_tools import (
+    calc_scores_lote, colunas_scores, explicar_scores, PESOS_SCORE
+)
+
+BAIRROS = ["MOEMA", "Tatuape", "GONZAGA", "CENTRO", "", "VILA MARIANA"]
+CIDADES = ["SAO PAULO", "SANTOS", "Guaruja", "CAMPINAS"]
+
+
+def _analises(n: int, semente: int = 11) -> list:
+    aleatorio = random.Random(semente)
+    analises = []
+    for _ in range(n):
+        vende = aleatorio.random() < 0.8
+        analises.append({
+            "bairro": aleatorio.choice(BAIRROS),
+            "cidade": aleatorio.choice(CIDADES),
+            "desconto": round(aleatorio.uniform(0, 70), 2),
+            "tipo_imovel": aleatorio.choice(["Apartamento", "Casa", "Terreno", "Loja"]),
+            "analise_edital": {
+                "ocupacao": aleatorio.choice(["ocupado", "desocupado", "nao_informado", "OCUPADO"]),
+                "total_debitos": round(aleatorio.uniform(0, 60000), 2),
+                "riscos": ["Risco"] * aleatorio.randint(0, 4),
+                "comissao_leiloeiro_pct": aleatorio.choice([0, 5.0, 6.5]),
+            },
+            "analise_matricula": {
+                "gravames_extintos": ["Hipoteca CEF"] * aleatorio.randint(0, 3),
+                "gravames_transferidos": ["Penhora"] * aleatorio.randint(0, 3),
+                "valor_gravames": aleatorio.choice([0, round(aleatorio.uniform(0, 40000), 2)]),
+            },
+            "pesquisa_mercado": {
+                "tempo_venda_dias": aleatorio.choice([36, 45, 90, 108, 150, 180]),
+                "demanda": aleatorio.choice(["alta", "media", "baixa", "Alta"]),
+            },
+            "custos": {"resultado_venda": {
+                "roi_total_percentual": round(aleatorio.uniform(-40, 250), 2),
+                "margem_seguranca_percentual": round(aleatorio.uniform(-20, 70), 2),
+            } if vende else {}},
+        })
+    return analises
+
+
+def test_lote_equivale_ao_score_por_imovel():
+    analises = _analises(500)
+    pesos = {**PESOS_SCORE, "financeiro": 0.40, "liquidez": 0.05, "localizacao": 0.15}
+
+    for p in (None, pesos):
+        lote = calc_scores_lote(colunas_scores(analises), pesos=p)
+        for i, analise in enumerate(analises):
+            escalar = explicar_scores(analise, pesos=p)
+            for nome in ("edital", "matricula", "localizacao", "financeiro", "liquidez"):
+                assert escalar[nome]["score"] == lote[nome][i], (i, nome)
+            assert escalar["oportunidade"]["score_geral"] == lote["geral"][i]
+            assert escalar["recomendacao"]["recomendacao"] == lote["recomendacao"][i]
+            assert escalar["recomendacao"]["nivel_risco"] == lote["nivel_risco"][i]
+            assert escalar["recomendacao"]["fatores_risco"] == lote["fatores_risco"][i]
+
+
+if __name__ == "__main__":
+    test_lote_equivale_ao_score_por_imovel()
+    print("[OK] Score em lote")
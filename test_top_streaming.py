@@ -0,0 +1,81 @@
+"""
+Teste do top N incremental (tools/top5_selector.py)
+SeletorTopK deve escolher os mesmos imoveis, na mesma ordem, que selecionar_top5
+"""
+
+import sys
+import copy
+import random
+from pathlib import Path
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tools.top5_selector import SeletorTopK, PerfisTopK, selecionar_top5, calcular_score_oportunidade
+
+
+def _analises(n: int, aleatorio: random.Random) -> list:
+    # Poucos valores distintos: muitos empates na chave do ranking
+    return [{
+        "id_imovel": str(i),
+        "desconto": aleatorio.choice([10, 30, 45]),
+        "recomendacao": aleatorio.choice(["COMPRAR", "ANALISAR_MELHOR", "EVITAR"]),
+        "nivel_risco": aleatorio.choice(["BAIXO", "MEDIO", "ALTO"]),
+        "scores": {"geral": aleatorio.choice([50, 60, 70, 80])},
+        "custos": {"resultado_venda": {
+            "roi_total_percentual": aleatorio.choice([50, 100]),
+            "margem_seguranca_percentual": aleatorio.choice([20, 40]),
+        }},
+        "analise_matricula": {"valor_gravames": aleatorio.choice([0, 90000])},
+    } for i in range(n)]
+
+
+def _ids(imoveis: list) -> list:
+    return [i["id_imovel"] for i in imoveis]
+
+
+def test_fora_de_ordem_igual_a_selecao_completa():
+    aleatorio = random.Random(5)
+    for _ in range(50):
+        analises = _analises(aleatorio.randint(1, 80), aleatorio)
+        esperado = selecionar_top5(copy.deepcopy(analises), quantidade=5)
+
+        # Analises chegam em ordem de conclusao; a posicao na listagem desempata
+        seletor = SeletorTopK(5)
+        chegada = list(enumerate(analises))
+        aleatorio.shuffle(chegada)
+        for posicao, analise in chegada:
+            seletor.adicionar(analise, posicao)
+        top = seletor.resultado()
+
+        assert _ids(top) == _ids(esperado)
+        assert [i["score_oportunidade"] for i in top] == [i["score_oportunidade"] for i in esperado]
+        assert [i.get("_nota_selecao") for i in top] == [i.get("_nota_selecao") for i in esperado]
+
+
+def test_perfis_simultaneos_e_leitura_durante_a_analise():
+    analises = _analises(200, random.Random(9))
+    perfis = PerfisTopK({
+        "top5": {"quantidade": 5},
+        "risco_baixo": {"quantidade": 10, "config": {"risco_maximo": ["BAIXO"], "score_minimo": 70}},
+    })
+
+    for i, analise in enumerate(analises):
+        perfis.adicionar(analise)
+        if i == 99:
+            parcial = perfis.ordenados()["top5"]
+            assert _ids(parcial) == _ids(selecionar_top5(copy.deepcopy(analises[:100])))
+            # Leitura parcial nao grava ranking nos imoveis
+            assert all("ranking_top5" not in a for a in analises)
+
+    assert _ids(perfis["top5"].resultado()) == _ids(selecionar_top5(copy.deepcopy(analises)))
+    risco_baixo = perfis["risco_baixo"].resultado()
+    assert len(risco_baixo) == 10
+    assert all(a["nivel_risco"] == "BAIXO" and a["scores"]["geral"] >= 70 for a in risco_baixo)
+    assert risco_baixo[0]["score_oportunidade"] == calcular_score_oportunidade(risco_baixo[0])
+
+
+if __name__ == "__main__":
+    test_fora_de_ordem_igual_a_selecao_completa()
+    test_perfis_simultaneos_e_leitura_durante_a_analise()
+    print("[OK] Top N incremental")
@@ -0,0 +1,130 @@
+"""
+Teste da triagem de paginas de PDF (tools/document_tools.py)
+Paginas com camada de texto nao sao rasterizadas; escaneadas viram JPEG em tons de cinza
+"""
+
+import sys
+import json
+import base64
+import tempfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Adiciona diretorio ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import fitz  # PyMuPDF
+
+from tools import document_tools
+from tools.llm_tools import CorpoStreaming, ImagemArquivo
+
+LINHA = "R.2 - Compra e venda: transmitente FULANO, adquirente BELTRANO, valor R$ 100.000,00"
+
+
+def _pdf_misto(caminho: Path) -> None:
+    """Pagina 0 com texto nativo, pagina 1 digitalizada (so imagem, 300 DPI)"""
+    origem = fitz.open()
+    pagina = origem.new_page()
+    for y in range(72, 780, 14):
+        pagina.insert_text((72, y), LINHA, fontsize=9)
+    digitalizada = pagina.get_pixmap(dpi=300)
+
+    doc = fitz.open()
+    texto = doc.new_page()
+    for y in range(72, 780, 14):
+        texto.insert_text((72, y), LINHA, fontsize=9)
+    escaneada = doc.new_page()
+    escaneada.insert_image(escaneada.rect, pixmap=digitalizada)
+    doc.save(str(caminho))
+
+
+def setup_function(_):
+    global _cache_original
+    _cache_original = document_tools.RENDER_CACHE_DIR
+
+
+def teardown_function(_):
+    document_tools.RENDER_CACHE_DIR = _cache_original
+
+
+def test_triagem_rasteriza_so_paginas_escaneadas():
+    with tempfile.TemporaryDirectory() as tmp:
+        document_tools.RENDER_CACHE_DIR = Path(tmp) / "render"
+        caminho = Path(tmp) / "matricula.pdf"
+        _pdf_misto(caminho)
+
+        triagem = document_tools.triar_paginas_pdf(str(caminho))
+        assert triagem["tipo"] == "misto"
+        assert triagem["paginas_texto"] == [0]
+        assert triagem["paginas_escaneadas"] == [1]
+        assert "BELTRANO" in triagem["texto"]
+
+        imagens = document_tools.pdf_to_images(str(caminho), paginas=triagem["paginas_escaneadas"])
+        assert len(imagens) == 1
+        jpeg = base64.b64decode(imagens[0])
+        assert jpeg[:2] == b"\xff\xd8"
+
+        # Tons de cinza e no maximo ~ALVO_PIXELS no lado maior
+        pix = fitz.Pixmap(jpeg)
+        assert pix.n == 1
+        assert max(pix.width, pix.height) <= document_tools.ALVO_PIXELS + 1
+
+
+def test_paginas_renderizadas_ficam_no_cache():
+    """Segunda chamada (ex.: prompt alterado) reaproveita os JPEGs sem renderizar de novo"""
+    with tempfile.TemporaryDirectory() as tmp:
+        document_tools.RENDER_CACHE_DIR = Path(tmp) / "render"
+        caminho = Path(tmp) / "matricula.pdf"
+        _pdf_misto(caminho)
+
+        primeira = document_tools.renderizar_paginas(str(caminho))
+        assert len(primeira) == 2
+        datas = [Path(c).stat().st_mtime_ns for c in primeira]
+
+        segunda = document_tools.renderizar_paginas(str(caminho), paginas=[1])
+        assert segunda == primeira[1:]
+        assert Path(segunda[0]).stat().st_mtime_ns == datas[1]
+
+        # Corpo da requisicao: imagem codificada em base64 durante o envio
+        corpo = CorpoStreaming({"url": ImagemArquivo(segunda[0])})
+        enviado = b"".join(iter(lambda: corpo.read(1000), b""))
+        assert len(enviado) == len(corpo)
+        url = json.loads(enviado)["url"]
+        assert base64.b64decode(url.split(",", 1)[1]) == Path(segunda[0]).read_bytes()
+
+
+def test_pool_de_renderizacao_compartilhado():
+    """Documentos renderizados a partir de varias threads usam o mesmo pool (spawn)"""
+    original = (document_tools.RENDER_CACHE_DIR, document_tools.RENDER_WORKERS)
+    with tempfile.TemporaryDirectory() as tmp:
+        document_tools.RENDER_CACHE_DIR = Path(tmp) / "render"
+        document_tools.RENDER_WORKERS = 2
+        try:
+            caminhos = []
+            for i in range(3):
+                caminho = Path(tmp) / f"matricula_{i}.pdf"
+                _pdf_misto(caminho)
+                # Conteudo diferente por documento (hash e cache distintos)
+                with fitz.open(str(caminho)) as doc:
+                    doc.set_metadata({"title": str(i)})
+                    doc.save(str(caminho) + ".v2")
+                caminhos.append(str(caminho) + ".v2")
+
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                renderizadas = list(executor.map(document_tools.renderizar_paginas, caminhos))
+            assert [len(r) for r in renderizadas] == [2, 2, 2]
+
+            pool = document_tools._get_pool_render()
+            assert pool._mp_context.get_start_method() == "spawn"
+            document_tools.renderizar_paginas(caminhos[0], paginas=[0, 1])
+            assert document_tools._get_pool_render() is pool
+        finally:
+            document_tools._encerrar_pool_render()
+            document_tools.RENDER_CACHE_DIR, document_tools.RENDER_WORKERS = original
+
+
+if __name__ == "__main__":
+    test_triagem_rasteriza_so_paginas_escaneadas()
+    test_paginas_renderizadas_ficam_no_cache()
+    test_pool_de_renderizacao_compartilhado()
+    print("[OK] Triagem de PDF")
@@ -1,25 +1,25 @@
 # Tools para Pipeline de Analise de Leilao
 # Apenas modulos existentes
 
-from .data_tools import download_csv_caixa, parse_csv_imoveis, filter_imoveis, check_update_schedule
-from .calc_tools import calc_itbi, calc_cartorio, calc_irpf, calc_custos_totais
+from .data_tools import download_csv_caixa, parse_csv_imoveis, ler_csv_imoveis, filter_imoveis, check_update_schedule
+from .calc_tools import calc_itbi, calc_cartorio, calc_irpf, calc_custos_totais, calc_custos_lote
 from .score_tools import (
     calc_score_edital, calc_score_matricula, calc_score_localizacao,
     calc_score_financeiro, calc_score_liquidez, calc_score_oportunidade,
-    classificar_recomendacao
+    classificar_recomendacao, calc_scores_lote, explicar_scores
 )
 from .output_tools import generate_csv_report, generate_pdf_report, generate_summary_csv
 from .apify_tools import run_apify_zuk_scraper, parse_zuk_imovel, filter_zuk_imoveis
 
 __all__ = [
     # Data tools
-    'download_csv_caixa', 'parse_csv_imoveis', 'filter_imoveis', 'check_update_schedule',
+    'download_csv_caixa', 'parse_csv_imoveis', 'ler_csv_imoveis', 'filter_imoveis', 'check_update_schedule',
     # Calc tools
-    'calc_itbi', 'calc_cartorio', 'calc_irpf', 'calc_custos_totais',
+    'calc_itbi', 'calc_cartorio', 'calc_irpf', 'calc_custos_totais', 'calc_custos_lote',
     # Score tools
     'calc_score_edital', 'calc_score_matricula', 'calc_score_localizacao',
     'calc_score_financeiro', 'calc_score_liquidez', 'calc_score_oportunidade',
-    'classificar_recomendacao',
+    'classificar_recomendacao', 'calc_scores_lote', 'explicar_scores',
     # Output tools
     'generate_csv_report', 'generate_pdf_report', 'generate_summary_csv',
     # Apify tools
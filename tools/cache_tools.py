@@ -0,0 +1,200 @@
+"""
+Tools de Cache - Cache persistente (SQLite) de resultados caros
+Enderecado por conteudo (SHA-256), com TTL e limite de tamanho, compartilhado entre processos
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuracoes
+CACHE_DB = Path(os.getenv("CACHE_DB", "./data/cache.sqlite3"))
+CACHE_TTL_DIAS = float(os.getenv("CACHE_TTL_DIAS", "180"))
+CACHE_MAX_MB = float(os.getenv("CACHE_MAX_MB", "256"))
+
+
+def sha256_arquivo(filepath: str, bloco: int = 1 << 20) -> str:
+    """SHA-256 do conteudo de um arquivo (lido em blocos)"""
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for parte in iter(lambda: f.read(bloco), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+
+def versao_texto(*partes: str) -> str:
+    """Versao curta derivada de prompt/modelo: muda quando qualquer parte muda"""
+    return hashlib.sha256("\x00".join(partes).encode("utf-8")).hexdigest()[:12]
+
+
+class CacheDisco:
+    """
+    Cache chave -> JSON em um arquivo SQLite.
+
+    - Cada operacao abre sua propria conexao (seguro entre threads e processos,
+      ex: varios workers do gunicorn apontando para o mesmo arquivo)
+    - Modo WAL: leituras nao bloqueiam a escrita de outro processo
+    - Entradas com mais de ttl_s segundos sao ignoradas e removidas
+    - Acima de max_bytes, remove as entradas acessadas ha mais tempo (LRU)
+    """
+
+    def __init__(
+        self,
+        caminho: Path = CACHE_DB,
+        ttl_s: float = CACHE_TTL_DIAS * 86400,
+        max_bytes: int = int(CACHE_MAX_MB * 1024 * 1024)
+    ):
+        """
+        Args:
+            caminho: Arquivo SQLite
+            ttl_s: Validade das entradas em segundos (0 = sem expiracao)
+            max_bytes: Tamanho maximo somado dos valores (0 = sem limite)
+        """
+        self.caminho = Path(caminho)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._conectar() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " chave TEXT PRIMARY KEY,"
+                " valor TEXT NOT NULL,"
+                " tamanho INTEGER NOT NULL,"
+                " criado_em REAL NOT NULL,"
+                " acessado_em REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_acesso ON cache (acessado_em)")
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.caminho), timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def _limite_validade(self) -> float:
+        return time.time() - self.ttl_s if self.ttl_s > 0 else 0.0
+
+    def obter(self, chave: str) -> Optional[Any]:
+        """
+        Busca um valor valido no cache.
+
+        Args:
+            chave: Chave da entrada
+
+        Returns:
+            Valor desserializado ou None (ausente ou expirado)
+        """
+        try:
+            conn = self._conectar()
+            try:
+                linha = conn.execute(
+                    "SELECT valor FROM cache WHERE chave = ? AND criado_em >= ?",
+                    (chave, self._limite_validade())
+                ).fetchone()
+                if linha is None:
+                    return None
+                conn.execute("UPDATE cache SET acessado_em = ? WHERE chave = ?", (time.time(), chave))
+                return json.loads(linha[0])
+            finally:
+                conn.close()
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            logger.warning(f"Erro ao ler cache {self.caminho}: {e}")
+            return None
+
+    def gravar(self, chave: str, valor: Any) -> bool:
+        """
+        Grava (ou substitui) uma entrada e aplica as politicas de remocao.
+
+        Args:
+            chave: Chave da entrada
+            valor: Valor serializavel em JSON
+
+        Returns:
+            True se gravou
+        """
+        texto = json.dumps(valor, ensure_ascii=False, default=str)
+        agora = time.time()
+        try:
+            conn = self._conectar()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (chave, valor, tamanho, criado_em, acessado_em) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (chave, texto, len(texto.encode("utf-8")), agora, agora)
+                )
+                self._remover_excedentes(conn)
+                conn.execute("COMMIT")
+                return True
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao gravar cache {self.caminho}: {e}")
+            return False
+
+    def _remover_excedentes(self, conn: sqlite3.Connection) -> None:
+        """Remove entradas expiradas e, acima do limite de tamanho, as menos acessadas"""
+        if self.ttl_s > 0:
+            conn.execute("DELETE FROM cache WHERE criado_em < ?", (self._limite_validade(),))
+
+        if self.max_bytes <= 0:
+            return
+
+        total = conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM cache").fetchone()[0]
+        excesso = total - self.max_bytes
+        if excesso <= 0:
+            return
+
+        remover = []
+        for chave, tamanho in conn.execute("SELECT chave, tamanho FROM cache ORDER BY acessado_em"):
+            remover.append((chave,))
+            excesso -= tamanho
+            if excesso <= 0:
+                break
+        conn.executemany("DELETE FROM cache WHERE chave = ?", remover)
+        logger.info(f"Cache {self.caminho.name}: {len(remover)} entradas removidas (limite de tamanho)")
+
+    def remover(self, chave: str) -> None:
+        """Remove uma entrada"""
+        conn = self._conectar()
+        try:
+            conn.execute("DELETE FROM cache WHERE chave = ?", (chave,))
+        finally:
+            conn.close()
+
+    def estatisticas(self) -> Dict:
+        """Quantidade de entradas e bytes ocupados"""
+        conn = self._conectar()
+        try:
+            total, tamanho = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM cache"
+            ).fetchone()
+        finally:
+            conn.close()
+        return {"entradas": total, "bytes": tamanho, "arquivo": str(self.caminho)}
+
+
+_caches: Dict[str, CacheDisco] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(caminho: Path = None) -> CacheDisco:
+    """Retorna (criando se necessario) o cache do processo para o arquivo"""
+    caminho = Path(caminho or CACHE_DB)
+    with _caches_lock:
+        chave = str(caminho.resolve())
+        if chave not in _caches:
+            _caches[chave] = CacheDisco(caminho)
+        return _caches[chave]
@@ -1,13 +1,17 @@
 """
 Tools de Calculo - Custos de Aquisicao e Venda de Imoveis em Leilao
+calc_custos_lote calcula milhares de imoveis/cenarios de uma vez (NumPy);
+calc_custos_totais e o mesmo calculo para um unico imovel
 """
 
 # Removido decorador @tool para permitir chamada direta
 # from crewai_tools import tool
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
 
 class Cidade(Enum):
     SAO_PAULO = "SAO PAULO"
@@ -65,6 +69,40 @@ IRPF_FAIXAS = [
     (float('inf'), 0.225) # Acima 30M: 22.5%
 ]
 
+# Custos fixos/estimados do cenario
+VALOR_CERTIDOES = 800.0
+CUSTO_DESOCUPACAO = 10000
+LUZ_AGUA_MENSAL = 100
+SEGURO_MENSAL = 50
+COMISSAO_CORRETOR = 0.06   # 6% sobre o preco de venda
+CDI_ANUAL = 0.13           # Comparativo CDI (aproximado 13% a.a.)
+
+# Tabelas em arrays para busca por np.searchsorted (primeira faixa com limite >= valor)
+_LIMITES_ESCRITURA = np.array([limite for limite, _ in TABELA_ESCRITURA_SP])
+_VALORES_ESCRITURA = np.array([valor for _, valor in TABELA_ESCRITURA_SP], dtype=float)
+_LIMITES_REGISTRO = np.array([limite for limite, _ in TABELA_REGISTRO_SP])
+_VALORES_REGISTRO = np.array([valor for _, valor in TABELA_REGISTRO_SP], dtype=float)
+_LIMITES_IRPF = np.array([limite for limite, _ in IRPF_FAIXAS])
+_ALIQUOTAS_IRPF = np.array([taxa for _, taxa in IRPF_FAIXAS])
+
+# Colunas de entrada do calculo em lote e seus valores padrao (os de calc_custos_totais)
+PARAMETROS_CUSTOS = {
+    "valor_arrematacao": None,
+    "cidade": None,
+    "ocupado": False,
+    "debitos_edital": 0.0,
+    "gravames_matricula": 0.0,
+    "area_m2": 50.0,
+    "custo_reforma_m2": 300.0,
+    "comissao_leiloeiro_pct": 5.0,
+    "honorarios_advogado": 4000.0,
+    "preco_venda_estimado": 0.0,
+    "condominio_mensal": 0.0,
+    "iptu_mensal": 0.0,
+    "meses_manutencao": 6,
+    "cdi_anual": CDI_ANUAL,
+}
+
 
 def calc_itbi(valor_arrematacao: float, cidade: str) -> Dict:
     """
@@ -161,6 +199,147 @@ def calc_irpf(lucro_bruto: float) -> Dict:
     }
 
 
+def arredondar_lote(valores: np.ndarray) -> np.ndarray:
+    """
+    round(x, 2) do Python em arrays. np.round multiplica por 100 antes de
+    arredondar e erra em empates como 629291.25 * 0.02 = 12585.825; esses
+    casos (raros) sao resolvidos um a um com round()
+    """
+    escalado = valores * 100
+    resultado = np.rint(escalado) / 100
+    empates = np.abs(np.abs(escalado - np.trunc(escalado)) - 0.5) < 1e-6
+    if empates.any():
+        resultado[empates] = [round(v, 2) for v in valores[empates].tolist()]
+    return resultado
+
+
+def _colunas(dados: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Colunas de entrada como arrays da mesma forma (escalares e arrays de 1
+    linha sao repetidos). cidade fica na forma original: a aliquota e
+    resolvida antes de repetir
+    """
+    colunas = {}
+    for nome, padrao in PARAMETROS_CUSTOS.items():
+        valor = dados.get(nome, padrao)
+        if valor is None:
+            raise ValueError(f"Coluna obrigatoria ausente: {nome}")
+        colunas[nome] = np.atleast_1d(np.asarray(valor, dtype=object if nome == "cidade" else float))
+    forma = np.broadcast_shapes(*(c.shape for c in colunas.values()))
+    return {
+        nome: c if nome == "cidade" else np.broadcast_to(c, forma)
+        for nome, c in colunas.items()
+    }
+
+
+def calc_custos_lote(imoveis: Any = None, **cenario: Any) -> Dict[str, np.ndarray]:
+    """
+    Calcula custos de aquisicao, manutencao e venda de varios imoveis em uma
+    unica passada vetorizada (mesmas regras de calc_custos_totais).
+
+    Args:
+        imoveis: DataFrame ou Dict coluna -> array/lista com as colunas de
+                 PARAMETROS_CUSTOS (valor_arrematacao e cidade obrigatorias)
+        **cenario: Parametros aplicados a todas as linhas (escalar ou array),
+                   sobrepondo as colunas de imoveis (ex: meses_manutencao=12).
+                   Arrays 2D seguem as regras de broadcast do NumPy: colunas
+                   (n, 1) contra cenarios (n, trials) dao resultados (n, trials)
+
+    Returns:
+        Dict coluna -> array (uma posicao por imovel). Colunas de venda
+        (comissao_corretor, irpf, lucro_*, roi_*, ...) sao NaN onde
+        preco_venda_estimado <= 0 (tem_venda = False)
+    """
+    dados = {} if imoveis is None else {c: imoveis[c] for c in PARAMETROS_CUSTOS if c in imoveis}
+    dados.update(cenario)
+    col = _colunas(dados)
+
+    valor = col["valor_arrematacao"]
+    meses = col["meses_manutencao"]
+    preco_venda = col["preco_venda_estimado"]
+
+    # 1. CUSTOS DE AQUISICAO
+    comissao_leiloeiro = valor * (col["comissao_leiloeiro_pct"] / 100)
+
+    # ITBI: aliquota resolvida uma vez por cidade distinta
+    cidades, posicao = np.unique(col["cidade"].astype(str), return_inverse=True)
+    aliquotas = np.array([
+        ITBI_ALIQUOTAS.get(c.upper().strip(), ITBI_ALIQUOTAS["DEFAULT"]) for c in cidades
+    ])
+    aliquota_itbi = np.broadcast_to(aliquotas[posicao].reshape(col["cidade"].shape), valor.shape)
+    itbi = arredondar_lote(valor * aliquota_itbi)
+
+    escritura = _VALORES_ESCRITURA[np.searchsorted(_LIMITES_ESCRITURA, valor, side="left")]
+    registro = _VALORES_REGISTRO[np.searchsorted(_LIMITES_REGISTRO, valor, side="left")]
+    total_cartorio = arredondar_lote(escritura + registro + VALOR_CERTIDOES)
+
+    custo_desocupacao = np.where(col["ocupado"] != 0, float(CUSTO_DESOCUPACAO), 0.0)
+    custo_reforma = col["area_m2"] * col["custo_reforma_m2"]
+
+    total_custos_aquisicao = (
+        comissao_leiloeiro + itbi + total_cartorio + col["honorarios_advogado"]
+        + custo_desocupacao + col["debitos_edital"] + col["gravames_matricula"] + custo_reforma
+    )
+    investimento_total = valor + total_custos_aquisicao
+
+    # 2. CUSTOS DE MANUTENCAO
+    manutencao_condominio = col["condominio_mensal"] * meses
+    manutencao_iptu = col["iptu_mensal"] * meses
+    manutencao_luz_agua = LUZ_AGUA_MENSAL * meses
+    manutencao_seguro = SEGURO_MENSAL * meses
+    total_manutencao = manutencao_condominio + manutencao_iptu + manutencao_luz_agua + manutencao_seguro
+    investimento_total_com_manutencao = investimento_total + total_manutencao
+
+    # 3. CUSTOS DE VENDA (linhas com preco_venda_estimado > 0)
+    tem_venda = preco_venda > 0
+    investimento = investimento_total_com_manutencao
+    comissao_corretor = preco_venda * COMISSAO_CORRETOR
+    lucro_bruto = preco_venda - investimento - comissao_corretor
+
+    aliquota_irpf = _ALIQUOTAS_IRPF[np.searchsorted(_LIMITES_IRPF, lucro_bruto, side="left")]
+    irpf = np.where(lucro_bruto > 0, arredondar_lote(lucro_bruto * aliquota_irpf), 0.0)
+    lucro_liquido = lucro_bruto - irpf
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi_total = np.where(investimento > 0, (lucro_liquido / investimento) * 100, 0.0)
+        roi_mensal = np.where(meses > 0, roi_total / meses, 0.0)
+        margem_seguranca = ((preco_venda - investimento) / preco_venda) * 100
+    rendimento_cdi = investimento * (col["cdi_anual"] * meses / 12)
+
+    def _venda(valores: np.ndarray) -> np.ndarray:
+        return np.where(tem_venda, valores, np.nan)
+
+    return {
+        "comissao_leiloeiro": comissao_leiloeiro,
+        "aliquota_itbi": aliquota_itbi,
+        "itbi": itbi,
+        "escritura": escritura,
+        "registro": registro,
+        "certidoes": np.full(valor.shape, VALOR_CERTIDOES),
+        "total_cartorio": total_cartorio,
+        "custo_desocupacao": custo_desocupacao,
+        "custo_reforma": custo_reforma,
+        "total_custos_aquisicao": total_custos_aquisicao,
+        "investimento_total": investimento_total,
+        "manutencao_condominio": manutencao_condominio,
+        "manutencao_iptu": manutencao_iptu,
+        "manutencao_luz_agua": manutencao_luz_agua,
+        "manutencao_seguro": manutencao_seguro,
+        "total_manutencao": total_manutencao,
+        "investimento_total_com_manutencao": investimento_total_com_manutencao,
+        "tem_venda": tem_venda,
+        "comissao_corretor": _venda(comissao_corretor),
+        "lucro_bruto": _venda(lucro_bruto),
+        "irpf": _venda(irpf),
+        "lucro_liquido": _venda(lucro_liquido),
+        "roi_total_percentual": _venda(roi_total),
+        "roi_mensal_percentual": _venda(roi_mensal),
+        "margem_seguranca_percentual": _venda(margem_seguranca),
+        "comparativo_cdi": _venda(rendimento_cdi),
+        "diferenca_vs_cdi": _venda(lucro_liquido - rendimento_cdi),
+    }
+
+
 def calc_custos_totais(
     valor_arrematacao: float,
     cidade: str,
@@ -197,113 +376,72 @@ def calc_custos_totais(
     Returns:
         Dict completo com todos os custos detalhados
     """
-    # 1. CUSTOS DE AQUISICAO
-    comissao_leiloeiro = valor_arrematacao * (comissao_leiloeiro_pct / 100)
-
-    itbi_calc = calc_itbi(valor_arrematacao, cidade)
-    cartorio_calc = calc_cartorio(valor_arrematacao)
-
-    custo_desocupacao = 10000 if ocupado else 0
-    custo_reforma = area_m2 * custo_reforma_m2
+    lote = calc_custos_lote(
+        valor_arrematacao=[valor_arrematacao], cidade=[cidade], ocupado=ocupado,
+        debitos_edital=debitos_edital, gravames_matricula=gravames_matricula,
+        area_m2=area_m2, custo_reforma_m2=custo_reforma_m2,
+        comissao_leiloeiro_pct=comissao_leiloeiro_pct, honorarios_advogado=honorarios_advogado,
+        preco_venda_estimado=preco_venda_estimado, condominio_mensal=condominio_mensal,
+        iptu_mensal=iptu_mensal, meses_manutencao=meses_manutencao
+    )
+    c = {nome: valores[0].item() for nome, valores in lote.items()}
 
     custos_aquisicao = {
         "valor_arrematacao": round(valor_arrematacao, 2),
-        "comissao_leiloeiro": round(comissao_leiloeiro, 2),
-        "itbi": itbi_calc["valor_itbi"],
-        "escritura": cartorio_calc["escritura"],
-        "registro": cartorio_calc["registro"],
-        "certidoes": cartorio_calc["certidoes"],
+        "comissao_leiloeiro": round(c["comissao_leiloeiro"], 2),
+        "itbi": c["itbi"],
+        "escritura": round(c["escritura"], 2),
+        "registro": round(c["registro"], 2),
+        "certidoes": round(c["certidoes"], 2),
         "honorarios_advogado": round(honorarios_advogado, 2),
-        "custo_desocupacao": round(custo_desocupacao, 2),
+        "custo_desocupacao": round(c["custo_desocupacao"], 2),
         "debitos_edital": round(debitos_edital, 2),
         "gravames_matricula": round(gravames_matricula, 2),
-        "custo_reforma": round(custo_reforma, 2)
+        "custo_reforma": round(c["custo_reforma"], 2)
     }
 
-    total_custos_aquisicao = sum([
-        comissao_leiloeiro,
-        itbi_calc["valor_itbi"],
-        cartorio_calc["total_cartorio"],
-        honorarios_advogado,
-        custo_desocupacao,
-        debitos_edital,
-        gravames_matricula,
-        custo_reforma
-    ])
-
-    investimento_total = valor_arrematacao + total_custos_aquisicao
-
-    # 2. CUSTOS DE MANUTENCAO
-    manutencao_condominio = condominio_mensal * meses_manutencao
-    manutencao_iptu = iptu_mensal * meses_manutencao
-    manutencao_luz_agua = 100 * meses_manutencao  # Estimado
-    manutencao_seguro = 50 * meses_manutencao     # Estimado
-
     custos_manutencao = {
-        "condominio": round(manutencao_condominio, 2),
-        "iptu": round(manutencao_iptu, 2),
-        "luz_agua": round(manutencao_luz_agua, 2),
-        "seguro": round(manutencao_seguro, 2),
+        "condominio": round(c["manutencao_condominio"], 2),
+        "iptu": round(c["manutencao_iptu"], 2),
+        "luz_agua": round(c["manutencao_luz_agua"], 2),
+        "seguro": round(c["manutencao_seguro"], 2),
         "meses": meses_manutencao
     }
 
-    total_manutencao = sum([
-        manutencao_condominio,
-        manutencao_iptu,
-        manutencao_luz_agua,
-        manutencao_seguro
-    ])
-
-    investimento_total_com_manutencao = investimento_total + total_manutencao
-
-    # 3. CUSTOS DE VENDA (se preco_venda informado)
     custos_venda = {}
     resultado_venda = {}
 
-    if preco_venda_estimado > 0:
-        comissao_corretor = preco_venda_estimado * 0.06  # 6%
-
-        lucro_bruto = preco_venda_estimado - investimento_total_com_manutencao - comissao_corretor
-        irpf_calc = calc_irpf(lucro_bruto)
-
+    if c["tem_venda"]:
         custos_venda = {
-            "comissao_corretor": round(comissao_corretor, 2),
-            "irpf": irpf_calc["valor_irpf"],
-            "total_custos_venda": round(comissao_corretor + irpf_calc["valor_irpf"], 2)
+            "comissao_corretor": round(c["comissao_corretor"], 2),
+            "irpf": c["irpf"],
+            "total_custos_venda": round(c["comissao_corretor"] + c["irpf"], 2)
         }
 
-        lucro_liquido = lucro_bruto - irpf_calc["valor_irpf"]
-        roi_total = (lucro_liquido / investimento_total_com_manutencao) * 100 if investimento_total_com_manutencao > 0 else 0
-        roi_mensal = roi_total / meses_manutencao if meses_manutencao > 0 else 0
-        margem_seguranca = ((preco_venda_estimado - investimento_total_com_manutencao) / preco_venda_estimado) * 100 if preco_venda_estimado > 0 else 0
-
-        # Comparativo CDI (aproximado 13% a.a.)
-        rendimento_cdi = investimento_total_com_manutencao * (0.13 * meses_manutencao / 12)
-
         resultado_venda = {
             "preco_venda": round(preco_venda_estimado, 2),
-            "lucro_bruto": round(lucro_bruto, 2),
-            "lucro_liquido": round(lucro_liquido, 2),
-            "roi_total_percentual": round(roi_total, 2),
-            "roi_mensal_percentual": round(roi_mensal, 2),
-            "margem_seguranca_percentual": round(margem_seguranca, 2),
-            "comparativo_cdi": round(rendimento_cdi, 2),
-            "diferenca_vs_cdi": round(lucro_liquido - rendimento_cdi, 2)
+            "lucro_bruto": round(c["lucro_bruto"], 2),
+            "lucro_liquido": round(c["lucro_liquido"], 2),
+            "roi_total_percentual": round(c["roi_total_percentual"], 2),
+            "roi_mensal_percentual": round(c["roi_mensal_percentual"], 2),
+            "margem_seguranca_percentual": round(c["margem_seguranca_percentual"], 2),
+            "comparativo_cdi": round(c["comparativo_cdi"], 2),
+            "diferenca_vs_cdi": round(c["diferenca_vs_cdi"], 2)
         }
 
     return {
         "custos_aquisicao": custos_aquisicao,
-        "total_custos_aquisicao": round(total_custos_aquisicao, 2),
-        "investimento_total": round(investimento_total, 2),
+        "total_custos_aquisicao": round(c["total_custos_aquisicao"], 2),
+        "investimento_total": round(c["investimento_total"], 2),
         "custos_manutencao": custos_manutencao,
-        "total_manutencao": round(total_manutencao, 2),
-        "investimento_total_com_manutencao": round(investimento_total_com_manutencao, 2),
+        "total_manutencao": round(c["total_manutencao"], 2),
+        "investimento_total_com_manutencao": round(c["investimento_total_com_manutencao"], 2),
         "custos_venda": custos_venda,
         "resultado_venda": resultado_venda,
         "resumo": {
             "valor_arrematacao": round(valor_arrematacao, 2),
-            "total_custos": round(total_custos_aquisicao + total_manutencao, 2),
-            "investimento_final": round(investimento_total_com_manutencao, 2),
+            "total_custos": round(c["total_custos_aquisicao"] + c["total_manutencao"], 2),
+            "investimento_final": round(c["investimento_total_com_manutencao"], 2),
             "cidade": cidade,
             "ocupado": ocupado,
             "meses_cenario": meses_manutencao
@@ -0,0 +1,174 @@
+"""
+Tools de Cenarios - Simulacao Monte Carlo do resultado de venda
+Sorteia as premissas fixas da analise (preco de venda, prazo, reforma, CDI)
+e roda milhares de cenarios por imovel de uma vez com calc_custos_lote
+"""
+
+import os
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .calc_tools import calc_custos_lote, CDI_ANUAL
+
+logger = logging.getLogger(__name__)
+
+# Configuracoes (podem ser sobrescritas por variaveis de ambiente)
+CENARIOS_TRIALS = int(os.getenv("CENARIOS_TRIALS", "10000"))
+CENARIOS_SEMENTE = os.getenv("CENARIOS_SEMENTE")        # fixa para resultados reprodutiveis
+CENARIOS_LINHAS_LOTE = 250_000                          # linhas por chamada de calc_custos_lote
+
+# Premissas da analise pontual (analisar_imovel) e suas faixas (minimo, mais provavel, maximo)
+DESCONTO_VENDA_RAPIDA = (0.90, 0.95, 1.00)     # preco de venda / valor de mercado
+CUSTO_REFORMA_M2 = (200.0, 300.0, 450.0)
+MESES_PREPARACAO = (2.0, 3.0, 5.0)             # desocupacao + reforma, antes de anunciar
+DISPERSAO_TEMPO_VENDA = 0.35                   # desvio do log do tempo de venda
+CDI_DESVIO = 0.01                              # desvio do CDI anual
+
+PERCENTIS_ROI = (5, 25, 50, 75, 95)
+
+
+def _premissas(analise: Dict) -> Optional[Dict]:
+    """Entradas fixas e faixas de mercado de uma analise (None se nao ha preco de mercado)"""
+    mercado = analise.get("pesquisa_mercado", {})
+    preco_m2 = mercado.get("preco_m2", 0) or 0
+    preco = analise.get("preco", 0) or 0
+    if preco_m2 <= 0 or preco <= 0:
+        return None
+
+    minimo = mercado.get("preco_m2_min", 0) or preco_m2 * 0.85
+    maximo = mercado.get("preco_m2_max", 0) or preco_m2 * 1.15
+    minimo, maximo = min(minimo, preco_m2), max(maximo, preco_m2)
+    if maximo <= minimo:
+        minimo, maximo = preco_m2 * 0.85, preco_m2 * 1.15
+
+    edital = analise.get("analise_edital", {})
+    return {
+        "valor_arrematacao": preco,
+        "cidade": analise.get("cidade", "SAO PAULO"),
+        "ocupado": edital.get("ocupacao", "ocupado") == "ocupado",
+        "debitos_edital": edital.get("total_debitos", 0),
+        "area_m2": analise.get("area_privativa", 50) or 50,
+        "condominio_mensal": mercado.get("condominio_mensal", 0),
+        "iptu_mensal": mercado.get("iptu_mensal", 0),
+        "preco_m2": preco_m2,
+        "preco_m2_min": minimo,
+        "preco_m2_max": maximo,
+        "tempo_venda_dias": mercado.get("tempo_venda_dias", 90) or 90,
+    }
+
+
+def _correlacao(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Correlacao de Pearson linha a linha (imovel x trials); 0 onde x ou y e constante"""
+    xc = x - x.mean(axis=1, keepdims=True)
+    yc = y - y.mean(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = (xc * yc).sum(axis=1) / np.sqrt((xc ** 2).sum(axis=1) * (yc ** 2).sum(axis=1))
+    return np.nan_to_num(r)
+
+
+def _simular_bloco(premissas: List[Dict], trials: int, rng: np.random.Generator) -> List[Dict]:
+    """
+    Roda os trials de um bloco de imoveis em uma unica chamada de
+    calc_custos_lote: colunas do imovel (k, 1) contra sorteios (k, trials)
+    """
+    forma = (len(premissas), trials)
+
+    def _coluna(nome: str) -> np.ndarray:
+        return np.array([p[nome] for p in premissas], dtype=object if nome == "cidade" else float)[:, None]
+
+    def _triangular(faixa: tuple) -> np.ndarray:
+        return rng.triangular(*faixa, forma)
+
+    # Premissas sorteadas
+    preco_m2 = rng.triangular(_coluna("preco_m2_min"), _coluna("preco_m2"), _coluna("preco_m2_max"), forma)
+    desconto_venda = _triangular(DESCONTO_VENDA_RAPIDA)
+    custo_reforma_m2 = _triangular(CUSTO_REFORMA_M2)
+    # Tempo de venda lognormal com media igual a estimativa de liquidez do bairro
+    fator_tempo = rng.lognormal(-DISPERSAO_TEMPO_VENDA ** 2 / 2, DISPERSAO_TEMPO_VENDA, forma)
+    meses = _triangular(MESES_PREPARACAO) + _coluna("tempo_venda_dias") / 30 * fator_tempo
+    cdi = np.maximum(rng.normal(CDI_ANUAL, CDI_DESVIO, forma), 0.0)
+
+    area = _coluna("area_m2")
+    lote = calc_custos_lote(
+        {nome: _coluna(nome) for nome in (
+            "valor_arrematacao", "cidade", "ocupado", "debitos_edital",
+            "condominio_mensal", "iptu_mensal"
+        )},
+        area_m2=area,
+        custo_reforma_m2=custo_reforma_m2,
+        preco_venda_estimado=preco_m2 * area * desconto_venda,
+        meses_manutencao=meses,
+        cdi_anual=cdi,
+    )
+
+    roi = lote["roi_total_percentual"]
+    lucro = lote["lucro_liquido"]
+    percentis_roi = np.percentile(roi, PERCENTIS_ROI, axis=1)
+    percentis_lucro = np.percentile(lucro, (5, 50), axis=1)
+    prob_prejuizo = (lucro < 0).mean(axis=1)
+    prob_abaixo_cdi = (lote["diferenca_vs_cdi"] < 0).mean(axis=1)
+    sensibilidade = {
+        "preco_m2": _correlacao(preco_m2, roi),
+        "desconto_venda": _correlacao(desconto_venda, roi),
+        "custo_reforma_m2": _correlacao(custo_reforma_m2, roi),
+        "meses_ate_venda": _correlacao(meses, roi),
+    }
+    meses_medio = meses.mean(axis=1)
+
+    return [{
+        "trials": trials,
+        "roi_percentis": {
+            f"p{p}": round(float(percentis_roi[j, i]), 2) for j, p in enumerate(PERCENTIS_ROI)
+        },
+        "roi_medio": round(float(roi[i].mean()), 2),
+        "lucro_liquido_p5": round(float(percentis_lucro[0, i]), 2),
+        "lucro_liquido_p50": round(float(percentis_lucro[1, i]), 2),
+        "prob_prejuizo": round(float(prob_prejuizo[i]), 4),
+        "prob_abaixo_cdi": round(float(prob_abaixo_cdi[i]), 4),
+        "meses_ate_venda_medio": round(float(meses_medio[i]), 1),
+        # Correlacao de cada premissa com o ROI (quanto maior o modulo, mais o ROI depende dela)
+        "sensibilidade": {nome: round(float(r[i]), 3) for nome, r in sensibilidade.items()},
+    } for i in range(forma[0])]
+
+
+def simular_cenarios(
+    analises: List[Dict],
+    trials: Optional[int] = None,
+    semente: Optional[int] = None
+) -> List[Optional[Dict]]:
+    """
+    Simula o resultado de venda de cada imovel analisado sorteando as
+    premissas que analisar_imovel fixa: preco/m2 na faixa de mercado,
+    desconto de venda rapida, custo de reforma, prazo ate a venda (pela
+    liquidez do bairro) e CDI.
+
+    Args:
+        analises: Analises de PipelineLeilao.analisar_imovel
+        trials: Cenarios por imovel (default CENARIOS_TRIALS)
+        semente: Semente do gerador (default CENARIOS_SEMENTE)
+
+    Returns:
+        Lista na mesma ordem de analises com percentis de ROI, probabilidade
+        de prejuizo e de render menos que o CDI e sensibilidade por premissa
+        (None para imoveis sem preco de mercado)
+    """
+    trials = trials or CENARIOS_TRIALS
+    if semente is None and CENARIOS_SEMENTE:
+        semente = int(CENARIOS_SEMENTE)
+    rng = np.random.default_rng(semente)
+
+    premissas = [_premissas(a) for a in analises]
+    validas = [i for i, p in enumerate(premissas) if p is not None]
+    resultados: List[Optional[Dict]] = [None] * len(analises)
+
+    # Blocos de imoveis para limitar a memoria (CENARIOS_LINHAS_LOTE linhas por vez)
+    por_bloco = max(1, CENARIOS_LINHAS_LOTE // trials)
+    for inicio in range(0, len(validas), por_bloco):
+        bloco = validas[inicio:inicio + por_bloco]
+        for i, resumo in zip(bloco, _simular_bloco([premissas[i] for i in bloco], trials, rng)):
+            resultados[i] = resumo
+
+    logger.info(f"Cenarios simulados: {len(validas)} imoveis x {trials} trials")
+    return resultados
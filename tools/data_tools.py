@@ -6,14 +6,18 @@ Download automatico 2x por semana com verificacao de atualizacao
 import os
 import requests
 import pandas as pd
+import numpy as np
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Union
 # Removido decorador @tool para permitir chamada direta
 # from crewai_tools import tool
 import json
 import logging
+from .parallel_tools import pool_processos
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -34,6 +38,20 @@ CIDADES_ALVO = CIDADES_CAPITAL + CIDADES_LITORAL
 # URL base Caixa
 CAIXA_DOWNLOAD_URL = "https://venda-imoveis.caixa.gov.br/sistema/download-lista.asp"
 
+# Todas as UFs com lista de imoveis da Caixa
+UFS_BRASIL = [
+    "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA",
+    "PB", "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO"
+]
+
+# Downloads simultaneos e processos de parse na ingestao multi-estado
+DOWNLOAD_WORKERS = int(os.getenv("CAIXA_DOWNLOAD_WORKERS", "8"))
+PARSE_WORKERS = int(os.getenv("CAIXA_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_metadata_lock = threading.Lock()
+_sessao_lock = threading.Lock()
+_sessao_caixa: Optional[requests.Session] = None
+
 
 def get_cache_metadata() -> Dict:
     """Le metadados do cache"""
@@ -44,10 +62,49 @@ def get_cache_metadata() -> Dict:
 
 
 def save_cache_metadata(metadata: Dict):
-    """Salva metadados do cache"""
+    """Salva metadados do cache (escrita atomica: arquivo temporario + rename)"""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    with open(CACHE_FILE, 'w') as f:
+    tmp = CACHE_FILE.with_name(f"{CACHE_FILE.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, 'w') as f:
         json.dump(metadata, f, indent=2)
+    os.replace(tmp, CACHE_FILE)
+
+
+def atualizar_cache_metadata(chave: str, dados: Dict) -> None:
+    """
+    Atualiza a entrada de um estado no cache_metadata.json.
+    Leitura-modificacao-escrita sob lock, para downloads paralelos nao
+    sobrescreverem a entrada uns dos outros.
+
+    Args:
+        chave: Chave do estado (ex: Lista_imoveis_SP)
+        dados: Novos metadados do estado
+    """
+    with _metadata_lock:
+        metadata = get_cache_metadata()
+        metadata[chave] = dados
+        save_cache_metadata(metadata)
+
+
+def _get_sessao_caixa() -> requests.Session:
+    """Sessao HTTP compartilhada (pool de conexoes) para os downloads da Caixa"""
+    global _sessao_caixa
+    with _sessao_lock:
+        if _sessao_caixa is None:
+            sessao = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=DOWNLOAD_WORKERS,
+                pool_maxsize=DOWNLOAD_WORKERS
+            )
+            sessao.mount("https://", adapter)
+            sessao.mount("http://", adapter)
+            sessao.headers.update({
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+                "Accept": "text/csv,application/csv,text/plain",
+                "Referer": CAIXA_DOWNLOAD_URL
+            })
+            _sessao_caixa = sessao
+        return _sessao_caixa
 
 
 def file_hash(filepath: Path) -> str:
@@ -93,122 +150,154 @@ def needs_update(estado: str, force: bool = False) -> bool:
     return False
 
 
-def download_csv_caixa(estado: str = "SP", force: bool = False) -> Dict:
+def _resultado_cache(estado: str, filepath: Path, mensagem: str) -> Dict:
+    """Resultado de download usando o arquivo ja existente em disco"""
+    cached = get_cache_metadata().get(f"Lista_imoveis_{estado}", {})
+    return {
+        "status": "cached",
+        "filepath": str(filepath),
+        "last_update": cached.get("last_update"),
+        "total_imoveis": cached.get("total_imoveis", 0),
+        "hash": cached.get("hash"),
+        "message": mensagem
+    }
+
+
+def _contar_imoveis(filepath: Path) -> int:
+    """Conta linhas de imoveis (iniciadas pelo numero do imovel) sem carregar o CSV"""
+    with open(filepath, 'rb') as f:
+        return sum(1 for linha in f if linha.lstrip()[:1].isdigit())
+
+
+def download_csv_caixa(
+    estado: str = "SP",
+    force: bool = False,
+    session: Optional[requests.Session] = None
+) -> Dict:
     """
     Baixa CSV de imoveis da Caixa por estado.
     Verifica automaticamente se precisa atualizar (2x por semana).
 
+    A requisicao e condicional (If-None-Match / If-Modified-Since com os
+    valores salvos no cache): se a Caixa responder 304, o arquivo local e
+    mantido sem novo download. O corpo e gravado em streaming num arquivo
+    temporario e movido para o destino so ao final.
+
     Args:
         estado: Sigla do estado (ex: SP, RJ)
         force: Forca download mesmo se cache recente
+        session: Sessao HTTP (default: sessao compartilhada com pool de conexoes)
 
     Returns:
         Dict com status, caminho do arquivo e metadados
     """
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    filename = f"Lista_imoveis_{estado}.csv"
-    filepath = DATA_DIR / filename
+    chave = f"Lista_imoveis_{estado}"
+    filepath = DATA_DIR / f"{chave}.csv"
 
     # Verifica se precisa atualizar
     if not needs_update(estado, force):
-        metadata = get_cache_metadata()
-        cached = metadata.get(f"Lista_imoveis_{estado}", {})
+        cached = get_cache_metadata().get(chave, {})
         logger.info(f"Usando cache existente: {filepath}")
-        return {
-            "status": "cached",
-            "filepath": str(filepath),
-            "last_update": cached.get("last_update"),
-            "total_imoveis": cached.get("total_imoveis", 0),
-            "hash": cached.get("hash"),
-            "message": f"Arquivo em cache (atualizado em {cached.get('last_update')})"
-        }
+        return _resultado_cache(
+            estado, filepath,
+            f"Arquivo em cache (atualizado em {cached.get('last_update')})"
+        )
 
     # Faz download
+    session = session or _get_sessao_caixa()
+    tmp = filepath.with_name(f"{filepath.name}.{threading.get_ident()}.tmp")
+
     try:
         logger.info(f"Baixando CSV para {estado}...")
 
-        # Simula requisicao ao site da Caixa
-        # Na pratica, pode precisar de session/cookies
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            "Accept": "text/csv,application/csv,text/plain",
-            "Referer": CAIXA_DOWNLOAD_URL
-        }
+        # Requisicao condicional com os validadores do ultimo download
+        cached = get_cache_metadata().get(chave, {})
+        headers = {}
+        if filepath.exists() and not force:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
 
         # URL de download (pode variar conforme o site)
         download_url = f"{CAIXA_DOWNLOAD_URL}?uf={estado}"
 
-        response = requests.get(download_url, headers=headers, timeout=60)
-
-        if response.status_code == 200:
-            # Salva arquivo
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-
-            # Conta linhas
-            df = pd.read_csv(filepath, sep=';', encoding='latin-1', on_bad_lines='skip')
-            total_imoveis = len(df)
-
-            # Atualiza metadata
-            new_hash = file_hash(filepath)
-            metadata = get_cache_metadata()
-            old_hash = metadata.get(f"Lista_imoveis_{estado}", {}).get("hash", "")
-
-            metadata[f"Lista_imoveis_{estado}"] = {
-                "last_update": datetime.now().isoformat(),
-                "total_imoveis": total_imoveis,
-                "hash": new_hash,
-                "filesize_kb": filepath.stat().st_size / 1024
-            }
-            save_cache_metadata(metadata)
-
-            changed = new_hash != old_hash
-
-            return {
-                "status": "updated" if changed else "no_changes",
-                "filepath": str(filepath),
-                "last_update": datetime.now().isoformat(),
-                "total_imoveis": total_imoveis,
-                "hash": new_hash,
-                "changed": changed,
-                "message": f"Download concluido: {total_imoveis} imoveis"
-            }
-        else:
-            # Fallback: usa cache existente se disponivel
-            if filepath.exists():
-                logger.warning(f"Download falhou (HTTP {response.status_code}), usando cache existente")
-                metadata = get_cache_metadata()
-                cached = metadata.get(f"Lista_imoveis_{estado}", {})
+        with session.get(download_url, headers=headers, timeout=60, stream=True) as response:
+            if response.status_code == 304:
+                # Nao mudou desde o ultimo download
+                agora = datetime.now().isoformat()
+                atualizar_cache_metadata(chave, {**cached, "last_update": agora})
+                logger.info(f"CSV {estado} sem alteracoes (HTTP 304)")
                 return {
-                    "status": "cached",
+                    "status": "no_changes",
                     "filepath": str(filepath),
-                    "last_update": cached.get("last_update"),
+                    "last_update": agora,
                     "total_imoveis": cached.get("total_imoveis", 0),
                     "hash": cached.get("hash"),
-                    "message": f"Download falhou, usando cache existente"
+                    "changed": False,
+                    "message": "Arquivo nao modificado desde o ultimo download"
                 }
-            return {
-                "status": "error",
-                "error": f"HTTP {response.status_code}",
-                "message": "Falha ao baixar arquivo"
-            }
+
+            if response.status_code != 200:
+                # Fallback: usa cache existente se disponivel
+                if filepath.exists():
+                    logger.warning(f"Download falhou (HTTP {response.status_code}), usando cache existente")
+                    return _resultado_cache(estado, filepath, "Download falhou, usando cache existente")
+                return {
+                    "status": "error",
+                    "error": f"HTTP {response.status_code}",
+                    "message": "Falha ao baixar arquivo"
+                }
+
+            # Grava em streaming calculando o hash
+            md5 = hashlib.md5()
+            with open(tmp, 'wb') as f:
+                for bloco in response.iter_content(chunk_size=64 * 1024):
+                    md5.update(bloco)
+                    f.write(bloco)
+            os.replace(tmp, filepath)
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+
+        total_imoveis = _contar_imoveis(filepath)
+
+        # Atualiza metadata do estado
+        new_hash = md5.hexdigest()
+        old_hash = cached.get("hash", "")
+        agora = datetime.now().isoformat()
+
+        atualizar_cache_metadata(chave, {
+            "last_update": agora,
+            "total_imoveis": total_imoveis,
+            "hash": new_hash,
+            "filesize_kb": filepath.stat().st_size / 1024,
+            "etag": etag,
+            "last_modified": last_modified
+        })
+
+        changed = new_hash != old_hash
+
+        return {
+            "status": "updated" if changed else "no_changes",
+            "filepath": str(filepath),
+            "last_update": agora,
+            "total_imoveis": total_imoveis,
+            "hash": new_hash,
+            "changed": changed,
+            "message": f"Download concluido: {total_imoveis} imoveis"
+        }
 
     except Exception as e:
         logger.error(f"Erro no download: {str(e)}")
+        if tmp.exists():
+            tmp.unlink()
         # Fallback: usa cache existente se disponivel
         if filepath.exists():
             logger.warning(f"Erro no download, usando cache existente: {filepath}")
-            metadata = get_cache_metadata()
-            cached = metadata.get(f"Lista_imoveis_{estado}", {})
-            return {
-                "status": "cached",
-                "filepath": str(filepath),
-                "last_update": cached.get("last_update"),
-                "total_imoveis": cached.get("total_imoveis", 0),
-                "hash": cached.get("hash"),
-                "message": f"Erro no download, usando cache existente"
-            }
+            return _resultado_cache(estado, filepath, "Erro no download, usando cache existente")
         return {
             "status": "error",
             "error": str(e),
@@ -216,113 +305,291 @@ def download_csv_caixa(estado: str = "SP", force: bool = False) -> Dict:
         }
 
 
-def parse_csv_imoveis(csv_path: str) -> List[Dict]:
+# Colunas do CSV da Caixa (na ordem do arquivo) e extraidas da descricao
+COLUNAS_CSV = [
+    'id_imovel', 'uf', 'cidade', 'bairro', 'endereco',
+    'preco', 'valor_avaliacao', 'desconto', 'descricao',
+    'modalidade', 'link'
+]
+COLUNAS_DERIVADAS = ['tipo_imovel', 'area_privativa', 'area_total', 'quartos', 'vagas', 'praca']
+
+# Linhas lidas por bloco no parse do CSV
+CSV_CHUNKSIZE = int(os.getenv("CSV_CHUNKSIZE", "20000"))
+
+# Padroes extraidos da descricao (texto em minusculas)
+_RE_AREA_PRIVATIVA = r'(\d+[\.,]?\d*)\s*de\s*[aá]rea\s*privativa'
+_RE_AREA_TOTAL = r'(\d+[\.,]?\d*)\s*de\s*[aá]rea\s*total'
+_RE_QUARTOS = r'(\d+)\s*qto'
+_RE_VAGAS = r'(\d+)\s*vaga'
+
+
+def _para_numero(serie: pd.Series, decimal_br: bool = True) -> pd.Series:
+    """Converte texto em formato brasileiro (1.234,56) para float"""
+    serie = serie.astype(str).str.strip()
+    if decimal_br:
+        serie = serie.str.replace('.', '', regex=False)
+    return pd.to_numeric(serie.str.replace(',', '.', regex=False), errors='coerce')
+
+
+def _extrair_numero_desc(desc: pd.Series, padrao: str) -> pd.Series:
+    """Extrai o primeiro numero que casa com o padrao (0 se ausente)"""
+    valores = desc.str.extract(padrao, expand=False).str.replace(',', '.', regex=False)
+    return pd.to_numeric(valores, errors='coerce').fillna(0)
+
+
+def _classificar_tipo(desc: pd.Series) -> pd.Series:
+    """Tipo do imovel a partir da descricao (mesma precedencia do parse original)"""
+    return pd.Series(
+        np.select(
+            [
+                desc.str.contains('apartamento', regex=False),
+                desc.str.contains('casa', regex=False),
+                desc.str.contains('terreno', regex=False),
+                desc.str.contains('sala', regex=False) | desc.str.contains('comercial', regex=False),
+            ],
+            ['Apartamento', 'Casa', 'Terreno', 'Comercial'],
+            default='Outro'
+        ),
+        index=desc.index
+    )
+
+
+def _processar_bloco(
+    df: pd.DataFrame,
+    ufs: Optional[set],
+    cidades: Optional[set],
+    preco_max: Optional[float],
+    tipo: Optional[str]
+) -> pd.DataFrame:
+    """
+    Normaliza um bloco do CSV aplicando os filtros o mais cedo possivel:
+    primeiro nos textos (UF, cidade), depois no preco e no tipo, e so entao
+    extrai area/quartos/vagas das linhas restantes.
+    """
+    # Descarta cabecalhos/rodapes (linhas sem ID numerico)
+    df['id_imovel'] = df['id_imovel'].str.strip()
+    df = df[df['id_imovel'].str.isdigit().fillna(False)]
+
+    for col in ['uf', 'cidade', 'bairro', 'endereco', 'modalidade']:
+        df[col] = df[col].str.strip()
+
+    if ufs:
+        df = df[df['uf'].str.upper().isin(ufs)]
+    if cidades:
+        df = df[df['cidade'].str.upper().isin(cidades)]
+
+    df['preco'] = _para_numero(df['preco'])
+    if preco_max:
+        df = df[df['preco'] <= preco_max]
+
+    desc = df['descricao'].fillna('').str.lower()
+    df['tipo_imovel'] = _classificar_tipo(desc)
+    if tipo:
+        manter = (df['tipo_imovel'].str.upper() == tipo.upper()).to_numpy()
+        df, desc = df[manter], desc[manter]
+
+    df['valor_avaliacao'] = _para_numero(df['valor_avaliacao'])
+    df['desconto'] = _para_numero(df['desconto'], decimal_br=False)
+
+    df['area_privativa'] = _extrair_numero_desc(desc, _RE_AREA_PRIVATIVA).astype(float)
+    df['area_total'] = _extrair_numero_desc(desc, _RE_AREA_TOTAL).astype(float)
+    df['quartos'] = _extrair_numero_desc(desc, _RE_QUARTOS).astype(int)
+    df['vagas'] = _extrair_numero_desc(desc, _RE_VAGAS).astype(int)
+
+    # Identifica 2a praca pelo desconto (geralmente > 30%)
+    df['praca'] = np.where(df['desconto'] > 30, '2a Praca', '1a Praca')
+
+    return df
+
+
+def ler_csv_imoveis(
+    csv_path: str,
+    ufs: Optional[List[str]] = None,
+    cidades: Optional[List[str]] = None,
+    preco_max: Optional[float] = None,
+    tipo: Optional[str] = None,
+    chunksize: Optional[int] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Le o CSV da Caixa em blocos, filtrando durante a leitura.
+
+    Nenhum bloco e materializado alem de chunksize linhas, o que permite
+    processar as listas de todos os estados sem pico de memoria.
+
+    Args:
+        csv_path: Caminho do arquivo CSV
+        ufs: UFs a manter (None = todas)
+        cidades: Cidades a manter (None = todas)
+        preco_max: Preco maximo (None/0 = sem limite)
+        tipo: Tipo de imovel (ex: "Apartamento"; None = todos)
+        chunksize: Linhas por bloco (default: CSV_CHUNKSIZE)
+
+    Yields:
+        DataFrames normalizados (somente linhas que passaram nos filtros)
+    """
+    ufs_set = {u.upper() for u in ufs} if ufs else None
+    cidades_set = {c.upper() for c in cidades} if cidades else None
+
+    leitor = pd.read_csv(
+        csv_path,
+        sep=';',
+        encoding='latin-1',
+        header=None,
+        names=COLUNAS_CSV,
+        usecols=range(len(COLUNAS_CSV)),
+        dtype=str,
+        on_bad_lines='skip',
+        chunksize=chunksize or CSV_CHUNKSIZE
+    )
+
+    with leitor:
+        for bloco in leitor:
+            bloco = _processar_bloco(bloco, ufs_set, cidades_set, preco_max, tipo)
+            if len(bloco):
+                yield bloco
+
+
+def parse_csv_imoveis(
+    csv_path: str,
+    ufs: Optional[List[str]] = None,
+    cidades: Optional[List[str]] = None,
+    preco_max: Optional[float] = None,
+    tipo: Optional[str] = None,
+    lazy: bool = False
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
     """
     Parseia CSV de imoveis da Caixa e normaliza os dados.
 
+    Os filtros opcionais sao aplicados durante a leitura (ver ler_csv_imoveis).
+
     Args:
         csv_path: Caminho do arquivo CSV
+        ufs: UFs a manter (None = todas)
+        cidades: Cidades a manter (None = todas)
+        preco_max: Preco maximo (None/0 = sem limite)
+        tipo: Tipo de imovel (None = todos)
+        lazy: Se True, retorna o iterador de blocos em vez de um DataFrame
 
     Returns:
-        Lista de dicionarios com dados normalizados
+        DataFrame com os imoveis normalizados (vazio em caso de erro),
+        ou iterador de DataFrames se lazy=True
     """
+    blocos = ler_csv_imoveis(csv_path, ufs=ufs, cidades=cidades, preco_max=preco_max, tipo=tipo)
+    if lazy:
+        return blocos
+
     try:
-        df = pd.read_csv(csv_path, sep=';', encoding='latin-1', on_bad_lines='skip')
+        return pd.concat(list(blocos), ignore_index=True)
+    except ValueError:
+        # Nenhum bloco passou nos filtros
+        return pd.DataFrame(columns=COLUNAS_CSV + COLUNAS_DERIVADAS)
+    except Exception as e:
+        logger.error(f"Erro ao parsear CSV: {str(e)}")
+        return pd.DataFrame(columns=COLUNAS_CSV + COLUNAS_DERIVADAS)
 
-        # Normaliza nomes das colunas
-        df.columns = [
-            'id_imovel', 'uf', 'cidade', 'bairro', 'endereco',
-            'preco', 'valor_avaliacao', 'desconto', 'descricao',
-            'modalidade', 'link'
-        ]
 
-        # Limpa espacos
-        for col in ['uf', 'cidade', 'bairro', 'endereco', 'modalidade']:
-            df[col] = df[col].str.strip()
+def baixar_csvs_caixa(
+    estados: Optional[List[str]] = None,
+    force: bool = False,
+    max_workers: Optional[int] = None
+) -> Dict[str, Dict]:
+    """
+    Baixa as listas da Caixa de varios estados em paralelo.
 
-        # Converte valores numericos
-        df['preco'] = pd.to_numeric(
-            df['preco'].astype(str).str.replace('.', '').str.replace(',', '.'),
-            errors='coerce'
-        )
-        df['valor_avaliacao'] = pd.to_numeric(
-            df['valor_avaliacao'].astype(str).str.replace('.', '').str.replace(',', '.'),
-            errors='coerce'
-        )
-        df['desconto'] = pd.to_numeric(
-            df['desconto'].astype(str).str.replace(',', '.'),
-            errors='coerce'
-        )
+    Args:
+        estados: UFs a baixar (default: todas)
+        force: Forca download mesmo se cache recente
+        max_workers: Downloads simultaneos (default: CAIXA_DOWNLOAD_WORKERS)
 
-        # Extrai dados da descricao
-        def parse_descricao(desc: str) -> Dict:
-            """Extrai tipo, area, quartos da descricao"""
-            result = {
-                'tipo_imovel': 'Outro',
-                'area_privativa': 0,
-                'area_total': 0,
-                'quartos': 0,
-                'vagas': 0
-            }
+    Returns:
+        Dict UF -> resultado de download_csv_caixa
+    """
+    estados = [e.upper() for e in (estados or UFS_BRASIL)]
+    session = _get_sessao_caixa()
 
-            if pd.isna(desc):
-                return result
-
-            desc = str(desc).lower()
-
-            # Tipo
-            if 'apartamento' in desc:
-                result['tipo_imovel'] = 'Apartamento'
-            elif 'casa' in desc:
-                result['tipo_imovel'] = 'Casa'
-            elif 'terreno' in desc:
-                result['tipo_imovel'] = 'Terreno'
-            elif 'sala' in desc or 'comercial' in desc:
-                result['tipo_imovel'] = 'Comercial'
-
-            # Area privativa
-            import re
-            match = re.search(r'(\d+[\.,]?\d*)\s*de\s*[aá]rea\s*privativa', desc)
-            if match:
-                result['area_privativa'] = float(match.group(1).replace(',', '.'))
-
-            # Area total
-            match = re.search(r'(\d+[\.,]?\d*)\s*de\s*[aá]rea\s*total', desc)
-            if match:
-                result['area_total'] = float(match.group(1).replace(',', '.'))
-
-            # Quartos
-            match = re.search(r'(\d+)\s*qto', desc)
-            if match:
-                result['quartos'] = int(match.group(1))
-
-            # Vagas
-            match = re.search(r'(\d+)\s*vaga', desc)
-            if match:
-                result['vagas'] = int(match.group(1))
-
-            return result
-
-        # Aplica parsing da descricao
-        desc_parsed = df['descricao'].apply(parse_descricao)
-        df['tipo_imovel'] = desc_parsed.apply(lambda x: x['tipo_imovel'])
-        df['area_privativa'] = desc_parsed.apply(lambda x: x['area_privativa'])
-        df['area_total'] = desc_parsed.apply(lambda x: x['area_total'])
-        df['quartos'] = desc_parsed.apply(lambda x: x['quartos'])
-        df['vagas'] = desc_parsed.apply(lambda x: x['vagas'])
-
-        # Identifica 2a praca pelo desconto (geralmente > 30%)
-        df['praca'] = df['desconto'].apply(lambda x: '2a Praca' if x and x > 30 else '1a Praca')
-
-        return df.to_dict('records')
+    with ThreadPoolExecutor(max_workers=max_workers or DOWNLOAD_WORKERS,
+                            thread_name_prefix="caixa") as executor:
+        resultados = executor.map(lambda uf: download_csv_caixa(uf, force, session), estados)
+        return dict(zip(estados, resultados))
 
-    except Exception as e:
-        logger.error(f"Erro ao parsear CSV: {str(e)}")
-        return []
+
+def _parse_estado(args: tuple) -> pd.DataFrame:
+    """Parse de um estado (executado em processo separado)"""
+    filepath, uf, cidades, preco_max, tipo = args
+    return parse_csv_imoveis(filepath, ufs=[uf], cidades=cidades, preco_max=preco_max, tipo=tipo)
+
+
+def coletar_caixa_estados(
+    estados: Optional[List[str]] = None,
+    cidades: Optional[Union[List[str], Dict[str, List[str]]]] = None,
+    preco_max: Optional[float] = None,
+    tipo: Optional[str] = None,
+    force: bool = False
+) -> Dict:
+    """
+    Ingestao multi-estado: downloads paralelos + parse em processos separados.
+
+    Args:
+        estados: UFs a coletar (default: todas)
+        cidades: Cidades a manter (None = todas); um dict UF -> cidades filtra
+                 so os estados listados (ex: {"SP": CIDADES_ALVO})
+        preco_max: Preco maximo (None/0 = sem limite)
+        tipo: Tipo de imovel (None = todos)
+        force: Forca download mesmo se cache recente
+
+    Returns:
+        Dict com:
+        - imoveis: DataFrame unico com os imoveis de todos os estados
+        - downloads: resultado do download por UF
+        - erros: UFs sem arquivo disponivel
+    """
+    inicio = datetime.now()
+    downloads = baixar_csvs_caixa(estados, force=force)
+
+    disponiveis = [
+        (r["filepath"], uf, cidades.get(uf) if isinstance(cidades, dict) else cidades, preco_max, tipo)
+        for uf, r in downloads.items()
+        if r.get("status") in ["cached", "updated", "no_changes"] and Path(r["filepath"]).exists()
+    ]
+    erros = [
+        {"uf": uf, "erro": r.get("error", r.get("message", ""))}
+        for uf, r in downloads.items()
+        if r.get("status") == "error"
+    ]
+
+    if len(disponiveis) > 1 and PARSE_WORKERS > 1:
+        try:
+            with pool_processos(min(PARSE_WORKERS, len(disponiveis))) as executor:
+                blocos = list(executor.map(_parse_estado, disponiveis))
+        except Exception as e:
+            # Ambientes sem suporte a multiprocessing: parse sequencial
+            logger.warning(f"Parse em processos indisponivel ({e}), usando parse sequencial")
+            blocos = [_parse_estado(args) for args in disponiveis]
+    else:
+        blocos = [_parse_estado(args) for args in disponiveis]
+
+    blocos = [b for b in blocos if len(b)]
+    if blocos:
+        imoveis = pd.concat(blocos, ignore_index=True)
+    else:
+        imoveis = pd.DataFrame(columns=COLUNAS_CSV + COLUNAS_DERIVADAS)
+
+    duracao = (datetime.now() - inicio).total_seconds()
+    logger.info(
+        f"Caixa: {len(imoveis)} imoveis de {len(disponiveis)}/{len(downloads)} estados "
+        f"em {duracao:.1f}s"
+    )
+
+    return {
+        "imoveis": imoveis,
+        "downloads": downloads,
+        "erros": erros,
+        "timestamp": datetime.now().isoformat()
+    }
 
 
 def filter_imoveis(
-    imoveis: List[Dict],
+    imoveis: Union[pd.DataFrame, List[Dict]],
     preco_max: float = 150000,
     tipo: str = "Apartamento",
     praca: str = "2a Praca",
@@ -332,7 +599,7 @@ def filter_imoveis(
     Filtra lista de imoveis por criterios.
 
     Args:
-        imoveis: Lista de imoveis parseados
+        imoveis: DataFrame de parse_csv_imoveis (ou lista de imoveis)
         preco_max: Preco maximo (default: 150000)
         tipo: Tipo de imovel (default: Apartamento)
         praca: 1a ou 2a Praca (default: 2a Praca)
@@ -347,7 +614,7 @@ def filter_imoveis(
     # Normaliza cidades para uppercase
     cidades = [c.upper() for c in cidades]
 
-    df = pd.DataFrame(imoveis)
+    df = imoveis if isinstance(imoveis, pd.DataFrame) else pd.DataFrame(imoveis)
 
     total_original = len(df)
 
@@ -456,6 +723,20 @@ import asyncio
 from typing import Tuple
 
 
+def _resultado_sem_playwright(erro: Exception) -> Dict:
+    """Resultado vazio quando Playwright/Chromium nao pode ser iniciado"""
+    return {
+        "imoveis": [],
+        "stats_por_fonte": {},
+        "total_bruto": 0,
+        "total_unico": 0,
+        "duplicatas_removidas": 0,
+        "fontes_com_erro": 1,
+        "erros": [{"fonte": "playwright", "erro": f"Playwright/Chromium nao disponivel: {str(erro)}"}],
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 async def coletar_todas_fontes(
     estado: str = "SP",
     preco_max: float = 200000,
@@ -474,83 +755,59 @@ async def coletar_todas_fontes(
     Returns:
         Dict com imoveis consolidados e estatisticas por fonte
     """
-    # Verifica se Playwright esta disponivel antes de importar scrapers
     try:
-        from playwright.async_api import async_playwright
-        # Testa se Chromium esta instalado
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            await browser.close()
-        logger.info("[MULTI-FONTE] Playwright/Chromium verificado com sucesso")
-    except Exception as e:
+        from scrapers import SCRAPERS_DISPONIVEIS, OrquestradorScrapers
+    except ImportError as e:
         logger.error(f"[MULTI-FONTE] Playwright nao disponivel: {e}")
-        return {
-            "imoveis": [],
-            "stats_por_fonte": {},
-            "total_bruto": 0,
-            "total_unico": 0,
-            "duplicatas_removidas": 0,
-            "fontes_com_erro": 1,
-            "erros": [{"fonte": "playwright", "erro": f"Playwright/Chromium nao disponivel: {str(e)}"}],
-            "timestamp": datetime.now().isoformat()
-        }
+        return _resultado_sem_playwright(e)
 
-    from scrapers import (
-        ZukScraper,
-        SuperbidScraper,
-        MegaLeiloesScraper,
-        FrazaoScraper,
-        BiasiScraper
-    )
+    scrapers = [scraper_class() for scraper_class in SCRAPERS_DISPONIVEIS]
+    logger.info(f"[MULTI-FONTE] Iniciando coleta de {len(scrapers)} fontes em paralelo...")
 
-    logger.info(f"[MULTI-FONTE] Iniciando coleta de {5} fontes...")
-
-    scrapers = [
-        ("portal_zuk", ZukScraper()),
-        ("superbid", SuperbidScraper()),
-        ("mega_leiloes", MegaLeiloesScraper()),
-        ("frazao_leiloes", FrazaoScraper()),
-        ("biasi_leiloes", BiasiScraper()),
-    ]
+    # Um unico Chromium compartilhado, um contexto isolado por fonte
+    try:
+        orquestrador = OrquestradorScrapers(scrapers)
+        por_fonte = await orquestrador.executar(
+            coletar_detalhes=coletar_detalhes,
+            max_por_fonte=max_por_fonte
+        )
+    except Exception as e:
+        logger.error(f"[MULTI-FONTE] Playwright nao disponivel: {e}")
+        return _resultado_sem_playwright(e)
 
     resultados = {}
     todos_imoveis = []
     erros = []
 
-    # Executa scrapers sequencialmente para evitar bloqueio
-    for nome_fonte, scraper in scrapers:
-        try:
-            logger.info(f"[MULTI-FONTE] Coletando {nome_fonte}...")
-
-            imoveis = await scraper.executar(
-                coletar_detalhes=coletar_detalhes,
-                max_imoveis=max_por_fonte
-            )
-
-            # Aplica filtro de preco
-            imoveis_filtrados = [
-                i for i in imoveis
-                if i.get('preco', float('inf')) <= preco_max
-            ]
-
-            resultados[nome_fonte] = {
-                "total_coletados": len(imoveis),
-                "total_filtrados": len(imoveis_filtrados),
-                "status": "sucesso"
-            }
-
-            todos_imoveis.extend(imoveis_filtrados)
-            logger.info(f"[MULTI-FONTE] {nome_fonte}: {len(imoveis_filtrados)} imoveis")
-
-        except Exception as e:
-            logger.error(f"[MULTI-FONTE] Erro em {nome_fonte}: {e}")
+    for nome_fonte, execucao in por_fonte.items():
+        if execucao["status"] != "sucesso":
             resultados[nome_fonte] = {
                 "total_coletados": 0,
                 "total_filtrados": 0,
                 "status": "erro",
-                "erro": str(e)
+                "erro": execucao.get("erro", "")
             }
-            erros.append({"fonte": nome_fonte, "erro": str(e)})
+            erros.append({"fonte": nome_fonte, "erro": execucao.get("erro", "")})
+            continue
+
+        imoveis = execucao["imoveis"]
+
+        # Aplica filtro de preco
+        imoveis_filtrados = [
+            i for i in imoveis
+            if i.get('preco', float('inf')) <= preco_max
+        ]
+
+        resultados[nome_fonte] = {
+            "total_coletados": len(imoveis),
+            "total_filtrados": len(imoveis_filtrados),
+            "duracao_s": execucao.get("duracao_s", 0),
+            "bytes_recebidos": execucao.get("metricas", {}).get("bytes_recebidos", 0),
+            "status": "sucesso"
+        }
+
+        todos_imoveis.extend(imoveis_filtrados)
+        logger.info(f"[MULTI-FONTE] {nome_fonte}: {len(imoveis_filtrados)} imoveis")
 
     # Remove duplicatas (por endereco similar + preco proximo)
     imoveis_unicos = remover_duplicatas_multifonte(todos_imoveis)
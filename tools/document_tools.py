@@ -4,15 +4,25 @@ Usa GPT-4o Vision para OCR e análise de PDFs escaneados
 """
 
 import os
-import re
 import logging
-import requests
 import base64
 import json
-from typing import Dict, List, Optional, Any
+import atexit
+import threading
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import hashlib
 
+from .parallel_tools import limite_etapa, pool_processos
+from .cache_tools import get_cache, sha256_arquivo, versao_texto
+from .llm_tools import get_gateway, ImagemArquivo
+from .matricula_tools import (
+    extrair_matricula, AnaliseMatricula, RespostaInvalida, FORMATO_RESPOSTA_MATRICULA
+)
+from .edital_tools import buscar_editais, get_sessao_site_caixa
+
 logger = logging.getLogger(__name__)
 
 # OpenAI API
@@ -22,114 +32,38 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 DOCS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'documentos')
 os.makedirs(DOCS_DIR, exist_ok=True)
 
-# Cache de análises
-_cache_analises: Dict[str, Dict] = {}
-
-
-def baixar_matricula(imovel_id: str, estado: str = "SP") -> Optional[str]:
-    """
-    Baixa a matrícula do imóvel do site da Caixa
-
-    Args:
-        imovel_id: ID do imóvel (ex: 1555519290270)
-        estado: UF do imóvel (default: SP)
-
-    Returns:
-        Caminho do arquivo baixado ou None se falhar
-    """
-    try:
-        # URL padrão da Caixa para matrículas
-        url = f"https://venda-imoveis.caixa.gov.br/editais/matricula/{estado}/{imovel_id}.pdf"
-
-        # Nome do arquivo local
-        filename = f"matricula_{imovel_id}.pdf"
-        filepath = os.path.join(DOCS_DIR, filename)
-
-        # Verifica se já existe
-        if os.path.exists(filepath):
-            logger.info(f"Matrícula já baixada: {filepath}")
-            return filepath
-
-        # Baixa o arquivo
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-
-        response = requests.get(url, headers=headers, timeout=30)
-
-        if response.status_code == 200 and response.headers.get('content-type', '').startswith('application/pdf'):
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-            logger.info(f"Matrícula baixada: {filepath} ({len(response.content)} bytes)")
-            return filepath
-        else:
-            logger.warning(f"Matrícula não disponível: {url} (status: {response.status_code})")
-            return None
-
-    except Exception as e:
-        logger.error(f"Erro ao baixar matrícula {imovel_id}: {e}")
-        return None
-
-
-def pdf_to_images(filepath: str, max_pages: int = 5) -> List[str]:
-    """
-    Converte páginas do PDF em imagens base64 para enviar ao GPT-4o Vision
-
-    Args:
-        filepath: Caminho do PDF
-        max_pages: Número máximo de páginas
-
-    Returns:
-        Lista de strings base64 das imagens
-    """
-    images = []
-    try:
-        import fitz  # PyMuPDF
-        doc = fitz.open(filepath)
-
-        for i, page in enumerate(doc):
-            if i >= max_pages:
-                break
-
-            # Renderiza página como imagem (300 DPI para boa qualidade)
-            mat = fitz.Matrix(2, 2)  # 2x zoom = ~144 DPI
-            pix = page.get_pixmap(matrix=mat)
-            img_bytes = pix.tobytes("png")
-            b64 = base64.b64encode(img_bytes).decode('utf-8')
-            images.append(b64)
-
-        doc.close()
-        logger.info(f"Convertidas {len(images)} páginas do PDF para imagem")
-
-    except Exception as e:
-        logger.error(f"Erro ao converter PDF para imagens: {e}")
-
-    return images
+# Download das matrículas (pré-busca em lote antes da análise)
+MATRICULA_URL = "https://venda-imoveis.caixa.gov.br/editais/matricula/{estado}/{imovel_id}.pdf"
+MATRICULA_WORKERS = int(os.getenv("MATRICULA_WORKERS", "6"))
+MATRICULA_TIMEOUT_S = float(os.getenv("MATRICULA_TIMEOUT_S", "30"))
 
+# Cache de análises (em memória, por processo)
+_cache_analises: Dict[str, Dict] = {}
 
-def analisar_matricula_com_gpt4(filepath: str) -> Dict[str, Any]:
-    """
-    Usa GPT-4o Vision para analisar a matrícula do imóvel
+# Modelo e prompt da análise de matrícula
+MODELO_MATRICULA = "gpt-4o"
+MAX_PAGINAS_MATRICULA = 5
 
-    Args:
-        filepath: Caminho do PDF da matrícula
+# Triagem de páginas: abaixo deste número de caracteres a página é tratada como escaneada
+MIN_CARACTERES_PAGINA = 200
 
-    Returns:
-        Dicionário com análise estruturada
-    """
-    if not OPENAI_API_KEY:
-        logger.error("OPENAI_API_KEY não configurada")
-        return {"erro": "API key não configurada"}
+# Renderização das páginas escaneadas (Vision): lado maior ~ALVO_PIXELS,
+# sem passar da resolução da imagem digitalizada, entre DPI_MIN e DPI_MAX
+ALVO_PIXELS = 1600
+DPI_MIN = 100
+DPI_MAX = 200
+QUALIDADE_JPEG = 70
 
-    # Converte PDF para imagens
-    images = pdf_to_images(filepath, max_pages=5)
+# Cache de páginas renderizadas (JPEG em disco): chave = hash do PDF + página + parâmetros
+# de renderização. Mudar o prompt/modelo não exige renderizar de novo.
+RENDER_CACHE_DIR = Path(os.getenv("RENDER_CACHE_DIR", "./data/render_cache"))
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
 
-    if not images:
-        logger.error("Não foi possível converter PDF para imagens")
-        return {"erro": "Falha na conversão do PDF"}
+# Pool de renderização único do processo (criado no primeiro uso, encerrado na saída)
+_pool_render: Optional[ProcessPoolExecutor] = None
+_pool_render_lock = threading.Lock()
 
-    # Monta o prompt para análise
-    prompt = """Analise esta matrícula de imóvel e extraia as seguintes informações em formato JSON:
+PROMPT_MATRICULA = """Analise esta matrícula de imóvel e extraia as seguintes informações em formato JSON:
 
 {
     "matricula_numero": "número da matrícula",
@@ -188,64 +122,431 @@ def analisar_matricula_com_gpt4(filepath: str) -> Dict[str, Any]:
 
 Seja preciso com os valores monetários. Se não encontrar alguma informação, use null."""
 
+# Chamadas ao GPT-4o por matrícula quando a resposta vem fora do schema (1 = uma nova tentativa)
+TENTATIVAS_SCHEMA_MATRICULA = 2
+
+# Versão da análise: muda o prompt/modelo/schema -> entradas antigas do cache em disco deixam de valer
+VERSAO_ANALISE_MATRICULA = versao_texto(
+    PROMPT_MATRICULA, MODELO_MATRICULA, json.dumps(FORMATO_RESPOSTA_MATRICULA, sort_keys=True),
+    str((MAX_PAGINAS_MATRICULA, MIN_CARACTERES_PAGINA, ALVO_PIXELS, DPI_MIN, DPI_MAX, QUALIDADE_JPEG))
+)
+
+
+def caminho_matricula(imovel_id: str) -> str:
+    """Caminho local do PDF da matrícula"""
+    return os.path.join(DOCS_DIR, f"matricula_{imovel_id}.pdf")
+
+
+def pdf_valido(filepath: str) -> bool:
+    """
+    Verifica se o arquivo é um PDF completo: cabeçalho %PDF- e marcador
+    %%EOF no final (um download interrompido não passa)
+    """
+    try:
+        tamanho = os.path.getsize(filepath)
+        if tamanho < 16:
+            return False
+        with open(filepath, 'rb') as f:
+            if f.read(5) != b'%PDF-':
+                return False
+            f.seek(max(0, tamanho - 1024))
+            return b'%%EOF' in f.read()
+    except OSError:
+        return False
+
+
+def baixar_matricula(imovel_id: str, estado: str = "SP") -> Optional[str]:
+    """
+    Baixa a matrícula do imóvel do site da Caixa
+
+    O PDF é gravado em streaming num arquivo .part e só é renomeado para o
+    nome final depois de conferir o tamanho (Content-Length) e o formato.
+    Um .part de uma tentativa anterior é retomado com Range.
+
+    Args:
+        imovel_id: ID do imóvel (ex: 1555519290270)
+        estado: UF do imóvel (default: SP)
+
+    Returns:
+        Caminho do arquivo baixado ou None se falhar
+    """
+    filepath = caminho_matricula(imovel_id)
+    parcial = f"{filepath}.part"
+
+    # Verifica se já existe (e está completo)
+    if os.path.exists(filepath):
+        if pdf_valido(filepath):
+            logger.info(f"Matrícula já baixada: {filepath}")
+            return filepath
+        logger.warning(f"Matrícula local inválida, baixando novamente: {filepath}")
+        os.remove(filepath)
+
+    url = MATRICULA_URL.format(estado=estado, imovel_id=imovel_id)
+    inicio = os.path.getsize(parcial) if os.path.exists(parcial) else 0
+    headers = {'Range': f'bytes={inicio}-'} if inicio else {}
+
+    try:
+        with limite_etapa("caixa"):
+            with get_sessao_site_caixa().get(url, headers=headers, timeout=MATRICULA_TIMEOUT_S, stream=True) as response:
+                if response.status_code == 416:
+                    # .part maior que o arquivo no servidor: descarta (próxima tentativa recomeça)
+                    os.remove(parcial)
+                    logger.warning(f"Download parcial descartado da matrícula {imovel_id}")
+                    return None
+
+                if response.status_code not in (200, 206) or not \
+                        response.headers.get('content-type', '').startswith('application/pdf'):
+                    logger.warning(f"Matrícula não disponível: {url} (status: {response.status_code})")
+                    return None
+
+                # 206 = continuação do .part; 200 = servidor ignorou o Range
+                retomado = response.status_code == 206
+                esperado = response.headers.get('content-length')
+                esperado = int(esperado) + (inicio if retomado else 0) if esperado else None
+
+                with open(parcial, 'ab' if retomado else 'wb') as f:
+                    for bloco in response.iter_content(chunk_size=64 * 1024):
+                        f.write(bloco)
+
+        tamanho = os.path.getsize(parcial)
+        if esperado is not None and tamanho != esperado:
+            logger.warning(f"Download incompleto da matrícula {imovel_id}: {tamanho}/{esperado} bytes")
+            if tamanho > esperado:
+                os.remove(parcial)
+            return None
+        if not pdf_valido(parcial):
+            logger.warning(f"Arquivo baixado não é um PDF válido: {url}")
+            os.remove(parcial)
+            return None
+
+        os.replace(parcial, filepath)
+        logger.info(f"Matrícula baixada: {filepath} ({tamanho} bytes{', retomado' if retomado else ''})")
+        return filepath
+
+    except Exception as e:
+        # O .part fica para ser retomado na próxima tentativa
+        logger.error(f"Erro ao baixar matrícula {imovel_id}: {e}")
+        return None
+
+
+def prefetch_matriculas(
+    imovel_ids: List[str],
+    estado: str = "SP",
+    max_workers: Optional[int] = None
+) -> Dict[str, Optional[str]]:
+    """
+    Baixa as matrículas de vários imóveis em paralelo, antes da análise
+
+    Args:
+        imovel_ids: IDs dos imóveis
+        estado: UF dos imóveis
+        max_workers: Downloads simultâneos (default: MATRICULA_WORKERS); o limite
+                     da etapa "caixa" continua valendo
+
+    Returns:
+        Dict imovel_id -> caminho do PDF (None se indisponível)
+    """
+    ids = list(dict.fromkeys(str(i) for i in imovel_ids if i))
+    if not ids:
+        return {}
+
+    workers = min(max_workers or MATRICULA_WORKERS, len(ids))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="matricula") as executor:
+        matriculas = dict(zip(ids, executor.map(lambda i: baixar_matricula(i, estado), ids)))
+
+    disponiveis = sum(1 for c in matriculas.values() if c)
+    logger.info(f"Matrículas: {disponiveis}/{len(ids)} disponíveis")
+    return matriculas
+
+
+def triar_paginas_pdf(filepath: str) -> Dict[str, Any]:
+    """
+    Classifica cada página do PDF como texto (camada de texto utilizável)
+    ou escaneada (imagem, precisa de OCR/Vision)
+
+    Args:
+        filepath: Caminho do PDF
+
+    Returns:
+        Dicionário com tipo do documento (texto, escaneado, misto),
+        índices das páginas de texto e escaneadas e o texto das páginas de texto
+    """
+    triagem = {"tipo": None, "paginas_texto": [], "paginas_escaneadas": [], "texto": ""}
+    try:
+        import fitz  # PyMuPDF
+        textos = []
+        with fitz.open(filepath) as doc:
+            for i, page in enumerate(doc):
+                texto = page.get_text()
+                if len("".join(texto.split())) >= MIN_CARACTERES_PAGINA:
+                    triagem["paginas_texto"].append(i)
+                    textos.append(texto)
+                else:
+                    triagem["paginas_escaneadas"].append(i)
+        triagem["texto"] = "\n".join(textos)
+    except Exception as e:
+        logger.error(f"Erro na triagem do PDF {filepath}: {e}")
+        return triagem
+
+    if not triagem["paginas_escaneadas"]:
+        triagem["tipo"] = "texto"
+    elif not triagem["paginas_texto"]:
+        triagem["tipo"] = "escaneado"
+    else:
+        triagem["tipo"] = "misto"
+
+    logger.info(
+        f"Triagem {os.path.basename(filepath)}: {triagem['tipo']} "
+        f"({len(triagem['paginas_texto'])} texto, {len(triagem['paginas_escaneadas'])} escaneadas)"
+    )
+    return triagem
+
+
+def _dpi_pagina(page) -> float:
+    """DPI para renderizar a página: alvo em pixels, limitado à resolução da digitalização"""
+    lado_pol = max(page.rect.width, page.rect.height) / 72
+    dpi = ALVO_PIXELS / lado_pol
+
+    # Não adianta renderizar acima da resolução da imagem digitalizada
+    nativos = [
+        info["width"] / (info["bbox"][2] - info["bbox"][0]) * 72
+        for info in page.get_image_info()
+        if info["bbox"][2] - info["bbox"][0] > page.rect.width / 2
+    ]
+    if nativos:
+        dpi = min(dpi, max(nativos))
+
+    return max(DPI_MIN, min(DPI_MAX, dpi))
+
+
+def _caminho_render(sha: str, indice: int) -> Path:
+    """Arquivo da página renderizada no cache (hash do PDF, página, DPI e formato)"""
+    perfil = f"a{ALVO_PIXELS}-dpi{DPI_MIN}-{DPI_MAX}-cinza-q{QUALIDADE_JPEG}"
+    return RENDER_CACHE_DIR / sha[:2] / f"{sha}_p{indice}_{perfil}.jpg"
+
+
+def _renderizar_pagina(tarefa: Tuple[str, int, str]) -> Tuple[int, Optional[str]]:
+    """Renderiza uma página em JPEG no cache (executado em processo separado)"""
+    filepath, indice, destino = tarefa
+    try:
+        import fitz  # PyMuPDF
+        with fitz.open(filepath) as doc:
+            page = doc[indice]
+
+            # DPI adaptativo + escala de cinza + JPEG: payload bem menor que PNG colorido a 144 DPI
+            zoom = _dpi_pagina(page) / 72
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY)
+            img_bytes = pix.tobytes("jpeg", jpg_quality=QUALIDADE_JPEG)
+
+        # Escrita atômica: outro processo pode estar renderizando a mesma página
+        temporario = f"{destino}.{os.getpid()}.tmp"
+        with open(temporario, 'wb') as f:
+            f.write(img_bytes)
+        os.replace(temporario, destino)
+        return indice, destino
+    except Exception as e:
+        logger.error(f"Erro ao renderizar página {indice} de {filepath}: {e}")
+        return indice, None
+
+
+def _encerrar_pool_render() -> None:
+    """Encerra o pool de renderização (na saída do processo ou se o pool quebrar)"""
+    global _pool_render
+    with _pool_render_lock:
+        pool, _pool_render = _pool_render, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_pool_render() -> ProcessPoolExecutor:
+    """
+    Pool de processos compartilhado pelas threads de análise
+    (spawn, ver parallel_tools.pool_processos).
+    """
+    global _pool_render
+    with _pool_render_lock:
+        if _pool_render is None:
+            _pool_render = pool_processos(RENDER_WORKERS)
+            atexit.register(_encerrar_pool_render)
+        return _pool_render
+
+
+def renderizar_paginas(
+    filepath: str,
+    max_pages: int = MAX_PAGINAS_MATRICULA,
+    paginas: Optional[List[int]] = None,
+    sha: Optional[str] = None
+) -> List[str]:
+    """
+    Renderiza páginas do PDF em JPEG (tons de cinza, DPI adaptativo) usando o cache em disco
+
+    Páginas ausentes do cache são renderizadas em paralelo no pool de processos
+    do módulo (_get_pool_render), criado uma vez e reaproveitado entre documentos.
+
+    Args:
+        filepath: Caminho do PDF
+        max_pages: Número máximo de páginas
+        paginas: Índices das páginas (default: as primeiras max_pages)
+        sha: SHA-256 do PDF, se já calculado
+
+    Returns:
+        Caminhos dos JPEGs, na ordem das páginas
+    """
+    try:
+        if paginas is None:
+            import fitz  # PyMuPDF
+            with fitz.open(filepath) as doc:
+                paginas = list(range(len(doc)))
+        indices = list(paginas)[:max_pages]
+        sha = sha or sha256_arquivo(filepath)
+    except Exception as e:
+        logger.error(f"Erro ao abrir PDF {filepath}: {e}")
+        return []
+
+    caminhos = {i: _caminho_render(sha, i) for i in indices}
+    faltando = [(filepath, i, str(c)) for i, c in caminhos.items() if not c.exists()]
+
+    if faltando:
+        os.makedirs(caminhos[indices[0]].parent, exist_ok=True)
+        if len(faltando) > 1 and RENDER_WORKERS > 1:
+            try:
+                list(_get_pool_render().map(_renderizar_pagina, faltando))
+            except Exception as e:
+                # Ambientes sem suporte a multiprocessing ou pool quebrado: renderização sequencial
+                logger.warning(f"Pool de processos indisponível ({e}), renderizando sequencialmente")
+                _encerrar_pool_render()
+                for tarefa in faltando:
+                    if not Path(tarefa[2]).exists():
+                        _renderizar_pagina(tarefa)
+        else:
+            for tarefa in faltando:
+                _renderizar_pagina(tarefa)
+
+    renderizadas = [str(caminhos[i]) for i in indices if caminhos[i].exists()]
+    logger.info(f"Páginas renderizadas: {len(renderizadas)} "
+                f"({len(indices) - len(faltando)} do cache, {len(faltando)} novas)")
+    return renderizadas
+
+
+def pdf_to_images(
+    filepath: str,
+    max_pages: int = MAX_PAGINAS_MATRICULA,
+    paginas: Optional[List[int]] = None
+) -> List[str]:
+    """
+    Converte páginas do PDF em imagens base64 (JPEG em tons de cinza) para o GPT-4o Vision
+
+    Args:
+        filepath: Caminho do PDF
+        max_pages: Número máximo de páginas
+        paginas: Índices das páginas a converter (default: as primeiras max_pages)
+
+    Returns:
+        Lista de strings base64 das imagens
+    """
+    images = []
+    for caminho in renderizar_paginas(filepath, max_pages=max_pages, paginas=paginas):
+        with open(caminho, 'rb') as f:
+            images.append(base64.b64encode(f.read()).decode('utf-8'))
+    return images
+
+
+def chave_cache_matricula(filepath: str, sha: Optional[str] = None) -> str:
+    """Chave do cache em disco: SHA-256 do PDF + versão do prompt/modelo"""
+    return f"matricula:{sha or sha256_arquivo(filepath)}:{VERSAO_ANALISE_MATRICULA}"
+
+
+def analisar_matricula_com_gpt4(
+    filepath: str,
+    usar_cache: bool = True,
+    triagem: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Usa GPT-4o Vision para analisar a matrícula do imóvel
+
+    O resultado fica no cache em disco (tools/cache_tools.py), endereçado
+    pelo conteúdo do PDF: uma matrícula que não mudou não é reenviada à OpenAI.
+
+    Com a triagem, apenas as páginas escaneadas vão como imagem; o texto das
+    demais páginas vai no próprio prompt.
+
+    A resposta segue um JSON schema estrito (structured outputs) e é validada
+    em AnaliseMatricula; fora do schema, a chamada é repetida uma vez.
+
+    Args:
+        filepath: Caminho do PDF da matrícula
+        usar_cache: Se False, ignora o cache em disco (a análise nova é gravada)
+        triagem: Resultado de triar_paginas_pdf (default: todas as páginas como imagem)
+
+    Returns:
+        Dicionário com análise estruturada (AnaliseMatricula.para_dict)
+    """
+    if not OPENAI_API_KEY:
+        logger.error("OPENAI_API_KEY não configurada")
+        return {"erro": "API key não configurada"}
+
+    sha = sha256_arquivo(filepath)
+    chave = chave_cache_matricula(filepath, sha)
+    if usar_cache:
+        analise = get_cache().obter(chave)
+        if analise is not None:
+            logger.info(f"Análise da matrícula em cache (disco): {os.path.basename(filepath)}")
+            return analise
+
+    # Renderiza as páginas (só as escaneadas, se houver triagem) - JPEGs no cache em disco
+    paginas = triagem["paginas_escaneadas"] if triagem else None
+    images = renderizar_paginas(filepath, max_pages=MAX_PAGINAS_MATRICULA, paginas=paginas, sha=sha)
+
+    if not images:
+        logger.error("Não foi possível converter PDF para imagens")
+        return {"erro": "Falha na conversão do PDF"}
+
     # Monta as mensagens com as imagens
-    content = [{"type": "text", "text": prompt}]
+    content = [{"type": "text", "text": PROMPT_MATRICULA}]
 
-    for img_b64 in images:
+    if triagem and triagem.get("texto"):
+        content.append({
+            "type": "text",
+            "text": f"Texto extraído das demais páginas da matrícula:\n\n{triagem['texto']}"
+        })
+
+    # As imagens são lidas e codificadas em base64 durante o envio (gateway)
+    for caminho in images:
         content.append({
             "type": "image_url",
             "image_url": {
-                "url": f"data:image/png;base64,{img_b64}",
+                "url": ImagemArquivo(caminho, "image/jpeg"),
                 "detail": "high"
             }
         })
 
-    # Chama a API do GPT-4o
+    # Chama a API do GPT-4o (gateway compartilhado: pool, limites por minuto, retry)
     try:
-        headers = {
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": "gpt-4o",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": content
-                }
-            ],
-            "max_tokens": 4000,
-            "temperature": 0.1
-        }
+        for tentativa in range(1, TENTATIVAS_SCHEMA_MATRICULA + 1):
+            logger.info("Enviando matrícula para análise com GPT-4o Vision...")
 
-        logger.info("Enviando matrícula para análise com GPT-4o Vision...")
+            resposta = get_gateway().chat(
+                [{"role": "user", "content": content}],
+                modelo=MODELO_MATRICULA,
+                max_tokens=4000,
+                temperatura=0.1,
+                response_format=FORMATO_RESPOSTA_MATRICULA
+            )
 
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=120
-        )
+            if resposta.get("erro"):
+                return {"erro": resposta["erro"]}
 
-        if response.status_code != 200:
-            logger.error(f"Erro na API OpenAI: {response.status_code} - {response.text}")
-            return {"erro": f"API error: {response.status_code}"}
-
-        result = response.json()
-        answer = result["choices"][0]["message"]["content"]
-
-        # Extrai o JSON da resposta
-        # Remove possíveis markdown code blocks
-        answer = answer.replace("```json", "").replace("```", "").strip()
+            try:
+                analise = AnaliseMatricula.de_json(resposta["conteudo"]).para_dict()
+            except RespostaInvalida as e:
+                logger.warning(f"Resposta fora do schema ({tentativa}/{TENTATIVAS_SCHEMA_MATRICULA}): {e}")
+                continue
 
-        try:
-            analise = json.loads(answer)
-            logger.info(f"Análise concluída - Risco: {analise.get('classificacao_risco', 'N/I')}")
+            logger.info(f"Análise concluída - Risco: {analise['classificacao_risco']}")
+            get_cache().gravar(chave, analise)
             return analise
-        except json.JSONDecodeError:
-            logger.warning("Resposta não é JSON válido, retornando texto bruto")
-            return {"texto_bruto": answer, "erro": "JSON inválido"}
+
+        return {"texto_bruto": resposta["conteudo"], "erro": "Resposta fora do schema"}
 
     except Exception as e:
         logger.error(f"Erro ao chamar GPT-4o: {e}")
@@ -285,153 +586,10 @@ def analisar_matricula(texto: str) -> Dict[str, Any]:
     Returns:
         Dicionário com informações extraídas
     """
-    resultado = {
-        'matricula_numero': None,
-        'comarca': None,
-        'oficio': None,
-        'area_privativa_m2': None,
-        'area_total_m2': None,
-        'fracao_ideal': None,
-        'proprietarios': [],
-        'gravames': [],
-        'penhoras': [],
-        'alienacao_fiduciaria': None,
-        'consolidacao_propriedade': None,
-        'dividas_identificadas': [],
-        'riscos': [],
-        'score_risco': 0,  # 0-100, onde 100 = alto risco
-    }
-
-    texto_upper = texto.upper()
-    texto_clean = re.sub(r'\s+', ' ', texto)
-
-    # Extrai número da matrícula
-    match = re.search(r'matr[íi]cula[:\s]*(\d+[\.\d]*)', texto, re.IGNORECASE)
-    if match:
-        resultado['matricula_numero'] = match.group(1).replace('.', '')
-
-    # Extrai comarca
-    match = re.search(r'comarca[:\s]*([^\n,]+)', texto, re.IGNORECASE)
-    if match:
-        resultado['comarca'] = match.group(1).strip()
-
-    # Extrai áreas
-    match = re.search(r'[áa]rea\s+privativa[:\s=]*(\d+[,\.]\d+)\s*m', texto, re.IGNORECASE)
-    if match:
-        resultado['area_privativa_m2'] = float(match.group(1).replace(',', '.'))
-
-    match = re.search(r'[áa]rea\s+total[:\s=]*(\d+[,\.]\d+)\s*m', texto, re.IGNORECASE)
-    if match:
-        resultado['area_total_m2'] = float(match.group(1).replace(',', '.'))
-
-    # === DETECÇÃO DE GRAVAMES E RISCOS ===
-
-    # Penhoras
-    penhoras = re.findall(
-        r'PENHORA[:\s].*?(?:valor|d[íi]vida)[:\s]*(?:de\s+)?R\$\s*([\d\.,]+)',
-        texto, re.IGNORECASE | re.DOTALL
-    )
-    for valor in penhoras:
-        valor_float = float(valor.replace('.', '').replace(',', '.'))
-        resultado['penhoras'].append({
-            'tipo': 'PENHORA',
-            'valor': valor_float
-        })
-        resultado['dividas_identificadas'].append({
-            'tipo': 'Penhora',
-            'valor': valor_float
-        })
-
-    # Busca por valores de penhora no formato R$ X.XXX,XX
-    if 'PENHORA' in texto_upper:
-        valores_penhora = re.findall(
-            r'PENHORA.*?R\$\s*([\d\.]+[,]\d{2})',
-            texto, re.IGNORECASE | re.DOTALL
-        )
-        for valor in valores_penhora:
-            try:
-                valor_float = float(valor.replace('.', '').replace(',', '.'))
-                if valor_float > 100:  # Ignora valores muito baixos
-                    if not any(p['valor'] == valor_float for p in resultado['penhoras']):
-                        resultado['penhoras'].append({
-                            'tipo': 'PENHORA',
-                            'valor': valor_float
-                        })
-            except:
-                pass
-
-    # Alienação Fiduciária
-    if 'ALIENA' in texto_upper and 'FIDUCI' in texto_upper:
-        match = re.search(
-            r'ALIENA[ÇC][ÃA]O\s+FIDUCI[ÁA]RIA.*?d[íi]vida.*?R\$\s*([\d\.,]+)',
-            texto, re.IGNORECASE | re.DOTALL
-        )
-        if match:
-            valor = float(match.group(1).replace('.', '').replace(',', '.'))
-            resultado['alienacao_fiduciaria'] = {
-                'valor_original': valor,
-                'credor': 'Caixa Econômica Federal' if 'CAIXA' in texto_upper else 'Desconhecido'
-            }
-
-    # Consolidação da Propriedade
-    if 'CONSOLIDA' in texto_upper and 'PROPRIEDADE' in texto_upper:
-        match = re.search(
-            r'CONSOLIDA[ÇC][ÃA]O.*?PROPRIEDADE.*?R\$\s*([\d\.,]+)',
-            texto, re.IGNORECASE | re.DOTALL
-        )
-        valor = None
-        if match:
-            valor = float(match.group(1).replace('.', '').replace(',', '.'))
-
-        resultado['consolidacao_propriedade'] = {
-            'consolidada': True,
-            'valor': valor,
-            'motivo': 'Não purgação da mora' if 'PURG' in texto_upper else 'Inadimplência'
-        }
-
-    # Dívida de Condomínio
-    if 'CONDOM' in texto_upper and ('PENHORA' in texto_upper or 'EXECU' in texto_upper):
-        match = re.search(
-            r'CONDOM[ÍI]NIO.*?R\$\s*([\d\.,]+)',
-            texto, re.IGNORECASE | re.DOTALL
-        )
-        if match:
-            valor = float(match.group(1).replace('.', '').replace(',', '.'))
-            resultado['dividas_identificadas'].append({
-                'tipo': 'Condomínio',
-                'valor': valor,
-                'observacao': 'Dívida de condomínio averbada na matrícula'
-            })
-
-    # Hipoteca
-    if 'HIPOTECA' in texto_upper:
-        resultado['gravames'].append({
-            'tipo': 'HIPOTECA',
-            'descricao': 'Hipoteca registrada na matrícula'
-        })
-
-    # Indisponibilidade
-    if 'INDISPONIBILIDADE' in texto_upper:
-        resultado['gravames'].append({
-            'tipo': 'INDISPONIBILIDADE',
-            'descricao': 'Indisponibilidade de bens averbada'
-        })
-
-    # Usufruto
-    if 'USUFRUTO' in texto_upper:
-        resultado['gravames'].append({
-            'tipo': 'USUFRUTO',
-            'descricao': 'Usufruto registrado - verificar vigência'
-        })
-
-    # Ação judicial
-    if 'A[ÇC][ÃA]O' in texto_upper or 'PROCESSO' in texto_upper or 'EXECU[ÇC][ÃA]O' in texto_upper:
-        processos = re.findall(r'\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}', texto)
-        for proc in processos:
-            resultado['gravames'].append({
-                'tipo': 'PROCESSO_JUDICIAL',
-                'numero': proc
-            })
+    # Extração em uma passada pelos atos (R.1, AV.2 ...) - tools/matricula_tools.py
+    resultado = extrair_matricula(texto)
+    resultado['riscos'] = []
+    resultado['score_risco'] = 0  # 0-100, onde 100 = alto risco
 
     # === CÁLCULO DO SCORE DE RISCO ===
 
@@ -492,7 +650,13 @@ def analisar_matricula(texto: str) -> Dict[str, Any]:
     return resultado
 
 
-def analisar_documento_imovel(imovel_id: str, estado: str = "SP", force_download: bool = False, use_gpt4: bool = True) -> Dict[str, Any]:
+def analisar_documento_imovel(
+    imovel_id: str,
+    estado: str = "SP",
+    force_download: bool = False,
+    use_gpt4: bool = True,
+    baixar: bool = True
+) -> Dict[str, Any]:
     """
     Função principal: baixa e analisa a matrícula de um imóvel
 
@@ -501,6 +665,7 @@ def analisar_documento_imovel(imovel_id: str, estado: str = "SP", force_download
         estado: UF do imóvel
         force_download: Força novo download mesmo se já existir
         use_gpt4: Se True, usa GPT-4o Vision para análise (recomendado para PDFs escaneados)
+        baixar: Se False, usa só o PDF já baixado (ex: por prefetch_matriculas), sem rede
 
     Returns:
         Dicionário com análise completa do documento
@@ -525,21 +690,37 @@ def analisar_documento_imovel(imovel_id: str, estado: str = "SP", force_download
     try:
         # Remove arquivo existente se force_download
         if force_download:
-            filepath = os.path.join(DOCS_DIR, f"matricula_{imovel_id}.pdf")
+            filepath = caminho_matricula(imovel_id)
             if os.path.exists(filepath):
                 os.remove(filepath)
 
-        # Baixa a matrícula
-        filepath = baixar_matricula(imovel_id, estado)
+        # Baixa a matrícula (ou usa a da pré-busca)
+        if baixar or force_download:
+            filepath = baixar_matricula(imovel_id, estado)
+        else:
+            filepath = caminho_matricula(imovel_id)
+            filepath = filepath if pdf_valido(filepath) else None
 
         if filepath:
             resultado['matricula_disponivel'] = True
             resultado['matricula_arquivo'] = filepath
 
-            if use_gpt4 and OPENAI_API_KEY:
-                # Usa GPT-4o Vision para análise (melhor para PDFs escaneados)
+            # Triagem: páginas com camada de texto dispensam o Vision
+            triagem = triar_paginas_pdf(filepath)
+            resultado['triagem'] = {
+                k: triagem[k] for k in ('tipo', 'paginas_texto', 'paginas_escaneadas')
+            }
+
+            if triagem['tipo'] == 'texto':
+                # PDF nativo: análise pelo texto, sem rasterizar nenhuma página
+                resultado['analise'] = analisar_matricula(triagem['texto'])
+                resultado['metodo_analise'] = 'texto'
+            elif use_gpt4 and OPENAI_API_KEY:
+                # Usa GPT-4o Vision só nas páginas escaneadas (o texto das demais vai no prompt)
                 logger.info(f"Analisando matrícula com GPT-4o Vision...")
-                analise_gpt = analisar_matricula_com_gpt4(filepath)
+                analise_gpt = analisar_matricula_com_gpt4(
+                    filepath, triagem=triagem if triagem['tipo'] else None
+                )
 
                 if analise_gpt and not analise_gpt.get('erro'):
                     # Converte formato GPT-4o para formato padrão do pipeline
@@ -549,7 +730,7 @@ def analisar_documento_imovel(imovel_id: str, estado: str = "SP", force_download
                 else:
                     logger.warning(f"GPT-4o falhou, tentando análise por regex...")
                     # Fallback para análise por regex
-                    texto = extrair_texto_pdf(filepath)
+                    texto = triagem['texto'] or extrair_texto_pdf(filepath)
                     if texto:
                         resultado['analise'] = analisar_matricula(texto)
                         resultado['metodo_analise'] = 'regex_fallback'
@@ -581,87 +762,12 @@ def converter_analise_gpt4(gpt_analise: Dict[str, Any]) -> Dict[str, Any]:
     Converte a análise do GPT-4o para o formato padrão do pipeline
 
     Args:
-        gpt_analise: Resultado da análise do GPT-4o
+        gpt_analise: Resultado da análise do GPT-4o (dict no formato do schema)
 
     Returns:
         Dicionário no formato padrão
     """
-    resultado = {
-        'matricula_numero': gpt_analise.get('matricula_numero'),
-        'comarca': gpt_analise.get('comarca'),
-        'oficio': gpt_analise.get('oficio'),
-        'area_privativa_m2': gpt_analise.get('area_privativa_m2'),
-        'area_total_m2': gpt_analise.get('area_total_m2'),
-        'fracao_ideal': None,
-        'proprietarios': gpt_analise.get('proprietarios_atuais', []),
-        'gravames': [],
-        'penhoras': [],
-        'alienacao_fiduciaria': None,
-        'consolidacao_propriedade': None,
-        'dividas_identificadas': [],
-        'riscos': gpt_analise.get('riscos_identificados', []),
-        'score_risco': gpt_analise.get('score_risco', 0),
-        'classificacao_risco': gpt_analise.get('classificacao_risco', 'BAIXO'),
-        'resumo': gpt_analise.get('resumo', ''),
-    }
-
-    # Converte penhoras
-    for p in gpt_analise.get('penhoras', []):
-        resultado['penhoras'].append({
-            'tipo': p.get('tipo', 'PENHORA'),
-            'valor': p.get('valor', 0),
-            'credor': p.get('credor'),
-            'processo': p.get('processo'),
-            'data': p.get('data')
-        })
-        # Adiciona como dívida identificada
-        if p.get('valor'):
-            resultado['dividas_identificadas'].append({
-                'tipo': 'Penhora',
-                'valor': p.get('valor', 0),
-                'credor': p.get('credor'),
-                'observacao': f"Processo: {p.get('processo', 'N/I')}"
-            })
-
-    # Converte alienação fiduciária
-    af = gpt_analise.get('alienacao_fiduciaria', {})
-    if af and af.get('existe'):
-        resultado['alienacao_fiduciaria'] = {
-            'valor_original': af.get('valor_original', 0),
-            'credor': af.get('credor', 'Desconhecido'),
-            'consolidada': af.get('consolidada', False)
-        }
-
-    # Converte consolidação
-    cp = gpt_analise.get('consolidacao_propriedade', {})
-    if cp and cp.get('consolidada'):
-        resultado['consolidacao_propriedade'] = {
-            'consolidada': True,
-            'valor': cp.get('valor'),
-            'para_quem': cp.get('para_quem'),
-            'data': cp.get('data'),
-            'motivo': 'Não purgação da mora'
-        }
-
-    # Converte dívidas de condomínio
-    dc = gpt_analise.get('dividas_condominio', {})
-    if dc and dc.get('existe') and dc.get('valor'):
-        resultado['dividas_identificadas'].append({
-            'tipo': 'Condomínio',
-            'valor': dc.get('valor', 0),
-            'credor': dc.get('credor'),
-            'observacao': 'Dívida de condomínio averbada'
-        })
-
-    # Converte gravames
-    for g in gpt_analise.get('gravames', []):
-        resultado['gravames'].append({
-            'tipo': g.get('tipo', 'GRAVAME'),
-            'descricao': g.get('descricao'),
-            'valor': g.get('valor')
-        })
-
-    return resultado
+    return AnaliseMatricula.validar(gpt_analise).para_pipeline()
 
 
 def calcular_custos_documentacao(analise: Dict[str, Any], valor_imovel: float) -> Dict[str, float]:
@@ -826,175 +932,15 @@ def extrair_edital_pagina(imovel_id: str) -> Dict[str, Any]:
     Na Venda Online da Caixa, não existe edital PDF separado.
     As informações estão na página do imóvel.
 
+    Para vários imóveis, use buscar_editais (downloads em paralelo).
+
     Args:
         imovel_id: ID do imóvel
 
     Returns:
         Dicionário com dados do "edital"
     """
-    try:
-        from bs4 import BeautifulSoup
-    except ImportError:
-        logger.error("BeautifulSoup não instalado. Instale: pip install beautifulsoup4")
-        return {"erro": "BeautifulSoup não disponível"}
-
-    url = f'https://venda-imoveis.caixa.gov.br/sistema/detalhe-imovel.asp?hdnimovel={imovel_id}'
-
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-
-    try:
-        resp = requests.get(url, headers=headers, timeout=30)
-
-        if resp.status_code != 200:
-            return {'erro': f'Status {resp.status_code}'}
-
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        texto = soup.get_text()
-
-        dados = {
-            'imovel_id': imovel_id,
-            'titulo': None,
-            'valor_avaliacao': None,
-            'valor_minimo': None,
-            'desconto_percentual': None,
-            'tipo_imovel': None,
-            'quartos': None,
-            'matricula': None,
-            'comarca': None,
-            'oficio': None,
-            'inscricao_imobiliaria': None,
-            'area_total': None,
-            'area_privativa': None,
-            'endereco': None,
-            'descricao': None,
-            'formas_pagamento': [],
-            'aceita_financiamento': False,
-            'aceita_fgts': False,
-            'regras_condominio': None,
-            'limite_condominio_caixa_percentual': None,
-            'regras_tributos': None,
-            'gravames_matricula': False,
-            'regularizacao_comprador': True,
-            'ocupado': None,
-            'modalidade_venda': 'Venda Online',
-        }
-
-        # Titulo do edificio
-        h5 = soup.find('h5')
-        if h5:
-            dados['titulo'] = h5.get_text().strip()
-
-        # Valor de avaliacao
-        match = re.search(r'Valor de avalia[çc][ãa]o:\s*R\$\s*([\d\.,]+)', texto)
-        if match:
-            dados['valor_avaliacao'] = float(match.group(1).replace('.', '').replace(',', '.'))
-
-        # Valor minimo
-        match = re.search(r'Valor m[íi]nimo de venda:\s*R\$\s*([\d\.,]+)', texto)
-        if match:
-            dados['valor_minimo'] = float(match.group(1).replace('.', '').replace(',', '.'))
-
-        # Desconto
-        match = re.search(r'desconto de\s*([\d,]+)%', texto)
-        if match:
-            dados['desconto_percentual'] = float(match.group(1).replace(',', '.'))
-
-        # Tipo imovel
-        match = re.search(r'Tipo de im[óo]vel:\s*(\w+)', texto)
-        if match:
-            dados['tipo_imovel'] = match.group(1)
-
-        # Quartos
-        match = re.search(r'Quartos:\s*(\d+)', texto)
-        if match:
-            dados['quartos'] = int(match.group(1))
-
-        # Matricula
-        match = re.search(r'Matr[íi]cula\(?s?\)?:\s*(\d+)', texto)
-        if match:
-            dados['matricula'] = match.group(1)
-
-        # Comarca
-        match = re.search(r'Comarca:\s*([A-Z\s\-]+)', texto)
-        if match:
-            dados['comarca'] = match.group(1).strip()
-
-        # Oficio
-        match = re.search(r'Of[íi]cio:\s*(\d+)', texto)
-        if match:
-            dados['oficio'] = match.group(1)
-
-        # Inscricao imobiliaria
-        match = re.search(r'Inscri[çc][ãa]o imobili[áa]ria:\s*(\d+)', texto)
-        if match:
-            dados['inscricao_imobiliaria'] = match.group(1)
-
-        # Areas
-        match = re.search(r'[ÁA]rea total\s*=\s*([\d,]+)m', texto)
-        if match:
-            dados['area_total'] = float(match.group(1).replace(',', '.'))
-
-        match = re.search(r'[ÁA]rea privativa\s*=\s*([\d,]+)m', texto)
-        if match:
-            dados['area_privativa'] = float(match.group(1).replace(',', '.'))
-
-        # Endereco - pega só a primeira linha
-        match = re.search(r'Endere[çc]o:\s*([^,]+,[^,]+,[^-]+-[^,]+)', texto)
-        if match:
-            dados['endereco'] = match.group(1).strip()
-
-        # Descricao do imovel
-        match = re.search(r'Descri[çc][ãa]o:\s*([^\.]+\.)', texto)
-        if match:
-            dados['descricao'] = match.group(1).strip()
-
-        # Formas de pagamento
-        if 'Recursos pr' in texto:
-            dados['formas_pagamento'].append('Recursos próprios')
-        if 'financiamento' in texto.lower():
-            dados['formas_pagamento'].append('Financiamento SBPE')
-            dados['aceita_financiamento'] = True
-        if 'FGTS' in texto:
-            dados['formas_pagamento'].append('FGTS')
-            dados['aceita_fgts'] = True
-
-        # Regras condominio
-        match = re.search(r'Condom[íi]nio:\s*([^\.]+\.)([^\.]+\.)?', texto)
-        if match:
-            dados['regras_condominio'] = (match.group(1) + (match.group(2) or '')).strip()
-
-        # Limite condominio Caixa
-        match = re.search(r'limite de\s*(\d+)%', texto)
-        if match:
-            dados['limite_condominio_caixa_percentual'] = int(match.group(1))
-
-        # Regras tributos
-        if 'Tributos:' in texto:
-            match = re.search(r'Tributos:\s*([^\.]+\.)', texto)
-            if match:
-                dados['regras_tributos'] = match.group(1).strip()
-
-        # Gravames
-        if 'gravame' in texto.lower() or 'penhora' in texto.lower() or 'indisponibilidade' in texto.lower():
-            dados['gravames_matricula'] = True
-
-        # Regularizacao
-        if 'Regulariza' in texto and 'adquirente' in texto.lower():
-            dados['regularizacao_comprador'] = True
-
-        # Ocupacao
-        if 'ocupado' in texto.lower():
-            dados['ocupado'] = True
-        elif 'desocupado' in texto.lower():
-            dados['ocupado'] = False
-
-        return dados
-
-    except Exception as e:
-        logger.error(f"Erro ao extrair edital da página: {e}")
-        return {'erro': str(e)}
+    return buscar_editais([imovel_id], max_workers=1).get(str(imovel_id), {'erro': 'ID do imóvel vazio'})
 
 
 def analisar_edital_completo(imovel_id: str, estado: str = "SP") -> Dict[str, Any]:
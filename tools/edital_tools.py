@@ -0,0 +1,360 @@
+"""
+Tools de Edital - Busca em lote das paginas de detalhe do imovel (Caixa)
+Sessao HTTP com pool de conexoes, HTML guardado por hash de conteudo e
+parse com lxml (fallback: BeautifulSoup html.parser)
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from .parallel_tools import limite_etapa
+
+logger = logging.getLogger(__name__)
+
+# Parser rapido opcional
+try:
+    import lxml.html
+    LXML_DISPONIVEL = True
+except ImportError:
+    LXML_DISPONIVEL = False
+
+# Configuracoes
+EDITAL_URL = "https://venda-imoveis.caixa.gov.br/sistema/detalhe-imovel.asp?hdnimovel={imovel_id}"
+EDITAL_HTML_DIR = Path(os.getenv("EDITAL_HTML_DIR", "./data/editais"))
+EDITAL_WORKERS = int(os.getenv("EDITAL_WORKERS", "6"))
+EDITAL_TIMEOUT_S = float(os.getenv("EDITAL_TIMEOUT_S", "30"))
+
+# Indice imovel -> hash do ultimo HTML baixado
+INDICE_EDITAIS = EDITAL_HTML_DIR / "indice.json"
+
+_indice_lock = threading.Lock()
+_sessao_lock = threading.Lock()
+_sessao_edital: Optional[requests.Session] = None
+
+# ============================================================================
+# Padroes pre-compilados (sobre o texto da pagina)
+# ============================================================================
+
+RE_VALOR_AVALIACAO = re.compile(r'Valor de avalia[çc][ãa]o:\s*R\$\s*([\d\.,]+)')
+RE_VALOR_MINIMO = re.compile(r'Valor m[íi]nimo de venda:\s*R\$\s*([\d\.,]+)')
+RE_DESCONTO = re.compile(r'desconto de\s*([\d,]+)%')
+RE_TIPO_IMOVEL = re.compile(r'Tipo de im[óo]vel:\s*(\w+)')
+RE_QUARTOS = re.compile(r'Quartos:\s*(\d+)')
+RE_MATRICULA = re.compile(r'Matr[íi]cula\(?s?\)?:\s*(\d+)')
+RE_COMARCA = re.compile(r'Comarca:\s*([A-Z\s\-]+)')
+RE_OFICIO = re.compile(r'Of[íi]cio:\s*(\d+)')
+RE_INSCRICAO = re.compile(r'Inscri[çc][ãa]o imobili[áa]ria:\s*(\d+)')
+RE_AREA_TOTAL = re.compile(r'[ÁA]rea total\s*=\s*([\d,]+)m')
+RE_AREA_PRIVATIVA = re.compile(r'[ÁA]rea privativa\s*=\s*([\d,]+)m')
+RE_ENDERECO = re.compile(r'Endere[çc]o:\s*([^,]+,[^,]+,[^-]+-[^,]+)')
+RE_DESCRICAO = re.compile(r'Descri[çc][ãa]o:\s*([^\.]+\.)')
+RE_CONDOMINIO = re.compile(r'Condom[íi]nio:\s*([^\.]+\.)([^\.]+\.)?')
+RE_LIMITE_CONDOMINIO = re.compile(r'limite de\s*(\d+)%')
+RE_TRIBUTOS = re.compile(r'Tributos:\s*([^\.]+\.)')
+
+
+def get_sessao_site_caixa() -> requests.Session:
+    """Sessao HTTP compartilhada (pool de conexoes) com o site de venda da Caixa"""
+    global _sessao_edital
+    with _sessao_lock:
+        if _sessao_edital is None:
+            sessao = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=EDITAL_WORKERS,
+                pool_maxsize=EDITAL_WORKERS
+            )
+            sessao.mount("https://", adapter)
+            sessao.mount("http://", adapter)
+            sessao.headers.update({
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+            })
+            _sessao_edital = sessao
+        return _sessao_edital
+
+
+# ============================================================================
+# HTML por hash de conteudo
+# ============================================================================
+
+def _caminho_html(sha: str) -> Path:
+    return EDITAL_HTML_DIR / sha[:2] / f"{sha}.html"
+
+
+def salvar_html(html: str) -> str:
+    """
+    Guarda o HTML enderecado pelo SHA-256 do conteudo (paginas iguais = um arquivo)
+
+    Returns:
+        SHA-256 do HTML
+    """
+    conteudo = html.encode("utf-8")
+    sha = hashlib.sha256(conteudo).hexdigest()
+    caminho = _caminho_html(sha)
+    if not caminho.exists():
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = caminho.with_name(f"{caminho.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporario.write_bytes(conteudo)
+        os.replace(temporario, caminho)
+    return sha
+
+
+def ler_indice() -> Dict[str, str]:
+    """Indice imovel_id -> SHA-256 do ultimo HTML baixado"""
+    if INDICE_EDITAIS.exists():
+        with open(INDICE_EDITAIS, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def _atualizar_indice(novos: Dict[str, str]) -> None:
+    """Leitura-modificacao-escrita do indice sob lock (escrita atomica)"""
+    if not novos:
+        return
+    with _indice_lock:
+        indice = ler_indice()
+        indice.update(novos)
+        INDICE_EDITAIS.parent.mkdir(parents=True, exist_ok=True)
+        temporario = INDICE_EDITAIS.with_name(f"{INDICE_EDITAIS.name}.{os.getpid()}.tmp")
+        with open(temporario, "w") as f:
+            json.dump(indice, f)
+        os.replace(temporario, INDICE_EDITAIS)
+
+
+# ============================================================================
+# Parse
+# ============================================================================
+
+def _texto_e_titulo(html: str) -> Tuple[str, Optional[str]]:
+    """Texto da pagina (equivalente a get_text()) e o primeiro <h5>"""
+    if LXML_DISPONIVEL:
+        raiz = lxml.html.fromstring(html)
+        h5 = raiz.find(".//h5")
+        return raiz.text_content(), (h5.text_content().strip() if h5 is not None else None)
+
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    h5 = soup.find("h5")
+    return soup.get_text(), (h5.get_text().strip() if h5 else None)
+
+
+def _reais(valor: str) -> float:
+    return float(valor.replace('.', '').replace(',', '.'))
+
+
+def parsear_pagina_edital(html: str, imovel_id: str) -> Dict[str, Any]:
+    """
+    Extrai os dados de "edital" da pagina de detalhe do imovel
+
+    Args:
+        html: HTML da pagina detalhe-imovel.asp
+        imovel_id: ID do imovel
+
+    Returns:
+        Dicionario com dados do "edital"
+    """
+    texto, titulo = _texto_e_titulo(html)
+    texto_lower = texto.lower()
+
+    dados = {
+        'imovel_id': imovel_id,
+        'titulo': titulo,
+        'valor_avaliacao': None,
+        'valor_minimo': None,
+        'desconto_percentual': None,
+        'tipo_imovel': None,
+        'quartos': None,
+        'matricula': None,
+        'comarca': None,
+        'oficio': None,
+        'inscricao_imobiliaria': None,
+        'area_total': None,
+        'area_privativa': None,
+        'endereco': None,
+        'descricao': None,
+        'formas_pagamento': [],
+        'aceita_financiamento': False,
+        'aceita_fgts': False,
+        'regras_condominio': None,
+        'limite_condominio_caixa_percentual': None,
+        'regras_tributos': None,
+        'gravames_matricula': False,
+        'regularizacao_comprador': True,
+        'ocupado': None,
+        'modalidade_venda': 'Venda Online',
+    }
+
+    match = RE_VALOR_AVALIACAO.search(texto)
+    if match:
+        dados['valor_avaliacao'] = _reais(match.group(1))
+
+    match = RE_VALOR_MINIMO.search(texto)
+    if match:
+        dados['valor_minimo'] = _reais(match.group(1))
+
+    match = RE_DESCONTO.search(texto)
+    if match:
+        dados['desconto_percentual'] = float(match.group(1).replace(',', '.'))
+
+    match = RE_TIPO_IMOVEL.search(texto)
+    if match:
+        dados['tipo_imovel'] = match.group(1)
+
+    match = RE_QUARTOS.search(texto)
+    if match:
+        dados['quartos'] = int(match.group(1))
+
+    match = RE_MATRICULA.search(texto)
+    if match:
+        dados['matricula'] = match.group(1)
+
+    match = RE_COMARCA.search(texto)
+    if match:
+        dados['comarca'] = match.group(1).strip()
+
+    match = RE_OFICIO.search(texto)
+    if match:
+        dados['oficio'] = match.group(1)
+
+    match = RE_INSCRICAO.search(texto)
+    if match:
+        dados['inscricao_imobiliaria'] = match.group(1)
+
+    match = RE_AREA_TOTAL.search(texto)
+    if match:
+        dados['area_total'] = float(match.group(1).replace(',', '.'))
+
+    match = RE_AREA_PRIVATIVA.search(texto)
+    if match:
+        dados['area_privativa'] = float(match.group(1).replace(',', '.'))
+
+    # Endereco - pega so a primeira linha
+    match = RE_ENDERECO.search(texto)
+    if match:
+        dados['endereco'] = match.group(1).strip()
+
+    match = RE_DESCRICAO.search(texto)
+    if match:
+        dados['descricao'] = match.group(1).strip()
+
+    # Formas de pagamento
+    if 'Recursos pr' in texto:
+        dados['formas_pagamento'].append('Recursos próprios')
+    if 'financiamento' in texto_lower:
+        dados['formas_pagamento'].append('Financiamento SBPE')
+        dados['aceita_financiamento'] = True
+    if 'FGTS' in texto:
+        dados['formas_pagamento'].append('FGTS')
+        dados['aceita_fgts'] = True
+
+    match = RE_CONDOMINIO.search(texto)
+    if match:
+        dados['regras_condominio'] = (match.group(1) + (match.group(2) or '')).strip()
+
+    match = RE_LIMITE_CONDOMINIO.search(texto)
+    if match:
+        dados['limite_condominio_caixa_percentual'] = int(match.group(1))
+
+    if 'Tributos:' in texto:
+        match = RE_TRIBUTOS.search(texto)
+        if match:
+            dados['regras_tributos'] = match.group(1).strip()
+
+    if 'gravame' in texto_lower or 'penhora' in texto_lower or 'indisponibilidade' in texto_lower:
+        dados['gravames_matricula'] = True
+
+    if 'Regulariza' in texto and 'adquirente' in texto_lower:
+        dados['regularizacao_comprador'] = True
+
+    if 'ocupado' in texto_lower:
+        dados['ocupado'] = True
+    elif 'desocupado' in texto_lower:
+        dados['ocupado'] = False
+
+    return dados
+
+
+# ============================================================================
+# Busca em lote
+# ============================================================================
+
+def _buscar_edital(imovel_id: str) -> Dict[str, Any]:
+    """Baixa, guarda e interpreta a pagina de um imovel"""
+    try:
+        with limite_etapa("caixa"):
+            resp = get_sessao_site_caixa().get(
+                EDITAL_URL.format(imovel_id=imovel_id),
+                timeout=EDITAL_TIMEOUT_S
+            )
+
+        if resp.status_code != 200:
+            return {'erro': f'Status {resp.status_code}'}
+
+        sha = salvar_html(resp.text)
+        dados = parsear_pagina_edital(resp.text, imovel_id)
+        dados['html_sha256'] = sha
+        return dados
+
+    except Exception as e:
+        logger.error(f"Erro ao extrair edital da pagina {imovel_id}: {e}")
+        return {'erro': str(e)}
+
+
+def buscar_editais(imovel_ids: List[str], max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Busca as paginas de varios imoveis em paralelo (sessao com pool de conexoes)
+
+    Args:
+        imovel_ids: IDs dos imoveis
+        max_workers: Downloads simultaneos (default: EDITAL_WORKERS); o limite
+                     da etapa "caixa" continua valendo
+
+    Returns:
+        Dict imovel_id -> dados do edital (ou {'erro': ...})
+    """
+    ids = list(dict.fromkeys(str(i) for i in imovel_ids if i))
+    if not ids:
+        return {}
+
+    workers = min(max_workers or EDITAL_WORKERS, len(ids))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="edital") as executor:
+        editais = dict(zip(ids, executor.map(_buscar_edital, ids)))
+
+    _atualizar_indice({i: d['html_sha256'] for i, d in editais.items() if d.get('html_sha256')})
+
+    erros = sum(1 for d in editais.values() if d.get('erro'))
+    logger.info(f"Editais: {len(ids) - erros}/{len(ids)} paginas obtidas")
+    return editais
+
+
+def reprocessar_editais(imovel_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Interpreta de novo o HTML ja baixado (ex: apos mudar os padroes), sem rede
+
+    Args:
+        imovel_ids: IDs a reprocessar (default: todos do indice)
+
+    Returns:
+        Dict imovel_id -> dados do edital (so imoveis com HTML guardado)
+    """
+    indice = ler_indice()
+    ids = indice.keys() if imovel_ids is None else [str(i) for i in imovel_ids]
+
+    editais = {}
+    for imovel_id in ids:
+        sha = indice.get(imovel_id)
+        caminho = _caminho_html(sha) if sha else None
+        if caminho is None or not caminho.exists():
+            continue
+        dados = parsear_pagina_edital(caminho.read_text(encoding="utf-8"), imovel_id)
+        dados['html_sha256'] = sha
+        editais[imovel_id] = dados
+    return editais
@@ -0,0 +1,484 @@
+"""
+Tools de LLM - Gateway compartilhado para a API da OpenAI
+Cliente HTTP com pool de conexoes, limites de requisicoes/tokens por minuto,
+retry com backoff exponencial, coalescencia de prompts identicos e metricas por chamada
+"""
+
+import os
+import re
+import json
+import time
+import base64
+import random
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from .parallel_tools import limite_etapa, LIMITES_ETAPA
+
+logger = logging.getLogger(__name__)
+
+# Configuracoes
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+LLM_RPM = int(os.getenv("LLM_RPM", "60"))              # requisicoes por minuto
+LLM_TPM = int(os.getenv("LLM_TPM", "90000"))           # tokens por minuto
+LLM_MAX_TENTATIVAS = int(os.getenv("LLM_MAX_TENTATIVAS", "5"))
+LLM_BACKOFF_BASE_S = float(os.getenv("LLM_BACKOFF_BASE_S", "1.0"))
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "120"))
+
+# Status que justificam nova tentativa
+STATUS_RETRY = {408, 409, 429, 500, 502, 503, 504}
+
+# Marcador de ImagemArquivo no JSON serializado
+RE_MARCADOR_IMAGEM = re.compile(r"\\u0000IMG(\d+)\\u0000")
+
+# Estimativa de tokens de uma imagem com detail=high (~4 tiles de 512px)
+TOKENS_IMAGEM = 765
+
+
+class ImagemArquivo:
+    """
+    Imagem em disco usada como image_url de uma mensagem.
+
+    O arquivo so e lido (e codificado em base64) enquanto o corpo da
+    requisicao e enviado, em blocos - as imagens nao ficam todas na memoria.
+    """
+
+    def __init__(self, caminho: str, mime: str = "image/jpeg"):
+        self.caminho = str(caminho)
+        self.mime = mime
+        self.tamanho = os.path.getsize(self.caminho)
+
+    def prefixo(self) -> bytes:
+        return f"data:{self.mime};base64,".encode("ascii")
+
+    def tamanho_codificado(self) -> int:
+        return len(self.prefixo()) + 4 * ((self.tamanho + 2) // 3)
+
+    def blocos(self, bloco: int = 3 * 4096):
+        yield self.prefixo()
+        with open(self.caminho, "rb") as f:
+            for parte in iter(lambda: f.read(bloco), b""):
+                yield base64.b64encode(parte)
+
+
+class CorpoStreaming:
+    """
+    Corpo JSON da requisicao gerado sob demanda.
+
+    O payload e serializado com marcadores no lugar das imagens; os trechos
+    de texto e as imagens (base64 em blocos) sao entregues via read().
+    O tamanho total e conhecido de antemao (Content-Length, sem chunked).
+    """
+
+    def __init__(self, payload: Dict):
+        imagens: List[ImagemArquivo] = []
+
+        def _marcar(obj):
+            if isinstance(obj, ImagemArquivo):
+                imagens.append(obj)
+                return f"\x00IMG{len(imagens) - 1}\x00"
+            raise TypeError(f"Tipo nao serializavel: {type(obj).__name__}")
+
+        # A imagem vira "\u0000IMG<n>\u0000"; as aspas ficam nos trechos de texto
+        pedacos = RE_MARCADOR_IMAGEM.split(json.dumps(payload, default=_marcar))
+        self._partes: List[Any] = [
+            imagens[int(pedaco)] if i % 2 else pedaco.encode("ascii")
+            for i, pedaco in enumerate(pedacos)
+        ]
+
+        self._total = sum(
+            p.tamanho_codificado() if isinstance(p, ImagemArquivo) else len(p)
+            for p in self._partes
+        )
+        self._gerador = self._gerar()
+        self._buffer = b""
+
+    def _gerar(self):
+        for parte in self._partes:
+            if isinstance(parte, ImagemArquivo):
+                yield from parte.blocos()
+            else:
+                yield parte
+
+    def __len__(self) -> int:
+        return self._total
+
+    def read(self, n: int = -1) -> bytes:
+        """Proximos n bytes do corpo (n < 0: todo o restante)"""
+        if n is None or n < 0:
+            restante = self._buffer + b"".join(self._gerador)
+            self._buffer = b""
+            return restante
+        while len(self._buffer) < n:
+            try:
+                self._buffer += next(self._gerador)
+            except StopIteration:
+                break
+        parte, self._buffer = self._buffer[:n], self._buffer[n:]
+        return parte
+
+
+class LimitadorPorMinuto:
+    """
+    Token bucket sincrono (thread-safe) com reposicao continua.
+
+    Comporta ate `por_minuto` unidades em rajada e repoe por_minuto/60 por segundo.
+    """
+
+    def __init__(self, por_minuto: int):
+        self.capacidade = float(max(1, por_minuto))
+        self.taxa = self.capacidade / 60.0
+        self.disponivel = self.capacidade
+        self.ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _repor(self) -> None:
+        agora = time.monotonic()
+        self.disponivel = min(self.capacidade, self.disponivel + (agora - self.ultimo) * self.taxa)
+        self.ultimo = agora
+
+    def aguardar(self, quantidade: float = 1.0) -> float:
+        """
+        Consome `quantidade` unidades, esperando a reposicao se necessario.
+
+        Returns:
+            Segundos esperados
+        """
+        quantidade = min(quantidade, self.capacidade)
+        esperado = 0.0
+        while True:
+            with self._lock:
+                self._repor()
+                if self.disponivel >= quantidade:
+                    self.disponivel -= quantidade
+                    return esperado
+                espera = (quantidade - self.disponivel) / self.taxa
+            time.sleep(espera)
+            esperado += espera
+
+    def ajustar(self, quantidade: float) -> None:
+        """Corrige o consumo apos a resposta (positivo = consumiu mais que o estimado)"""
+        with self._lock:
+            self._repor()
+            self.disponivel = min(self.capacidade, self.disponivel - quantidade)
+
+
+def estimar_tokens(mensagens: List[Dict], max_tokens: int) -> int:
+    """Estimativa de tokens de uma chamada (~4 caracteres por token + imagens + resposta)"""
+    caracteres = 0
+    imagens = 0
+    for mensagem in mensagens:
+        conteudo = mensagem.get("content")
+        if isinstance(conteudo, str):
+            caracteres += len(conteudo)
+            continue
+        for parte in conteudo or []:
+            if parte.get("type") == "image_url":
+                imagens += 1
+            else:
+                caracteres += len(parte.get("text", ""))
+    return caracteres // 4 + imagens * TOKENS_IMAGEM + max_tokens
+
+
+class GatewayLLM:
+    """
+    Cliente unico para chat completions.
+
+    - Sessao HTTP com pool de conexoes (reaproveita TLS entre chamadas)
+    - Limites de requisicoes e tokens por minuto compartilhados entre threads
+    - Concorrencia limitada pela etapa "openai" (tools/parallel_tools.py)
+    - Retry com backoff exponencial + jitter em 429/5xx e erros de conexao,
+      respeitando Retry-After
+    - Chamadas identicas simultaneas sao coalescidas em uma unica requisicao
+    - Imagens em disco (ImagemArquivo) sao codificadas durante o envio do corpo
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = OPENAI_BASE_URL,
+        rpm: int = LLM_RPM,
+        tpm: int = LLM_TPM,
+        max_tentativas: int = LLM_MAX_TENTATIVAS,
+        backoff_base_s: float = LLM_BACKOFF_BASE_S,
+        timeout_s: float = LLM_TIMEOUT_S
+    ):
+        """
+        Args:
+            api_key: Chave da OpenAI (default: OPENAI_API_KEY)
+            base_url: URL base da API (permite servidor local em testes)
+            rpm: Requisicoes por minuto
+            tpm: Tokens por minuto
+            max_tentativas: Tentativas por chamada (inclui a primeira)
+            backoff_base_s: Espera base do backoff exponencial
+            timeout_s: Timeout de cada requisicao
+        """
+        self.api_key = api_key or OPENAI_API_KEY
+        self.base_url = base_url.rstrip("/")
+        self.max_tentativas = max(1, max_tentativas)
+        self.backoff_base_s = backoff_base_s
+        self.timeout_s = timeout_s
+
+        self.limite_requisicoes = LimitadorPorMinuto(rpm)
+        self.limite_tokens = LimitadorPorMinuto(tpm)
+
+        pool = max(4, LIMITES_ETAPA.get("openai") or 4)
+        self.sessao = requests.Session()
+        self.sessao.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool))
+        self.sessao.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool))
+
+        self._em_voo: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._metricas = {
+            "chamadas": 0,
+            "requisicoes": 0,
+            "retries": 0,
+            "coalescidas": 0,
+            "erros": 0,
+            "tokens_prompt": 0,
+            "tokens_resposta": 0,
+            "latencia_total_s": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # API publica
+    # ------------------------------------------------------------------
+
+    def chat(
+        self,
+        mensagens: List[Dict],
+        modelo: str = "gpt-4o",
+        max_tokens: int = 1000,
+        temperatura: float = 0.1,
+        **extra: Any
+    ) -> Dict[str, Any]:
+        """
+        Executa uma chamada de chat completions.
+
+        Args:
+            mensagens: Lista de mensagens no formato da OpenAI
+            modelo: Nome do modelo
+            max_tokens: Maximo de tokens na resposta
+            temperatura: Temperatura
+            **extra: Demais campos do payload (ex: response_format)
+
+        Returns:
+            Dict com conteudo, uso (tokens), latencia_s, tentativas e coalescida;
+            em caso de falha, Dict com erro (e status, se houver)
+        """
+        payload = {
+            "model": modelo,
+            "messages": mensagens,
+            "max_tokens": max_tokens,
+            "temperature": temperatura,
+            **extra
+        }
+        chave = hashlib.sha256(json.dumps(
+            payload, sort_keys=True, default=lambda o: f"{o.caminho}:{o.tamanho}"
+        ).encode("utf-8")).hexdigest()
+
+        with self._lock:
+            self._metricas["chamadas"] += 1
+            futuro = self._em_voo.get(chave)
+            lider = futuro is None
+            if lider:
+                futuro = Future()
+                self._em_voo[chave] = futuro
+
+        if not lider:
+            with self._lock:
+                self._metricas["coalescidas"] += 1
+            return {**futuro.result(), "coalescida": True}
+
+        try:
+            resultado = self._executar(payload)
+        except Exception as e:  # Garante que seguidores nao fiquem presos
+            resultado = {"erro": str(e)}
+        finally:
+            with self._lock:
+                self._em_voo.pop(chave, None)
+
+        futuro.set_result(resultado)
+        return {**resultado, "coalescida": False}
+
+    def metricas(self) -> Dict[str, Any]:
+        """Metricas acumuladas do gateway"""
+        with self._lock:
+            m = dict(self._metricas)
+        m["latencia_media_s"] = round(m["latencia_total_s"] / m["requisicoes"], 3) if m["requisicoes"] else 0.0
+        m["latencia_total_s"] = round(m["latencia_total_s"], 3)
+        return m
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _espera_retry(self, tentativa: int, response: Optional[requests.Response]) -> float:
+        """Retry-After do servidor ou backoff exponencial com jitter"""
+        if response is not None:
+            try:
+                return float(response.headers.get("Retry-After"))
+            except (TypeError, ValueError):
+                pass
+        return self.backoff_base_s * (2 ** tentativa) * (0.5 + random.random() / 2)
+
+    def _executar(self, payload: Dict) -> Dict[str, Any]:
+        if not self.api_key:
+            return {"erro": "OPENAI_API_KEY nao configurada"}
+
+        estimativa = estimar_tokens(payload["messages"], payload.get("max_tokens", 0))
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        inicio = time.monotonic()
+        ultimo_erro: Dict[str, Any] = {}
+
+        for tentativa in range(self.max_tentativas):
+            if tentativa:
+                espera = self._espera_retry(tentativa - 1, ultimo_erro.get("_response"))
+                logger.warning(f"LLM: tentativa {tentativa + 1}/{self.max_tentativas} em {espera:.1f}s "
+                               f"({ultimo_erro.get('erro')})")
+                with self._lock:
+                    self._metricas["retries"] += 1
+                time.sleep(espera)
+
+            self.limite_requisicoes.aguardar()
+            self.limite_tokens.aguardar(estimativa)
+
+            response = None
+            try:
+                with limite_etapa("openai"):
+                    inicio_req = time.monotonic()
+                    response = self.sessao.post(
+                        f"{self.base_url}/chat/completions",
+                        headers=headers,
+                        data=CorpoStreaming(payload),  # novo a cada tentativa
+                        timeout=self.timeout_s
+                    )
+                    latencia_req = time.monotonic() - inicio_req
+            except requests.RequestException as e:
+                with self._lock:
+                    self._metricas["requisicoes"] += 1
+                ultimo_erro = {"erro": str(e)}
+                continue
+
+            with self._lock:
+                self._metricas["requisicoes"] += 1
+                self._metricas["latencia_total_s"] += latencia_req
+
+            if response.status_code == 200:
+                return self._processar_resposta(response, estimativa, inicio, tentativa + 1)
+
+            ultimo_erro = {
+                "erro": f"API error: {response.status_code}",
+                "status": response.status_code,
+                "_response": response
+            }
+            if response.status_code not in STATUS_RETRY:
+                logger.error(f"Erro na API OpenAI: {response.status_code} - {response.text[:500]}")
+                break
+
+        with self._lock:
+            self._metricas["erros"] += 1
+        ultimo_erro.pop("_response", None)
+        return {
+            **ultimo_erro,
+            "tentativas": tentativa + 1,
+            "latencia_s": round(time.monotonic() - inicio, 3)
+        }
+
+    def _processar_resposta(
+        self,
+        response: requests.Response,
+        estimativa: int,
+        inicio: float,
+        tentativas: int
+    ) -> Dict[str, Any]:
+        dados = response.json()
+        uso = dados.get("usage") or {}
+        tokens_prompt = uso.get("prompt_tokens", 0)
+        tokens_resposta = uso.get("completion_tokens", 0)
+
+        # Corrige o limitador de tokens com o consumo real
+        if uso:
+            self.limite_tokens.ajustar(tokens_prompt + tokens_resposta - estimativa)
+
+        latencia = time.monotonic() - inicio
+        with self._lock:
+            self._metricas["tokens_prompt"] += tokens_prompt
+            self._metricas["tokens_resposta"] += tokens_resposta
+
+        logger.info(f"LLM {dados.get('model', '')}: {latencia:.2f}s, "
+                    f"{tokens_prompt}+{tokens_resposta} tokens, {tentativas} tentativa(s)")
+
+        return {
+            "conteudo": dados["choices"][0]["message"]["content"],
+            "modelo": dados.get("model"),
+            "uso": {"prompt_tokens": tokens_prompt, "completion_tokens": tokens_resposta},
+            "latencia_s": round(latencia, 3),
+            "tentativas": tentativas
+        }
+
+
+_gateway: Optional[GatewayLLM] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> GatewayLLM:
+    """Gateway compartilhado do processo"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = GatewayLLM()
+        return _gateway
+
+
+def criar_llm_langchain(modelo: str = "gpt-4o", temperatura: float = 0.2):
+    """
+    ChatOpenAI (LangChain/CrewAI) usando a mesma configuracao do gateway:
+    URL base, timeout, tentativas e o limitador de requisicoes por minuto
+    compartilhado com as chamadas diretas.
+
+    Args:
+        modelo: Nome do modelo
+        temperatura: Temperatura
+
+    Returns:
+        Instancia de ChatOpenAI
+    """
+    from langchain_openai import ChatOpenAI
+
+    kwargs = dict(
+        model=modelo,
+        temperature=temperatura,
+        api_key=OPENAI_API_KEY,
+        base_url=OPENAI_BASE_URL,
+        timeout=LLM_TIMEOUT_S,
+        max_retries=LLM_MAX_TENTATIVAS - 1
+    )
+
+    try:
+        from langchain_core.rate_limiters import BaseRateLimiter
+    except ImportError:
+        return ChatOpenAI(**kwargs)
+
+    limitador = get_gateway().limite_requisicoes
+
+    class _LimitadorGateway(BaseRateLimiter):
+        def acquire(self, *, blocking: bool = True) -> bool:
+            limitador.aguardar()
+            return True
+
+        async def aacquire(self, *, blocking: bool = True) -> bool:
+            import asyncio
+            await asyncio.to_thread(limitador.aguardar)
+            return True
+
+    return ChatOpenAI(**kwargs, rate_limiter=_LimitadorGateway())
@@ -1,20 +1,111 @@
 """
 Tools de Pesquisa de Mercado - Busca de precos reais na web
+Estatisticas de preco/m2 por bairro em cache de dois niveis (memoria + disco),
+escaladas pela area de cada imovel; falhas da API ficam em cache por pouco tempo
 """
 
 import os
+import re
 import json
 import logging
+import threading
+import unicodedata
 import requests
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 import time
 
+from .parallel_tools import limite_etapa
+from .cache_tools import get_cache
+
 logger = logging.getLogger(__name__)
 
-# Cache simples em memoria
-_cache_precos = {}
-_cache_timeout = 3600 * 24  # 24 horas
+# Validade das estatisticas por bairro (uma consulta a API por bairro por dia)
+# e das falhas (cache negativo, para nao insistir num endpoint fora do ar)
+MERCADO_TTL_HORAS = float(os.getenv("MERCADO_TTL_HORAS", "24"))
+MERCADO_TTL_FALHA_MIN = float(os.getenv("MERCADO_TTL_FALHA_MIN", "30"))
+
+# Status da API que indicam endpoint indisponivel/bloqueado (vale para todos os bairros)
+STATUS_API_INDISPONIVEL = {403, 429, 500, 502, 503, 504}
+CHAVE_API_INDISPONIVEL = "mercado:vivareal:indisponivel"
+
+# Nivel 1: memoria do processo (nivel 2: cache em disco de tools/cache_tools.py)
+_cache_bairros: Dict[str, Dict] = {}
+_cache_lock = threading.Lock()
+_locks_bairro: Dict[str, threading.Lock] = {}
+
+
+def _chave_bairro(cidade: str, bairro: str, tipo: str) -> str:
+    """Chave do bairro: independente de area e quartos"""
+    return "mercado:" + "|".join(normalizar_nome(p) for p in (cidade, bairro, tipo))
+
+
+def _ler_cache_mercado(chave: str) -> Optional[Dict]:
+    """Entrada valida da memoria ou, na falta, do disco"""
+    entrada = _cache_bairros.get(chave)
+    if entrada is None:
+        entrada = get_cache().obter(chave)
+        if entrada is not None:
+            _cache_bairros[chave] = entrada
+    if entrada and entrada["expira_em"] > time.time():
+        return entrada["dados"]
+    return None
+
+
+def _gravar_cache_mercado(chave: str, dados: Dict, ttl_s: float) -> None:
+    entrada = {"expira_em": time.time() + ttl_s, "dados": dados}
+    _cache_bairros[chave] = entrada
+    get_cache().gravar(chave, entrada)
+
+
+def _lock_bairro(chave: str) -> threading.Lock:
+    with _cache_lock:
+        return _locks_bairro.setdefault(chave, threading.Lock())
+
+
+def estatisticas_bairro(cidade: str, bairro: str, tipo: str = "Apartamento") -> Dict:
+    """
+    Estatisticas de preco/m2 do bairro na API do VivaReal/ZAP, com cache.
+
+    Sucessos valem MERCADO_TTL_HORAS; falhas (sem anuncios, erro) valem
+    MERCADO_TTL_FALHA_MIN. Com a API fora do ar, nenhum bairro a consulta
+    ate o cache negativo expirar. Threads pedindo o mesmo bairro fazem uma
+    unica consulta.
+
+    Args:
+        cidade: Nome da cidade
+        bairro: Nome do bairro
+        tipo: Tipo (Apartamento, Casa, etc)
+
+    Returns:
+        Dict com sucesso e, se houver, preco_m2, preco_m2_min, preco_m2_max,
+        amostras e imoveis_similares
+    """
+    chave = _chave_bairro(cidade, bairro, tipo)
+    dados = _ler_cache_mercado(chave)
+    if dados is not None:
+        logger.info(f"Cache hit para {bairro}/{cidade}")
+        return dados
+
+    with _lock_bairro(chave):
+        # Outra thread pode ter consultado o bairro enquanto esperavamos
+        dados = _ler_cache_mercado(chave)
+        if dados is not None:
+            return dados
+
+        if _ler_cache_mercado(CHAVE_API_INDISPONIVEL) is not None:
+            return {"sucesso": False, "erro": "API indisponivel (cache negativo)"}
+
+        dados = _buscar_vivareal_api(cidade, bairro, tipo)
+        if dados.get("sucesso"):
+            ttl_s = MERCADO_TTL_HORAS * 3600
+        else:
+            ttl_s = MERCADO_TTL_FALHA_MIN * 60
+            if dados.get("indisponivel"):
+                logger.warning(f"API de mercado indisponivel, sem novas consultas por {MERCADO_TTL_FALHA_MIN:.0f} min")
+                _gravar_cache_mercado(CHAVE_API_INDISPONIVEL, {"erro": dados.get("erro")}, ttl_s)
+        _gravar_cache_mercado(chave, dados, ttl_s)
+        return dados
 
 
 def buscar_preco_mercado_web(
@@ -42,15 +133,6 @@ def buscar_preco_mercado_web(
     Returns:
         Dict com preco_m2, valor_estimado, fonte e confianca
     """
-    cache_key = f"{cidade}_{bairro}_{tipo_imovel}_{area_m2}_{quartos}"
-
-    # Verifica cache
-    if cache_key in _cache_precos:
-        cached = _cache_precos[cache_key]
-        if time.time() - cached["timestamp"] < _cache_timeout:
-            logger.info(f"Cache hit para {bairro}/{cidade}")
-            return cached["data"]
-
     logger.info(f"Buscando preco de mercado: {bairro}, {cidade}")
 
     resultado = {
@@ -74,8 +156,8 @@ def buscar_preco_mercado_web(
 
     # Tenta diferentes fontes
 
-    # 1. Tenta API do VivaReal/ZAP (OLX Group)
-    vr_result = _buscar_vivareal_api(cidade, bairro, tipo_imovel, area_m2, quartos)
+    # 1. Tenta API do VivaReal/ZAP (OLX Group) - estatisticas do bairro, em cache
+    vr_result = estatisticas_bairro(cidade, bairro, tipo_imovel)
     if vr_result.get("sucesso"):
         resultado.update(vr_result)
         resultado["fonte"] = "vivareal_api"
@@ -96,30 +178,18 @@ def buscar_preco_mercado_web(
         resultado["fonte"] = "estimativa_mercado"
         resultado["confianca"] = "baixa"
 
-    # Calcula valores estimados baseado no preco/m2
+    # Calcula valores estimados baseado no preco/m2 (escala do bairro para a area do imovel)
     if resultado["preco_m2"] > 0:
         resultado["valor_estimado"] = resultado["preco_m2"] * area_m2
         resultado["valor_min"] = resultado["preco_m2_min"] * area_m2 if resultado["preco_m2_min"] > 0 else resultado["valor_estimado"] * 0.85
         resultado["valor_max"] = resultado["preco_m2_max"] * area_m2 if resultado["preco_m2_max"] > 0 else resultado["valor_estimado"] * 1.15
 
-    # Salva no cache
-    _cache_precos[cache_key] = {
-        "timestamp": time.time(),
-        "data": resultado
-    }
-
     return resultado
 
 
-def _buscar_vivareal_api(
-    cidade: str,
-    bairro: str,
-    tipo: str,
-    area: float,
-    quartos: int
-) -> Dict:
+def _buscar_vivareal_api(cidade: str, bairro: str, tipo: str) -> Dict:
     """
-    Busca precos na API publica do VivaReal/ZAP.
+    Busca precos na API publica do VivaReal/ZAP (listagens do bairro).
     Nota: API pode ter limites de requisicao.
     """
     try:
@@ -147,7 +217,8 @@ def _buscar_vivareal_api(
             "from": 0
         }
 
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        with limite_etapa("mercado"):
+            response = requests.get(url, headers=headers, params=params, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
@@ -187,23 +258,39 @@ def _buscar_vivareal_api(
                         "imoveis_similares": imoveis[:5]
                     }
 
-        return {"sucesso": False}
+            return {"sucesso": False}
 
-    except Exception as e:
+        return {
+            "sucesso": False,
+            "erro": f"Status {response.status_code}",
+            "indisponivel": response.status_code in STATUS_API_INDISPONIVEL
+        }
+
+    except requests.exceptions.JSONDecodeError as e:
+        # Resposta invalida so deste bairro
+        logger.warning(f"Resposta invalida da VivaReal API para {bairro}: {e}")
+        return {"sucesso": False, "erro": str(e)}
+
+    except requests.RequestException as e:
+        # Conexao/timeout: a API fica indisponivel para todos os bairros
         logger.warning(f"Erro ao buscar VivaReal API: {e}")
+        return {"sucesso": False, "erro": str(e), "indisponivel": True}
+
+    except Exception as e:
+        # Erro de parse no payload deste bairro (ex: listagem sem area)
+        logger.warning(f"Erro ao ler listagens da VivaReal API para {bairro}: {e}")
         return {"sucesso": False, "erro": str(e)}
 
 
-def _buscar_base_regional(cidade: str, bairro: str, tipo: str) -> Dict:
-    """
-    Busca em base de dados regional de precos medios.
-    Dados atualizados periodicamente de fontes publicas.
-    """
-    # Base de dados de precos medios por bairro (dados de mercado 2024/2025)
-    # Fonte: CRECI-SP, SECOVI, FipeZAP
+# ============================================================================
+# Base regional (indice por cidade e bairro, montado uma vez na importacao)
+# ============================================================================
 
-    BASE_PRECOS_SP = {
-        # Capital - Zona Leste (mais acessivel)
+# Precos medios por bairro (dados de mercado 2024/2025)
+# Fonte: CRECI-SP, SECOVI, FipeZAP
+BASE_PRECOS_BAIRROS = {
+    "SAO PAULO": {
+        # Zona Leste (mais acessivel)
         "ITAIM PAULISTA": {"m2": 4200, "cond": 350, "iptu": 80},
         "SAO MIGUEL PAULISTA": {"m2": 4500, "cond": 380, "iptu": 90},
         "GUAIANASES": {"m2": 4000, "cond": 320, "iptu": 75},
@@ -221,7 +308,7 @@ def _buscar_base_regional(cidade: str, bairro: str, tipo: str) -> Dict:
         "VILA NOVA CURUCA": {"m2": 4200, "cond": 350, "iptu": 80},
         "JARDIM DA LARANJEIRA": {"m2": 4300, "cond": 360, "iptu": 85},
 
-        # Capital - Zona Norte
+        # Zona Norte
         "SANTANA": {"m2": 7500, "cond": 600, "iptu": 180},
         "TUCURUVI": {"m2": 6500, "cond": 520, "iptu": 150},
         "VILA GUILHERME": {"m2": 6000, "cond": 480, "iptu": 130},
@@ -231,7 +318,7 @@ def _buscar_base_regional(cidade: str, bairro: str, tipo: str) -> Dict:
         "JARAGUA": {"m2": 4200, "cond": 320, "iptu": 75},
         "BRASILANDIA": {"m2": 4000, "cond": 300, "iptu": 70},
 
-        # Capital - Zona Sul
+        # Zona Sul
         "MOEMA": {"m2": 14000, "cond": 1200, "iptu": 350},
         "VILA MARIANA": {"m2": 12000, "cond": 1000, "iptu": 300},
         "SAUDE": {"m2": 9000, "cond": 750, "iptu": 220},
@@ -243,7 +330,7 @@ def _buscar_base_regional(cidade: str, bairro: str, tipo: str) -> Dict:
         "JARDIM ANGELA": {"m2": 3800, "cond": 280, "iptu": 60},
         "GRAJAU": {"m2": 4000, "cond": 300, "iptu": 70},
 
-        # Capital - Zona Oeste
+        # Zona Oeste
         "PINHEIROS": {"m2": 15000, "cond": 1300, "iptu": 380},
         "PERDIZES": {"m2": 13000, "cond": 1100, "iptu": 320},
         "LAPA": {"m2": 10000, "cond": 800, "iptu": 250},
@@ -253,7 +340,7 @@ def _buscar_base_regional(cidade: str, bairro: str, tipo: str) -> Dict:
         "RIO PEQUENO": {"m2": 6500, "cond": 520, "iptu": 140},
         "RAPOSO TAVARES": {"m2": 5500, "cond": 420, "iptu": 110},
 
-        # Capital - Centro
+        # Centro
         "SE": {"m2": 7000, "cond": 500, "iptu": 150},
         "REPUBLICA": {"m2": 6500, "cond": 480, "iptu": 140},
         "LIBERDADE": {"m2": 8500, "cond": 650, "iptu": 190},
@@ -264,11 +351,9 @@ def _buscar_base_regional(cidade: str, bairro: str, tipo: str) -> Dict:
         "BRAS": {"m2": 5500, "cond": 400, "iptu": 110},
         "MOOCA": {"m2": 7500, "cond": 600, "iptu": 170},
         "TATUAPE": {"m2": 8500, "cond": 700, "iptu": 200},
-        "VILA FORMOSA": {"m2": 6500, "cond": 520, "iptu": 140}
-    }
-
-    BASE_PRECOS_LITORAL = {
-        # Santos
+        "VILA FORMOSA": {"m2": 6500, "cond": 520, "iptu": 140},
+    },
+    "SANTOS": {
         "GONZAGA": {"m2": 9000, "cond": 800, "iptu": 200},
         "BOQUEIRAO": {"m2": 8000, "cond": 700, "iptu": 180},
         "APARECIDA": {"m2": 7500, "cond": 650, "iptu": 160},
@@ -277,14 +362,14 @@ def _buscar_base_regional(cidade: str, bairro: str, tipo: str) -> Dict:
         "EMBARE": {"m2": 8500, "cond": 750, "iptu": 190},
         "MARAPE": {"m2": 6500, "cond": 550, "iptu": 140},
         "CAMPO GRANDE": {"m2": 5500, "cond": 450, "iptu": 120},
-
-        # Guaruja
+    },
+    "GUARUJA": {
         "PITANGUEIRAS": {"m2": 7500, "cond": 650, "iptu": 160},
-        "ASTÚRIAS": {"m2": 7000, "cond": 600, "iptu": 150},
+        "ASTURIAS": {"m2": 7000, "cond": 600, "iptu": 150},
         "ENSEADA": {"m2": 6500, "cond": 550, "iptu": 140},
         "TOMBO": {"m2": 6000, "cond": 500, "iptu": 130},
-
-        # Praia Grande
+    },
+    "PRAIA GRANDE": {
         "CANTO DO FORTE": {"m2": 6000, "cond": 500, "iptu": 130},
         "GUILHERMINA": {"m2": 5500, "cond": 450, "iptu": 120},
         "AVIACAO": {"m2": 5000, "cond": 420, "iptu": 110},
@@ -292,13 +377,13 @@ def _buscar_base_regional(cidade: str, bairro: str, tipo: str) -> Dict:
         "OCIAN": {"m2": 4800, "cond": 400, "iptu": 100},
         "TUPI": {"m2": 4500, "cond": 380, "iptu": 95},
         "MIRIM": {"m2": 4200, "cond": 350, "iptu": 85},
-        "CAIÇARA": {"m2": 4000, "cond": 330, "iptu": 80},
+        "CAICARA": {"m2": 4000, "cond": 330, "iptu": 80},
         "REAL": {"m2": 3800, "cond": 300, "iptu": 75},
         "SAMAMBAIA": {"m2": 4200, "cond": 350, "iptu": 85},
         "ANHANGUERA": {"m2": 4000, "cond": 320, "iptu": 80},
         "SOLEMAR": {"m2": 4500, "cond": 380, "iptu": 95},
-
-        # Sao Vicente
+    },
+    "SAO VICENTE": {
         "CENTRO": {"m2": 4500, "cond": 380, "iptu": 95},
         "ITARARE": {"m2": 5000, "cond": 420, "iptu": 110},
         "GONZAGUINHA": {"m2": 4800, "cond": 400, "iptu": 100},
@@ -308,69 +393,240 @@ def _buscar_base_regional(cidade: str, bairro: str, tipo: str) -> Dict:
         "JARDIM RIO BRANCO": {"m2": 4200, "cond": 350, "iptu": 85},
         "CATIAPOA": {"m2": 4500, "cond": 380, "iptu": 95},
         "PARQUE DAS BANDEIRAS": {"m2": 4000, "cond": 320, "iptu": 80},
-        "SAMARITA": {"m2": 4000, "cond": 320, "iptu": 80}
-    }
+        "SAMARITA": {"m2": 4000, "cond": 320, "iptu": 80},
+    },
+}
+
+# Medias por cidade (dados FipeZAP 2024)
+MEDIAS_CIDADE = {
+    "SAO PAULO": {"m2": 6500, "cond": 500, "iptu": 130},
+    "SANTOS": {"m2": 7500, "cond": 650, "iptu": 160},
+    "GUARUJA": {"m2": 6500, "cond": 550, "iptu": 140},
+    "PRAIA GRANDE": {"m2": 5000, "cond": 420, "iptu": 100},
+    "SAO VICENTE": {"m2": 4500, "cond": 380, "iptu": 90},
+    "BERTIOGA": {"m2": 6000, "cond": 500, "iptu": 120},
+    "UBATUBA": {"m2": 5500, "cond": 450, "iptu": 110},
+    "CARAGUATATUBA": {"m2": 5000, "cond": 400, "iptu": 100},
+    "MONGAGUA": {"m2": 4000, "cond": 320, "iptu": 80},
+    "ITANHAEM": {"m2": 3800, "cond": 300, "iptu": 75},
+    "PERUIBE": {"m2": 3500, "cond": 280, "iptu": 70},
+}
+
+# Liquidez por bairro: alta (< 60 dias), media (60-120 dias), baixa (> 120 dias)
+LIQUIDEZ_BAIRROS = {
+    "SAO PAULO": {
+        "MOEMA": "alta", "PINHEIROS": "alta", "VILA MARIANA": "alta", "TATUAPE": "alta",
+        "SANTANA": "alta", "PERDIZES": "alta",
+        "PENHA": "media", "LAPA": "media", "SAUDE": "media", "JABAQUARA": "media",
+        "SANTO AMARO": "media", "BUTANTA": "media", "ITAQUERA": "media",
+        "CIDADE TIRADENTES": "baixa", "GRAJAU": "baixa", "JARDIM ANGELA": "baixa",
+        "BRASILANDIA": "baixa",
+    },
+    "SANTOS": {"GONZAGA": "alta", "BOQUEIRAO": "media"},
+    "GUARUJA": {"PITANGUEIRAS": "alta"},
+    "SAO VICENTE": {"GONZAGUINHA": "alta", "ITARARE": "media"},
+    "PRAIA GRANDE": {
+        "BOQUEIRAO": "media", "CANTO DO FORTE": "media", "REAL": "baixa", "SAMAMBAIA": "baixa",
+    },
+}
+
+# Similaridade minima (coeficiente de Dice sobre trigramas) para um bairro ser candidato
+SIMILARIDADE_MINIMA_BAIRRO = 0.6
+# Erros de digitacao aceitos no nome aproximado (distancia de edicao somada das palavras)
+DISTANCIA_MAXIMA_BAIRRO = 1
+# Palavras menores que isso precisam ser iguais (SAO, DA, DOS...)
+TAMANHO_MINIMO_PALAVRA_APROXIMADA = 4
+
+# Abreviacoes comuns nos enderecos dos leiloes
+ABREVIACOES_BAIRRO = {
+    "JD": "JARDIM", "JRD": "JARDIM", "VL": "VILA", "PQ": "PARQUE", "PRQ": "PARQUE",
+    "CJ": "CONJUNTO", "CONJ": "CONJUNTO", "RES": "RESIDENCIAL", "STA": "SANTA", "STO": "SANTO",
+}
+
+# Prefixos genericos: nao identificam o bairro sozinhos e precisam ser iguais
+# ("JARDIM PAULISTA" nao e "ITAIM PAULISTA", "JARDIM SANTANA" nao e "SANTANA")
+PALAVRAS_GENERICAS_BAIRRO = {
+    "JARDIM", "JARDINS", "VILA", "PARQUE", "CONJUNTO", "RESIDENCIAL", "CIDADE",
+    "CHACARA", "RECANTO", "SITIO", "NUCLEO", "BAIRRO",
+}
+
+RE_NAO_ALFANUMERICO = re.compile(r"[^A-Z0-9]+")
+
+
+def normalizar_nome(texto: str) -> str:
+    """Maiusculas, sem acentos e sem pontuacao ('Jd. São Luís' -> 'JD SAO LUIS')"""
+    sem_acento = unicodedata.normalize("NFKD", str(texto or "")).encode("ascii", "ignore").decode("ascii")
+    return " ".join(RE_NAO_ALFANUMERICO.sub(" ", sem_acento.upper()).split())
+
+
+def _nome_bairro(texto: str) -> str:
+    """normalizar_nome com abreviacoes expandidas ('Jd. São Luís' -> 'JARDIM SAO LUIS')"""
+    return " ".join(ABREVIACOES_BAIRRO.get(p, p) for p in normalizar_nome(texto).split())
+
+
+def _trigramas(nome: str) -> set:
+    texto = f"  {nome} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _distancia_edicao(a: str, b: str, limite: int) -> int:
+    """Distancia de Levenshtein, interrompida ao passar de limite (retorna limite + 1)"""
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        atual = [i]
+        for j, cb in enumerate(b, 1):
+            atual.append(min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        if min(atual) > limite:
+            return limite + 1
+        anterior = atual
+    return anterior[-1]
+
+
+def _erro_de_digitacao(bairro: str, candidato: str, limite: int = DISTANCIA_MAXIMA_BAIRRO) -> bool:
+    """
+    Mesmas palavras, na mesma ordem, com no maximo limite erros de digitacao
+    nas palavras distintivas. Palavras genericas e curtas precisam ser iguais.
+    """
+    palavras, palavras_candidato = bairro.split(), candidato.split()
+    if len(palavras) != len(palavras_candidato):
+        return False
+
+    erros = 0
+    for palavra, outra in zip(palavras, palavras_candidato):
+        if palavra == outra:
+            continue
+        if (palavra in PALAVRAS_GENERICAS_BAIRRO or outra in PALAVRAS_GENERICAS_BAIRRO
+                or min(len(palavra), len(outra)) < TAMANHO_MINIMO_PALAVRA_APROXIMADA):
+            return False
+        erros += _distancia_edicao(palavra, outra, limite - erros)
+        if erros > limite:
+            return False
+    return True
+
+
+class IndiceBairros:
+    """
+    Indice (cidade, bairro) -> dados, com nomes normalizados e abreviacoes
+    expandidas (JD -> JARDIM, VL -> VILA...).
+
+    Busca, nesta ordem (sempre dentro da cidade):
+    1. Nome exato
+    2. Maior sequencia de palavras do bairro informado que seja um bairro
+       conhecido, sem descartar prefixos genericos ("VILA MARIANA II" ->
+       "VILA MARIANA", mas "JARDIM SANTANA" nao vira "SANTANA")
+    3. Erro de digitacao: mesmas palavras, ate DISTANCIA_MAXIMA_BAIRRO letras
+       trocadas nas palavras distintivas ("JARDIM SAO LUIZ" -> "JARDIM SAO LUIS").
+       Candidatos vem dos trigramas em comum (Dice >= SIMILARIDADE_MINIMA_BAIRRO);
+       o mais parecido vence, empate resolvido pelo nome
+
+    O custo depende do tamanho do nome buscado, nao do tamanho da base.
+    """
 
-    cidade_upper = cidade.upper().strip()
-    bairro_upper = bairro.upper().strip() if bairro else ""
+    def __init__(self, bases: Dict[str, Dict[str, Any]], similaridade_minima: float = SIMILARIDADE_MINIMA_BAIRRO):
+        self.similaridade_minima = similaridade_minima
+        self._bairros: Dict[str, Dict[str, Any]] = {}
+        self._trigramas: Dict[str, Dict[str, List[str]]] = {}
+        self._tamanhos: Dict[str, Dict[str, int]] = {}
+        self._max_palavras = 1
+
+        for cidade, bairros in bases.items():
+            cidade = normalizar_nome(cidade)
+            por_nome = self._bairros.setdefault(cidade, {})
+            indice = self._trigramas.setdefault(cidade, {})
+            tamanhos = self._tamanhos.setdefault(cidade, {})
+            for bairro, dados in bairros.items():
+                nome = _nome_bairro(bairro)
+                por_nome[nome] = dados
+                grams = _trigramas(nome)
+                tamanhos[nome] = len(grams)
+                for gram in grams:
+                    indice.setdefault(gram, []).append(nome)
+                self._max_palavras = max(self._max_palavras, len(nome.split()))
+
+    def buscar(self, cidade: str, bairro: str) -> Optional[Tuple[str, Any]]:
+        """
+        Args:
+            cidade: Nome da cidade (qualquer grafia)
+            bairro: Nome do bairro (qualquer grafia)
+
+        Returns:
+            (nome do bairro na base, dados) ou None
+        """
+        cidade = normalizar_nome(cidade)
+        bairro = _nome_bairro(bairro)
+        por_nome = self._bairros.get(cidade)
+        if not por_nome or not bairro:
+            return None
+
+        if bairro in por_nome:
+            return bairro, por_nome[bairro]
+
+        # Maior sequencia de palavras conhecida (a mais a esquerda no empate),
+        # mantendo todas as palavras genericas do nome informado
+        palavras = bairro.split()
+        genericas = [i for i, p in enumerate(palavras) if p in PALAVRAS_GENERICAS_BAIRRO]
+        for tamanho in range(min(len(palavras), self._max_palavras), 0, -1):
+            for inicio in range(len(palavras) - tamanho + 1):
+                if any(i < inicio or i >= inicio + tamanho for i in genericas):
+                    continue
+                nome = " ".join(palavras[inicio:inicio + tamanho])
+                if nome in por_nome:
+                    return nome, por_nome[nome]
+
+        # Erro de digitacao entre os candidatos com trigramas em comum (coeficiente de Dice)
+        grams = _trigramas(bairro)
+        comuns: Dict[str, int] = {}
+        indice = self._trigramas[cidade]
+        for gram in grams:
+            for nome in indice.get(gram, ()):
+                comuns[nome] = comuns.get(nome, 0) + 1
+
+        tamanhos = self._tamanhos[cidade]
+        candidatos = sorted(
+            ((2 * n / (len(grams) + tamanhos[nome]), nome) for nome, n in comuns.items()),
+            reverse=True
+        )
+        for similaridade, nome in candidatos:
+            if similaridade < self.similaridade_minima:
+                break
+            if _erro_de_digitacao(bairro, nome):
+                return nome, por_nome[nome]
+        return None
 
-    # Busca na base apropriada
-    if cidade_upper == "SAO PAULO":
-        base = BASE_PRECOS_SP
-    elif cidade_upper in ["SANTOS", "GUARUJA", "PRAIA GRANDE", "SAO VICENTE"]:
-        base = BASE_PRECOS_LITORAL
-    else:
-        return {}
 
-    # Tenta encontrar bairro exato ou parcial
-    dados = None
-
-    # Busca exata
-    if bairro_upper in base:
-        dados = base[bairro_upper]
-    else:
-        # Busca parcial
-        for key in base:
-            if key in bairro_upper or bairro_upper in key:
-                dados = base[key]
-                break
+INDICE_PRECOS = IndiceBairros(BASE_PRECOS_BAIRROS)
+INDICE_LIQUIDEZ = IndiceBairros(LIQUIDEZ_BAIRROS)
 
-    if dados:
-        return {
-            "preco_m2": dados["m2"],
-            "preco_m2_min": int(dados["m2"] * 0.85),
-            "preco_m2_max": int(dados["m2"] * 1.15),
-            "condominio_estimado": dados["cond"],
-            "iptu_estimado": dados["iptu"],
-            "amostras": 50,  # Base estatistica
-            "fonte_detalhe": f"Base CRECI-SP/SECOVI - {bairro_upper}"
-        }
 
-    return {}
+def _buscar_base_regional(cidade: str, bairro: str, tipo: str) -> Dict:
+    """
+    Busca em base de dados regional de precos medios.
+    Dados atualizados periodicamente de fontes publicas.
+    """
+    encontrado = INDICE_PRECOS.buscar(cidade, bairro)
+    if not encontrado:
+        return {}
+
+    nome, dados = encontrado
+    return {
+        "preco_m2": dados["m2"],
+        "preco_m2_min": int(dados["m2"] * 0.85),
+        "preco_m2_max": int(dados["m2"] * 1.15),
+        "condominio_estimado": dados["cond"],
+        "iptu_estimado": dados["iptu"],
+        "amostras": 50,  # Base estatistica
+        "fonte_detalhe": f"Base CRECI-SP/SECOVI - {nome}"
+    }
 
 
 def _estimar_preco_regiao(cidade: str, bairro: str, tipo: str) -> Dict:
     """
     Estimativa de preco baseada em medias regionais quando nao ha dados especificos.
     """
-    cidade_upper = cidade.upper().strip()
-
-    # Medias por cidade (dados FipeZAP 2024)
-    MEDIAS_CIDADE = {
-        "SAO PAULO": {"m2": 6500, "cond": 500, "iptu": 130},
-        "SANTOS": {"m2": 7500, "cond": 650, "iptu": 160},
-        "GUARUJA": {"m2": 6500, "cond": 550, "iptu": 140},
-        "PRAIA GRANDE": {"m2": 5000, "cond": 420, "iptu": 100},
-        "SAO VICENTE": {"m2": 4500, "cond": 380, "iptu": 90},
-        "BERTIOGA": {"m2": 6000, "cond": 500, "iptu": 120},
-        "UBATUBA": {"m2": 5500, "cond": 450, "iptu": 110},
-        "CARAGUATATUBA": {"m2": 5000, "cond": 400, "iptu": 100},
-        "MONGAGUA": {"m2": 4000, "cond": 320, "iptu": 80},
-        "ITANHAEM": {"m2": 3800, "cond": 300, "iptu": 75},
-        "PERUIBE": {"m2": 3500, "cond": 280, "iptu": 70}
-    }
-
-    dados = MEDIAS_CIDADE.get(cidade_upper, {"m2": 5000, "cond": 400, "iptu": 100})
+    cidade_normalizada = normalizar_nome(cidade)
+    dados = MEDIAS_CIDADE.get(cidade_normalizada, {"m2": 5000, "cond": 400, "iptu": 100})
 
     return {
         "preco_m2": dados["m2"],
@@ -379,7 +635,7 @@ def _estimar_preco_regiao(cidade: str, bairro: str, tipo: str) -> Dict:
         "condominio_estimado": dados["cond"],
         "iptu_estimado": dados["iptu"],
         "amostras": 0,
-        "fonte_detalhe": f"Media regional {cidade_upper}"
+        "fonte_detalhe": f"Media regional {cidade_normalizada}"
     }
 
 
@@ -395,36 +651,12 @@ def calcular_liquidez_mercado(
     Returns:
         Dict com tempo_venda_estimado, demanda, oferta e classificacao
     """
-    cidade_upper = cidade.upper().strip()
-    bairro_upper = bairro.upper().strip() if bairro else ""
-
-    # Base de liquidez por regiao (dias para vender)
-    LIQUIDEZ_BASE = {
-        # Alta liquidez (< 60 dias)
-        "alta": ["MOEMA", "PINHEIROS", "VILA MARIANA", "TATUAPE", "SANTANA", "PERDIZES",
-                 "GONZAGA", "PITANGUEIRAS", "GONZAGUINHA"],
-        # Media liquidez (60-120 dias)
-        "media": ["PENHA", "LAPA", "SAUDE", "JABAQUARA", "SANTO AMARO", "BUTANTA",
-                  "ITAQUERA", "BOQUEIRAO", "CANTO DO FORTE", "ITARARE"],
-        # Baixa liquidez (> 120 dias)
-        "baixa": ["CIDADE TIRADENTES", "GRAJAU", "JARDIM ANGELA", "BRASILANDIA",
-                  "REAL", "SAMAMBAIA"]
-    }
-
     # Determina liquidez
-    liquidez = "media"
-    tempo_base = 90
-
-    for nivel, bairros in LIQUIDEZ_BASE.items():
-        if any(b in bairro_upper for b in bairros):
-            liquidez = nivel
-            break
+    encontrado = INDICE_LIQUIDEZ.buscar(cidade, bairro)
+    liquidez = encontrado[1] if encontrado else "media"
 
     # Ajusta tempo baseado na liquidez
-    if liquidez == "alta":
-        tempo_base = 45
-    elif liquidez == "baixa":
-        tempo_base = 150
+    tempo_base = {"alta": 45, "media": 90, "baixa": 150}[liquidez]
 
     # Ajusta por faixa de preco (imoveis mais baratos vendem mais rapido)
     if preco > 0:
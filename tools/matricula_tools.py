@@ -0,0 +1,467 @@
+"""
+Tools de Matricula - Extrator de texto de matricula em uma unica passada
+Divide a matricula em atos numerados (R.1, AV.2 ...) e aplica padroes
+pre-compilados a cada ato, capturando valores em janelas limitadas.
+Tambem define o modelo tipado (schema estrito) da analise feita pelo GPT-4o
+"""
+
+import re
+import json
+from typing import Any, Dict, List, Optional
+
+# Janela (caracteres) apos a palavra-chave em que o valor do ato e procurado
+JANELA_VALOR = 400
+
+# Valor minimo para considerar um "R$ ..." como valor de penhora
+VALOR_MINIMO_PENHORA = 100
+
+# ============================================================================
+# Padroes pre-compilados
+# ============================================================================
+
+# Inicio de ato: "R.1", "R-1", "AV.2", "AV-12"... seguido de separador ("/", "-", ":", ".")
+# Exige maiusculas e separador para nao confundir com "Av. 9 de Julho" ou "R$"
+RE_ATO = re.compile(r"(?<![A-Z0-9])(R|AV)[.\-]?\s?(\d{1,4})(?=\s*[/\-–:.])")
+
+RE_MATRICULA = re.compile(r"matr[íi]cula[:\s]*(?:n[º°o]\.?\s*)?(\d+[\.\d]*)", re.IGNORECASE)
+RE_COMARCA = re.compile(r"comarca[:\s]*([^\n,]+)", re.IGNORECASE)
+RE_AREA_PRIVATIVA = re.compile(r"[áa]rea\s+privativa[:\s=]*(?:de\s+)?(\d+[,\.]\d+)\s*m", re.IGNORECASE)
+RE_AREA_TOTAL = re.compile(r"[áa]rea\s+total[:\s=]*(?:de\s+)?(\d+[,\.]\d+)\s*m", re.IGNORECASE)
+RE_PROCESSO = re.compile(r"\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}")
+
+# Valores monetarios (sobre o texto em maiusculas)
+RE_VALOR = re.compile(r"R\$\s*([\d\.]{1,20}(?:,\d{2})?)")
+RE_VALOR_CENTAVOS = re.compile(r"R\$\s*([\d\.]{1,20},\d{2})")
+RE_VALOR_ROTULADO = re.compile(r"(?:VALOR|D[ÍI]VIDA)[:\s]*(?:DE\s+)?R\$\s*([\d\.]{1,20}(?:,\d{2})?)")
+RE_DIVIDA = re.compile(r"D[ÍI]VIDA")
+
+RE_ALIENACAO = re.compile(r"ALIENA[ÇC][ÃA]O\s+FIDUCI[ÁA]RIA")
+
+# Palavras-chave dos atos (sobre o texto em maiusculas), localizadas com str.find:
+# uma varredura em C por palavra, sem alternancia de regex em cada posicao
+PALAVRAS_CHAVE = (
+    "PENHORA", "ALIENA", "CONSOLIDA", "CONDOM", "CANCELA", "HIPOTECA",
+    "INDISPONIBILIDADE", "USUFRUTO", "PROPRIEDADE", "PURG", "CAIXA", "EXECU",
+)
+RE_ATO_REFERIDO = re.compile(r"(?<![A-Z0-9])(R|AV)[.\-]?\s?(\d{1,4})")
+
+# Ato de cancelamento: o ato abre com CANCELAMENTO ("AV.7/123 - CANCELAMENTO ...").
+# Atos que so mencionam um cancelamento ("CONSOLIDACAO ..., ficando cancelada a
+# alienacao do R.5") continuam sendo classificados pelos proprios padroes
+RE_CANCELAMENTO = re.compile(r"(?:R|AV)[.\-]?\s?\d{1,4}(?:/[\d.]+)?\s*[\-–:.]\s*CANCELAMENTO")
+
+GRAVAMES_SIMPLES = {
+    "HIPOTECA": "Hipoteca registrada na matrícula",
+    "INDISPONIBILIDADE": "Indisponibilidade de bens averbada",
+    "USUFRUTO": "Usufruto registrado - verificar vigência",
+}
+
+
+def _valor_reais(texto: str) -> Optional[float]:
+    """Converte '1.234,56' em 1234.56"""
+    try:
+        return float(texto.replace(".", "").replace(",", "."))
+    except ValueError:
+        return None
+
+
+def _valor_na_janela(corpo: str, inicio: int, padrao: re.Pattern = RE_VALOR) -> Optional[float]:
+    """Primeiro valor do padrao na janela limitada a partir de inicio"""
+    match = padrao.search(corpo, inicio, inicio + JANELA_VALOR)
+    return _valor_reais(match.group(1)) if match else None
+
+
+def _palavras_chave(corpo: str) -> Dict[str, int]:
+    """Posicao da primeira ocorrencia de cada palavra-chave presente no ato"""
+    encontradas = {}
+    for palavra in PALAVRAS_CHAVE:
+        posicao = corpo.find(palavra)
+        if posicao >= 0:
+            encontradas[palavra] = posicao
+    return encontradas
+
+
+def _cancelamento(ato: Dict[str, Any]) -> bool:
+    """Ato de cancelamento: o ato abre com CANCELAMENTO"""
+    return ato["ato"] != "CABECALHO" and "CANCELA" in ato["chaves"] and bool(RE_CANCELAMENTO.match(ato["corpo"]))
+
+
+def dividir_atos(texto: str) -> List[Dict[str, Any]]:
+    """
+    Divide a matricula em cabecalho e atos numerados.
+
+    Args:
+        texto: Texto da matricula (ja normalizado)
+
+    Returns:
+        Lista de {"ato": "R.1" | "AV.2" | "CABECALHO", "corpo": texto do ato}
+        na ordem do documento. Sem atos numerados, o texto inteiro vira um ato.
+    """
+    atos = []
+    anterior = 0
+    rotulo = "CABECALHO"
+    for match in RE_ATO.finditer(texto):
+        atos.append({"ato": rotulo, "corpo": texto[anterior:match.start()]})
+        rotulo = f"{match.group(1)}.{int(match.group(2))}"
+        anterior = match.start()
+    atos.append({"ato": rotulo, "corpo": texto[anterior:]})
+    return [a for a in atos if a["corpo"].strip()]
+
+
+def extrair_matricula(texto: str) -> Dict[str, Any]:
+    """
+    Extrai dados e gravames da matricula em uma unica passada pelos atos.
+
+    Atos de cancelamento ("AV.7 - CANCELAMENTO da penhora do R.5")
+    removem os gravames dos atos que referenciam. Atos que apenas mencionam
+    um cancelamento no corpo nao cancelam nada.
+
+    Args:
+        texto: Texto extraido da matricula
+
+    Returns:
+        Dict com matricula_numero, comarca, areas, penhoras, alienacao_fiduciaria,
+        consolidacao_propriedade, dividas_identificadas e gravames
+    """
+    resultado = {
+        'matricula_numero': None,
+        'comarca': None,
+        'oficio': None,
+        'area_privativa_m2': None,
+        'area_total_m2': None,
+        'fracao_ideal': None,
+        'proprietarios': [],
+        'gravames': [],
+        'penhoras': [],
+        'alienacao_fiduciaria': None,
+        'consolidacao_propriedade': None,
+        'dividas_identificadas': [],
+    }
+
+    # Normalizacao unica (espacos + maiusculas) reaproveitada por todos os padroes
+    texto_clean = " ".join(texto.split())
+    texto_upper = texto_clean.upper()
+
+    # Cabecalho (primeira ocorrencia; padroes sem retrocesso ilimitado)
+    match = RE_MATRICULA.search(texto_clean)
+    if match:
+        resultado['matricula_numero'] = match.group(1).replace('.', '')
+    match = RE_COMARCA.search(texto)
+    if match:
+        resultado['comarca'] = match.group(1).strip()
+    match = RE_AREA_PRIVATIVA.search(texto_clean)
+    if match:
+        resultado['area_privativa_m2'] = float(match.group(1).replace(',', '.'))
+    match = RE_AREA_TOTAL.search(texto_clean)
+    if match:
+        resultado['area_total_m2'] = float(match.group(1).replace(',', '.'))
+
+    # Atos: cada um classificado pelos padroes do seu tipo
+    atos = dividir_atos(texto_upper)
+    for ato in atos:
+        ato["chaves"] = _palavras_chave(ato["corpo"])
+
+    cancelados = set()
+    for ato in atos:
+        corpo = ato["corpo"]
+        if _cancelamento(ato):
+            # Atos citados no corpo (depois do proprio rotulo)
+            cancelados.update(
+                f"{m.group(1)}.{int(m.group(2))}"
+                for m in RE_ATO_REFERIDO.finditer(corpo, RE_ATO.match(corpo).end())
+            )
+
+    for ato in atos:
+        rotulo, corpo, chaves = ato["ato"], ato["corpo"], ato["chaves"]
+        if rotulo in cancelados or _cancelamento(ato):
+            continue
+
+        if "PENHORA" in chaves:
+            inicio = chaves["PENHORA"]
+            rotulado = RE_VALOR_ROTULADO.search(corpo, inicio, inicio + JANELA_VALOR)
+            if rotulado:
+                valor = _valor_reais(rotulado.group(1))
+                if valor is not None:
+                    resultado['penhoras'].append({'tipo': 'PENHORA', 'valor': valor, 'ato': rotulo})
+                    resultado['dividas_identificadas'].append({'tipo': 'Penhora', 'valor': valor})
+            else:
+                valor = _valor_na_janela(corpo, inicio, RE_VALOR_CENTAVOS)
+                if valor is not None and valor > VALOR_MINIMO_PENHORA:
+                    resultado['penhoras'].append({'tipo': 'PENHORA', 'valor': valor, 'ato': rotulo})
+
+        match = None
+        if "ALIENA" in chaves and resultado['alienacao_fiduciaria'] is None:
+            match = RE_ALIENACAO.search(corpo, chaves["ALIENA"])
+        if match:
+            divida = RE_DIVIDA.search(corpo, match.end(), match.end() + JANELA_VALOR)
+            valor = _valor_na_janela(corpo, divida.end()) if divida else None
+            if valor is not None:
+                resultado['alienacao_fiduciaria'] = {
+                    'valor_original': valor,
+                    'credor': 'Caixa Econômica Federal' if 'CAIXA' in chaves else 'Desconhecido',
+                    'ato': rotulo
+                }
+
+        if "CONSOLIDA" in chaves and "PROPRIEDADE" in chaves:
+            resultado['consolidacao_propriedade'] = {
+                'consolidada': True,
+                'valor': _valor_na_janela(corpo, chaves["CONSOLIDA"]),
+                'motivo': 'Não purgação da mora' if 'PURG' in chaves else 'Inadimplência',
+                'ato': rotulo
+            }
+
+        if "CONDOM" in chaves and ("PENHORA" in chaves or "EXECU" in chaves):
+            valor = _valor_na_janela(corpo, chaves["CONDOM"])
+            if valor is not None:
+                resultado['dividas_identificadas'].append({
+                    'tipo': 'Condomínio',
+                    'valor': valor,
+                    'observacao': 'Dívida de condomínio averbada na matrícula'
+                })
+
+        for tipo, descricao in GRAVAMES_SIMPLES.items():
+            if tipo in chaves and not any(g['tipo'] == tipo for g in resultado['gravames']):
+                resultado['gravames'].append({'tipo': tipo, 'descricao': descricao, 'ato': rotulo})
+
+    # Processos judiciais (numeracao CNJ), sem repeticao
+    for numero in dict.fromkeys(RE_PROCESSO.findall(texto_clean)):
+        resultado['gravames'].append({'tipo': 'PROCESSO_JUDICIAL', 'numero': numero})
+
+    resultado['atos'] = [a["ato"] for a in atos if a["ato"] != "CABECALHO"]
+    resultado['atos_cancelados'] = sorted(cancelados)
+    return resultado
+
+
+# ============================================================================
+# Modelo da resposta do GPT-4o (structured outputs)
+# ============================================================================
+#
+# Tipos dos campos: "string", "number", "boolean" (sufixo "?" = aceita null),
+# tupla = enum de strings, lista de um tipo = array, subclasse de _Modelo = objeto.
+# O JSON schema estrito enviado a OpenAI e a validacao da resposta saem da mesma definicao.
+
+class RespostaInvalida(ValueError):
+    """Resposta do modelo fora do schema"""
+
+
+_TIPOS_JSON = {"string": (str,), "number": (int, float), "boolean": (bool,)}
+
+
+def _schema_tipo(tipo: Any) -> Dict[str, Any]:
+    if isinstance(tipo, type) and issubclass(tipo, _Modelo):
+        return tipo.schema()
+    if isinstance(tipo, list):
+        return {"type": "array", "items": _schema_tipo(tipo[0])}
+    if isinstance(tipo, tuple):
+        return {"type": "string", "enum": list(tipo)}
+    if tipo.endswith("?"):
+        return {"type": [tipo[:-1], "null"]}
+    return {"type": tipo}
+
+
+def _validar_tipo(valor: Any, tipo: Any, caminho: str) -> Any:
+    if isinstance(tipo, type) and issubclass(tipo, _Modelo):
+        return tipo.validar(valor, caminho)
+    if isinstance(tipo, list):
+        if not isinstance(valor, list):
+            raise RespostaInvalida(f"{caminho}: esperado array")
+        return [_validar_tipo(v, tipo[0], f"{caminho}[{i}]") for i, v in enumerate(valor)]
+    if isinstance(tipo, tuple):
+        if valor not in tipo:
+            raise RespostaInvalida(f"{caminho}: {valor!r} fora de {tipo}")
+        return valor
+    if tipo.endswith("?"):
+        if valor is None:
+            return None
+        tipo = tipo[:-1]
+    # bool e subclasse de int: nao vale como numero
+    if not isinstance(valor, _TIPOS_JSON[tipo]) or (tipo == "number" and isinstance(valor, bool)):
+        raise RespostaInvalida(f"{caminho}: esperado {tipo}, recebido {type(valor).__name__}")
+    return float(valor) if tipo == "number" else valor
+
+
+class _Modelo:
+    """Base dos modelos: um atributo (__slots__) por campo de CAMPOS"""
+
+    __slots__ = ()
+    CAMPOS: Dict[str, Any] = {}
+
+    def __init__(self, **valores: Any):
+        for nome in self.CAMPOS:
+            setattr(self, nome, valores.get(nome))
+
+    @classmethod
+    def schema(cls) -> Dict[str, Any]:
+        """JSON schema estrito (todos os campos obrigatorios, sem campos extras)"""
+        return {
+            "type": "object",
+            "properties": {nome: _schema_tipo(tipo) for nome, tipo in cls.CAMPOS.items()},
+            "required": list(cls.CAMPOS),
+            "additionalProperties": False,
+        }
+
+    @classmethod
+    def validar(cls, dados: Any, caminho: str = "$") -> "_Modelo":
+        """
+        Valida um dict (JSON decodificado) contra CAMPOS
+
+        Raises:
+            RespostaInvalida: campo ausente, extra ou de tipo errado
+        """
+        if not isinstance(dados, dict):
+            raise RespostaInvalida(f"{caminho}: esperado objeto")
+        ausentes = [c for c in cls.CAMPOS if c not in dados]
+        extras = [c for c in dados if c not in cls.CAMPOS]
+        if ausentes or extras:
+            raise RespostaInvalida(f"{caminho}: campos ausentes {ausentes}, extras {extras}")
+        return cls(**{
+            nome: _validar_tipo(dados[nome], tipo, f"{caminho}.{nome}")
+            for nome, tipo in cls.CAMPOS.items()
+        })
+
+    def para_dict(self) -> Dict[str, Any]:
+        """Volta ao dict no formato da resposta (para cache e relatorios)"""
+        def _converter(valor):
+            if isinstance(valor, _Modelo):
+                return valor.para_dict()
+            if isinstance(valor, list):
+                return [_converter(v) for v in valor]
+            return valor
+        return {nome: _converter(getattr(self, nome)) for nome in self.CAMPOS}
+
+
+class PenhoraGPT(_Modelo):
+    __slots__ = ("tipo", "valor", "credor", "processo", "data")
+    CAMPOS = {"tipo": "string", "valor": "number?", "credor": "string?",
+              "processo": "string?", "data": "string?"}
+
+
+class AlienacaoGPT(_Modelo):
+    __slots__ = ("existe", "credor", "valor_original", "consolidada")
+    CAMPOS = {"existe": "boolean", "credor": "string?", "valor_original": "number?",
+              "consolidada": "boolean"}
+
+
+class GravameGPT(_Modelo):
+    __slots__ = ("tipo", "descricao", "valor")
+    CAMPOS = {"tipo": "string", "descricao": "string?", "valor": "number?"}
+
+
+class DividaCondominioGPT(_Modelo):
+    __slots__ = ("existe", "valor", "credor")
+    CAMPOS = {"existe": "boolean", "valor": "number?", "credor": "string?"}
+
+
+class ConsolidacaoGPT(_Modelo):
+    __slots__ = ("consolidada", "para_quem", "valor", "data")
+    CAMPOS = {"consolidada": "boolean", "para_quem": "string?", "valor": "number?", "data": "string?"}
+
+
+class AnaliseMatricula(_Modelo):
+    """Analise de matricula retornada pelo GPT-4o (ver PROMPT_MATRICULA)"""
+
+    __slots__ = (
+        "matricula_numero", "comarca", "oficio", "area_privativa_m2", "area_total_m2",
+        "endereco", "proprietarios_atuais", "penhoras", "alienacao_fiduciaria", "gravames",
+        "dividas_condominio", "consolidacao_propriedade", "riscos_identificados",
+        "score_risco", "classificacao_risco", "resumo",
+    )
+    CAMPOS = {
+        "matricula_numero": "string?",
+        "comarca": "string?",
+        "oficio": "string?",
+        "area_privativa_m2": "number?",
+        "area_total_m2": "number?",
+        "endereco": "string?",
+        "proprietarios_atuais": ["string"],
+        "penhoras": [PenhoraGPT],
+        "alienacao_fiduciaria": AlienacaoGPT,
+        "gravames": [GravameGPT],
+        "dividas_condominio": DividaCondominioGPT,
+        "consolidacao_propriedade": ConsolidacaoGPT,
+        "riscos_identificados": ["string"],
+        "score_risco": "number",
+        "classificacao_risco": ("BAIXO", "MEDIO", "ALTO"),
+        "resumo": "string",
+    }
+
+    @classmethod
+    def de_json(cls, texto: str) -> "AnaliseMatricula":
+        """Decodifica e valida o conteudo da resposta"""
+        try:
+            dados = json.loads(texto)
+        except (TypeError, json.JSONDecodeError) as e:
+            raise RespostaInvalida(f"JSON invalido: {e}") from None
+        return cls.validar(dados)
+
+    def para_pipeline(self) -> Dict[str, Any]:
+        """Formato padrao do pipeline (o mesmo de extrair_matricula + riscos e score)"""
+        resultado = {
+            'matricula_numero': self.matricula_numero,
+            'comarca': self.comarca,
+            'oficio': self.oficio,
+            'area_privativa_m2': self.area_privativa_m2,
+            'area_total_m2': self.area_total_m2,
+            'fracao_ideal': None,
+            'proprietarios': self.proprietarios_atuais,
+            'gravames': [
+                {'tipo': g.tipo, 'descricao': g.descricao, 'valor': g.valor} for g in self.gravames
+            ],
+            'penhoras': [],
+            'alienacao_fiduciaria': None,
+            'consolidacao_propriedade': None,
+            'dividas_identificadas': [],
+            'riscos': self.riscos_identificados,
+            'score_risco': self.score_risco,
+            'classificacao_risco': self.classificacao_risco,
+            'resumo': self.resumo,
+        }
+
+        for p in self.penhoras:
+            resultado['penhoras'].append({
+                'tipo': p.tipo, 'valor': p.valor or 0, 'credor': p.credor,
+                'processo': p.processo, 'data': p.data
+            })
+            if p.valor:
+                resultado['dividas_identificadas'].append({
+                    'tipo': 'Penhora',
+                    'valor': p.valor,
+                    'credor': p.credor,
+                    'observacao': f"Processo: {p.processo or 'N/I'}"
+                })
+
+        af = self.alienacao_fiduciaria
+        if af.existe:
+            resultado['alienacao_fiduciaria'] = {
+                'valor_original': af.valor_original or 0,
+                'credor': af.credor or 'Desconhecido',
+                'consolidada': af.consolidada
+            }
+
+        cp = self.consolidacao_propriedade
+        if cp.consolidada:
+            resultado['consolidacao_propriedade'] = {
+                'consolidada': True,
+                'valor': cp.valor,
+                'para_quem': cp.para_quem,
+                'data': cp.data,
+                'motivo': 'Não purgação da mora'
+            }
+
+        dc = self.dividas_condominio
+        if dc.existe and dc.valor:
+            resultado['dividas_identificadas'].append({
+                'tipo': 'Condomínio',
+                'valor': dc.valor,
+                'credor': dc.credor,
+                'observacao': 'Dívida de condomínio averbada'
+            })
+
+        return resultado
+
+
+# response_format da chamada ao GPT-4o (structured outputs)
+FORMATO_RESPOSTA_MATRICULA = {
+    "type": "json_schema",
+    "json_schema": {"name": "analise_matricula", "strict": True, "schema": AnaliseMatricula.schema()},
+}
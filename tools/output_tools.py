@@ -51,6 +51,9 @@ CSV_COLUMNS = [
     # Cenario 6 Meses
     "cenario_preco_venda", "cenario_lucro_liquido", "cenario_roi_percentual",
     "cenario_roi_mensal", "cenario_margem_seguranca",
+    # Simulacao Monte Carlo
+    "simulacao_roi_p5", "simulacao_roi_p50", "simulacao_roi_p95",
+    "simulacao_prob_prejuizo", "simulacao_prob_abaixo_cdi",
     # Scores
     "score_edital", "score_matricula", "score_localizacao", "score_financeiro",
     "score_liquidez", "score_geral", "recomendacao", "nivel_risco",
@@ -156,6 +159,15 @@ def flatten_analysis(analise: Dict) -> Dict:
     flat["cenario_roi_mensal"] = resultado.get("roi_mensal_percentual", 0)
     flat["cenario_margem_seguranca"] = resultado.get("margem_seguranca_percentual", 0)
 
+    # Simulacao Monte Carlo (cenarios)
+    cenarios = analise.get("cenarios") or {}
+    percentis = cenarios.get("roi_percentis", {})
+    flat["simulacao_roi_p5"] = percentis.get("p5", "")
+    flat["simulacao_roi_p50"] = percentis.get("p50", "")
+    flat["simulacao_roi_p95"] = percentis.get("p95", "")
+    flat["simulacao_prob_prejuizo"] = cenarios.get("prob_prejuizo", "")
+    flat["simulacao_prob_abaixo_cdi"] = cenarios.get("prob_abaixo_cdi", "")
+
     # Scores
     scores = analise.get("scores", {})
     flat["score_edital"] = scores.get("edital", 0)
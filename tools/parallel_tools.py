@@ -0,0 +1,212 @@
+"""
+Tools de Concorrencia - Execucao paralela limitada das etapas de analise
+Pool de threads com limite por etapa (OpenAI, site da Caixa, API de mercado)
+"""
+
+import os
+import time
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuracoes (podem ser sobrescritas por variaveis de ambiente)
+ANALISE_WORKERS = int(os.getenv("ANALISE_WORKERS", "8"))
+ANALISE_TIMEOUT_IMOVEL = float(os.getenv("ANALISE_TIMEOUT_IMOVEL", "300"))
+
+# Maximo de chamadas simultaneas por etapa externa
+LIMITES_ETAPA = {
+    "openai": int(os.getenv("LIMITE_OPENAI", "4")),    # GPT-4o Vision
+    "caixa": int(os.getenv("LIMITE_CAIXA", "6")),      # Matricula + pagina do imovel
+    "mercado": int(os.getenv("LIMITE_MERCADO", "4")),  # VivaReal/ZAP
+}
+
+_semaforos: Dict[str, threading.BoundedSemaphore] = {}
+_semaforos_lock = threading.Lock()
+
+
+class _RelogioItem:
+    """Tempo de execucao de um item, sem a espera pelos semaforos das etapas"""
+
+    def __init__(self):
+        self.inicio = time.monotonic()
+        self.espera = 0.0
+        self.pausado_em: Optional[float] = None
+
+    def pausar(self) -> None:
+        self.pausado_em = time.monotonic()
+
+    def retomar(self) -> None:
+        self.espera += time.monotonic() - self.pausado_em
+        self.pausado_em = None
+
+    def decorrido(self, agora: float) -> float:
+        pausado_em = self.pausado_em
+        espera = self.espera + (agora - pausado_em if pausado_em is not None else 0.0)
+        return agora - self.inicio - espera
+
+
+# Relogio do item em execucao em cada thread de executar_em_paralelo
+_relogios: Dict[int, _RelogioItem] = {}
+
+
+def _get_semaforo(etapa: str) -> Optional[threading.BoundedSemaphore]:
+    """Retorna (criando se necessario) o semaforo de uma etapa"""
+    limite = LIMITES_ETAPA.get(etapa)
+    if not limite or limite <= 0:
+        return None
+
+    with _semaforos_lock:
+        if etapa not in _semaforos:
+            _semaforos[etapa] = threading.BoundedSemaphore(limite)
+        return _semaforos[etapa]
+
+
+def pool_processos(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Pool de processos do projeto (parse da Caixa, renderizacao de PDFs).
+
+    Sempre com o contexto spawn: um fork a partir de um processo com threads
+    (analise, downloads) copiaria locks (logging, requests) possivelmente presos.
+
+    Args:
+        max_workers: Numero de processos
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def configurar_limites(limites: Dict[str, int]) -> None:
+    """
+    Atualiza os limites de concorrencia por etapa.
+    Deve ser chamado antes de iniciar a analise.
+
+    Args:
+        limites: Dict etapa -> maximo de chamadas simultaneas (0 = sem limite)
+    """
+    with _semaforos_lock:
+        LIMITES_ETAPA.update(limites)
+        for etapa in limites:
+            _semaforos.pop(etapa, None)
+
+
+@contextmanager
+def limite_etapa(etapa: str):
+    """
+    Context manager que limita chamadas simultaneas a um servico externo.
+    A espera pelo semaforo nao conta no timeout do item (executar_em_paralelo).
+
+    Uso:
+        with limite_etapa("openai"):
+            analisar_matricula_com_gpt4(filepath)
+    """
+    semaforo = _get_semaforo(etapa)
+    if semaforo is None:
+        yield
+        return
+
+    relogio = _relogios.get(threading.get_ident())
+    if relogio:
+        relogio.pausar()
+    semaforo.acquire()
+    if relogio:
+        relogio.retomar()
+    try:
+        yield
+    finally:
+        semaforo.release()
+
+
+def executar_em_paralelo(
+    itens: List[Any],
+    funcao: Callable[[Any], Dict],
+    max_workers: Optional[int] = None,
+    timeout_item: Optional[float] = None,
+    ao_concluir: Optional[Callable[[int, Dict], None]] = None
+) -> List[Dict]:
+    """
+    Executa funcao(item) para cada item num pool de threads limitado.
+
+    O resultado mantem a ordem da lista de entrada, independente da ordem
+    de conclusao. Itens que excedem timeout_item recebem {"error": "timeout"}.
+    O tempo conta a partir do inicio da execucao do item, sem a espera pelos
+    semaforos de limite_etapa.
+
+    O timeout nao interrompe o item: a thread continua em segundo plano
+    (ocupando um worker e o semaforo de etapa que tiver) ate a chamada
+    terminar, e o resultado e descartado. Os timeouts das chamadas externas
+    e que limitam esse tempo.
+
+    Args:
+        itens: Lista de itens a processar
+        funcao: Funcao aplicada a cada item (deve retornar Dict)
+        max_workers: Numero de threads (default: ANALISE_WORKERS)
+        timeout_item: Timeout por item em segundos (default: ANALISE_TIMEOUT_IMOVEL)
+        ao_concluir: Callback opcional chamado (na thread principal) com
+                     (indice, resultado) a cada item concluido
+
+    Returns:
+        Lista de resultados na mesma ordem de itens
+    """
+    if not itens:
+        return []
+
+    max_workers = max_workers or ANALISE_WORKERS
+    timeout_item = ANALISE_TIMEOUT_IMOVEL if timeout_item is None else timeout_item
+
+    resultados: List[Optional[Dict]] = [None] * len(itens)
+    relogios: Dict[int, _RelogioItem] = {}
+
+    def _executar(indice: int, item: Any) -> Dict:
+        thread = threading.get_ident()
+        relogios[indice] = _relogios[thread] = _RelogioItem()
+        try:
+            return funcao(item)
+        finally:
+            _relogios.pop(thread, None)
+
+    def _registrar(indice: int, resultado: Dict) -> None:
+        resultados[indice] = resultado
+        if ao_concluir:
+            try:
+                ao_concluir(indice, resultado)
+            except Exception as e:
+                logger.warning(f"Erro no callback ao_concluir: {e}")
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analise")
+    try:
+        pendentes = {
+            executor.submit(_executar, i, item): i
+            for i, item in enumerate(itens)
+        }
+
+        while pendentes:
+            concluidos, _ = wait(list(pendentes), timeout=1.0, return_when=FIRST_COMPLETED)
+
+            for future in concluidos:
+                indice = pendentes.pop(future)
+                try:
+                    _registrar(indice, future.result())
+                except Exception as e:
+                    logger.error(f"Erro no item {indice}: {e}")
+                    _registrar(indice, {"error": str(e)})
+
+            # Verifica timeouts dos itens em execucao
+            if timeout_item and timeout_item > 0:
+                agora = time.monotonic()
+                for future, indice in list(pendentes.items()):
+                    relogio = relogios.get(indice)
+                    if relogio is not None and relogio.decorrido(agora) > timeout_item:
+                        logger.warning(f"Item {indice} excedeu timeout de {timeout_item:.0f}s")
+                        pendentes.pop(future)
+                        future.cancel()
+                        _registrar(indice, {"error": "timeout"})
+
+    finally:
+        # Nao espera threads que estouraram o timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return resultados
@@ -0,0 +1,187 @@
+"""
+Tools de Ranking - Reclassificacao do Top 5 a partir das analises gravadas
+Reaplica pesos, filtros e ranking com novos parametros sem reanalisar
+(sem rede): le a ultima execucao do store e regenera o CSV/PDF do Top 5
+"""
+
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .store_tools import carregar_analises, listar_execucoes, TABELA_ANALISES
+from .score_tools import calc_scores_lote, colunas_scores, explicar_scores, PESOS_SCORE
+from .top5_selector import SeletorTopK, gerar_resumo_selecao, PESOS_OPORTUNIDADE
+from .output_tools import gerar_csv_top5, gerar_pdf_top5_consolidado
+
+logger = logging.getLogger(__name__)
+
+# Analises da ultima execucao lida (as consultas seguintes nao releem o store)
+_execucao_cache: Dict[str, Dict] = {}
+_execucao_lock = threading.Lock()
+
+COMPONENTES_SCORE = ("edital", "matricula", "localizacao", "financeiro", "liquidez")
+
+
+def _pesos(pesos: Optional[Dict[str, float]], padrao: Dict[str, float]) -> Optional[Dict[str, float]]:
+    """Completa pesos parciais com os padroes; ValueError para componente desconhecido"""
+    if not pesos:
+        return None
+    desconhecidos = set(pesos) - set(padrao)
+    if desconhecidos:
+        raise ValueError(f"Pesos desconhecidos: {', '.join(sorted(desconhecidos))}")
+    return {**padrao, **{nome: float(valor) for nome, valor in pesos.items()}}
+
+
+def carregar_execucao(execucao: Optional[str] = "ultima") -> Tuple[Optional[str], Dict]:
+    """
+    Analises de uma execucao gravada no store, mantidas em memoria.
+
+    Args:
+        execucao: "ultima" (default) ou um execucao_id
+
+    Returns:
+        Tupla (execucao_id, {"analises": [...], "colunas": colunas de score ou None})
+        ou (None, {}) se nao ha analises gravadas
+    """
+    execucoes = listar_execucoes(TABELA_ANALISES)
+    if execucao in (None, "ultima"):
+        execucao = execucoes[-1] if execucoes else None
+    if execucao not in execucoes:
+        return None, {}
+
+    with _execucao_lock:
+        if execucao not in _execucao_cache:
+            _execucao_cache.clear()
+            _execucao_cache[execucao] = {
+                "analises": carregar_analises(execucao=execucao),
+                "colunas": None,
+            }
+        return execucao, _execucao_cache[execucao]
+
+
+def repontuar(dados: Dict, pesos: Dict[str, float]) -> List[Dict]:
+    """
+    Recalcula scores, recomendacao e nivel de risco com outros pesos
+    (calc_scores_lote), em copias das analises.
+
+    Args:
+        dados: Execucao carregada (carregar_execucao)
+        pesos: Pesos completos do score geral
+
+    Returns:
+        Copias das analises com scores, recomendacao e nivel_risco novos
+    """
+    analises = dados["analises"]
+    if dados.get("colunas") is None:
+        dados["colunas"] = colunas_scores(analises)
+    lote = calc_scores_lote(dados["colunas"], pesos)
+
+    componentes = {nome: lote[nome].tolist() for nome in COMPONENTES_SCORE + ("geral",)}
+    recomendacoes = lote["recomendacao"].tolist()
+    niveis = lote["nivel_risco"].tolist()
+    return [
+        {
+            **analise,
+            "scores": {nome: valores[i] for nome, valores in componentes.items()},
+            "recomendacao": recomendacoes[i],
+            "nivel_risco": niveis[i],
+        }
+        for i, analise in enumerate(analises)
+    ]
+
+
+def reclassificar_top5(
+    quantidade: int = 5,
+    config: Optional[Dict] = None,
+    pesos_score: Optional[Dict[str, float]] = None,
+    execucao: Optional[str] = "ultima",
+    gerar_pdf: bool = True,
+    output_dir: Optional[Path] = None
+) -> Dict:
+    """
+    Refaz a selecao do Top N de uma execucao ja analisada com novos
+    parametros e regenera o CSV/PDF, sem rede nem nova analise.
+
+    Args:
+        quantidade: Numero de imoveis no ranking
+        config: Filtros e pesos do ranking de selecionar_top5 (score_minimo,
+                recomendacoes, risco_maximo, valor_penhoras_max, pesos_oportunidade)
+        pesos_score: Pesos do score geral (parciais, completados com PESOS_SCORE);
+                     se informados, scores e recomendacoes sao recalculados
+        execucao: "ultima" (default) ou um execucao_id
+        gerar_pdf: Gera tambem o PDF consolidado
+        output_dir: Diretorio dos relatorios (default: OUTPUT_DIR)
+
+    Returns:
+        Dict com status, ids do Top N, resumo, arquivos gerados e tempo
+    """
+    inicio = time.perf_counter()
+    config = dict(config or {})
+    pesos_score = _pesos(pesos_score, PESOS_SCORE)
+    if config.get("pesos_oportunidade"):
+        config["pesos_oportunidade"] = _pesos(config["pesos_oportunidade"], PESOS_OPORTUNIDADE)
+
+    execucao_id, dados = carregar_execucao(execucao)
+    if not execucao_id or not dados["analises"]:
+        return {"status": "vazio", "error": "Nenhuma analise gravada no store"}
+
+    if pesos_score:
+        analises = repontuar(dados, pesos_score)
+    else:
+        analises = [dict(analise) for analise in dados["analises"]]
+
+    seletor = SeletorTopK(quantidade, config)
+    for analise in analises:
+        seletor.adicionar(analise)
+    top = seletor.resultado()
+
+    # Justificativas so para os selecionados (com os pesos novos)
+    if pesos_score:
+        for imovel in top:
+            recomendacao = explicar_scores(imovel, pesos_score)["recomendacao"]
+            imovel["justificativa"] = recomendacao["justificativa"]
+            imovel["pontos_atencao"] = recomendacao["alertas"]
+            imovel["proximos_passos"] = recomendacao["proximos_passos"]
+
+    resumo = gerar_resumo_selecao(top, len(analises))
+    csv_result = gerar_csv_top5(top, output_dir, f"top5_reclassificado_{execucao_id}.csv")
+    pdf_result = None
+    if gerar_pdf:
+        pdf_result = gerar_pdf_top5_consolidado(
+            top,
+            output_dir,
+            f"top5_reclassificado_{execucao_id}.pdf",
+            titulo="Top 5 Oportunidades de Leilao (reclassificado)",
+            resumo_selecao=resumo
+        )
+
+    tempo = time.perf_counter() - inicio
+    logger.info(f"Reclassificacao de {execucao_id}: top {len(top)} de {len(analises)} em {tempo:.2f}s")
+
+    return {
+        "status": "success",
+        "execucao_id": execucao_id,
+        "parametros": {
+            "quantidade": quantidade,
+            "config": seletor.criterios,
+            "pesos_score": pesos_score or PESOS_SCORE,
+        },
+        "top_ids": [i.get("id_imovel") for i in top],
+        "top": [
+            {
+                "ranking": i.get("ranking_top5"),
+                "id_imovel": i.get("id_imovel"),
+                "score_oportunidade": i.get("score_oportunidade"),
+                "score_geral": i.get("scores", {}).get("geral"),
+                "recomendacao": i.get("recomendacao"),
+                "nivel_risco": i.get("nivel_risco"),
+            }
+            for i in top
+        ],
+        "resumo": resumo,
+        "csv": csv_result,
+        "pdf": pdf_result,
+        "tempo_s": round(tempo, 3),
+    }
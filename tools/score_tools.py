@@ -1,14 +1,20 @@
 """
 Tools de Score - Calculo de Score de Oportunidade e Classificacao
+calc_scores_lote pontua um historico inteiro de analises de uma vez (NumPy);
+as funcoes calc_score_* pontuam um imovel e detalham as deducoes
 """
 
 # Removido decorador @tool para permitir chamada direta
 # from crewai_tools import tool
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from dataclasses import dataclass
 from enum import Enum
 import logging
 
+import numpy as np
+
+from .calc_tools import arredondar_lote
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -34,6 +40,42 @@ PESOS_SCORE = {
     "liquidez": 0.10     # 10%
 }
 
+# Bairros premium de SP (score base alto)
+BAIRROS_PREMIUM = [
+    "VILA MARIANA", "MOEMA", "PINHEIROS", "ITAIM BIBI", "JARDINS",
+    "PERDIZES", "HIGIENOPOLIS", "BROOKLIN", "VILA OLIMPIA", "PARAISO",
+    "CONSOLACAO", "SANTA CECILIA", "BELA VISTA", "LIBERDADE"
+]
+
+# Bairros bons
+BAIRROS_BONS = [
+    "TATUAPE", "SANTANA", "LAPA", "ACLIMACAO", "CAMBUCI", "MOOCA",
+    "VILA PRUDENTE", "PENHA", "CASA VERDE", "TUCURUVI", "MANDAQUI"
+]
+
+# Cidades litoral premium
+CIDADES_LITORAL_PREMIUM = ["SANTOS", "GUARUJA", "SAO VICENTE"]
+
+# Subscores de localizacao usados na analise (ainda sem dados por bairro)
+SUBSCORES_LOCALIZACAO = {
+    "infraestrutura": 70,
+    "seguranca": 70,
+    "valorizacao": 75,
+    "transporte": 80
+}
+
+# Ajustes do score de liquidez
+AJUSTE_DEMANDA = {"alta": 20, "media": 0, "baixa": -20}
+AJUSTE_TIPO_IMOVEL = {
+    "Apartamento": 10,
+    "Casa": 0,
+    "Terreno": -10,
+    "Comercial": -15
+}
+
+# Debitos acima deste valor contam como fator de risco na recomendacao
+LIMITE_DEBITOS_ALTO = 15000
+
 
 def calc_score_edital(
     ocupacao: str = "nao_informado",
@@ -158,6 +200,22 @@ def calc_score_matricula(
     }
 
 
+def _categoria_localizacao(bairro: str, cidade: str) -> tuple:
+    """Score base e categoria da localizacao"""
+    bairro_upper = bairro.upper()
+    cidade_upper = cidade.upper()
+
+    if bairro_upper in BAIRROS_PREMIUM:
+        return 90, "Premium"
+    if bairro_upper in BAIRROS_BONS:
+        return 75, "Bom"
+    if cidade_upper in CIDADES_LITORAL_PREMIUM:
+        return 80, "Litoral Premium"
+    if cidade_upper == "SAO PAULO":
+        return 60, "SP Capital"
+    return 50, "Outros"
+
+
 def calc_score_localizacao(
     bairro: str,
     cidade: str,
@@ -180,41 +238,7 @@ def calc_score_localizacao(
     Returns:
         Dict com score e detalhamento
     """
-    # Bairros premium de SP (score base alto)
-    BAIRROS_PREMIUM = [
-        "VILA MARIANA", "MOEMA", "PINHEIROS", "ITAIM BIBI", "JARDINS",
-        "PERDIZES", "HIGIENOPOLIS", "BROOKLIN", "VILA OLIMPIA", "PARAISO",
-        "CONSOLACAO", "SANTA CECILIA", "BELA VISTA", "LIBERDADE"
-    ]
-
-    # Bairros bons
-    BAIRROS_BONS = [
-        "TATUAPE", "SANTANA", "LAPA", "ACLIMACAO", "CAMBUCI", "MOOCA",
-        "VILA PRUDENTE", "PENHA", "CASA VERDE", "TUCURUVI", "MANDAQUI"
-    ]
-
-    # Cidades litoral premium
-    CIDADES_LITORAL_PREMIUM = ["SANTOS", "GUARUJA", "SAO VICENTE"]
-
-    bairro_upper = bairro.upper()
-    cidade_upper = cidade.upper()
-
-    # Score base por localizacao
-    if bairro_upper in BAIRROS_PREMIUM:
-        score_base = 90
-        categoria = "Premium"
-    elif bairro_upper in BAIRROS_BONS:
-        score_base = 75
-        categoria = "Bom"
-    elif cidade_upper in CIDADES_LITORAL_PREMIUM:
-        score_base = 80
-        categoria = "Litoral Premium"
-    elif cidade_upper == "SAO PAULO":
-        score_base = 60
-        categoria = "SP Capital"
-    else:
-        score_base = 50
-        categoria = "Outros"
+    score_base, categoria = _categoria_localizacao(bairro, cidade)
 
     # Ajusta com subscores (media ponderada)
     subscores = {
@@ -340,18 +364,11 @@ def calc_score_liquidez(
     fatores.append((f"Tempo venda {tempo_venda_dias} dias", score_tempo - 50))
 
     # Ajuste por demanda
-    demanda_ajuste = {"alta": 20, "media": 0, "baixa": -20}
-    ajuste = demanda_ajuste.get(demanda_regiao.lower(), 0)
+    ajuste = AJUSTE_DEMANDA.get(demanda_regiao.lower(), 0)
     fatores.append((f"Demanda {demanda_regiao}", ajuste))
 
     # Ajuste por tipo de imovel
-    tipo_ajuste = {
-        "Apartamento": 10,
-        "Casa": 0,
-        "Terreno": -10,
-        "Comercial": -15
-    }
-    ajuste_tipo = tipo_ajuste.get(tipo_imovel, 0)
+    ajuste_tipo = AJUSTE_TIPO_IMOVEL.get(tipo_imovel, 0)
     fatores.append((f"Tipo {tipo_imovel}", ajuste_tipo))
 
     score = score_tempo + ajuste + ajuste_tipo
@@ -372,7 +389,8 @@ def calc_score_oportunidade(
     score_matricula: float,
     score_localizacao: float,
     score_financeiro: float,
-    score_liquidez: float
+    score_liquidez: float,
+    pesos: Optional[Dict[str, float]] = None
 ) -> Dict:
     """
     Calcula score geral de oportunidade (0-100) ponderado.
@@ -383,10 +401,12 @@ def calc_score_oportunidade(
         score_localizacao: Score da localizacao (0-100)
         score_financeiro: Score financeiro (0-100)
         score_liquidez: Score de liquidez (0-100)
+        pesos: Pesos por componente (default PESOS_SCORE)
 
     Returns:
         Dict com score geral e classificacao
     """
+    pesos = pesos or PESOS_SCORE
     scores = {
         "edital": score_edital,
         "matricula": score_matricula,
@@ -396,22 +416,22 @@ def calc_score_oportunidade(
     }
 
     # Calcula score ponderado
-    score_geral = sum(scores[k] * PESOS_SCORE[k] for k in scores)
+    score_geral = sum(scores[k] * pesos[k] for k in scores)
 
     # Componentes
     componentes = [
-        {"nome": "Edital", "score": score_edital, "peso": f"{PESOS_SCORE['edital']*100:.0f}%", "contribuicao": score_edital * PESOS_SCORE['edital']},
-        {"nome": "Matricula", "score": score_matricula, "peso": f"{PESOS_SCORE['matricula']*100:.0f}%", "contribuicao": score_matricula * PESOS_SCORE['matricula']},
-        {"nome": "Localizacao", "score": score_localizacao, "peso": f"{PESOS_SCORE['localizacao']*100:.0f}%", "contribuicao": score_localizacao * PESOS_SCORE['localizacao']},
-        {"nome": "Financeiro", "score": score_financeiro, "peso": f"{PESOS_SCORE['financeiro']*100:.0f}%", "contribuicao": score_financeiro * PESOS_SCORE['financeiro']},
-        {"nome": "Liquidez", "score": score_liquidez, "peso": f"{PESOS_SCORE['liquidez']*100:.0f}%", "contribuicao": score_liquidez * PESOS_SCORE['liquidez']}
+        {"nome": "Edital", "score": score_edital, "peso": f"{pesos['edital']*100:.0f}%", "contribuicao": score_edital * pesos['edital']},
+        {"nome": "Matricula", "score": score_matricula, "peso": f"{pesos['matricula']*100:.0f}%", "contribuicao": score_matricula * pesos['matricula']},
+        {"nome": "Localizacao", "score": score_localizacao, "peso": f"{pesos['localizacao']*100:.0f}%", "contribuicao": score_localizacao * pesos['localizacao']},
+        {"nome": "Financeiro", "score": score_financeiro, "peso": f"{pesos['financeiro']*100:.0f}%", "contribuicao": score_financeiro * pesos['financeiro']},
+        {"nome": "Liquidez", "score": score_liquidez, "peso": f"{pesos['liquidez']*100:.0f}%", "contribuicao": score_liquidez * pesos['liquidez']}
     ]
 
     return {
         "score_geral": round(score_geral, 2),
         "componentes": componentes,
         "scores_individuais": scores,
-        "pesos": PESOS_SCORE
+        "pesos": pesos
     }
 
 
@@ -505,6 +525,278 @@ def classificar_recomendacao(
     }
 
 
+# Colunas de entrada do score em lote e seus valores padrao (os das funcoes calc_score_*);
+# listas (riscos, gravames, irregularidades) entram como contagens
+PARAMETROS_SCORE = {
+    "ocupacao": "nao_informado",
+    "debitos_total": 0.0,
+    "total_riscos": 0,
+    "comissao_leiloeiro": 5.0,
+    "total_gravames_extintos": 0,
+    "total_gravames_transferidos": 0,
+    "total_irregularidades": 0,
+    "valor_gravames": 0.0,
+    "bairro": None,
+    "cidade": None,
+    "infraestrutura": 50,
+    "seguranca": 50,
+    "valorizacao": 50,
+    "transporte": 50,
+    "roi_percentual": None,
+    "margem_seguranca": None,
+    "desconto_percentual": None,
+    "tempo_retorno_meses": 6,
+    "tempo_venda_dias": 90,
+    "demanda_regiao": "media",
+    "tipo_imovel": "Apartamento",
+    "ocupado": False,
+    "debitos_alto": False,
+}
+
+_COLUNAS_TEXTO = ("ocupacao", "bairro", "cidade", "demanda_regiao", "tipo_imovel")
+
+
+def entradas_score(analise: Dict) -> Dict[str, Dict]:
+    """
+    Argumentos de cada calc_score_* para uma analise ja gravada
+    (os mesmos que PipelineLeilao.analisar_imovel usou).
+
+    Args:
+        analise: Analise de PipelineLeilao.analisar_imovel
+
+    Returns:
+        Dict etapa -> kwargs (edital, matricula, localizacao, financeiro,
+        liquidez, recomendacao)
+    """
+    edital = analise.get("analise_edital", {})
+    matricula = analise.get("analise_matricula", {})
+    mercado = analise.get("pesquisa_mercado", {})
+    resultado = analise.get("custos", {}).get("resultado_venda", {})
+    debitos = edital.get("total_debitos", 0)
+
+    return {
+        "edital": {
+            "ocupacao": edital.get("ocupacao", "nao_informado"),
+            "debitos_total": debitos,
+            "riscos": edital.get("riscos", []),
+            "comissao_leiloeiro": edital.get("comissao_leiloeiro_pct", 5.0),
+        },
+        "matricula": {
+            "gravames_extintos": matricula.get("gravames_extintos", []),
+            "gravames_transferidos": matricula.get("gravames_transferidos", []),
+            "irregularidades": matricula.get("irregularidades", []),
+            "valor_gravames": matricula.get("valor_gravames", 0),
+        },
+        "localizacao": {
+            "bairro": analise.get("bairro", ""),
+            "cidade": analise.get("cidade", "SAO PAULO"),
+            **SUBSCORES_LOCALIZACAO,
+        },
+        "financeiro": {
+            "roi_percentual": resultado.get("roi_total_percentual", 0),
+            "margem_seguranca": resultado.get("margem_seguranca_percentual", 0),
+            "desconto_percentual": analise.get("desconto", 0),
+        },
+        "liquidez": {
+            "tempo_venda_dias": mercado.get("tempo_venda_dias", 90),
+            "demanda_regiao": mercado.get("demanda", "media"),
+            "tipo_imovel": analise.get("tipo_imovel", "Apartamento"),
+        },
+        "recomendacao": {
+            "ocupado": edital.get("ocupacao") == "ocupado",
+            "debitos_alto": debitos > LIMITE_DEBITOS_ALTO,
+        },
+    }
+
+
+def colunas_scores(analises: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Colunas de PARAMETROS_SCORE extraidas de analises gravadas, para
+    calc_scores_lote.
+
+    Args:
+        analises: Analises de PipelineLeilao.analisar_imovel
+
+    Returns:
+        Dict coluna -> array (uma posicao por analise)
+    """
+    linhas = []
+    for analise in analises:
+        entradas = entradas_score(analise)
+        linha = {}
+        for argumentos in entradas.values():
+            for nome, valor in argumentos.items():
+                if isinstance(valor, list):
+                    linha[f"total_{nome}"] = len(valor)
+                else:
+                    linha[nome] = valor
+        linhas.append(linha)
+
+    return {
+        nome: np.array(
+            [linha.get(nome, padrao) for linha in linhas],
+            dtype=object if nome in _COLUNAS_TEXTO else float
+        )
+        for nome, padrao in PARAMETROS_SCORE.items()
+    }
+
+
+def _por_valor(coluna: np.ndarray, funcao: Callable[[str], Any]) -> np.ndarray:
+    """Aplica funcao uma vez por valor distinto de uma coluna de texto"""
+    valores, posicao = np.unique(coluna.astype(str), return_inverse=True)
+    return np.array([funcao(v) for v in valores])[posicao.reshape(-1)]
+
+
+def _menos_por_item(score: np.ndarray, quantidade: np.ndarray, pontos: float) -> np.ndarray:
+    """score -= pontos uma vez por item (mesma sequencia de operacoes do calculo por imovel)"""
+    for i in range(int(quantidade.max(initial=0))):
+        score = np.where(quantidade > i, score - pontos, score)
+    return score
+
+
+def calc_scores_lote(colunas: Any, pesos: Optional[Dict[str, float]] = None) -> Dict[str, np.ndarray]:
+    """
+    Calcula os cinco scores, o score geral e a recomendacao de varios
+    imoveis em uma unica passada vetorizada (mesmas regras e mesmo
+    arredondamento das funcoes calc_score_* e classificar_recomendacao).
+    Nao gera deducoes nem justificativas: para os imoveis que vao para
+    relatorio, use explicar_scores.
+
+    Args:
+        colunas: DataFrame ou Dict coluna -> array com as colunas de
+                 PARAMETROS_SCORE (ver colunas_scores)
+        pesos: Pesos do score geral (default PESOS_SCORE)
+
+    Returns:
+        Dict coluna -> array: edital, matricula, localizacao, financeiro,
+        liquidez, geral, recomendacao, nivel_risco, fatores_risco
+    """
+    pesos = pesos or PESOS_SCORE
+    col = {}
+    for nome, padrao in PARAMETROS_SCORE.items():
+        valor = colunas[nome] if nome in colunas else padrao
+        if valor is None:
+            raise ValueError(f"Coluna obrigatoria ausente: {nome}")
+        col[nome] = np.atleast_1d(np.asarray(valor, dtype=object if nome in _COLUNAS_TEXTO else float))
+    forma = np.broadcast_shapes(*(c.shape for c in col.values()))
+    col = {nome: np.broadcast_to(c, forma) for nome, c in col.items()}
+
+    # Edital
+    ocupacao = _por_valor(col["ocupacao"], str.lower)
+    edital = np.full(forma, 100.0)
+    edital = np.where(ocupacao == "ocupado", edital - 25, edital)
+    edital = np.where(ocupacao == "nao_informado", edital - 10, edital)
+    deducao_debitos = np.minimum(30, col["debitos_total"] / 1000)
+    edital = np.where(deducao_debitos > 0, edital - deducao_debitos, edital)
+    edital = _menos_por_item(edital, col["total_riscos"], 5)
+    comissao = col["comissao_leiloeiro"]
+    edital = np.where(comissao > 5, edital - (comissao - 5) * 2, edital)
+    edital = arredondar_lote(np.clip(edital, 0, 100))
+
+    # Matricula
+    matricula = np.full(forma, 100.0)
+    matricula = _menos_por_item(matricula, col["total_gravames_transferidos"], 15)
+    matricula = _menos_por_item(matricula, col["total_irregularidades"], 20)
+    deducao_valor = np.minimum(20, col["valor_gravames"] / 5000 * 5)
+    matricula = np.where(deducao_valor > 0, matricula - deducao_valor, matricula)
+    bonus = np.minimum(10, col["total_gravames_extintos"] * 5)
+    matricula = np.where(bonus > 0, matricula + bonus, matricula)
+    matricula = arredondar_lote(np.clip(matricula, 0, 100))
+
+    # Localizacao (score base resolvido uma vez por bairro/cidade distintos)
+    chave = np.char.add(np.char.add(col["bairro"].astype(str), "|"), col["cidade"].astype(str))
+    score_base = _por_valor(chave, lambda c: _categoria_localizacao(*c.split("|", 1))[0])
+    ajuste = (
+        col["infraestrutura"] * 0.25 + col["seguranca"] * 0.30
+        + col["valorizacao"] * 0.25 + col["transporte"] * 0.20
+    ) / 100 * 20 - 10
+    localizacao = arredondar_lote(np.clip(score_base + ajuste, 0, 100))
+
+    # Financeiro
+    tempo = col["tempo_retorno_meses"]
+    financeiro = (
+        np.minimum(50, col["roi_percentual"] / 4)
+        + np.minimum(25, col["margem_seguranca"] / 2)
+        + np.minimum(25, col["desconto_percentual"] / 2)
+    )
+    financeiro = financeiro + np.where(tempo <= 6, 5, np.where(tempo > 12, -10, 0))
+    financeiro = arredondar_lote(np.clip(financeiro, 0, 100))
+
+    # Liquidez
+    liquidez = (
+        np.maximum(0, 100 - col["tempo_venda_dias"] / 2)
+        + _por_valor(col["demanda_regiao"], lambda d: AJUSTE_DEMANDA.get(d.lower(), 0))
+        + _por_valor(col["tipo_imovel"], lambda t: AJUSTE_TIPO_IMOVEL.get(t, 0))
+    )
+    liquidez = arredondar_lote(np.clip(liquidez, 0, 100))
+
+    # Score geral (mesma ordem de soma de calc_score_oportunidade)
+    geral = 0
+    for nome, score in (("edital", edital), ("matricula", matricula), ("localizacao", localizacao),
+                        ("financeiro", financeiro), ("liquidez", liquidez)):
+        geral = geral + score * pesos[nome]
+    geral = arredondar_lote(geral)
+
+    # Recomendacao e nivel de risco
+    recomendacao = np.select(
+        [geral >= 75, geral >= 50],
+        [Recomendacao.COMPRAR.value, Recomendacao.ANALISAR_MELHOR.value],
+        Recomendacao.EVITAR.value
+    ).astype(object)
+    fatores_risco = 2 * (
+        (col["ocupado"] != 0).astype(int) + (col["debitos_alto"] != 0) + (geral < 50)
+    )
+    nivel_risco = np.select(
+        [fatores_risco <= 2, fatores_risco <= 4],
+        [NivelRisco.BAIXO.value, NivelRisco.MEDIO.value],
+        NivelRisco.ALTO.value
+    ).astype(object)
+
+    return {
+        "edital": edital,
+        "matricula": matricula,
+        "localizacao": localizacao,
+        "financeiro": financeiro,
+        "liquidez": liquidez,
+        "geral": geral,
+        "recomendacao": recomendacao,
+        "nivel_risco": nivel_risco,
+        "fatores_risco": fatores_risco,
+    }
+
+
+def explicar_scores(analise: Dict, pesos: Optional[Dict[str, float]] = None) -> Dict:
+    """
+    Recalcula os scores de uma analise gravada com as funcoes por imovel,
+    com deducoes, justificativa e proximos passos (para os imoveis que vao
+    para relatorio depois de calc_scores_lote).
+
+    Args:
+        analise: Analise de PipelineLeilao.analisar_imovel
+        pesos: Pesos do score geral (default PESOS_SCORE)
+
+    Returns:
+        Dict com o resultado de cada calc_score_*, "oportunidade" e "recomendacao"
+    """
+    entradas = entradas_score(analise)
+    resultado = {
+        "edital": calc_score_edital(**entradas["edital"]),
+        "matricula": calc_score_matricula(**entradas["matricula"]),
+        "localizacao": calc_score_localizacao(**entradas["localizacao"]),
+        "financeiro": calc_score_financeiro(**entradas["financeiro"]),
+        "liquidez": calc_score_liquidez(**entradas["liquidez"]),
+    }
+    resultado["oportunidade"] = calc_score_oportunidade(
+        *(resultado[nome]["score"] for nome in ("edital", "matricula", "localizacao", "financeiro", "liquidez")),
+        pesos=pesos
+    )
+    resultado["recomendacao"] = classificar_recomendacao(
+        score_geral=resultado["oportunidade"]["score_geral"],
+        **entradas["recomendacao"]
+    )
+    return resultado
+
+
 # Exemplo de uso
 if __name__ == "__main__":
     import json
@@ -0,0 +1,380 @@
+"""
+Tools de Armazenamento - Store colunar (Parquet) de listagens, analises e Top 5
+Particionado por data de execucao e UF; leitura com projecao de colunas e filtros
+"""
+
+import os
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .output_tools import flatten_analysis
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    PARQUET_DISPONIVEL = False
+
+# Configuracoes
+STORE_DIR = Path(os.getenv("STORE_DIR", "./data/store"))
+
+# Tabelas do store
+TABELA_LISTAGENS = "listagens"   # imoveis coletados (Caixa + scrapers)
+TABELA_ANALISES = "analises"     # analises completas (colunas do CSV + JSON original)
+TABELA_TOP5 = "top5"             # snapshots do Top 5 de cada execucao
+
+PARTICOES = ["data_execucao", "uf"]
+
+# Filtro no formato do pyarrow: (coluna, operador, valor)
+Filtro = Tuple[str, str, Any]
+
+
+class ErroStore(RuntimeError):
+    """Falha ao ler uma tabela do store"""
+
+
+def nova_execucao_id() -> str:
+    """Identificador de uma execucao do pipeline (ordenavel)"""
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def _caminho_tabela(tabela: str) -> Path:
+    return STORE_DIR / tabela
+
+
+def _tipo_coluna(serie: pd.Series) -> "pa.DataType":
+    """Tipo gravado de uma coluna: numeros como float64, booleanos como bool, o resto como texto"""
+    if pd.api.types.is_bool_dtype(serie):
+        return pa.bool_()
+    if pd.api.types.is_numeric_dtype(serie):
+        return pa.float64()
+    valores = serie.dropna()
+    if len(valores) and valores.map(lambda v: isinstance(v, bool)).all():
+        return pa.bool_()
+    if len(valores) and valores.map(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)).all():
+        return pa.float64()
+    return pa.string()
+
+
+def _tabela_arrow(df: pd.DataFrame) -> "pa.Table":
+    """
+    Converte o DataFrame com schema explicito, para que a mesma coluna tenha
+    o mesmo tipo em todas as execucoes (ex: debitos 0 numa execucao e 1234.5
+    na seguinte, ou uma coluna toda vazia que depois recebe texto)
+    """
+    campos = []
+    for col in df.columns:
+        tipo = _tipo_coluna(df[col])
+        if tipo == pa.string():
+            df[col] = df[col].map(lambda v: None if v is None or (isinstance(v, float) and pd.isna(v)) else str(v))
+        elif tipo == pa.float64():
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        campos.append(pa.field(col, tipo))
+    return pa.Table.from_pandas(df, schema=pa.schema(campos), preserve_index=False)
+
+
+def _unificar_esquemas(esquemas: List["pa.Schema"]) -> "pa.Schema":
+    """
+    Schema comum dos arquivos de uma tabela. Arquivos gravados antes do schema
+    explicito podem divergir: numeros diferentes viram float64, colunas nulas
+    assumem o tipo das demais e qualquer outro conflito vira texto.
+    """
+    tipos: Dict[str, "pa.DataType"] = {}
+    for esquema in esquemas:
+        for campo in esquema:
+            if campo.name in PARTICOES:
+                continue
+            atual = tipos.get(campo.name)
+            if atual is None or pa.types.is_null(atual):
+                tipos[campo.name] = campo.type
+            elif atual == campo.type or pa.types.is_null(campo.type):
+                continue
+            elif all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in (atual, campo.type)):
+                tipos[campo.name] = pa.float64()
+            else:
+                tipos[campo.name] = pa.string()
+    campos = [pa.field(nome, tipo) for nome, tipo in tipos.items()]
+    return pa.schema(campos + [pa.field(col, pa.string()) for col in PARTICOES])
+
+
+def salvar_tabela(
+    tabela: str,
+    registros: Union[pd.DataFrame, List[Dict]],
+    execucao_id: str
+) -> Dict:
+    """
+    Grava registros em uma tabela do store, particionada por data de execucao e UF.
+
+    Args:
+        tabela: Nome da tabela (listagens, analises, top5)
+        registros: DataFrame ou lista de dicts (colunas planas)
+        execucao_id: Identificador da execucao (ver nova_execucao_id)
+
+    Returns:
+        Dict com status, caminho e total de registros
+    """
+    if not PARQUET_DISPONIVEL:
+        logger.warning("pyarrow nao instalado, store Parquet desabilitado")
+        return {"status": "indisponivel", "error": "pyarrow nao instalado"}
+
+    df = registros.copy() if isinstance(registros, pd.DataFrame) else pd.DataFrame(registros)
+    if df.empty:
+        return {"status": "vazio", "total": 0}
+
+    df["execucao_id"] = execucao_id
+    df["data_execucao"] = datetime.strptime(execucao_id[:8], "%Y%m%d").strftime("%Y-%m-%d")
+    # Fontes sem UF sao de SP (padrao do normalizar_imovel dos scrapers)
+    if "uf" not in df.columns:
+        df["uf"] = "SP"
+    df["uf"] = df["uf"].fillna("SP").astype(str).str.strip().str.upper().replace("", "SP")
+
+    raiz = _caminho_tabela(tabela)
+    try:
+        pq.write_to_dataset(
+            _tabela_arrow(df),
+            root_path=str(raiz),
+            partition_cols=PARTICOES,
+            basename_template=f"{execucao_id}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore"
+        )
+    except Exception as e:
+        logger.error(f"Erro ao gravar tabela {tabela}: {e}")
+        return {"status": "error", "error": str(e)}
+
+    logger.info(f"Store: {len(df)} registros gravados em {tabela} ({execucao_id})")
+    return {"status": "success", "path": str(raiz), "total": len(df), "execucao_id": execucao_id}
+
+
+def listar_execucoes(tabela: str) -> List[str]:
+    """Execucoes gravadas em uma tabela (mais antiga primeiro)"""
+    raiz = _caminho_tabela(tabela)
+    if not raiz.exists():
+        return []
+    return sorted({p.name.split("-")[0] for p in raiz.rglob("*.parquet")})
+
+
+def ler_tabela(
+    tabela: str,
+    colunas: Optional[List[str]] = None,
+    filtros: Optional[List[Filtro]] = None,
+    execucao: Optional[str] = "ultima"
+) -> pd.DataFrame:
+    """
+    Le uma tabela do store com projecao de colunas e filtros aplicados na leitura.
+
+    Filtros nas colunas de particao (data_execucao, uf) descartam diretorios
+    inteiros; os demais usam as estatisticas dos arquivos Parquet. Com uma
+    execucao informada, so os arquivos dela sao abertos.
+
+    Args:
+        tabela: Nome da tabela
+        colunas: Colunas a ler (None = todas)
+        filtros: Lista de (coluna, operador, valor), combinados com AND.
+                 Operadores: =, !=, <, <=, >, >=, in, not in
+        execucao: "ultima" (default), um execucao_id especifico ou None (todas)
+
+    Returns:
+        DataFrame (vazio se a tabela ou a execucao nao existe ou pyarrow nao esta instalado)
+
+    Raises:
+        ErroStore: Se os arquivos existem mas nao puderam ser lidos
+    """
+    if not PARQUET_DISPONIVEL:
+        logger.warning("pyarrow nao instalado, store Parquet desabilitado")
+        return pd.DataFrame(columns=colunas or [])
+
+    raiz = _caminho_tabela(tabela)
+    if not raiz.exists():
+        return pd.DataFrame(columns=colunas or [])
+
+    if execucao == "ultima":
+        execucoes = listar_execucoes(tabela)
+        if not execucoes:
+            return pd.DataFrame(columns=colunas or [])
+        execucao = execucoes[-1]
+    if execucao:
+        data = datetime.strptime(execucao[:8], "%Y%m%d").strftime("%Y-%m-%d")
+        arquivos = sorted(raiz.glob(f"data_execucao={data}/*/{execucao}-*.parquet"))
+    else:
+        arquivos = sorted(raiz.rglob("*.parquet"))
+    if not arquivos:
+        return pd.DataFrame(columns=colunas or [])
+
+    try:
+        esquema = _unificar_esquemas([pq.read_schema(arquivo) for arquivo in arquivos])
+        dataset = ds.dataset(
+            [str(arquivo) for arquivo in arquivos],
+            schema=esquema,
+            format="parquet",
+            partitioning=ds.partitioning(
+                pa.schema([pa.field(col, pa.string()) for col in PARTICOES]), flavor="hive"
+            ),
+            partition_base_dir=str(raiz)
+        )
+        tabela_arrow = dataset.to_table(
+            columns=colunas,
+            filter=pq.filters_to_expression(filtros) if filtros else None
+        )
+    except Exception as e:
+        logger.error(f"Erro ao ler tabela {tabela}: {e}")
+        raise ErroStore(f"Erro ao ler tabela {tabela}: {e}") from e
+
+    return tabela_arrow.to_pandas()
+
+
+# ============================================================================
+# Tabelas do pipeline
+# ============================================================================
+
+def salvar_listagens(imoveis: Union[pd.DataFrame, List[Dict]], execucao_id: str) -> Dict:
+    """Grava os imoveis coletados (antes da analise) de uma execucao"""
+    if isinstance(imoveis, list):
+        # Listas (ex: imagens dos scrapers) nao sao colunas escalares
+        imoveis = [
+            {k: (json.dumps(v, ensure_ascii=False) if isinstance(v, (list, dict)) else v)
+             for k, v in imovel.items()}
+            for imovel in imoveis
+        ]
+    return salvar_tabela(TABELA_LISTAGENS, imoveis, execucao_id)
+
+
+def _linhas_analise(analises: List[Dict]) -> List[Dict]:
+    """Colunas do CSV completo + UF, fonte e a analise original em JSON"""
+    linhas = []
+    for analise in analises:
+        linha = flatten_analysis(analise)
+        linha["uf"] = analise.get("uf", "SP")
+        linha["fonte"] = analise.get("fonte", "caixa")
+        linha["analise_json"] = json.dumps(analise, ensure_ascii=False, default=str)
+        linhas.append(linha)
+    return linhas
+
+
+def salvar_analises(analises: List[Dict], execucao_id: str) -> Dict:
+    """Grava as analises completas de uma execucao"""
+    return salvar_tabela(TABELA_ANALISES, _linhas_analise(analises), execucao_id)
+
+
+def salvar_top5(top5: List[Dict], execucao_id: str) -> Dict:
+    """Grava o snapshot do Top 5 de uma execucao (com a posicao no ranking)"""
+    linhas = _linhas_analise(top5)
+    for posicao, linha in enumerate(linhas, 1):
+        linha["posicao"] = posicao
+    return salvar_tabela(TABELA_TOP5, linhas, execucao_id)
+
+
+def carregar_analises(
+    filtros: Optional[List[Filtro]] = None,
+    execucao: Optional[str] = "ultima"
+) -> List[Dict]:
+    """
+    Recupera as analises completas (estrutura original do pipeline).
+
+    Args:
+        filtros: Filtros de ler_tabela
+        execucao: "ultima", um execucao_id ou None
+
+    Returns:
+        Lista de analises (dicts aninhados)
+    """
+    df = ler_tabela(TABELA_ANALISES, colunas=["analise_json"], filtros=filtros, execucao=execucao)
+    return [json.loads(valor) for valor in df["analise_json"]] if len(df) else []
+
+
+# ============================================================================
+# Execucao incremental (delta entre listagens)
+# ============================================================================
+
+def _preco(valor: Any) -> Optional[float]:
+    try:
+        preco = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return None if pd.isna(preco) else preco
+
+
+def chave_imovel(id_imovel: Any) -> Optional[str]:
+    """id_imovel como texto; None se vazio ("", "None", NaN), que nao identifica o imovel"""
+    if id_imovel is None or (isinstance(id_imovel, float) and pd.isna(id_imovel)):
+        return None
+    chave = str(id_imovel).strip()
+    return None if chave.lower() in ("", "none", "nan") else chave
+
+
+def chaves_unicas(ids: List[Any]) -> set:
+    """Chaves validas que aparecem uma unica vez (repetidas nao identificam um imovel)"""
+    contagem: Dict[str, int] = {}
+    for id_imovel in ids:
+        chave = chave_imovel(id_imovel)
+        if chave is not None:
+            contagem[chave] = contagem.get(chave, 0) + 1
+    return {chave for chave, n in contagem.items() if n == 1}
+
+
+def calcular_delta(
+    atuais: List[Dict],
+    anteriores: pd.DataFrame,
+    tolerancia: float = 0.01
+) -> Dict[str, List]:
+    """
+    Compara a listagem atual com a da execucao anterior por id_imovel.
+
+    Imoveis com id_imovel vazio ou repetido (em qualquer das duas listagens)
+    nunca sao comparados: vao para sem_id e precisam ser analisados.
+
+    Args:
+        atuais: Imoveis coletados na execucao atual
+        anteriores: DataFrame com id_imovel e preco da execucao anterior
+        tolerancia: Diferenca minima de preco (R$) para considerar alteracao
+
+    Returns:
+        Dict com novos, alterados, inalterados e sem_id (imoveis atuais)
+        e removidos (ids que sairam da listagem)
+    """
+    precos_anteriores = {}
+    if len(anteriores):
+        unicos = chaves_unicas(anteriores["id_imovel"].tolist())
+        precos_anteriores = {
+            chave_imovel(id_imovel): preco
+            for id_imovel, preco in zip(anteriores["id_imovel"], anteriores["preco"])
+            if chave_imovel(id_imovel) in unicos
+        }
+
+    unicos_atuais = chaves_unicas([imovel.get("id_imovel") for imovel in atuais])
+    delta = {"novos": [], "alterados": [], "inalterados": [], "sem_id": [], "removidos": []}
+    vistos = set()
+    for imovel in atuais:
+        id_imovel = chave_imovel(imovel.get("id_imovel"))
+        vistos.add(id_imovel)
+
+        if id_imovel not in unicos_atuais:
+            delta["sem_id"].append(imovel)
+            continue
+        if id_imovel not in precos_anteriores:
+            delta["novos"].append(imovel)
+            continue
+
+        atual, anterior = _preco(imovel.get("preco")), _preco(precos_anteriores[id_imovel])
+        if atual is None or anterior is None:
+            alterado = atual != anterior
+        else:
+            alterado = abs(atual - anterior) > tolerancia
+        delta["alterados" if alterado else "inalterados"].append(imovel)
+
+    delta["removidos"] = [i for i in precos_anteriores if i not in vistos]
+    return delta
+
+
+def execucao_anterior(execucao_id: str) -> Optional[str]:
+    """Ultima execucao com analises gravadas antes de execucao_id"""
+    anteriores = [e for e in listar_execucoes(TABELA_ANALISES) if e < execucao_id]
+    return anteriores[-1] if anteriores else None
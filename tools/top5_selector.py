@@ -1,28 +1,45 @@
 """
 Top 5 Selector - Seleciona as 5 melhores oportunidades de imoveis
+SeletorTopK mantem o top N durante a analise (heap limitado, O(n log k));
+PerfisTopK mantem varios top N (quantidade/filtros diferentes) ao mesmo tempo
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+import heapq
 import logging
+import threading
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pesos do score de oportunidade composto (ranking)
+PESOS_OPORTUNIDADE = {
+    "geral": 0.40,
+    "margem": 0.25,
+    "roi": 0.20,
+    "desconto": 0.15
+}
 
-def calcular_score_oportunidade(imovel: Dict) -> float:
+
+def calcular_score_oportunidade(imovel: Dict, pesos: Optional[Dict[str, float]] = None) -> float:
     """
     Calcula score de oportunidade composto para ranking.
 
-    Combina:
+    Combina (pesos padrao de PESOS_OPORTUNIDADE):
     - Score geral (40%)
     - Margem de seguranca (25%)
     - ROI (20%)
     - Desconto (15%)
 
+    Args:
+        imovel: Analise do imovel
+        pesos: Pesos por componente (default PESOS_OPORTUNIDADE)
+
     Returns:
         Score de 0-100
     """
+    pesos = pesos or PESOS_OPORTUNIDADE
     scores = imovel.get("scores", {})
     custos = imovel.get("custos", {})
     resultado = custos.get("resultado_venda", {})
@@ -39,15 +56,52 @@ def calcular_score_oportunidade(imovel: Dict) -> float:
 
     # Score composto
     score_oportunidade = (
-        score_geral * 0.40 +
-        margem_norm * 0.25 +
-        roi_norm * 0.20 +
-        desconto_norm * 0.15
+        score_geral * pesos["geral"] +
+        margem_norm * pesos["margem"] +
+        roi_norm * pesos["roi"] +
+        desconto_norm * pesos["desconto"]
     )
 
     return round(score_oportunidade, 2)
 
 
+def chave_ranking(imovel: Dict, score_oportunidade: float) -> Tuple[float, float, float, float]:
+    """Chave de ordenacao do ranking: score de oportunidade, desempatado por score geral, margem e ROI"""
+    resultado = imovel.get("custos", {}).get("resultado_venda", {})
+    return (
+        score_oportunidade,
+        imovel.get("scores", {}).get("geral", 0),
+        resultado.get("margem_seguranca_percentual", 0),
+        resultado.get("roi_total_percentual", 0)
+    )
+
+
+def _criterios(config: Optional[Dict]) -> Dict:
+    """Criterios de filtro (podem ser customizados por config)"""
+    if config is None:
+        config = {}
+    return {
+        "score_minimo": config.get("score_minimo", 55),
+        "recomendacoes": config.get("recomendacoes", ["COMPRAR", "ANALISAR_MELHOR"]),
+        "risco_maximo": config.get("risco_maximo", ["BAIXO", "MEDIO"]),
+        "valor_penhoras_max": config.get("valor_penhoras_max", 80000),
+        "pesos_oportunidade": {**PESOS_OPORTUNIDADE, **config.get("pesos_oportunidade", {})},
+    }
+
+
+def _passa_filtros(imovel: Dict, criterios: Dict) -> bool:
+    """Verifica recomendacao, score minimo, nivel de risco e valor de penhoras/gravames"""
+    if imovel.get("recomendacao", "") not in criterios["recomendacoes"]:
+        return False
+    if imovel.get("scores", {}).get("geral", 0) < criterios["score_minimo"]:
+        return False
+    if imovel.get("nivel_risco", "ALTO") not in criterios["risco_maximo"]:
+        return False
+    if imovel.get("analise_matricula", {}).get("valor_gravames", 0) > criterios["valor_penhoras_max"]:
+        return False
+    return True
+
+
 def filtrar_candidatos(imoveis: List[Dict], config: Optional[Dict] = None) -> List[Dict]:
     """
     Filtra imoveis que atendem aos criterios minimos de qualidade.
@@ -59,44 +113,138 @@ def filtrar_candidatos(imoveis: List[Dict], config: Optional[Dict] = None) -> Li
     Returns:
         Lista de imoveis que passaram nos filtros
     """
-    if config is None:
-        config = {}
+    criterios = _criterios(config)
+    candidatos = [imovel for imovel in imoveis if _passa_filtros(imovel, criterios)]
 
-    # Criterios de filtro (podem ser customizados)
-    score_minimo = config.get("score_minimo", 55)
-    recomendacoes_aceitas = config.get("recomendacoes", ["COMPRAR", "ANALISAR_MELHOR"])
-    risco_maximo = config.get("risco_maximo", ["BAIXO", "MEDIO"])
-    valor_penhoras_max = config.get("valor_penhoras_max", 80000)
+    logger.info(f"Filtrados {len(candidatos)} candidatos de {len(imoveis)} imoveis")
+    return candidatos
 
-    candidatos = []
 
-    for imovel in imoveis:
-        # Verifica recomendacao
-        recomendacao = imovel.get("recomendacao", "")
-        if recomendacao not in recomendacoes_aceitas:
-            continue
+class SeletorTopK:
+    """
+    Top N incremental: recebe as analises conforme ficam prontas e guarda so
+    os N melhores candidatos num heap (mesmos filtros, chave e desempate de
+    selecionar_top5, sem lista materializada nem ordenacao completa).
 
-        # Verifica score minimo
-        scores = imovel.get("scores", {})
-        score_geral = scores.get("geral", 0)
-        if score_geral < score_minimo:
-            continue
+    Empates na chave ficam com o imovel de menor ordem (posicao na listagem),
+    como na ordenacao estavel de selecionar_top5. Se nenhum imovel passa nos
+    filtros, usa os N de maior score geral (fallback).
+    """
 
-        # Verifica nivel de risco
-        nivel_risco = imovel.get("nivel_risco", "ALTO")
-        if nivel_risco not in risco_maximo:
-            continue
+    def __init__(self, quantidade: int = 5, config: Optional[Dict] = None):
+        self.quantidade = quantidade
+        self.criterios = _criterios(config)
+        self.total = 0
+        self.total_candidatos = 0
+        # Heaps de minimo: a raiz e o pior dos N guardados
+        self._top: List[tuple] = []
+        self._fallback: List[tuple] = []
+        self._ordem = 0
+        self._lock = threading.Lock()
+
+    def adicionar(self, imovel: Dict, ordem: Optional[int] = None) -> bool:
+        """
+        Considera uma analise para o top N.
+
+        Args:
+            imovel: Analise de um imovel
+            ordem: Posicao do imovel na listagem, para desempate
+                   (default: ordem de chegada)
+
+        Returns:
+            True se o imovel entrou (por enquanto) no top N
+        """
+        with self._lock:
+            if ordem is None:
+                ordem = self._ordem
+            self._ordem = max(self._ordem, ordem) + 1
+            self.total += 1
+            sequencia = self.total  # desempate final: o heap nunca compara os dicts
+
+            if not _passa_filtros(imovel, self.criterios):
+                if not self.total_candidatos:
+                    entrada = (imovel.get("scores", {}).get("geral", 0), -ordem, sequencia, imovel)
+                    self._empurrar(self._fallback, entrada)
+                return False
+
+            self.total_candidatos += 1
+            self._fallback = []
+            chave = chave_ranking(imovel, self._score(imovel))
+            return self._empurrar(self._top, (chave, -ordem, sequencia, imovel))
+
+    def _score(self, imovel: Dict) -> float:
+        return calcular_score_oportunidade(imovel, self.criterios["pesos_oportunidade"])
+
+    def _empurrar(self, heap: List[tuple], entrada: tuple) -> bool:
+        """Insere no heap limitado a quantidade; False se a entrada nao e melhor que a raiz"""
+        if self.quantidade <= 0:
+            return False
+        if len(heap) < self.quantidade:
+            heapq.heappush(heap, entrada)
+            return True
+        if entrada[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entrada)
+            return True
+        return False
+
+    def ordenados(self) -> List[Dict]:
+        """Top N atual, do melhor para o pior (pode ser lido durante a analise; nao altera os imoveis)"""
+        with self._lock:
+            if self._top:
+                entradas = list(self._top)
+            else:
+                # Fallback: reordena os de maior score geral pela chave do ranking
+                entradas = [
+                    (chave_ranking(imovel, self._score(imovel)), ordem, sequencia, imovel)
+                    for _, ordem, sequencia, imovel in self._fallback
+                ]
+        return [imovel for *_, imovel in sorted(entradas, key=lambda e: e[:3], reverse=True)]
+
+    def resultado(self) -> List[Dict]:
+        """
+        Top N final, com score_oportunidade e ranking_top5 gravados nos
+        imoveis selecionados (como selecionar_top5).
+
+        Returns:
+            Lista com os top N imoveis ordenados por score
+        """
+        top_n = self.ordenados()
+        logger.info(f"Filtrados {self.total_candidatos} candidatos de {self.total} imoveis")
+
+        if not self.total_candidatos and top_n:
+            logger.warning("Nenhum imovel passou nos filtros de qualidade")
+            for imovel in top_n:
+                imovel["_nota_selecao"] = "Selecionado por fallback (nenhum passou nos filtros)"
+
+        for i, imovel in enumerate(top_n, 1):
+            imovel["score_oportunidade"] = self._score(imovel)
+            imovel["ranking_top5"] = i
+
+        logger.info(f"Selecionados top {len(top_n)} de {self.total_candidatos or len(top_n)} candidatos")
+        return top_n
+
+
+class PerfisTopK:
+    """
+    Varios top N alimentados pelas mesmas analises, um por perfil
+    (ex: {"top5": {"quantidade": 5}, "risco_baixo": {"quantidade": 10,
+    "config": {"risco_maximo": ["BAIXO"]}}}).
+    """
 
-        # Verifica valor de penhoras/gravames
-        matricula = imovel.get("analise_matricula", {})
-        valor_gravames = matricula.get("valor_gravames", 0)
-        if valor_gravames > valor_penhoras_max:
-            continue
+    def __init__(self, perfis: Dict[str, Dict]):
+        self.seletores = {nome: SeletorTopK(**parametros) for nome, parametros in perfis.items()}
 
-        candidatos.append(imovel)
+    def __getitem__(self, nome: str) -> SeletorTopK:
+        return self.seletores[nome]
 
-    logger.info(f"Filtrados {len(candidatos)} candidatos de {len(imoveis)} imoveis")
-    return candidatos
+    def adicionar(self, imovel: Dict, ordem: Optional[int] = None) -> None:
+        """Considera uma analise em todos os perfis"""
+        for seletor in self.seletores.values():
+            seletor.adicionar(imovel, ordem)
+
+    def ordenados(self) -> Dict[str, List[Dict]]:
+        """Top N atual de cada perfil"""
+        return {nome: seletor.ordenados() for nome, seletor in self.seletores.items()}
 
 
 def selecionar_top5(
@@ -118,7 +266,8 @@ def selecionar_top5(
     Args:
         imoveis_analisados: Lista completa de imoveis analisados
         quantidade: Numero de imoveis a selecionar (default: 5)
-        config: Configuracoes customizadas de filtro
+        config: Configuracoes customizadas de filtro (score_minimo, recomendacoes,
+                risco_maximo, valor_penhoras_max) e pesos_oportunidade do ranking
 
     Returns:
         Lista com os top N imoveis ordenados por score
@@ -127,46 +276,10 @@ def selecionar_top5(
         logger.warning("Lista de imoveis vazia")
         return []
 
-    # Aplica filtros de qualidade
-    candidatos = filtrar_candidatos(imoveis_analisados, config)
-
-    if not candidatos:
-        logger.warning("Nenhum imovel passou nos filtros de qualidade")
-        # Fallback: pega os melhores mesmo sem passar nos filtros
-        candidatos = sorted(
-            imoveis_analisados,
-            key=lambda x: x.get("scores", {}).get("geral", 0),
-            reverse=True
-        )[:quantidade]
-        for c in candidatos:
-            c["_nota_selecao"] = "Selecionado por fallback (nenhum passou nos filtros)"
-
-    # Calcula score de oportunidade para cada candidato
-    for candidato in candidatos:
-        candidato["score_oportunidade"] = calcular_score_oportunidade(candidato)
-
-    # Ordena por score de oportunidade (maior para menor)
-    candidatos_ordenados = sorted(
-        candidatos,
-        key=lambda x: (
-            x.get("score_oportunidade", 0),
-            x.get("scores", {}).get("geral", 0),
-            x.get("custos", {}).get("resultado_venda", {}).get("margem_seguranca_percentual", 0),
-            x.get("custos", {}).get("resultado_venda", {}).get("roi_total_percentual", 0)
-        ),
-        reverse=True
-    )
-
-    # Seleciona top N
-    top_n = candidatos_ordenados[:quantidade]
-
-    # Adiciona ranking
-    for i, imovel in enumerate(top_n, 1):
-        imovel["ranking_top5"] = i
-
-    logger.info(f"Selecionados top {len(top_n)} de {len(candidatos)} candidatos")
-
-    return top_n
+    seletor = SeletorTopK(quantidade, config)
+    for imovel in imoveis_analisados:
+        seletor.adicionar(imovel)
+    return seletor.resultado()
 
 
 def gerar_resumo_selecao(top_imoveis: List[Dict], total_analisados: int) -> Dict: